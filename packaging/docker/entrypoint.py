@@ -71,6 +71,7 @@ def load_config_from_env() -> Dict[str, Any]:
     max_size_in_mb_all_logs = os.environ.get('MAX_SIZE_IN_MB_ALL_LOGS')
     max_logfiles_num = os.environ.get('MAX_LOGFILES_NUM')
     sqlite_instructions = os.environ.get('SQLITE_INSTRUCTIONS')
+    sqlite_read_connections = os.environ.get('SQLITE_READ_CONNECTIONS')
 
     return {
         'loglevel': loglevel,
@@ -78,6 +79,7 @@ def load_config_from_env() -> Dict[str, Any]:
         'max_logfiles_num': max_logfiles_num,
         'max_size_in_mb_all_logs': max_size_in_mb_all_logs,
         'sqlite_instructions': sqlite_instructions,
+        'sqlite_read_connections': sqlite_read_connections,
     }
 
 
@@ -92,6 +94,7 @@ def load_config() -> List[str]:
     max_logfiles_num = env_config.get('max_logfiles_num')
     max_size_in_mb_all_logs = env_config.get('max_size_in_mb_all_logs')
     sqlite_instructions = env_config.get('sqlite_instructions')
+    sqlite_read_connections = env_config.get('sqlite_read_connections')
 
     if file_config is not None:
         logger.info('loading config from file')
@@ -111,6 +114,9 @@ def load_config() -> List[str]:
         if file_config.get('sqlite_instructions') is not None:
             sqlite_instructions = file_config.get('sqlite_instructions')
 
+        if file_config.get('sqlite_read_connections') is not None:
+            sqlite_read_connections = file_config.get('sqlite_read_connections')
+
     args = [
         '--data-dir',
         '/data',
@@ -134,6 +140,10 @@ def load_config() -> List[str]:
     if sqlite_instructions is not None:
         args.append('--sqlite-instructions')
         args.append(int(sqlite_instructions))
+
+    if sqlite_read_connections is not None:
+        args.append('--sqlite-read-connections')
+        args.append(int(sqlite_read_connections))
     return args
 
 
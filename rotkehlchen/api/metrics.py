@@ -0,0 +1,75 @@
+import bisect
+from dataclasses import dataclass, field
+from typing import Any, Final, Optional
+
+# Upper bounds in seconds of the buckets of the latency histograms. The last bucket
+# counts the requests slower than all of them
+LATENCY_BUCKETS: Final = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+@dataclass
+class EndpointMetrics:
+    """Aggregated measurements of the requests to one method of an endpoint"""
+    count: int = 0
+    total_time: float = 0.0  # seconds
+    max_time: float = 0.0  # seconds
+    latency_buckets: list[int] = field(default_factory=lambda: [0] * (len(LATENCY_BUCKETS) + 1))  # noqa: E501
+    request_bytes: int = 0
+    response_bytes: int = 0
+    max_response_bytes: int = 0
+
+    def serialize(self) -> dict[str, Any]:
+        return {
+            'count': self.count,
+            'total_time': round(self.total_time, 6),
+            'avg_time': round(self.total_time / self.count, 6) if self.count != 0 else 0.0,
+            'max_time': round(self.max_time, 6),
+            'latency_histogram': {
+                str(bound): count for bound, count in zip((*LATENCY_BUCKETS, 'inf'), self.latency_buckets)  # noqa: E501
+            },
+            'request_bytes': self.request_bytes,
+            'response_bytes': self.response_bytes,
+            'max_response_bytes': self.max_response_bytes,
+        }
+
+
+class RequestMetrics:
+    """Latency and payload sizes of the API requests, per endpoint and method
+
+    Endpoints are keyed by their url rule so that all the requests of an endpoint
+    with url parameters are aggregated together.
+    """
+
+    def __init__(self) -> None:
+        self.endpoints: dict[tuple[str, str], EndpointMetrics] = {}
+
+    def reset(self) -> None:
+        self.endpoints = {}
+
+    def record(
+            self,
+            endpoint: str,
+            method: str,
+            duration: float,
+            request_bytes: Optional[int],
+            response_bytes: Optional[int],
+    ) -> None:
+        """Payload sizes are None when unknown, as for streamed responses"""
+        if (metrics := self.endpoints.get((endpoint, method))) is None:
+            metrics = self.endpoints[(endpoint, method)] = EndpointMetrics()
+        metrics.count += 1
+        metrics.total_time += duration
+        metrics.max_time = max(metrics.max_time, duration)
+        metrics.latency_buckets[bisect.bisect_left(LATENCY_BUCKETS, duration)] += 1
+        metrics.request_bytes += request_bytes or 0
+        if response_bytes is not None:
+            metrics.response_bytes += response_bytes
+            metrics.max_response_bytes = max(metrics.max_response_bytes, response_bytes)
+
+    def serialize(self) -> list[dict[str, Any]]:
+        """Endpoints are sorted by the total time spent in them"""
+        ordered = sorted(self.endpoints.items(), key=lambda x: x[1].total_time, reverse=True)
+        return [
+            {'endpoint': endpoint, 'method': method, **metrics.serialize()}
+            for (endpoint, method), metrics in ordered
+        ]
@@ -7,7 +7,9 @@ import sys
 import tempfile
 import traceback
 from collections import defaultdict
+from collections.abc import Iterable, Iterator
 from http import HTTPStatus
+from itertools import islice
 from pathlib import Path
 from typing import (
     TYPE_CHECKING,
@@ -37,16 +39,25 @@ from rotkehlchen.accounting.debugimporter.json import DebugHistoryImporter
 from rotkehlchen.accounting.ledger_actions import LedgerAction
 from rotkehlchen.accounting.structures.balance import Balance, BalanceType
 from rotkehlchen.accounting.structures.base import HistoryBaseEntry, StakingEvent
+from rotkehlchen.accounting.structures.processed_event import ProcessedAccountingEvent
 from rotkehlchen.accounting.structures.types import (
     ActionType,
     HistoryEventSubType,
     HistoryEventType,
 )
+from rotkehlchen.api.metrics import RequestMetrics
+from rotkehlchen.api.tasks import (
+    APITaskClass,
+    APITaskExecutor,
+    APITaskPriority,
+    make_dedup_key,
+)
 from rotkehlchen.api.v1.schemas import TradeSchema
 from rotkehlchen.api.v1.types import (
     EvmPendingTransactionDecodingApiData,
     EvmTransactionDecodingApiData,
 )
+from rotkehlchen.api.websockets.typedefs import WSMessageType
 from rotkehlchen.assets.asset import (
     Asset,
     AssetWithNameAndType,
@@ -86,6 +97,7 @@ from rotkehlchen.constants.misc import (
     ASSET_TYPES_EXCLUDED_FOR_USERS,
     DEFAULT_MAX_LOG_BACKUP_FILES,
     DEFAULT_MAX_LOG_SIZE_IN_MB,
+    DEFAULT_SQL_READ_CONNECTIONS,
     DEFAULT_SQL_VM_INSTRUCTIONS_CB,
     HTTP_STATUS_INTERNAL_DB_ERROR,
     ONE,
@@ -96,6 +108,7 @@ from rotkehlchen.data_import.manager import DataImportSource
 from rotkehlchen.db.addressbook import DBAddressbook
 from rotkehlchen.db.constants import HISTORY_MAPPING_KEY_STATE, HISTORY_MAPPING_STATE_CUSTOMIZED
 from rotkehlchen.db.custom_assets import DBCustomAssets
+from rotkehlchen.db.drivers.instrumentation import SQL_INSTRUMENTATION
 from rotkehlchen.db.evmtx import DBEvmTx
 from rotkehlchen.db.filtering import (
     AssetMovementsFilterQuery,
@@ -118,6 +131,11 @@ from rotkehlchen.db.reports import DBAccountingReports
 from rotkehlchen.db.search_assets import search_assets_levenshtein
 from rotkehlchen.db.settings import ModifiableDBSettings
 from rotkehlchen.db.snapshots import DBSnapshot
+from rotkehlchen.db.timeseries import (
+    TimeSeriesResolution,
+    query_balances_series,
+    query_netvalue_series,
+)
 from rotkehlchen.db.utils import DBAssetBalance, LocationData
 from rotkehlchen.errors.api import (
     AuthenticationError,
@@ -155,7 +173,11 @@ from rotkehlchen.inquirer import CurrentPriceOracle, Inquirer
 from rotkehlchen.logging import RotkehlchenLogsAdapter
 from rotkehlchen.premium.premium import PremiumCredentials
 from rotkehlchen.rotkehlchen import Rotkehlchen
-from rotkehlchen.serialization.serialize import process_result, process_result_list
+from rotkehlchen.serialization.serialize import (
+    process_result,
+    process_result_list,
+    process_result_to_json,
+)
 from rotkehlchen.types import (
     AVAILABLE_MODULES_MAP,
     SUPPORTED_BITCOIN_CHAINS,
@@ -202,6 +224,7 @@ logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
 
 OK_RESULT = {'result': True, 'message': ''}
+STREAMED_ENTRIES_PER_CHUNK = 500
 
 
 def _wrap_in_ok_result(result: Any) -> dict[str, Any]:
@@ -224,10 +247,15 @@ def api_response(
         result: dict[str, Any],
         status_code: HTTPStatus = HTTPStatus.OK,
         log_result: bool = True,
+        process: bool = False,
 ) -> Response:
+    """If process is True the result is given to process_result while serialized to json.
+    Doing it here in a single pass is faster than calling process_result first."""
     if status_code == HTTPStatus.NO_CONTENT:
         assert not result, 'Provided 204 response with non-zero length response'
         data = ''
+    elif process is True:
+        data = process_result_to_json(result)
     else:
         data = json.dumps(result)
 
@@ -244,22 +272,65 @@ def api_response(
     return response
 
 
+def streamed_api_response(
+        entries: Iterable[Any],
+        result: Union[dict[str, Any], Callable[[], dict[str, Any]]],
+        process: bool = False,
+) -> Response:
+    """Returns a response whose body is sent while the entries are being serialized
+
+    The body is the same as that of api_response for the result with the entries
+    under 'entries' and a message. Entries are consumed lazily and serialized in
+    batches so memory is bounded whatever their number, if they are generated lazily
+    too. The rest of the result is sent after the entries, so it can be given as a
+    function that is called once they are consumed. Once the response started there
+    is no way to report an error. If the entries raise, the body is cut short.
+    """
+    encode: Callable[[Any], str] = process_result_to_json if process is True else json.dumps
+
+    def generate_body() -> Iterator[str]:
+        yield '{"result": {"entries": ['
+        separator = ''
+        entries_iterator = iter(entries)
+        while len(batch := list(islice(entries_iterator, STREAMED_ENTRIES_PER_CHUNK))) != 0:
+            yield separator + encode(batch)[1:-1]  # without the list's brackets
+            separator = ', '
+        rest_of_result = result() if callable(result) else result
+        yield ']' + (', ' + encode(rest_of_result)[1:-1] if len(rest_of_result) != 0 else '') + '}, "message": ""}'  # noqa: E501
+
+    return Response(
+        generate_body(),
+        status=HTTPStatus.OK,
+        mimetype='application/json',
+        headers={'rotki-log-result': False},  # popped by after request callback
+    )
+
+
 def make_response_from_dict(response_data: dict[str, Any]) -> Response:
     result = response_data.get('result')
     message = response_data.get('message', '')
     status_code = response_data.get('status_code', HTTPStatus.OK)
     return api_response(
-        result=process_result(_wrap_in_result(result=result, message=message)),
+        result=_wrap_in_result(result=result, message=message),
         status_code=status_code,
+        process=True,
     )
 
 
-def async_api_call() -> Callable:
+def async_api_call(
+        task_class: APITaskClass = APITaskClass.OTHER,
+        priority: APITaskPriority = APITaskPriority.NORMAL,
+        deduplicate: bool = False,
+) -> Callable:
     """
     This is a decorator that should be used with endpoints that can be called asynchronously.
     It reads `async_query` argument from the wrapped function to determine whether to call
     asynchronously or not. Defaults to synchronous mode.
 
+    Async calls run as tasks of the given class and priority. If `deduplicate` is True a call
+    identical to a task that is queued or running gets the outcome of that task instead of
+    starting a new one. Only for endpoints for which running twice gives the same outcome.
+
     Endpoints that it wraps must return a dictionary with result, message and optionally a
     status code.
     This decorator reads the dictionary and transforms it to a Reponse object.
@@ -270,6 +341,9 @@ def async_api_call() -> Callable:
             if async_query is True:
                 return rest_api._query_async(
                     command=func,
+                    task_class=task_class,
+                    priority=priority,
+                    dedup_key=make_dedup_key(func, kwargs) if deduplicate else None,
                     **kwargs,
                 )
 
@@ -292,7 +366,9 @@ class RestAPI():
         self.task_lock = Semaphore()
         self.task_id = 0
         self.task_results: dict[int, Any] = {}
+        self.task_executor = APITaskExecutor(greenlets=self.rotkehlchen.api_task_greenlets)
         self.trade_schema = TradeSchema()
+        self.request_metrics = RequestMetrics()
 
     # - Private functions not exposed to the API
     def _new_task_id(self) -> int:
@@ -302,8 +378,18 @@ class RestAPI():
         return task_id
 
     def _write_task_result(self, task_id: int, result: Any) -> None:
+        """Writes the result for all the requests served by the task and notifies the
+        websocket subscribers. Broadcasting only queues the messages, so this is safe to
+        call from the hub as well"""
+        task_ids = self.task_executor.finish(task_id)
         with self.task_lock:
-            self.task_results[task_id] = result
+            for served_id in task_ids:
+                self.task_results[served_id] = result
+        for served_id in task_ids:
+            self.rotkehlchen.rotki_notifier.broadcast(
+                message_type=WSMessageType.ASYNC_TASK_STATUS,
+                to_send_data={'task_id': served_id, 'status': 'completed'},
+            )
 
     def _handle_killed_greenlets(self, greenlet: gevent.Greenlet) -> None:
         if not greenlet.exception:
@@ -345,17 +431,31 @@ class RestAPI():
         result = command(self, **kwargs)
         self._write_task_result(task_id, result)
 
-    def _query_async(self, command: Callable, **kwargs: Any) -> Response:
+    def _query_async(
+            self,
+            command: Callable,
+            task_class: APITaskClass,
+            priority: APITaskPriority,
+            dedup_key: Optional[tuple],
+            **kwargs: Any,
+    ) -> Response:
         task_id = self._new_task_id()
-        greenlet = gevent.spawn(
-            self._do_query_async,
-            command,
-            task_id,
-            **kwargs,
-        )
-        greenlet.task_id = task_id
-        greenlet.link_exception(self._handle_killed_greenlets)
-        self.rotkehlchen.api_task_greenlets.append(greenlet)
+        if self.task_executor.join_in_flight(task_id=task_id, dedup_key=dedup_key) is False:
+            greenlet = gevent.Greenlet(
+                self._do_query_async,
+                command,
+                task_id,
+                **kwargs,
+            )
+            greenlet.task_id = task_id
+            greenlet.link_exception(self._handle_killed_greenlets)
+            self.task_executor.submit(
+                task_id=task_id,
+                greenlet=greenlet,
+                task_class=task_class,
+                priority=priority,
+                dedup_key=dedup_key,
+            )
         return api_response(_wrap_in_ok_result({'task_id': task_id}), status_code=HTTPStatus.OK)
 
     # - Public functions not exposed via the rest api
@@ -390,8 +490,7 @@ class RestAPI():
             # If no task id is given return list of all pending and completed tasks
             completed = []
             pending = []
-            for greenlet in self.rotkehlchen.api_task_greenlets:
-                task_id = greenlet.task_id
+            for task_id in self.task_executor.tasks:
                 if task_id in self.task_results:
                     completed.append(task_id)
                 else:
@@ -400,37 +499,40 @@ class RestAPI():
             result = _wrap_in_ok_result({'pending': pending, 'completed': completed})
             return api_response(result=result, status_code=HTTPStatus.OK)
 
-        with self.task_lock:
-            for idx, greenlet in enumerate(self.rotkehlchen.api_task_greenlets):
-                if greenlet.task_id == task_id:
-                    if task_id in self.task_results:
-                        # Task has completed and we just got the outcome
-                        function_response = self.task_results.pop(int(task_id), None)
-                        # The result of the original request
-                        result = function_response['result']
-                        # The message of the original request
-                        message = function_response['message']
-                        status_code = function_response.get('status_code')
-                        ret = {'result': result, 'message': message}
-                        returned_task_result = {
-                            'status': 'completed',
-                            'outcome': process_result(ret),
-                        }
-                        if status_code:
-                            returned_task_result['status_code'] = status_code
-                        result_dict = {
-                            'result': returned_task_result,
-                            'message': '',
-                        }
-                        # Also remove the greenlet from the api tasks
-                        self.rotkehlchen.api_task_greenlets.pop(idx)
-                        return api_response(result=result_dict, status_code=HTTPStatus.OK)
-                    # else task is still pending and the greenlet is running
-                    result_dict = {
-                        'result': {'status': 'pending', 'outcome': None},
-                        'message': f'The task with id {task_id} is still pending',
-                    }
-                    return api_response(result=result_dict, status_code=HTTPStatus.OK)
+        if task_id in self.task_executor.tasks:
+            with self.task_lock:
+                function_response = self.task_results.pop(task_id, None)
+            if function_response is not None:
+                # Task has completed and we just got the outcome
+                # The result of the original request
+                result = function_response['result']
+                # The message of the original request
+                message = function_response['message']
+                status_code = function_response.get('status_code')
+                ret = {'result': result, 'message': message}
+                returned_task_result = {
+                    'status': 'completed',
+                    'outcome': ret,
+                }
+                if status_code:
+                    returned_task_result['status_code'] = status_code
+                result_dict = {
+                    'result': returned_task_result,
+                    'message': '',
+                }
+                # Also remove the task and its greenlet from the api tasks
+                self.task_executor.remove(task_id)
+                return api_response(
+                    result=result_dict,
+                    status_code=HTTPStatus.OK,
+                    process=True,
+                )
+            # else task is still pending and the greenlet is queued or running
+            result_dict = {
+                'result': {'status': 'pending', 'outcome': None},
+                'message': f'The task with id {task_id} is still pending',
+            }
+            return api_response(result=result_dict, status_code=HTTPStatus.OK)
 
         # The task has not been found
         result_dict = {
@@ -439,7 +541,7 @@ class RestAPI():
         }
         return api_response(result=result_dict, status_code=HTTPStatus.NOT_FOUND)
 
-    @async_api_call()
+    @async_api_call(deduplicate=True)
     def get_exchange_rates(self, given_currencies: list[AssetWithOracles]) -> dict[str, Any]:
         if len(given_currencies) == 0:
             return wrap_in_fail_result(
@@ -466,7 +568,7 @@ class RestAPI():
 
         return _wrap_in_ok_result(process_result(asset_rates))
 
-    @async_api_call()
+    @async_api_call(task_class=APITaskClass.BALANCES, deduplicate=True)
     def query_all_balances(
             self,
             save_data: bool,
@@ -608,7 +710,7 @@ class RestAPI():
 
         return {'result': result, 'message': error_msg, 'status_code': status_code}
 
-    @async_api_call()
+    @async_api_call(task_class=APITaskClass.BALANCES, deduplicate=True)
     def query_exchange_balances(self, location: Optional[Location], ignore_cache: bool) -> dict[str, Any]:  # noqa: E501
         if location is None:
             # Query all exchanges
@@ -656,7 +758,7 @@ class RestAPI():
 
         return api_response(_wrap_in_ok_result(result), status_code=HTTPStatus.OK)
 
-    @async_api_call()
+    @async_api_call(task_class=APITaskClass.BALANCES, deduplicate=True)
     def query_blockchain_balances(
             self,
             blockchain: Optional[SupportedBlockchain],
@@ -681,13 +783,28 @@ class RestAPI():
 
         return {'result': result, 'message': msg, 'status_code': status_code}
 
-    @async_api_call()
-    def get_trades(
+    def _serialize_trades(
+            self,
+            trades: list[Trade],
+            ignored_ids: set[str],
+            include_ignored_trades: bool,
+    ) -> Iterator[dict[str, Any]]:
+        for trade in trades:
+            is_trade_ignored = trade.identifier in ignored_ids
+            if include_ignored_trades is False and is_trade_ignored is True:
+                continue
+
+            serialized_trade = self.trade_schema.dump(trade)
+            serialized_trade['trade_id'] = trade.identifier
+            yield {'entry': serialized_trade, 'ignored_in_accounting': is_trade_ignored}
+
+    def _query_trades(
             self,
             only_cache: bool,
             filter_query: TradesFilterQuery,
             include_ignored_trades: bool,
     ) -> dict[str, Any]:
+        """The trades under entries in the result are serialized while iterated"""
         try:
             trades, filter_total_found = self.rotkehlchen.events_historian.query_trades(
                 filter_query=filter_query,
@@ -696,37 +813,67 @@ class RestAPI():
         except RemoteError as e:
             return {'result': None, 'message': str(e), 'status_code': HTTPStatus.BAD_GATEWAY}
 
-        trades_result = []
-        for trade in trades:
-            serialized_trade = self.trade_schema.dump(trade)
-            serialized_trade['trade_id'] = trade.identifier
-            trades_result.append(serialized_trade)
-
         with self.rotkehlchen.data.db.conn.read_ctx() as cursor:
             mapping = self.rotkehlchen.data.db.get_ignored_action_ids(cursor, ActionType.TRADE)
             ignored_ids = mapping.get(ActionType.TRADE, set())
-            entries_result = []
-            for entry in trades_result:
-                is_trade_ignored = entry['trade_id'] in ignored_ids
-                if include_ignored_trades is False and is_trade_ignored is True:
-                    continue
-
-                entries_result.append(
-                    {'entry': entry, 'ignored_in_accounting': is_trade_ignored},
-                )
 
-            result = {
-                'entries': entries_result,
-                'entries_found': filter_total_found,
-                'entries_total': self.rotkehlchen.data.db.get_entries_count(
+            if (keyset_cursor := filter_query.keyset_cursor) is not None:
+                entries_total = keyset_cursor.entries_total
+            else:
+                entries_total = self.rotkehlchen.data.db.get_entries_count(
                     cursor=cursor,
                     entries_table='trades',
+                )
+            result = {
+                'entries': self._serialize_trades(
+                    trades=trades,
+                    ignored_ids=ignored_ids,
+                    include_ignored_trades=include_ignored_trades,
                 ),
+                'entries_found': filter_total_found,
+                'entries_total': entries_total,
                 'entries_limit': FREE_TRADES_LIMIT if self.rotkehlchen.premium is None else -1,
+                'next_continuation_token': filter_query.next_continuation_token(
+                    entries=trades,
+                    entries_found=filter_total_found,
+                    entries_total=entries_total,
+                ),
             }
 
         return {'result': result, 'message': '', 'status_code': HTTPStatus.OK}
 
+    @async_api_call(task_class=APITaskClass.HISTORY, deduplicate=True)
+    def get_trades(
+            self,
+            only_cache: bool,
+            filter_query: TradesFilterQuery,
+            include_ignored_trades: bool,
+    ) -> dict[str, Any]:
+        response = self._query_trades(
+            only_cache=only_cache,
+            filter_query=filter_query,
+            include_ignored_trades=include_ignored_trades,
+        )
+        if response['result'] is not None:
+            response['result']['entries'] = list(response['result']['entries'])
+        return response
+
+    def stream_trades(
+            self,
+            only_cache: bool,
+            filter_query: TradesFilterQuery,
+            include_ignored_trades: bool,
+    ) -> Response:
+        response = self._query_trades(
+            only_cache=only_cache,
+            filter_query=filter_query,
+            include_ignored_trades=include_ignored_trades,
+        )
+        if (result := response['result']) is None:
+            return make_response_from_dict(response)
+
+        return streamed_api_response(entries=result.pop('entries'), result=result, process=True)
+
     def add_trade(
             self,
             timestamp: Timestamp,
@@ -811,7 +958,7 @@ class RestAPI():
 
         return api_response(_wrap_in_ok_result(True), status_code=HTTPStatus.OK)
 
-    @async_api_call()
+    @async_api_call(task_class=APITaskClass.HISTORY, deduplicate=True)
     def get_asset_movements(
             self,
             filter_query: AssetMovementsFilterQuery,
@@ -850,7 +997,7 @@ class RestAPI():
 
         return {'result': result, 'message': msg, 'status_code': status_code}
 
-    @async_api_call()
+    @async_api_call(task_class=APITaskClass.HISTORY, deduplicate=True)
     def get_ledger_actions(
             self,
             filter_query: LedgerActionsFilterQuery,
@@ -1024,7 +1171,7 @@ class RestAPI():
         result_dict = _wrap_in_ok_result(result)
         return api_response(result_dict, status_code=HTTPStatus.OK)
 
-    @async_api_call()
+    @async_api_call(priority=APITaskPriority.HIGH)
     def create_new_user(
             self,
             name: str,
@@ -1106,7 +1253,7 @@ class RestAPI():
             'status_code': HTTPStatus.OK,
         }
 
-    @async_api_call()
+    @async_api_call(priority=APITaskPriority.HIGH)
     def user_login(
             self,
             name: str,
@@ -1183,6 +1330,7 @@ class RestAPI():
         # 2. Have an intricate stop() notification system for each greenlet, but
         #   that is going to get complicated fast.
         gevent.killall(self.rotkehlchen.api_task_greenlets)
+        self.task_executor.reset()
         with self.task_lock:
             self.task_results = {}
         self.rotkehlchen.logout()
@@ -1537,7 +1685,11 @@ class RestAPI():
             return api_response(_wrap_in_ok_result(OK_RESULT), status_code=HTTPStatus.OK)
         return api_response(wrap_in_fail_result(msg), status_code=HTTPStatus.CONFLICT)
 
-    def query_netvalue_data(self, include_nfts: bool) -> Response:
+    def query_netvalue_data(
+            self,
+            include_nfts: bool,
+            resolution: Optional[TimeSeriesResolution] = None,
+    ) -> Response:
         from_ts = Timestamp(0)
         premium = self.rotkehlchen.premium
 
@@ -1546,8 +1698,14 @@ class RestAPI():
             start_of_day_today = datetime.datetime(today.year, today.month, today.day, tzinfo=datetime.timezone.utc)  # noqa: E501
             from_ts = Timestamp(int((start_of_day_today - datetime.timedelta(days=14)).timestamp()))  # noqa: E501
 
-        data = self.rotkehlchen.data.db.get_netvalue_data(from_ts, include_nfts)
-        result = process_result({'times': data[0], 'data': data[1]})
+        with self.rotkehlchen.data.db.conn.read_ctx(offload=True) as cursor:
+            series = query_netvalue_series(
+                cursor=cursor,
+                from_ts=from_ts,
+                include_nfts=include_nfts,
+                resolution=resolution,
+            )
+        result = {'times': series.times, 'data': series.usd_values}
         return api_response(
             result=_wrap_in_ok_result(result),
             status_code=HTTPStatus.OK,
@@ -1559,18 +1717,21 @@ class RestAPI():
             asset: Asset,
             from_timestamp: Timestamp,
             to_timestamp: Timestamp,
+            resolution: Optional[TimeSeriesResolution] = None,
     ) -> Response:
         # TODO: Think about this, but for now this is only balances, not liabilities
-        with self.rotkehlchen.data.db.conn.read_ctx() as cursor:
-            data = self.rotkehlchen.data.db.query_timed_balances(
+        with self.rotkehlchen.data.db.conn.read_ctx(offload=True) as cursor:
+            series = query_balances_series(
                 cursor=cursor,
+                settings=self.rotkehlchen.data.db.get_settings(cursor),
                 from_ts=from_timestamp,
                 to_ts=to_timestamp,
                 asset=asset,
                 balance_type=BalanceType.ASSET,
+                resolution=resolution,
             )
 
-        result = process_result_list(data)
+        result = series.serialize()
         return api_response(
             result=_wrap_in_ok_result(result),
             status_code=HTTPStatus.OK,
@@ -1604,9 +1765,10 @@ class RestAPI():
             status_code = HTTPStatus.CONFLICT
 
         return api_response(
-            result=process_result(result_dict),
+            result=result_dict,
             status_code=status_code,
             log_result=False,
+            process=True,
         )
 
     def get_messages(self) -> Response:
@@ -1615,7 +1777,7 @@ class RestAPI():
         result = {'warnings': warnings, 'errors': errors}
         return api_response(_wrap_in_ok_result(result), status_code=HTTPStatus.OK)
 
-    @async_api_call()
+    @async_api_call(task_class=APITaskClass.REPORTS, deduplicate=True)
     def process_history(
             self,
             from_timestamp: Timestamp,
@@ -1627,7 +1789,7 @@ class RestAPI():
         )
         return {'result': report_id, 'message': error_or_empty}
 
-    @async_api_call()
+    @async_api_call(task_class=APITaskClass.REPORTS)
     def get_history_debug(
             self,
             from_timestamp: Timestamp,
@@ -1664,7 +1826,7 @@ class RestAPI():
         return _wrap_in_ok_result(debug_info)
 
     if getattr(sys, 'frozen', False) is False:
-        @async_api_call()
+        @async_api_call(task_class=APITaskClass.REPORTS)
         def _import_history_debug(self, filepath: Path) -> dict[str, Any]:
             """Imports the PnL debug data for processing and report generation"""
             json_importer = DebugHistoryImporter(self.rotkehlchen.data.db)
@@ -1793,7 +1955,7 @@ class RestAPI():
         except InputError as e:
             return api_response(wrap_in_fail_result(str(e)), status_code=HTTPStatus.BAD_REQUEST)  # noqa: E501
 
-        return api_response(process_result(_wrap_in_result(data, '')), status_code=HTTPStatus.OK)
+        return api_response(_wrap_in_result(data, ''), status_code=HTTPStatus.OK, process=True)
 
     @async_api_call()
     def add_evm_accounts(
@@ -1826,7 +1988,7 @@ class RestAPI():
     def get_blockchain_accounts(self, blockchain: SupportedBlockchain) -> Response:
         with self.rotkehlchen.data.db.conn.read_ctx() as cursor:
             data = self.rotkehlchen.get_blockchain_account_data(cursor, blockchain)
-        return api_response(process_result(_wrap_in_result(data, '')), status_code=HTTPStatus.OK)
+        return api_response(_wrap_in_result(data, ''), status_code=HTTPStatus.OK, process=True)
 
     @overload
     def add_single_blockchain_accounts(
@@ -1908,7 +2070,7 @@ class RestAPI():
         except InputError as e:
             return api_response(wrap_in_fail_result(str(e)), status_code=HTTPStatus.BAD_REQUEST)  # noqa: E501
 
-        return api_response(process_result(_wrap_in_result(data, '')), status_code=HTTPStatus.OK)
+        return api_response(_wrap_in_result(data, ''), status_code=HTTPStatus.OK, process=True)
 
     @async_api_call()
     def remove_single_blockchain_accounts(
@@ -1945,7 +2107,7 @@ class RestAPI():
         )
         return _wrap_in_ok_result(balances)
 
-    @async_api_call()
+    @async_api_call(task_class=APITaskClass.BALANCES, deduplicate=True)
     def get_manually_tracked_balances(self) -> dict[str, Any]:
         return self._get_manually_tracked_balances()
 
@@ -2100,6 +2262,7 @@ class RestAPI():
                 'max_logfiles_num': DEFAULT_MAX_LOG_BACKUP_FILES,
                 'max_size_in_mb_all_logs': DEFAULT_MAX_LOG_SIZE_IN_MB,
                 'sqlite_instructions': DEFAULT_SQL_VM_INSTRUCTIONS_CB,
+                'sqlite_read_connections': DEFAULT_SQL_READ_CONNECTIONS,
             },
         }
         return api_response(_wrap_in_ok_result(result), status_code=HTTPStatus.OK)
@@ -2147,7 +2310,7 @@ class RestAPI():
             **kwargs,
         )
 
-    @async_api_call()
+    @async_api_call(task_class=APITaskClass.HISTORY, deduplicate=True)
     def get_eth2_stake_deposits(self) -> dict[str, Any]:
         try:
             result = self.rotkehlchen.chains_aggregator.get_eth2_staking_deposits()
@@ -2158,7 +2321,7 @@ class RestAPI():
 
         return {'result': process_result_list([x.serialize() for x in result]), 'message': ''}
 
-    @async_api_call()
+    @async_api_call(task_class=APITaskClass.BALANCES, deduplicate=True)
     def get_eth2_stake_details(self) -> dict[str, Any]:
         try:
             result = self.rotkehlchen.chains_aggregator.get_eth2_staking_details()
@@ -2173,7 +2336,7 @@ class RestAPI():
             'message': '',
         }
 
-    @async_api_call()
+    @async_api_call(task_class=APITaskClass.HISTORY, deduplicate=True)
     def get_eth2_daily_stats(
             self,
             filter_query: Eth2DailyStatsFilterQuery,
@@ -2275,7 +2438,7 @@ class RestAPI():
 
         return api_response(result, status_code=status_code)
 
-    @async_api_call()
+    @async_api_call(task_class=APITaskClass.BALANCES, deduplicate=True)
     def get_defi_balances(self) -> dict[str, Any]:
         """
         This returns the typical async response dict but with the
@@ -2404,7 +2567,7 @@ class RestAPI():
 
         return {'result': result, 'message': msg, 'status_code': status_code}
 
-    @async_api_call()
+    @async_api_call(task_class=APITaskClass.BALANCES, deduplicate=True)
     def get_makerdao_dsr_balance(self) -> dict[str, Any]:
         return self._eth_module_query(
             module_name='makerdao_dsr',
@@ -2412,7 +2575,7 @@ class RestAPI():
             query_specific_balances_before=None,
         )
 
-    @async_api_call()
+    @async_api_call(task_class=APITaskClass.HISTORY, deduplicate=True)
     def get_makerdao_dsr_history(self) -> dict[str, Any]:
         return self._eth_module_query(
             module_name='makerdao_dsr',
@@ -2420,7 +2583,7 @@ class RestAPI():
             query_specific_balances_before=None,
         )
 
-    @async_api_call()
+    @async_api_call(task_class=APITaskClass.BALANCES, deduplicate=True)
     def get_makerdao_vaults(self) -> dict[str, Any]:
         return self._eth_module_query(
             module_name='makerdao_vaults',
@@ -2428,7 +2591,7 @@ class RestAPI():
             query_specific_balances_before=None,
         )
 
-    @async_api_call()
+    @async_api_call(task_class=APITaskClass.HISTORY, deduplicate=True)
     def get_makerdao_vault_details(self) -> dict[str, Any]:
         return self._eth_module_query(
             module_name='makerdao_vaults',
@@ -2436,7 +2599,7 @@ class RestAPI():
             query_specific_balances_before=None,
         )
 
-    @async_api_call()
+    @async_api_call(task_class=APITaskClass.BALANCES, deduplicate=True)
     def get_aave_balances(self) -> dict[str, Any]:
         # Once that has ran we can be sure that defi_balances mapping is populated
         return self._eth_module_query(
@@ -2450,7 +2613,7 @@ class RestAPI():
             given_defi_balances=lambda: self.rotkehlchen.chains_aggregator.defi_balances,
         )
 
-    @async_api_call()
+    @async_api_call(task_class=APITaskClass.HISTORY, deduplicate=True)
     def get_aave_history(
             self,
             reset_db_data: bool,
@@ -2472,7 +2635,7 @@ class RestAPI():
             given_defi_balances=lambda: self.rotkehlchen.chains_aggregator.defi_balances,
         )
 
-    @async_api_call()
+    @async_api_call(task_class=APITaskClass.BALANCES, deduplicate=True)
     def get_compound_balances(self) -> dict[str, Any]:
         # Once that has ran we can be sure that defi_balances mapping is populated
         return self._eth_module_query(
@@ -2486,7 +2649,7 @@ class RestAPI():
             given_defi_balances=lambda: self.rotkehlchen.chains_aggregator.defi_balances,
         )
 
-    @async_api_call()
+    @async_api_call(task_class=APITaskClass.HISTORY, deduplicate=True)
     def get_compound_history(
             self,
             reset_db_data: bool,
@@ -2508,7 +2671,7 @@ class RestAPI():
             to_timestamp=to_timestamp,
         )
 
-    @async_api_call()
+    @async_api_call(task_class=APITaskClass.BALANCES, deduplicate=True)
     def get_yearn_vaults_balances(self) -> dict[str, Any]:
         # Once that has ran we can be sure that defi_balances mapping is populated
         return self._eth_module_query(
@@ -2522,7 +2685,7 @@ class RestAPI():
             given_defi_balances=lambda: self.rotkehlchen.chains_aggregator.defi_balances,
         )
 
-    @async_api_call()
+    @async_api_call(task_class=APITaskClass.BALANCES, deduplicate=True)
     def get_yearn_vaults_v2_balances(self) -> dict[str, Any]:
         # Once that has ran we can be sure that defi_balances mapping is populated
         return self._eth_module_query(
@@ -2536,7 +2699,7 @@ class RestAPI():
             given_eth_balances=lambda: self.rotkehlchen.chains_aggregator.balances.eth,
         )
 
-    @async_api_call()
+    @async_api_call(task_class=APITaskClass.HISTORY, deduplicate=True)
     def get_yearn_vaults_history(
             self,
             reset_db_data: bool,
@@ -2558,7 +2721,7 @@ class RestAPI():
             to_timestamp=to_timestamp,
         )
 
-    @async_api_call()
+    @async_api_call(task_class=APITaskClass.HISTORY, deduplicate=True)
     def get_yearn_vaults_v2_history(
             self,
             reset_db_data: bool,
@@ -2581,7 +2744,7 @@ class RestAPI():
             to_timestamp=to_timestamp,
         )
 
-    @async_api_call()
+    @async_api_call(task_class=APITaskClass.BALANCES, deduplicate=True)
     def get_uniswap_balances(self) -> dict[str, Any]:
         return self._eth_module_query(
             module_name='uniswap',
@@ -2590,7 +2753,7 @@ class RestAPI():
             addresses=self.rotkehlchen.chains_aggregator.queried_addresses_for_module('uniswap'),
         )
 
-    @async_api_call()
+    @async_api_call(task_class=APITaskClass.BALANCES, deduplicate=True)
     def get_uniswap_v3_balances(self) -> dict[str, Any]:
         return self._eth_module_query(
             module_name='uniswap',
@@ -2599,7 +2762,7 @@ class RestAPI():
             addresses=self.rotkehlchen.chains_aggregator.queried_addresses_for_module('uniswap'),
         )
 
-    @async_api_call()
+    @async_api_call(task_class=APITaskClass.HISTORY, deduplicate=True)
     def get_uniswap_events_history(
             self,
             reset_db_data: bool,
@@ -2616,7 +2779,7 @@ class RestAPI():
             to_timestamp=to_timestamp,
         )
 
-    @async_api_call()
+    @async_api_call(task_class=APITaskClass.BALANCES, deduplicate=True)
     def get_sushiswap_balances(self) -> dict[str, Any]:
         return self._eth_module_query(
             module_name='sushiswap',
@@ -2625,7 +2788,7 @@ class RestAPI():
             addresses=self.rotkehlchen.chains_aggregator.queried_addresses_for_module('sushiswap'),
         )
 
-    @async_api_call()
+    @async_api_call(task_class=APITaskClass.HISTORY, deduplicate=True)
     def get_sushiswap_events_history(
             self,
             reset_db_data: bool,
@@ -2642,7 +2805,7 @@ class RestAPI():
             to_timestamp=to_timestamp,
         )
 
-    @async_api_call()
+    @async_api_call(task_class=APITaskClass.BALANCES, deduplicate=True)
     def get_loopring_balances(self) -> dict[str, Any]:
         return self._eth_module_query(
             module_name='loopring',
@@ -2651,7 +2814,7 @@ class RestAPI():
             addresses=self.rotkehlchen.chains_aggregator.queried_addresses_for_module('loopring'),
         )
 
-    @async_api_call()
+    @async_api_call(task_class=APITaskClass.BALANCES, deduplicate=True)
     def get_balancer_balances(self) -> dict[str, Any]:
         return self._eth_module_query(
             module_name='balancer',
@@ -2660,7 +2823,7 @@ class RestAPI():
             addresses=self.rotkehlchen.chains_aggregator.queried_addresses_for_module('balancer'),
         )
 
-    @async_api_call()
+    @async_api_call(task_class=APITaskClass.HISTORY, deduplicate=True)
     def get_balancer_events_history(
             self,
             reset_db_data: bool,
@@ -2677,7 +2840,7 @@ class RestAPI():
             to_timestamp=to_timestamp,
         )
 
-    @async_api_call()
+    @async_api_call(task_class=APITaskClass.BALANCES, deduplicate=True)
     def get_dill_balance(self) -> dict[str, Any]:
         addresses = self.rotkehlchen.chains_aggregator.queried_addresses_for_module('pickle_finance')  # noqa: E501
         return self._eth_module_query(
@@ -2687,7 +2850,7 @@ class RestAPI():
             addresses=addresses,
         )
 
-    @async_api_call()
+    @async_api_call(task_class=APITaskClass.BALANCES, deduplicate=True)
     def get_liquity_troves(self) -> dict[str, Any]:
         return self._eth_module_query(
             module_name='liquity',
@@ -2696,7 +2859,7 @@ class RestAPI():
             addresses_list=self.rotkehlchen.chains_aggregator.queried_addresses_for_module('liquity'),  # noqa: E501
         )
 
-    @async_api_call()
+    @async_api_call(task_class=APITaskClass.BALANCES, deduplicate=True)
     def get_liquity_staked(self) -> dict[str, Any]:
         return self._eth_module_query(
             module_name='liquity',
@@ -2705,7 +2868,7 @@ class RestAPI():
             addresses=self.rotkehlchen.chains_aggregator.queried_addresses_for_module('liquity'),
         )
 
-    @async_api_call()
+    @async_api_call(task_class=APITaskClass.BALANCES, deduplicate=True)
     def get_liquity_stability_pool_positions(self) -> dict[str, Any]:
         return self._eth_module_query(
             module_name='liquity',
@@ -2714,7 +2877,7 @@ class RestAPI():
             addresses=self.rotkehlchen.chains_aggregator.queried_addresses_for_module('liquity'),
         )
 
-    @async_api_call()
+    @async_api_call(task_class=APITaskClass.HISTORY, deduplicate=True)
     def get_liquity_stats(self) -> dict[str, Any]:
         liquity_addresses = self.rotkehlchen.chains_aggregator.queried_addresses_for_module('liquity')  # noqa: E501
         stats = get_liquity_stats(
@@ -2770,7 +2933,7 @@ class RestAPI():
         )
         return api_response(OK_RESULT, status_code=HTTPStatus.OK)
 
-    @async_api_call()
+    @async_api_call(task_class=APITaskClass.HISTORY, deduplicate=True)
     def get_evm_transactions(
             self,
             only_cache: bool,
@@ -2854,23 +3017,32 @@ class RestAPI():
                 entries_result = []
 
             result: Optional[dict[str, Any]] = None
-            kwargs = {}
-            if filter_query.chain_id is not None:
-                kwargs['chain_id'] = filter_query.chain_id.serialize_for_db()
-            result = {
-                'entries': entries_result,
-                'entries_found': total_filter_count,
-                'entries_total': self.rotkehlchen.data.db.get_entries_count(
+            if (keyset_cursor := filter_query.keyset_cursor) is not None:
+                entries_total = keyset_cursor.entries_total
+            else:
+                kwargs = {}
+                if filter_query.chain_id is not None:
+                    kwargs['chain_id'] = filter_query.chain_id.serialize_for_db()
+                entries_total = self.rotkehlchen.data.db.get_entries_count(
                     cursor=cursor,
                     entries_table='evm_transactions',
                     **kwargs,  # type: ignore[arg-type]
-                ),
+                )
+            result = {
+                'entries': entries_result,
+                'entries_found': total_filter_count,
+                'entries_total': entries_total,
                 'entries_limit': FREE_ETH_TX_LIMIT if self.rotkehlchen.premium is None else -1,
+                'next_continuation_token': filter_query.next_continuation_token(
+                    entries=transactions,
+                    entries_found=total_filter_count,
+                    entries_total=entries_total,
+                ),
             }
 
         return {'result': result, 'message': message, 'status_code': status_code}
 
-    @async_api_call()
+    @async_api_call(task_class=APITaskClass.HISTORY, deduplicate=True)
     def decode_evm_transactions(
             self,
             ignore_cache: bool,
@@ -2916,7 +3088,7 @@ class RestAPI():
 
         return {'result': result, 'message': message, 'status_code': status_code}
 
-    @async_api_call()
+    @async_api_call(task_class=APITaskClass.HISTORY, deduplicate=True)
     def decode_pending_evm_transactions(
             self,
             data: list[EvmPendingTransactionDecodingApiData],
@@ -3014,7 +3186,7 @@ class RestAPI():
             )
         return api_response(OK_RESULT, status_code=HTTPStatus.OK)
 
-    @async_api_call()
+    @async_api_call(deduplicate=True)
     def get_current_assets_price(
             self,
             assets: list[AssetWithNameAndType],
@@ -3094,7 +3266,7 @@ class RestAPI():
         }
         return _wrap_in_ok_result(process_result(result))
 
-    @async_api_call()
+    @async_api_call(deduplicate=True)
     def get_historical_assets_price(
             self,
             assets_timestamp: list[tuple[Asset, Timestamp]],
@@ -3120,7 +3292,7 @@ class RestAPI():
                 return wrap_in_fail_result(msg, status_code=HTTPStatus.BAD_GATEWAY)
             return _wrap_in_result(success, message=msg)
 
-    @async_api_call()
+    @async_api_call(priority=APITaskPriority.LOW)
     def create_oracle_cache(
             self,
             oracle: HistoricalPriceOracle,
@@ -3309,7 +3481,7 @@ class RestAPI():
             status_code=HTTPStatus.CONFLICT,
         )
 
-    @async_api_call()
+    @async_api_call(task_class=APITaskClass.HISTORY, deduplicate=True)
     def get_avalanche_transactions(
             self,
             address: ChecksumEvmAddress,
@@ -3338,7 +3510,7 @@ class RestAPI():
         }
         return _wrap_in_ok_result(result)
 
-    @async_api_call()
+    @async_api_call(task_class=APITaskClass.BALANCES, deduplicate=True)
     def get_nfts(self, ignore_cache: bool) -> dict[str, Any]:
         return self._eth_module_query(
             module_name='nfts',
@@ -3348,7 +3520,7 @@ class RestAPI():
             ignore_cache=ignore_cache,
         )
 
-    @async_api_call()
+    @async_api_call(task_class=APITaskClass.BALANCES, deduplicate=True)
     def get_nfts_balances(
             self,
             filter_query: NFTFilterQuery,
@@ -3487,6 +3659,42 @@ class RestAPI():
 
         return api_response(_wrap_in_ok_result(result_dict), status_code=HTTPStatus.OK)
 
+    @staticmethod
+    def get_sql_instrumentation() -> Response:
+        if SQL_INSTRUMENTATION.enabled is False:
+            return api_response(
+                wrap_in_fail_result('SQL instrumentation is not enabled. Start rotki with --sqlite-instrumentation to enable it'),  # noqa: E501
+                status_code=HTTPStatus.CONFLICT,
+            )
+
+        return api_response(
+            result=_wrap_in_ok_result(SQL_INSTRUMENTATION.serialize()),
+            status_code=HTTPStatus.OK,
+            log_result=False,
+        )
+
+    @staticmethod
+    def reset_sql_instrumentation() -> Response:
+        SQL_INSTRUMENTATION.reset()
+        return api_response(OK_RESULT, status_code=HTTPStatus.OK)
+
+    def get_request_metrics(self) -> Response:
+        return api_response(
+            result=_wrap_in_ok_result(self.request_metrics.serialize()),
+            status_code=HTTPStatus.OK,
+            log_result=False,
+        )
+
+    def reset_request_metrics(self) -> Response:
+        self.request_metrics.reset()
+        return api_response(OK_RESULT, status_code=HTTPStatus.OK)
+
+    def get_websocket_metrics(self) -> Response:
+        return api_response(
+            result=_wrap_in_ok_result(self.rotkehlchen.rotki_notifier.serialize_metrics()),
+            status_code=HTTPStatus.OK,
+        )
+
     def create_database_backup(self) -> Response:
         try:
             db_backup_path = self.rotkehlchen.data.db.create_db_backup()
@@ -3551,29 +3759,48 @@ class RestAPI():
             'entries_found': entries_found,
             'entries_limit': entries_limit,
         })
-        return api_response(process_result(result_dict), status_code=HTTPStatus.OK)
+        return api_response(result_dict, status_code=HTTPStatus.OK, process=True)
 
-    def get_report_data(self, filter_query: ReportDataFilterQuery) -> Response:
+    def get_report_data(self, filter_query: ReportDataFilterQuery, stream: bool) -> Response:
         with_limit = False
         entries_limit = -1
         if self.rotkehlchen.premium is None:
             with_limit = True
             entries_limit = FREE_PNL_EVENTS_LIMIT
         dbreports = DBAccountingReports(self.rotkehlchen.data.db)
+        report_data: Iterable[ProcessedAccountingEvent]
         try:
-            report_data, entries_found = dbreports.get_report_data(
-                filter_=filter_query,
-                with_limit=with_limit,
-            )
+            if stream is True:
+                report_data = report_events = dbreports.iterate_report_data(
+                    filter_=filter_query,
+                    with_limit=with_limit,
+                )
+            else:
+                report_data, entries_found = dbreports.get_report_data(
+                    filter_=filter_query,
+                    with_limit=with_limit,
+                )
         except InputError as e:
             return api_response(wrap_in_fail_result(str(e)), status_code=HTTPStatus.BAD_REQUEST)
 
+        entries = (x.to_exported_dict(
+            ts_converter=self.rotkehlchen.accountant.pots[0].timestamp_to_date,
+            eth_explorer=None,
+            for_api=True,
+        ) for x in report_data)
+        if stream is True:
+            response = streamed_api_response(
+                entries=entries,
+                result=lambda: {
+                    'entries_found': report_events.entries_found,
+                    'entries_limit': entries_limit,
+                },
+            )
+            response.call_on_close(report_events.close)  # also if the client disconnects
+            return response
+
         result = {
-            'entries': [x.to_exported_dict(
-                ts_converter=self.rotkehlchen.accountant.pots[0].timestamp_to_date,
-                eth_explorer=None,
-                for_api=True,
-            ) for x in report_data],
+            'entries': list(entries),
             'entries_found': entries_found,
             'entries_limit': entries_limit,
         }
@@ -3587,7 +3814,7 @@ class RestAPI():
             status_code=HTTPStatus.OK,
         )
 
-    @async_api_call()
+    @async_api_call(task_class=APITaskClass.HISTORY, deduplicate=True)
     def query_kraken_staking_events(
             self,
             only_cache: bool,
@@ -3896,7 +4123,7 @@ class RestAPI():
             database=self.rotkehlchen.data.db,
             chain_addresses=chain_addresses,
         )
-        return api_response(_wrap_in_ok_result(process_result_list(mappings)))
+        return api_response(_wrap_in_ok_result(mappings), process=True)
 
     @async_api_call()
     def detect_evm_tokens(
@@ -3943,6 +4170,10 @@ class RestAPI():
                 'value': self.rotkehlchen.args.sqlite_instructions,
                 'is_default': self.rotkehlchen.args.sqlite_instructions == DEFAULT_SQL_VM_INSTRUCTIONS_CB,  # noqa: E501
             },
+            'sqlite_read_connections': {
+                'value': self.rotkehlchen.args.sqlite_read_connections,
+                'is_default': self.rotkehlchen.args.sqlite_read_connections == DEFAULT_SQL_READ_CONNECTIONS,  # noqa: E501
+            },
         }
         return api_response(_wrap_in_ok_result(config), status_code=HTTPStatus.OK)
 
@@ -4145,21 +4376,27 @@ class RestAPI():
                     continue
                 events.append(staking_event)
 
-            entries_total = history_events_db.get_history_events_count(
-                cursor=cursor,
-                query_filter=table_filter,
-            )
-            value_query_filters, value_bindings = value_filter.prepare(with_pagination=False, with_order=False)  # noqa: E501
-            usd_value, amounts = history_events_db.get_value_stats(
+            if (keyset_cursor := query_filter.keyset_cursor) is not None:
+                entries_total = keyset_cursor.entries_total
+            else:
+                entries_total = history_events_db.get_history_events_count(
+                    cursor=cursor,
+                    query_filter=table_filter,
+                )
+            usd_value, amounts = history_events_db.get_value_stats_for_filter(
                 cursor=cursor,
-                query_filters=value_query_filters,
-                bindings=value_bindings,
+                filter_query=value_filter,
             )
             result = {
                 'events': events,
                 'entries_found': entries_found,
                 'entries_limit': entries_limit,
                 'entries_total': entries_total,
+                'next_continuation_token': query_filter.next_continuation_token(
+                    entries=events_raw,
+                    entries_found=entries_found,
+                    entries_total=entries_total,
+                ),
                 'total_usd_value': usd_value,
                 'assets': history_events_db.get_entries_assets_history_events(
                     cursor=cursor,
@@ -4176,7 +4413,7 @@ class RestAPI():
 
         return {'result': result, 'message': message, 'status_code': HTTPStatus.OK}
 
-    @async_api_call()
+    @async_api_call(task_class=APITaskClass.HISTORY, deduplicate=True)
     def get_binance_savings_history(
             self,
             only_cache: bool,
@@ -1,11 +1,12 @@
 import json
 import logging
 import sys
+import time
 from http import HTTPStatus
-from typing import Any, Optional, Union
+from typing import Any, Final, Optional, Union
 
 import werkzeug
-from flask import Blueprint, Flask, Response, abort, jsonify, request
+from flask import Blueprint, Flask, Response, abort, g, jsonify, request
 from flask.views import MethodView
 from flask_cors import CORS
 from gevent.pywsgi import WSGIServer
@@ -114,8 +115,10 @@ from rotkehlchen.api.v1.resources import (
     PickleDillResource,
     PingResource,
     QueriedAddressesResource,
+    RequestMetricsResource,
     ReverseEnsResource,
     RpcNodesResource,
+    SQLInstrumentationResource,
     SettingsResource,
     StakingResource,
     StatisticsAssetBalanceResource,
@@ -138,6 +141,7 @@ from rotkehlchen.api.v1.resources import (
     UsersByNameResource,
     UsersResource,
     WatchersResource,
+    WebsocketMetricsResource,
     YearnVaultsBalancesResource,
     YearnVaultsHistoryResource,
     YearnVaultsV2BalancesResource,
@@ -145,7 +149,7 @@ from rotkehlchen.api.v1.resources import (
     create_blueprint,
 )
 from rotkehlchen.api.websockets.notifier import RotkiNotifier, RotkiWSApp
-from rotkehlchen.logging import RotkehlchenLogsAdapter
+from rotkehlchen.logging import TRACE, RotkehlchenLogsAdapter
 
 URLS = list[
     Union[
@@ -298,6 +302,9 @@ URLS_V1: URLS = [
     ('/nfts/prices', NFTSPricesResource),
     ('/database/info', DatabaseInfoResource),
     ('/database/backups', DatabaseBackupsResource),
+    ('/database/instrumentation', SQLInstrumentationResource),
+    ('/metrics/requests', RequestMetricsResource),
+    ('/metrics/websockets', WebsocketMetricsResource),
     ('/locations/associated', AssociatedLocations),
     ('/staking/kraken', StakingResource),
     ('/names', AllNamesResource),
@@ -315,6 +322,10 @@ URLS_V1: URLS = [
 logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
 
+# Responses logged at debug level are cut after that many characters. At trace level
+# they are logged whole
+MAX_LOGGED_RESPONSE_LENGTH: Final = 10000
+
 
 def setup_urls(
         rest_api: RestAPI,
@@ -417,31 +428,55 @@ class APIServer():
     @staticmethod
     def before_request_callback() -> None:
         """Function that runs before each request"""
-        log.debug(
-            f'start rotki api {request.method} {request.path}',
-            view_args=request.view_args,
-            query_string=request.query_string,
-        )
+        g.request_start = time.perf_counter()
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug(
+                f'start rotki api {request.method} {request.path}',
+                view_args=request.view_args,
+                query_string=request.query_string,
+            )
 
     @staticmethod
-    def after_request_callback(response: Response) -> Response:
+    def _loggable_result(response: Response, log_result: bool) -> Optional[str]:
+        """Returns the body of the response as it should be logged
+
+        The body is not parsed back from json. If it's too long it is truncated unless
+        logging at trace level.
+        """
+        if log_result is False:
+            return 'redacted'
+        if response.is_json is False or response.is_streamed is True:
+            return None
+
+        result = response.get_data(as_text=True)
+        if len(result) > MAX_LOGGED_RESPONSE_LENGTH and log.isEnabledFor(TRACE) is False:
+            return f'{result[:MAX_LOGGED_RESPONSE_LENGTH]}... ({len(result)} characters)'
+        return result
+
+    def after_request_callback(self, response: Response) -> Response:
         """Function that runs after each completed request
 
-        Logs the response if required. This is determined by the
-        fake header rotki-log-result passed to all responses.
+        Records the request metrics and logs the response if required. This is
+        determined by the fake header rotki-log-result passed to all responses.
         """
-        if response.headers.pop('rotki-log-result', 'True') == 'True':
-            result = response.json
-        else:
-            result = 'redacted'
-
-        log.debug(
-            f'end rotki api {request.method} {request.path}',
-            view_args=request.view_args,
-            query_string=request.query_string,
-            status_code=response.status_code,
-            result=result,
-        )
+        log_result = response.headers.pop('rotki-log-result', 'True') == 'True'
+        if (request_start := g.get('request_start')) is not None:
+            self.rest_api.request_metrics.record(
+                endpoint=request.url_rule.rule if request.url_rule is not None else 'not found',
+                method=request.method,
+                duration=time.perf_counter() - request_start,
+                request_bytes=request.content_length,
+                response_bytes=response.calculate_content_length(),
+            )
+
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug(
+                f'end rotki api {request.method} {request.path}',
+                view_args=request.view_args,
+                query_string=request.query_string,
+                status_code=response.status_code,
+                result=self._loggable_result(response, log_result),
+            )
         return response
 
     def run(self, host: str = '127.0.0.1', port: int = 5042, **kwargs: Any) -> None:
@@ -0,0 +1,198 @@
+import heapq
+import itertools
+import logging
+from collections.abc import Callable
+from contextlib import suppress
+from dataclasses import dataclass
+from enum import Enum, IntEnum, auto
+from typing import Any, Final, Optional
+
+import gevent
+
+from rotkehlchen.assets.asset import Asset
+from rotkehlchen.fval import FVal
+from rotkehlchen.logging import RotkehlchenLogsAdapter
+
+logger = logging.getLogger(__name__)
+log = RotkehlchenLogsAdapter(logger)
+
+
+class APITaskClass(Enum):
+    """The kind of work an async task does. Each class has its own concurrency limit"""
+    BALANCES = auto()
+    HISTORY = auto()
+    REPORTS = auto()
+    OTHER = auto()
+
+
+class APITaskPriority(IntEnum):
+    """Order in which the queued tasks of a class are started. Lower starts first"""
+    HIGH = 0
+    NORMAL = 1
+    LOW = 2
+
+
+# How many tasks of each class can run at the same time. The rest wait in a queue.
+# Reports are run one at a time as they all use the same accountant.
+DEFAULT_TASK_CLASS_LIMITS: Final = {
+    APITaskClass.BALANCES: 4,
+    APITaskClass.HISTORY: 4,
+    APITaskClass.REPORTS: 1,
+    APITaskClass.OTHER: 8,
+}
+
+_KEYABLE_TYPES: Final = (type(None), bool, int, float, str, Enum, Asset, FVal)
+
+
+class _NotKeyableError(Exception):
+    pass
+
+
+def _dedup_value(value: Any) -> Any:
+    """Returns a hashable value equal for all equal arguments.
+
+    May raise:
+    - _NotKeyableError if the value is of a type that can't be compared safely
+    """
+    if isinstance(value, _KEYABLE_TYPES):
+        return value
+    if isinstance(value, (list, tuple)):
+        return tuple(_dedup_value(x) for x in value)
+    if isinstance(value, dict):
+        return tuple((key, _dedup_value(x)) for key, x in value.items())
+    raise _NotKeyableError
+
+
+def make_dedup_key(command: Callable, kwargs: dict[str, Any]) -> Optional[tuple]:
+    """Returns the key under which identical requests of an endpoint are deduplicated.
+
+    None if any of the arguments is of a type that can't be safely compared, in which
+    case the request is never deduplicated.
+    """
+    try:
+        return (command.__qualname__, tuple((key, _dedup_value(x)) for key, x in sorted(kwargs.items())))  # noqa: E501
+    except _NotKeyableError:
+        return None
+
+
+@dataclass(eq=False)
+class APITask:
+    task_ids: list[int]  # all the requests served by this task. More than one if deduplicated
+    greenlet: gevent.Greenlet
+    task_class: APITaskClass
+    priority: APITaskPriority
+    dedup_key: Optional[tuple]
+
+
+class APITaskExecutor:
+    """Runs the async tasks of the API with a concurrency limit per task class
+
+    Each task gets a greenlet when submitted which is only started once its class has a
+    free slot. Queued greenlets are in the api task greenlets already, so they can be
+    killed like the running ones. Killing a queued greenlet prevents it from starting.
+    """
+
+    def __init__(
+            self,
+            greenlets: list[gevent.Greenlet],
+            class_limits: Optional[dict[APITaskClass, int]] = None,
+    ) -> None:
+        self.greenlets = greenlets
+        self.class_limits = DEFAULT_TASK_CLASS_LIMITS if class_limits is None else class_limits
+        self.tasks: dict[int, APITask] = {}
+        self.in_flight: dict[tuple, APITask] = {}
+        self.running: dict[APITaskClass, set[APITask]] = {x: set() for x in APITaskClass}
+        self.queues: dict[APITaskClass, list[tuple[int, int, APITask]]] = {x: [] for x in APITaskClass}  # noqa: E501
+        self.sequence = itertools.count()
+
+    def join_in_flight(self, task_id: int, dedup_key: Optional[tuple]) -> bool:
+        """Makes the request with the given task id share the outcome of an identical
+        task that is queued or running. Returns False if there is no such task."""
+        if dedup_key is None or (task := self.in_flight.get(dedup_key)) is None:
+            return False
+
+        task.task_ids.append(task_id)
+        self.tasks[task_id] = task
+        log.debug(f'Async task with task id {task_id} deduplicated to task {task.task_ids[0]}')
+        return True
+
+    def submit(
+            self,
+            task_id: int,
+            greenlet: gevent.Greenlet,
+            task_class: APITaskClass,
+            priority: APITaskPriority,
+            dedup_key: Optional[tuple],
+    ) -> None:
+        """Starts the not yet started greenlet of a task or queues it if its class is busy"""
+        task = APITask(
+            task_ids=[task_id],
+            greenlet=greenlet,
+            task_class=task_class,
+            priority=priority,
+            dedup_key=dedup_key,
+        )
+        self.tasks[task_id] = task
+        if dedup_key is not None:
+            self.in_flight[dedup_key] = task
+        self.greenlets.append(greenlet)
+        greenlet.link(lambda _: self._release(task))
+        if len(self.running[task_class]) < self.class_limits[task_class]:
+            self._start(task)
+            return
+
+        heapq.heappush(self.queues[task_class], (priority, next(self.sequence), task))
+        log.debug(
+            f'Async task with task id {task_id} queued. {len(self.running[task_class])} '
+            f'{task_class.name.lower()} tasks are already running',
+        )
+
+    def finish(self, task_id: int) -> list[int]:
+        """Marks the task as done so that new identical requests start a new task
+
+        Returns the ids of all the requests the task served.
+        """
+        if (task := self.tasks.get(task_id)) is None:
+            return [task_id]
+
+        self._forget_in_flight(task)
+        return task.task_ids
+
+    def remove(self, task_id: int) -> None:
+        """Forgets a task id whose outcome was returned. The greenlet is removed from the
+        api task greenlets once the outcome of all of its requests has been returned"""
+        if (task := self.tasks.pop(task_id, None)) is None:
+            return
+
+        if all(x not in self.tasks for x in task.task_ids):
+            with suppress(ValueError):
+                self.greenlets.remove(task.greenlet)
+
+    def reset(self) -> None:
+        """Forgets all tasks. Their greenlets should have been killed already"""
+        self.tasks = {}
+        self.in_flight = {}
+        self.running = {x: set() for x in APITaskClass}
+        self.queues = {x: [] for x in APITaskClass}
+
+    def _forget_in_flight(self, task: APITask) -> None:
+        if task.dedup_key is not None and self.in_flight.get(task.dedup_key) is task:
+            del self.in_flight[task.dedup_key]
+
+    def _start(self, task: APITask) -> None:
+        self.running[task.task_class].add(task)
+        task.greenlet.start()
+
+    def _release(self, task: APITask) -> None:
+        """Called when the greenlet of a task dies. Starts the next queued tasks of its class"""
+        self._forget_in_flight(task)
+        running = self.running[task.task_class]
+        if task not in running:  # killed while queued or forgotten by a reset
+            return
+
+        running.remove(task)
+        queue = self.queues[task.task_class]
+        while len(queue) != 0 and len(running) < self.class_limits[task.task_class]:
+            _, _, next_task = heapq.heappop(queue)
+            if next_task.greenlet.dead is False:
+                self._start(next_task)
@@ -23,6 +23,7 @@ from rotkehlchen.assets.types import AssetType
 from rotkehlchen.chain.bitcoin.hdkey import HDKey
 from rotkehlchen.chain.bitcoin.utils import is_valid_derivation_path
 from rotkehlchen.constants.misc import NFT_DIRECTIVE, ZERO
+from rotkehlchen.db.filtering import DBKeysetCursor
 from rotkehlchen.errors.asset import UnknownAsset, WrongAssetType
 from rotkehlchen.errors.misc import XPUBError
 from rotkehlchen.errors.serialization import DeserializationError
@@ -570,6 +571,24 @@ class EVMTransactionHashField(fields.Field):
         return make_evm_tx_hash(txhash)
 
 
+class ContinuationTokenField(fields.Field):
+
+    def _deserialize(
+            self,
+            value: str,
+            attr: Optional[str],  # pylint: disable=unused-argument
+            data: Optional[Mapping[str, Any]],
+            **_kwargs: Any,
+    ) -> DBKeysetCursor:
+        if not isinstance(value, str):
+            raise ValidationError('Continuation token should be a string')
+
+        try:
+            return DBKeysetCursor.deserialize(value)
+        except DeserializationError as e:
+            raise ValidationError(str(e)) from e
+
+
 class AssetTypeField(fields.Field):
 
     def __init__(self, *, exclude_types: Optional[Sequence[AssetType]] = None, **kwargs: Any) -> None:  # noqa: E501
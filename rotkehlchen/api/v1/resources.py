@@ -211,6 +211,7 @@ from .types import EvmPendingTransactionDecodingApiData, EvmTransactionDecodingA
 if TYPE_CHECKING:
     from rotkehlchen.chain.bitcoin.hdkey import HDKey
     from rotkehlchen.db.filtering import HistoryEventFilterQuery
+    from rotkehlchen.db.timeseries import TimeSeriesResolution
     from rotkehlchen.exchanges.kraken import KrakenAccountType
 
 
@@ -680,6 +681,30 @@ class DatabaseInfoResource(BaseMethodView):
         return self.rest_api.get_database_info()
 
 
+class SQLInstrumentationResource(BaseMethodView):
+
+    def get(self) -> Response:
+        return self.rest_api.get_sql_instrumentation()
+
+    def delete(self) -> Response:
+        return self.rest_api.reset_sql_instrumentation()
+
+
+class RequestMetricsResource(BaseMethodView):
+
+    def get(self) -> Response:
+        return self.rest_api.get_request_metrics()
+
+    def delete(self) -> Response:
+        return self.rest_api.reset_request_metrics()
+
+
+class WebsocketMetricsResource(BaseMethodView):
+
+    def get(self) -> Response:
+        return self.rest_api.get_websocket_metrics()
+
+
 class DatabaseBackupsResource(BaseMethodView):
 
     delete_schema = FileListSchema()
@@ -937,9 +962,16 @@ class TradesResource(BaseMethodView):
             self,
             async_query: bool,
             only_cache: bool,
+            stream: bool,
             filter_query: TradesFilterQuery,
             include_ignored_trades: bool,
     ) -> Response:
+        if stream is True:
+            return self.rest_api.stream_trades(
+                only_cache=only_cache,
+                filter_query=filter_query,
+                include_ignored_trades=include_ignored_trades,
+            )
         return self.rest_api.get_trades(
             async_query=async_query,
             only_cache=only_cache,
@@ -1261,8 +1293,15 @@ class StatisticsNetvalueResource(BaseMethodView):
 
     @require_loggedin_user()
     @use_kwargs(get_schema, location='json_and_query')
-    def get(self, include_nfts: bool) -> Response:
-        return self.rest_api.query_netvalue_data(include_nfts=include_nfts)
+    def get(
+            self,
+            include_nfts: bool,
+            resolution: Optional['TimeSeriesResolution'],
+    ) -> Response:
+        return self.rest_api.query_netvalue_data(
+            include_nfts=include_nfts,
+            resolution=resolution,
+        )
 
 
 class StatisticsAssetBalanceResource(BaseMethodView):
@@ -1276,11 +1315,13 @@ class StatisticsAssetBalanceResource(BaseMethodView):
             asset: Asset,
             from_timestamp: Timestamp,
             to_timestamp: Timestamp,
+            resolution: Optional['TimeSeriesResolution'],
     ) -> Response:
         return self.rest_api.query_timed_balances_data(
             asset=asset,
             from_timestamp=from_timestamp,
             to_timestamp=to_timestamp,
+            resolution=resolution,
         )
 
 
@@ -1401,8 +1442,8 @@ class AccountingReportDataResource(BaseMethodView):
 
     @require_loggedin_user()
     @ignore_kwarg_parser.use_kwargs(post_schema, location='json_and_query_and_view_args')
-    def post(self, filter_query: ReportDataFilterQuery) -> Response:
-        return self.rest_api.get_report_data(filter_query=filter_query)
+    def post(self, filter_query: ReportDataFilterQuery, stream: bool) -> Response:
+        return self.rest_api.get_report_data(filter_query=filter_query, stream=stream)
 
 
 class HistoryExportingResource(BaseMethodView):
@@ -107,6 +107,7 @@ from .fields import (
     AssetTypeField,
     BlockchainField,
     ColorField,
+    ContinuationTokenField,
     CurrentPriceOracleField,
     DelimitedOrNormalList,
     DerivationPathField,
@@ -180,11 +181,64 @@ class OnlyCacheQuerySchema(Schema):
     only_cache = fields.Boolean(load_default=False)
 
 
+class StreamQuerySchema(Schema):
+    """For getters of big collections that can send the response while serializing it"""
+    stream = fields.Boolean(load_default=False)
+
+    @validates_schema
+    def validate_stream_schema(
+            self,
+            data: dict[str, Any],
+            **_kwargs: Any,
+    ) -> None:
+        if data['stream'] is True and data.get('async_query', False) is True:
+            raise ValidationError(
+                message='A response can not be streamed for an async query',
+                field_name='stream',
+            )
+
+
 class DBPaginationSchema(Schema):
     limit = fields.Integer(load_default=None)
     offset = fields.Integer(load_default=None)
 
 
+class DBKeysetPaginationSchema(DBPaginationSchema):
+    """Pagination that can also continue after the last entry of a previous page using the
+    continuation token returned with it. Has to be combined with DBOrderBySchema.
+
+    Subclasses set the keyset columns of the filter query they create.
+    """
+    continuation_token = ContinuationTokenField(load_default=None)
+    keyset_columns: tuple[str, ...] = ()
+
+    @validates_schema
+    def validate_keyset_pagination_schema(
+            self,
+            data: dict[str, Any],
+            **_kwargs: Any,
+    ) -> None:
+        continuation = data['continuation_token']
+        if continuation is None:
+            return
+
+        if data['limit'] is None or data['offset'] is not None:
+            raise ValidationError(
+                message='continuation_token has to be given with a limit and without an offset',
+                field_name='continuation_token',
+            )
+        if data['order_by_attributes'] not in (None, ['timestamp']):
+            raise ValidationError(
+                message='continuation_token can only be used when ordering by timestamp',
+                field_name='continuation_token',
+            )
+        if len(continuation.after) != len(self.keyset_columns):
+            raise ValidationError(
+                message='continuation_token was not given for this type of entries',
+                field_name='continuation_token',
+            )
+
+
 class DBOrderBySchema(Schema):
     order_by_attributes = DelimitedOrNormalList(fields.String(), load_default=None)
     ascending = DelimitedOrNormalList(fields.Boolean(), load_default=None)  # noqa: E501 most recent first by default
@@ -244,9 +298,10 @@ class EvmTransactionPurgingSchema(Schema):
 class EvmTransactionQuerySchema(
         AsyncQueryArgumentSchema,
         OnlyCacheQuerySchema,
-        DBPaginationSchema,
+        DBKeysetPaginationSchema,
         DBOrderBySchema,
 ):
+    keyset_columns = EvmTransactionsFilterQuery.keyset_columns
     accounts = fields.List(
         fields.Nested(RequiredEvmAddressOptionalChainSchema),
         load_default=None,
@@ -325,6 +380,7 @@ class EvmTransactionQuerySchema(
             exclude_ignored_assets=exclude_ignored_assets,
             event_types=event_types,
             event_subtypes=event_subtypes,
+            continuation=data['continuation_token'],
         )
         event_params = {
             'asset': asset,
@@ -402,9 +458,11 @@ class EvmPendingTransactionDecodingSchema(AsyncQueryArgumentSchema):
 class TradesQuerySchema(
         AsyncQueryArgumentSchema,
         OnlyCacheQuerySchema,
-        DBPaginationSchema,
+        StreamQuerySchema,
+        DBKeysetPaginationSchema,
         DBOrderBySchema,
 ):
+    keyset_columns = TradesFilterQuery.keyset_columns
     base_asset = AssetField(expected_type=Asset, load_default=None)
     quote_asset = AssetField(expected_type=Asset, load_default=None)
     from_timestamp = TimestampField(load_default=Timestamp(0))
@@ -481,11 +539,13 @@ class TradesQuerySchema(
             trade_type=[data['trade_type']] if data['trade_type'] is not None else None,
             location=data['location'],
             trades_idx_to_ignore=trades_idx_to_ignore,
+            continuation=data['continuation_token'],
         )
 
         return {
             'async_query': data['async_query'],
             'only_cache': data['only_cache'],
+            'stream': data['stream'],
             'filter_query': filter_query,
             'include_ignored_trades': data['include_ignored_trades'],
         }
@@ -494,9 +554,10 @@ class TradesQuerySchema(
 class BaseStakingQuerySchema(
     AsyncQueryArgumentSchema,
     OnlyCacheQuerySchema,
-    DBPaginationSchema,
+    DBKeysetPaginationSchema,
     DBOrderBySchema,
 ):
+    keyset_columns = HistoryEventFilterQuery.keyset_columns
     from_timestamp = TimestampField(load_default=Timestamp(0))
     to_timestamp = TimestampField(load_default=ts_now)
     asset = AssetField(expected_type=AssetWithOracles, load_default=None)
@@ -537,6 +598,7 @@ class BaseStakingQuerySchema(
             event_subtypes=query_event_subtypes,
             exclude_subtypes=exclude_event_subtypes,
             assets=asset_list,
+            continuation=data['continuation_token'],
         )
 
         value_filter = HistoryEventFilterQuery.make(
@@ -1093,6 +1155,22 @@ class ModifiableSettingsSchema(Schema):
     address_name_priority = fields.List(fields.String(
         validate=webargs.validate.OneOf(choices=DEFAULT_ADDRESS_NAME_PRIORITY),
     ), load_default=DEFAULT_ADDRESS_NAME_PRIORITY)
+    daily_snapshots_after_days = fields.Integer(
+        strict=True,
+        validate=webargs.validate.Range(
+            min=0,
+            error='The days after which snapshots are kept daily should be >= 0',
+        ),
+        load_default=None,
+    )
+    weekly_snapshots_after_days = fields.Integer(
+        strict=True,
+        validate=webargs.validate.Range(
+            min=0,
+            error='The days after which snapshots are kept weekly should be >= 0',
+        ),
+        load_default=None,
+    )
 
     @validates_schema
     def validate_settings_schema(
@@ -1108,6 +1186,13 @@ class ModifiableSettingsSchema(Schema):
                         field_name='active_modules',
                     )
 
+        daily_after, weekly_after = data['daily_snapshots_after_days'], data['weekly_snapshots_after_days']  # noqa: E501
+        if daily_after and weekly_after and weekly_after < daily_after:
+            raise ValidationError(
+                message='Snapshots can only be kept weekly after they are kept daily',
+                field_name='weekly_snapshots_after_days',
+            )
+
     @post_load
     def transform_data(
             self,
@@ -1143,6 +1228,8 @@ class ModifiableSettingsSchema(Schema):
             treat_eth2_as_eth=data['treat_eth2_as_eth'],
             eth_staking_taxable_after_withdrawal_enabled=data['eth_staking_taxable_after_withdrawal_enabled'],  # noqa: 501
             address_name_priority=data['address_name_priority'],
+            daily_snapshots_after_days=data['daily_snapshots_after_days'],
+            weekly_snapshots_after_days=data['weekly_snapshots_after_days'],
         )
 
 
@@ -1279,6 +1366,10 @@ class StatisticsAssetBalanceSchema(Schema):
     asset = AssetField(expected_type=Asset, required=True)
     from_timestamp = TimestampField(load_default=Timestamp(0))
     to_timestamp = TimestampField(load_default=ts_now)
+    resolution = fields.String(
+        load_default=None,
+        validate=webargs.validate.OneOf(choices=('daily', 'weekly')),
+    )
 
 
 class StatisticsValueDistributionSchema(Schema):
@@ -1318,7 +1409,7 @@ class AccountingReportsSchema(Schema):
             raise ValidationError('A report id should be given')
 
 
-class AccountingReportDataSchema(DBPaginationSchema, DBOrderBySchema):
+class AccountingReportDataSchema(DBPaginationSchema, DBOrderBySchema, StreamQuerySchema):
     report_id = fields.Integer(load_default=None)
     event_type = SerializableEnumField(enum_class=SchemaEventType, load_default=None)
     from_timestamp = TimestampField(load_default=Timestamp(0))
@@ -1363,6 +1454,7 @@ class AccountingReportDataSchema(DBPaginationSchema, DBOrderBySchema):
         )
         return {
             'filter_query': filter_query,
+            'stream': data['stream'],
         }
 
 
@@ -2470,6 +2562,10 @@ class Eth2DailyStatsSchema(
 
 class StatisticsNetValueSchema(Schema):
     include_nfts = fields.Boolean(load_default=True)
+    resolution = fields.String(
+        load_default=None,
+        validate=webargs.validate.OneOf(choices=('daily', 'weekly')),
+    )
 
 
 class BinanceMarketsSchema(Schema):
@@ -1,46 +1,220 @@
 import json
 import logging
-from contextlib import suppress
-from typing import TYPE_CHECKING, Any, Callable, Optional, Union
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Final, Optional, Union
 
+import gevent
+from gevent.event import Event
 from gevent.lock import Semaphore
 from geventwebsocket import WebSocketApplication
 from geventwebsocket.exceptions import WebSocketError
 from geventwebsocket.websocket import WebSocket
 
+from rotkehlchen.api.websockets.typedefs import WSMessageType
 from rotkehlchen.greenlets.manager import GreenletManager
 from rotkehlchen.logging import RotkehlchenLogsAdapter
 
-if TYPE_CHECKING:
-    from rotkehlchen.api.websockets.typedefs import WSMessageType
-
 logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
 
+# Messages queued per subscriber. When a subscriber falls behind the oldest are dropped
+MAX_QUEUED_MESSAGES: Final = 1000
+# Messages sent in a single frame to the subscribers that accept batched frames
+MAX_BATCHED_MESSAGES: Final = 100
+# Sends slower than this are counted as slow in the metrics of a subscriber
+SLOW_SEND_SECONDS: Final = 1.0
 
-def _ws_send_impl(
-        websocket: WebSocket,
-        lock: Semaphore,
-        to_send_msg: str,
-        success_callback: Optional[Callable] = None,
-        success_callback_args: Optional[dict[str, Any]] = None,
-        failure_callback: Optional[Callable] = None,
-        failure_callback_args: Optional[dict[str, Any]] = None,
-) -> None:
-    try:
-        with lock:
-            websocket.send(to_send_msg)
-    except WebSocketError as e:
-        log.error(f'Websocket send with message {to_send_msg} failed due to {str(e)}')
-
-        if failure_callback:
-            failure_callback_args = {} if failure_callback_args is None else failure_callback_args  # noqa: E501
-            failure_callback(**failure_callback_args)
-        return
 
-    if success_callback:  # send success
-        success_callback_args = {} if success_callback_args is None else success_callback_args  # noqa: E501
-        success_callback(**success_callback_args)
+def _coalesce_key(
+        message_type: WSMessageType,
+        data: Union[dict[str, Any], list[Any]],
+) -> Optional[tuple]:
+    """Returns the key of progress messages. A queued progress message that has not been
+    sent yet is replaced by a newer one of the same key since only the latest matters."""
+    if isinstance(data, list):
+        return None
+    if message_type in (WSMessageType.DB_UPGRADE_STATUS, WSMessageType.DATA_MIGRATION_STATUS):  # noqa: E501
+        return (message_type,)
+    if message_type == WSMessageType.CSV_IMPORT_PROGRESS:
+        return (message_type, data.get('source'))
+    if message_type == WSMessageType.EVM_TRANSACTION_STATUS:
+        # the status is part of the key so that no step of a query is skipped
+        return (message_type, data.get('address'), data.get('evm_chain'), data.get('status'))
+    return None
+
+
+class QueuedMessage():
+    """An encoded message waiting to be sent to a subscriber along with its callbacks"""
+    __slots__ = (
+        'message',
+        'coalesce_key',
+        'success_callback',
+        'success_callback_args',
+        'failure_callback',
+        'failure_callback_args',
+    )
+
+    def __init__(
+            self,
+            message: str,
+            coalesce_key: Optional[tuple],
+            success_callback: Optional[Callable] = None,
+            success_callback_args: Optional[dict[str, Any]] = None,
+            failure_callback: Optional[Callable] = None,
+            failure_callback_args: Optional[dict[str, Any]] = None,
+    ) -> None:
+        self.message = message
+        self.coalesce_key = coalesce_key
+        self.success_callback = success_callback
+        self.success_callback_args = success_callback_args
+        self.failure_callback = failure_callback
+        self.failure_callback_args = failure_callback_args
+
+    def succeeded(self) -> None:
+        if self.success_callback is not None:
+            self.success_callback(**(self.success_callback_args or {}))
+
+    def failed(self) -> None:
+        if self.failure_callback is not None:
+            self.failure_callback(**(self.failure_callback_args or {}))
+
+
+@dataclass
+class SubscriberMetrics:
+    """Measurements of the messages sent to a websocket subscriber"""
+    sent_messages: int = 0
+    sent_frames: int = 0
+    coalesced_messages: int = 0  # replaced by a newer progress message before being sent
+    dropped_messages: int = 0  # dropped because the subscriber fell behind
+    failed_messages: int = 0
+    max_queued_messages: int = 0
+    total_send_time: float = 0.0  # seconds
+    max_send_time: float = 0.0  # seconds
+    slow_sends: int = 0
+
+    def add(self, other: 'SubscriberMetrics') -> None:
+        self.sent_messages += other.sent_messages
+        self.sent_frames += other.sent_frames
+        self.coalesced_messages += other.coalesced_messages
+        self.dropped_messages += other.dropped_messages
+        self.failed_messages += other.failed_messages
+        self.max_queued_messages = max(self.max_queued_messages, other.max_queued_messages)
+        self.total_send_time += other.total_send_time
+        self.max_send_time = max(self.max_send_time, other.max_send_time)
+        self.slow_sends += other.slow_sends
+
+    def serialize(self) -> dict[str, Union[int, float]]:
+        return {
+            'sent_messages': self.sent_messages,
+            'sent_frames': self.sent_frames,
+            'coalesced_messages': self.coalesced_messages,
+            'dropped_messages': self.dropped_messages,
+            'failed_messages': self.failed_messages,
+            'max_queued_messages': self.max_queued_messages,
+            'total_send_time': round(self.total_send_time, 6),
+            'max_send_time': round(self.max_send_time, 6),
+            'slow_sends': self.slow_sends,
+        }
+
+
+class WSSubscriber():
+    """The outbound queue of a websocket and the greenlet that writes it to the socket
+
+    Queueing never blocks so that a slow client can't slow down the producers of the
+    messages. If the client falls behind, the oldest queued messages are dropped.
+    """
+
+    def __init__(self, websocket: WebSocket) -> None:
+        self.websocket = websocket
+        self.lock = Semaphore()
+        self.queue: deque[QueuedMessage] = deque()
+        self.coalesced: dict[tuple, QueuedMessage] = {}
+        self.has_messages = Event()
+        self.batch_frames = False
+        self.metrics = SubscriberMetrics()
+        self.writer = gevent.spawn(self._write_forever)
+        self.writer.link_exception(self._handle_writer_death)
+
+    def put(self, queued: QueuedMessage) -> None:
+        if queued.coalesce_key is not None:
+            if (pending := self.coalesced.get(queued.coalesce_key)) is not None:
+                pending.message = queued.message
+                pending.success_callback = queued.success_callback
+                pending.success_callback_args = queued.success_callback_args
+                pending.failure_callback = queued.failure_callback
+                pending.failure_callback_args = queued.failure_callback_args
+                self.metrics.coalesced_messages += 1
+                return
+            self.coalesced[queued.coalesce_key] = queued
+
+        if len(self.queue) >= MAX_QUEUED_MESSAGES:
+            if self.metrics.dropped_messages == 0:
+                log.warning(
+                    f'Websocket with hash id {hash(self.websocket)} fell behind by '
+                    f'{MAX_QUEUED_MESSAGES} messages. Dropping the oldest ones',
+                )
+            self._pop().failed()
+            self.metrics.dropped_messages += 1
+
+        self.queue.append(queued)
+        self.metrics.max_queued_messages = max(self.metrics.max_queued_messages, len(self.queue))  # noqa: E501
+        self.has_messages.set()
+
+    def close(self) -> None:
+        """Stops the writer. The messages that were not sent yet count as failed"""
+        self.writer.kill(block=False)
+        while len(self.queue) != 0:
+            self._pop().failed()
+            self.metrics.failed_messages += 1
+
+    def _pop(self) -> QueuedMessage:
+        queued = self.queue.popleft()
+        if queued.coalesce_key is not None:
+            self.coalesced.pop(queued.coalesce_key, None)
+        return queued
+
+    def _write_forever(self) -> None:
+        while True:
+            self.has_messages.wait()
+            self.has_messages.clear()
+            while len(self.queue) != 0:
+                if self.batch_frames is True:
+                    batch = [self._pop() for _ in range(min(MAX_BATCHED_MESSAGES, len(self.queue)))]  # noqa: E501
+                    frame = '[' + ', '.join(x.message for x in batch) + ']'
+                else:
+                    batch = [self._pop()]
+                    frame = batch[0].message
+                self._send(frame, batch)
+
+    def _send(self, frame: str, batch: list[QueuedMessage]) -> None:
+        start = time.perf_counter()
+        try:
+            with self.lock:
+                self.websocket.send(frame)
+        except WebSocketError as e:
+            log.error(f'Websocket send with message {frame} failed due to {str(e)}')
+            self.metrics.failed_messages += len(batch)
+            for queued in batch:
+                queued.failed()
+            return
+
+        duration = time.perf_counter() - start
+        self.metrics.sent_messages += len(batch)
+        self.metrics.sent_frames += 1
+        self.metrics.total_send_time += duration
+        self.metrics.max_send_time = max(self.metrics.max_send_time, duration)
+        if duration >= SLOW_SEND_SECONDS:
+            self.metrics.slow_sends += 1
+        for queued in batch:
+            queued.succeeded()
+
+    def _handle_writer_death(self, greenlet: gevent.Greenlet) -> None:
+        log.error(
+            f'Writer of websocket with hash id {hash(self.websocket)} died '
+            f'with exception: {greenlet.exception}',
+        )
 
 
 class RotkiNotifier():
@@ -50,23 +224,30 @@ class RotkiNotifier():
             greenlet_manager: GreenletManager,
     ) -> None:
         self.greenlet_manager = greenlet_manager
-        self.subscribers: list[WebSocket] = []
-        self.locks: dict[WebSocket, Semaphore] = {}
+        self.subscribers: dict[WebSocket, WSSubscriber] = {}
+        # metrics of the subscribers that are gone
+        self.unsubscribed_metrics = SubscriberMetrics()
 
     def subscribe(self, websocket: WebSocket) -> None:
         log.info(f'Websocket with hash id {hash(websocket)} subscribed to rotki notifier')
-        self.subscribers.append(websocket)
-        self.locks[websocket] = Semaphore()
+        self.subscribers[websocket] = WSSubscriber(websocket)
 
     def unsubscribe(self, websocket: WebSocket) -> None:
-        self.locks.pop(websocket, None)
-        with suppress(ValueError):
-            self.subscribers.remove(websocket)
-            log.info(f'Websocket with hash id {hash(websocket)} unsubscribed from rotki notifier')  # noqa: E501
+        if (subscriber := self.subscribers.pop(websocket, None)) is None:
+            return
+
+        subscriber.close()
+        self.unsubscribed_metrics.add(subscriber.metrics)
+        log.info(f'Websocket with hash id {hash(websocket)} unsubscribed from rotki notifier')
+
+    def set_batch_frames(self, websocket: WebSocket, batch_frames: bool) -> None:
+        """Subscribers that accept batched frames get lists of messages in a frame"""
+        if (subscriber := self.subscribers.get(websocket)) is not None:
+            subscriber.batch_frames = batch_frames
 
     def broadcast(
             self,
-            message_type: 'WSMessageType',
+            message_type: WSMessageType,
             to_send_data: Union[dict[str, Any], list[Any]],
             success_callback: Optional[Callable] = None,
             success_callback_args: Optional[dict[str, Any]] = None,
@@ -75,8 +256,11 @@ class RotkiNotifier():
     ) -> None:
         """Broadcasts a websocket message
 
-        A callback to run on message success and a callback to run on message
-        failure can be optionally provided.
+        The message is queued for each subscriber and sent by its writer, so this never
+        waits on the sockets. A callback to run on message success and a callback to run on
+        message failure can be optionally provided. They run once per subscriber when the
+        message is sent, or fails to be sent or is dropped. The failure callback also runs
+        if there is no subscriber.
         """
         message_data = {'type': str(message_type), 'data': to_send_data}
         try:
@@ -89,32 +273,37 @@ class RotkiNotifier():
 
             return  # get out of the broadcast
 
-        to_remove_indices = set()
-        spawned_one_broadcast = False
-        for idx, websocket in enumerate(self.subscribers):
+        coalesce_key = _coalesce_key(message_type, to_send_data)
+        queued_one_broadcast = False
+        for websocket, subscriber in list(self.subscribers.items()):
             if websocket.closed is True:
-                to_remove_indices.add(idx)
+                self.unsubscribe(websocket)
                 continue
 
-            _ws_send_impl(
-                websocket=websocket,
-                lock=self.locks[websocket],
-                to_send_msg=message,
+            subscriber.put(QueuedMessage(
+                message=message,
+                coalesce_key=coalesce_key,
                 success_callback=success_callback,
                 success_callback_args=success_callback_args,
                 failure_callback=failure_callback,
                 failure_callback_args=failure_callback_args,
-            )
-            spawned_one_broadcast = True
+            ))
+            queued_one_broadcast = True
 
-        if len(to_remove_indices) != 0:  # removed closed websockets from the list
-            self.subscribers = [
-                i for j, i in enumerate(self.subscribers) if j not in to_remove_indices
-            ]
-        if spawned_one_broadcast is False and failure_callback is not None:
+        if queued_one_broadcast is False and failure_callback is not None:
             failure_callback_args = {} if failure_callback_args is None else failure_callback_args  # noqa: E501
             failure_callback(**failure_callback_args)
 
+    def serialize_metrics(self) -> dict[str, Any]:
+        return {
+            'subscribers': [{
+                'queued_messages': len(x.queue),
+                'batch_frames': x.batch_frames,
+                **x.metrics.serialize(),
+            } for x in self.subscribers.values()],
+            'unsubscribed': self.unsubscribed_metrics.serialize(),
+        }
+
 
 class RotkiWSApp(WebSocketApplication):
     """The WebSocket app that's instantiated for every message as it seems from the code
@@ -130,6 +319,15 @@ class RotkiWSApp(WebSocketApplication):
     def on_message(self, message: Optional[str], *args: Any, **kwargs: Any) -> None:
         if self.ws.closed:
             return
+        if message is not None and 'batch_frames' in message:
+            try:
+                batch_frames = json.loads(message)['batch_frames']
+            except (json.JSONDecodeError, KeyError, TypeError):
+                pass  # not a configuration message
+            else:
+                rotki_notifier: RotkiNotifier = self.ws.environ['rotki_notifier']
+                rotki_notifier.set_batch_frames(self.ws, batch_frames is True)
+                return
         try:
             self.ws.send(message, **kwargs)
         except WebSocketError as e:
@@ -6,6 +6,8 @@ from typing import Any, Optional, Union
 from rotkehlchen.constants.misc import (
     DEFAULT_MAX_LOG_BACKUP_FILES,
     DEFAULT_MAX_LOG_SIZE_IN_MB,
+    DEFAULT_SQL_READ_CONNECTIONS,
+    DEFAULT_SQL_SLOW_QUERY_MS,
     DEFAULT_SQL_VM_INSTRUCTIONS_CB,
 )
 from rotkehlchen.utils.misc import get_system_spec
@@ -105,6 +107,17 @@ def app_args(prog: str, description: str) -> argparse.ArgumentParser:
         choices=['trace', 'debug', 'info', 'warning', 'error', 'critical'],
         default='debug',
     )
+    p.add_argument(
+        '--logformat',
+        help='Choose the format of the logging entries. Valid values are "text" and "json" for one json object per line',  # noqa: E501
+        choices=['text', 'json'],
+        default='text',
+    )
+    p.add_argument(
+        '--logasync',
+        help='If given then logging entries are written by a separate thread so that the disk I/O never blocks the backend',  # noqa: E501
+        action='store_true',
+    )
     p.add_argument(
         '--logfromothermodules',
         help=(
@@ -131,6 +144,27 @@ def app_args(prog: str, description: str) -> argparse.ArgumentParser:
         default=DEFAULT_SQL_VM_INSTRUCTIONS_CB,
         type=_positive_int_or_zero,
     )
+    p.add_argument(
+        '--sqlite-read-connections',
+        help='Number of read only connections to the user DB. If not zero the user DB uses WAL journaling and reads no longer wait for writes. Zero to disable.',  # noqa: E501
+        default=DEFAULT_SQL_READ_CONNECTIONS,
+        type=_positive_int_or_zero,
+    )
+    p.add_argument(
+        '--sqlite-instrumentation',
+        help=(
+            'If given then the number of executions, the time and the rows of each SQL '
+            'statement are recorded. They can be queried from the API and are written in '
+            'the data directory at shutdown.'
+        ),
+        action='store_true',
+    )
+    p.add_argument(
+        '--sqlite-slow-query-ms',
+        help='With --sqlite-instrumentation, SQL statements that take longer than this are logged along with their query plan. Zero to disable.',  # noqa: E501
+        default=DEFAULT_SQL_SLOW_QUERY_MS,
+        type=_positive_int_or_zero,
+    )
     p.add_argument(
         'version',
         help='Shows the rotki version',
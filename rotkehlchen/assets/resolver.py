@@ -1,10 +1,12 @@
 import logging
+from collections.abc import Iterable
 from typing import TYPE_CHECKING, Optional, TypeVar
 
 from rotkehlchen.assets.types import AssetType
+from rotkehlchen.constants.misc import NFT_DIRECTIVE
 from rotkehlchen.errors.asset import UnknownAsset, WrongAssetType
 from rotkehlchen.logging import RotkehlchenLogsAdapter
-from rotkehlchen.utils.data_structures import LRUCacheWithRemove
+from rotkehlchen.utils.data_structures import CacheStats, LRUCacheWithRemove, PartitionedLRUCache
 
 if TYPE_CHECKING:
     from rotkehlchen.assets.asset import (
@@ -23,13 +25,23 @@ logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
 T = TypeVar('T', 'FiatAsset', 'CryptoAsset', 'EvmToken', 'Nft', 'AssetWithNameAndType', 'AssetWithSymbol', 'AssetWithOracles')  # noqa: E501
 
+# Max number of assets kept in memory for each asset type. EVM tokens get a bigger
+# partition since users can have thousands of them and they should not evict the
+# fiat and crypto assets that are used everywhere.
+ASSETS_CACHE_MAXSIZE = 1024
+EVM_TOKENS_CACHE_MAXSIZE = 8192
+ASSET_TYPES_CACHE_MAXSIZE = 16384
+
 
 class AssetResolver():
     __instance: Optional['AssetResolver'] = None
     # A cache so that the DB is not hit every time
     # the cache maps identifier -> final representation of the asset
-    assets_cache: LRUCacheWithRemove['Asset'] = LRUCacheWithRemove(maxsize=512)
-    types_cache: LRUCacheWithRemove[AssetType] = LRUCacheWithRemove(maxsize=512)
+    assets_cache: PartitionedLRUCache[AssetType, 'Asset'] = PartitionedLRUCache(
+        maxsize=ASSETS_CACHE_MAXSIZE,
+        partition_maxsizes={AssetType.EVM_TOKEN: EVM_TOKENS_CACHE_MAXSIZE},
+    )
+    types_cache: LRUCacheWithRemove[AssetType] = LRUCacheWithRemove(maxsize=ASSET_TYPES_CACHE_MAXSIZE)  # noqa: E501
 
     def __new__(cls) -> 'AssetResolver':
         """Lazily initializes AssetResolver
@@ -53,6 +65,42 @@ class AssetResolver():
             AssetResolver.__instance.assets_cache.clear()
             AssetResolver.__instance.types_cache.clear()
 
+    @staticmethod
+    def resize_caches(
+            assets_maxsize: int = ASSETS_CACHE_MAXSIZE,
+            evm_tokens_maxsize: int = EVM_TOKENS_CACHE_MAXSIZE,
+            types_maxsize: int = ASSET_TYPES_CACHE_MAXSIZE,
+    ) -> None:
+        """Change how many assets are kept in memory per asset type"""
+        instance = AssetResolver()
+        instance.assets_cache.resize(
+            maxsize=assets_maxsize,
+            partition_maxsizes={AssetType.EVM_TOKEN: evm_tokens_maxsize},
+        )
+        instance.types_cache.resize(maxsize=types_maxsize)
+
+    @staticmethod
+    def cache_stats() -> dict[str, CacheStats]:
+        """Returns the size and hit rate of the memory caches"""
+        instance = AssetResolver()
+        return {
+            'assets': instance.assets_cache.stats(),
+            'types': instance.types_cache.stats(),
+        }
+
+    @staticmethod
+    def cached_identifiers() -> list[str]:
+        """Returns the identifiers of the cached assets, the most recently used first"""
+        return [x.identifier for x in AssetResolver().assets_cache.values()]
+
+    @staticmethod
+    def _cache_asset(identifier: str, asset: 'AssetWithNameAndType') -> None:
+        instance = AssetResolver()
+        instance.assets_cache.set(identifier, asset, asset.asset_type)
+        # nfts are resolved to EVM tokens but have their own asset type
+        asset_type = AssetType.NFT if identifier.startswith(NFT_DIRECTIVE) else asset.asset_type
+        instance.types_cache.set(identifier, asset_type)
+
     @staticmethod
     def resolve_asset(identifier: str) -> 'Asset':
         """
@@ -84,9 +132,52 @@ class AssetResolver():
             log.debug(f'Attempt to resolve asset {identifier} using the packaged database')
             asset = GlobalDBHandler().resolve_asset_from_packaged_and_store(identifier=identifier)
         # Save it in the cache
-        instance.assets_cache.set(identifier, asset)
+        AssetResolver._cache_asset(identifier, asset)
         return asset
 
+    @staticmethod
+    def resolve_assets(identifiers: Iterable[str]) -> dict[str, 'Asset']:
+        """
+        Resolve many identifiers at once. The ones that are not in the cache are
+        queried from the globaldb in bulk and cached so that resolving them again
+        one by one does not hit the DB.
+
+        Returns a mapping of the given identifiers to their assets. Unknown identifiers
+        are not in the mapping.
+        """
+        from rotkehlchen.constants.assets import CONSTANT_ASSETS  # pylint: disable=import-outside-toplevel  # isort:skip  # noqa: E501
+        from rotkehlchen.globaldb.handler import GlobalDBHandler  # pylint: disable=import-outside-toplevel  # isort:skip  # noqa: E501
+
+        instance = AssetResolver()
+        result: dict[str, 'Asset'] = {}
+        missing: dict[str, str] = {}  # lowercased identifier -> identifier
+        for identifier in identifiers:
+            if identifier in result:
+                continue
+            if (cached_data := instance.assets_cache.get(identifier)) is not None:
+                result[identifier] = cached_data
+            else:
+                missing[identifier.lower()] = identifier
+
+        if len(missing) == 0:
+            return result
+
+        for asset in GlobalDBHandler().resolve_assets(identifiers=list(missing.values())):
+            if (identifier := missing.pop(asset.identifier.lower(), None)) is None:
+                continue
+            AssetResolver._cache_asset(identifier, asset)
+            result[identifier] = asset
+
+        for identifier in missing.values():
+            if identifier not in CONSTANT_ASSETS:
+                continue
+            try:  # use the single asset path that restores constant assets from the packaged db
+                result[identifier] = AssetResolver.resolve_asset(identifier)
+            except UnknownAsset:
+                continue
+
+        return result
+
     @staticmethod
     def get_asset_type(identifier: str, query_packaged_db: bool = True) -> AssetType:
         # TODO: This is ugly here but is here to avoid a cyclic import in the Assets file
@@ -134,7 +225,7 @@ class AssetResolver():
         if identifier in CONSTANT_ASSETS:
             # Check if the version in the packaged globaldb is correct
             resolved_asset = GlobalDBHandler().resolve_asset_from_packaged_and_store(identifier=identifier)  # noqa: E501
-            AssetResolver().assets_cache.set(identifier, resolved_asset)
+            AssetResolver._cache_asset(identifier, resolved_asset)
             if isinstance(resolved_asset, expected_type) is True:
                 # resolve_asset returns Asset, but we already narrow type with the if check above
                 return resolved_asset  # type: ignore
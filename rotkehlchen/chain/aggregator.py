@@ -2,6 +2,7 @@ import logging
 import typing
 from collections import defaultdict
 from collections.abc import Iterator
+from functools import partial
 from importlib import import_module
 from pathlib import Path
 from typing import (
@@ -60,8 +61,9 @@ from rotkehlchen.constants.assets import (
     A_LQTY,
     A_LUSD,
 )
-from rotkehlchen.constants.misc import ONE, ZERO
+from rotkehlchen.constants.misc import BALANCE_QUERIES_CONCURRENCY, ONE, ZERO
 from rotkehlchen.constants.resolver import ethaddress_to_identifier
+from rotkehlchen.constants.timing import BALANCE_QUERY_TIMEOUT
 from rotkehlchen.db.eth2 import DBEth2
 from rotkehlchen.db.filtering import Eth2DailyStatsFilterQuery
 from rotkehlchen.db.queried_addresses import QueriedAddresses
@@ -73,6 +75,7 @@ from rotkehlchen.errors.misc import (
     ModuleInitializationFailure,
 )
 from rotkehlchen.fval import FVal
+from rotkehlchen.greenlets.fanout import FanoutQuery, fanout
 from rotkehlchen.greenlets.manager import GreenletManager
 from rotkehlchen.inquirer import Inquirer
 from rotkehlchen.logging import RotkehlchenLogsAdapter
@@ -138,6 +141,9 @@ def _module_name_to_class(module_name: ModuleName) -> type[EthereumModule]:
 
 
 DEFI_BALANCES_REQUERY_SECONDS = 600
+# The details of the validators change every epoch. They are refreshed in the background
+# after that, while the previous ones are returned.
+ETH2_DETAILS_CACHE_SECS = 384
 
 
 # Mapping to token symbols to ignore. True means all
@@ -466,22 +472,36 @@ class ChainsAggregator(CacheableMixIn, LockableQueryMixIn):
         - EthSyncError if querying the token balances through a provided ethereum
         client and the chain is not synced
         """
-        xpub_manager = XpubManager(chains_aggregator=self)
         if blockchain is not None:
-            query_method = f'query_{blockchain.get_key()}_balances'
-            getattr(self, query_method)(ignore_cache=ignore_cache)
-            if ignore_cache is True and blockchain.is_bitcoin():
-                xpub_manager.check_for_new_xpub_addresses(blockchain=blockchain)  # type: ignore # is checked in the if  # noqa: E501
-        else:  # all chains
-            for chain in SupportedBlockchain:
-                query_method = f'query_{chain.get_key()}_balances'
-                getattr(self, query_method)(ignore_cache=ignore_cache)
-                if ignore_cache is True and chain.is_bitcoin():
-                    xpub_manager.check_for_new_xpub_addresses(blockchain=chain)  # type: ignore # is checked in the if  # noqa: E501
+            self._query_chain_balances(blockchain=blockchain, ignore_cache=ignore_cache)
+        else:  # all chains. They are independent so query them concurrently.
+            # Each chain query only writes the balances of its own chain in self.balances,
+            # so they never write the same mapping. Totals are recalculated after all finish.
+            results = fanout(
+                queries=[FanoutQuery(
+                    name=f'{chain.name.lower()} balances',
+                    method=partial(
+                        self._query_chain_balances,
+                        blockchain=chain,
+                        ignore_cache=ignore_cache,
+                    ),
+                ) for chain in SupportedBlockchain],
+                pool_size=BALANCE_QUERIES_CONCURRENCY,
+                timeout=BALANCE_QUERY_TIMEOUT,
+            )
+            for result in results:  # raise the first error in chain order, as if run serially
+                result.get()
 
         self.totals = self.balances.recalculate_totals()
         return self.get_balances_update(blockchain)
 
+    def _query_chain_balances(self, blockchain: SupportedBlockchain, ignore_cache: bool) -> None:
+        """Queries the balances of a single chain. May raise the same as query_balances"""
+        query_method = f'query_{blockchain.get_key()}_balances'
+        getattr(self, query_method)(ignore_cache=ignore_cache)
+        if ignore_cache is True and blockchain.is_bitcoin():
+            XpubManager(chains_aggregator=self).check_for_new_xpub_addresses(blockchain=blockchain)  # type: ignore # is checked in the if  # noqa: E501
+
     @protect_with_lock()
     @cache_response_timewise()
     def query_btc_balances(
@@ -882,7 +902,10 @@ class ChainsAggregator(CacheableMixIn, LockableQueryMixIn):
         # Query ETH/gas token balances
         eth_usd_price = Inquirer().find_usd_price(A_ETH)
         manager = cast('EvmManager', self.get_chain_manager(chain))
-        chain_balances = self.balances.get(chain)
+        # Balances are gathered in a new mapping and only replace the ones of the chain
+        # when complete. Chains are queried concurrently so this way each query only
+        # writes the balances of its own chain and never leaves them half updated.
+        chain_balances: DefaultDict[ChecksumEvmAddress, BalanceSheet] = defaultdict(BalanceSheet)  # noqa: E501
         queried_balances = manager.node_inquirer.get_multi_balance(accounts)
         for account, balance in queried_balances.items():
             usd_value = balance * eth_usd_price
@@ -892,6 +915,7 @@ class ChainsAggregator(CacheableMixIn, LockableQueryMixIn):
                 }),
             )
         self.query_evm_tokens(manager=manager, balances=chain_balances)
+        setattr(self.balances, chain.get_key(), chain_balances)
 
     @protect_with_lock()
     @cache_response_timewise()
@@ -1110,7 +1134,7 @@ class ChainsAggregator(CacheableMixIn, LockableQueryMixIn):
         return deposits
 
     @protect_with_lock()
-    @cache_response_timewise()
+    @cache_response_timewise(ttl_secs=ETH2_DETAILS_CACHE_SECS, stale_while_revalidate=True)
     def get_eth2_staking_details(self) -> list['ValidatorDetails']:
         """May raise:
         - ModuleInactive if eth2 module is not activated
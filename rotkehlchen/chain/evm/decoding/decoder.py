@@ -254,8 +254,12 @@ class EVMTransactionDecoder(metaclass=ABCMeta):
                 result = method(tx_log, transaction, decoded_events, all_logs, action_items, *mapping_result[1:])  # noqa: E501
         except (DeserializationError, ConversionError, UnknownAsset) as e:
             log.debug(
-                f'Decoding tx log with index {tx_log.log_index} of transaction '
-                f'{transaction.tx_hash.hex()} through {method.__name__} failed due to {str(e)}')
+                'Decoding tx log failed',
+                log_index=tx_log.log_index,
+                tx_hash=transaction.tx_hash,
+                method=method.__name__,
+                error=e,
+            )
             return None, []
 
         return result
@@ -526,8 +530,8 @@ class EVMTransactionDecoder(metaclass=ABCMeta):
             amount_raw = hex_or_bytes_to_int(tx_log.data[64:])
         else:
             log.debug(
-                f'Got an ERC20 approve event with unknown structure '
-                f'in transaction {transaction.tx_hash.hex()}',
+                'Got an ERC20 approve event with unknown structure',
+                tx_hash=transaction.tx_hash,
             )
             return None, []
 
@@ -22,3 +22,7 @@ ASSET_TYPES_EXCLUDED_FOR_USERS = {AssetType.NFT}
 DEFAULT_MAX_LOG_SIZE_IN_MB = 300
 DEFAULT_MAX_LOG_BACKUP_FILES = 3
 DEFAULT_SQL_VM_INSTRUCTIONS_CB = 5000
+DEFAULT_SQL_READ_CONNECTIONS = 0
+DEFAULT_SQL_SLOW_QUERY_MS = 500
+
+BALANCE_QUERIES_CONCURRENCY = 8  # max number of exchanges/chains queried at the same time
@@ -23,3 +23,5 @@ ENS_UPDATE_INTERVAL = DAY_IN_SECONDS
 ETH_PROTOCOLS_CACHE_REFRESH = DAY_IN_SECONDS * 3
 DATA_UPDATES_REFRESH = DAY_IN_SECONDS
 EVM_ACCOUNTS_DETECTION_REFRESH = DAY_IN_SECONDS
+SNAPSHOTS_COMPACTION_REFRESH = DAY_IN_SECONDS
+BALANCE_QUERY_TIMEOUT = 10 * 60  # seconds a single exchange/chain balance query can take
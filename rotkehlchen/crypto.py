@@ -1,5 +1,6 @@
 import base64
 import os
+from collections.abc import Iterable, Iterator
 
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
@@ -31,6 +32,46 @@ def encrypt(key: bytes, source: bytes) -> str:
     return base64.b64encode(data).decode('latin-1')
 
 
+def encrypt_chunks(key: bytes, chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """Same as encrypt() but works on an iterable of chunks of the source
+
+    Yields the iv followed by the encrypted chunks without base64 encoding them. Joining
+    and base64 encoding everything that is yielded gives the same result as encrypt()
+    so it can be decrypted with decrypt().
+    """
+    assert isinstance(key, bytes), 'key should be given in bytes'
+    digest = hashes.Hash(hashes.SHA256())
+    digest.update(key)
+    key = digest.finalize()  # use SHA-256 over our key to get a proper-sized AES key
+    iv = os.urandom(AES_BLOCK_SIZE)
+    cipher = Cipher(algorithms.AES(key), modes.CBC(iv))
+    encryptor = cipher.encryptor()
+    yield iv
+    source_length = 0
+    for chunk in chunks:
+        source_length += len(chunk)
+        encrypted_chunk = encryptor.update(chunk)
+        if len(encrypted_chunk) != 0:
+            yield encrypted_chunk
+
+    padding = AES_BLOCK_SIZE - source_length % AES_BLOCK_SIZE  # calculate needed padding
+    yield encryptor.update(bytes([padding]) * padding) + encryptor.finalize()
+
+
+def b64encode_chunks(chunks: Iterable[bytes]) -> bytes:
+    """Base64 encodes the given chunks without having to join them first"""
+    encoded_chunks = []  # joined once at the end so the result is only copied once
+    leftover = b''
+    for chunk in chunks:
+        data = leftover + chunk
+        cutoff = len(data) - len(data) % 3  # encode only full 3 byte groups to avoid padding
+        encoded_chunks.append(base64.b64encode(data[:cutoff]))
+        leftover = data[cutoff:]
+
+    encoded_chunks.append(base64.b64encode(leftover))
+    return b''.join(encoded_chunks)
+
+
 def decrypt(key: bytes, given_source: str) -> bytes:
     """
     Decrypts the given source data we with the given key.
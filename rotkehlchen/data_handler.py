@@ -4,11 +4,13 @@ import logging
 import shutil
 import tempfile
 import zlib
+from collections.abc import Iterator
 from pathlib import Path
-from typing import Optional
+from typing import BinaryIO, Optional
 
 from rotkehlchen.assets.asset import Asset
-from rotkehlchen.crypto import decrypt, encrypt
+from rotkehlchen.constants.misc import DEFAULT_SQL_READ_CONNECTIONS
+from rotkehlchen.crypto import b64encode_chunks, decrypt, encrypt_chunks
 from rotkehlchen.db.dbhandler import DBHandler
 from rotkehlchen.db.settings import ModifiableDBSettings
 from rotkehlchen.errors.api import AuthenticationError
@@ -24,6 +26,21 @@ log = RotkehlchenLogsAdapter(logger)
 BUFFERSIZE = 64 * 1024
 
 
+def _compressed_file_chunks(src_f: BinaryIO, source_hash: 'hashlib._Hash') -> Iterator[bytes]:
+    """Reads the given file in blocks, updates the hash with each block read and
+    yields the zlib compressed data"""
+    compressor = zlib.compressobj(level=9)
+    block = src_f.read(BUFFERSIZE)
+    while block:
+        source_hash.update(block)
+        compressed_block = compressor.compress(block)
+        if len(compressed_block) != 0:
+            yield compressed_block
+        block = src_f.read(BUFFERSIZE)
+
+    yield compressor.flush()
+
+
 class DataHandler():
 
     def __init__(
@@ -31,6 +48,7 @@ class DataHandler():
             data_directory: Path,
             msg_aggregator: MessagesAggregator,
             sql_vm_instructions_cb: int,
+            sql_read_connections: int = DEFAULT_SQL_READ_CONNECTIONS,
     ):
         self.logged_in = False
         self.data_directory = data_directory
@@ -38,6 +56,7 @@ class DataHandler():
         self.password = ''
         self.msg_aggregator = msg_aggregator
         self.sql_vm_instructions_cb = sql_vm_instructions_cb
+        self.sql_read_connections = sql_read_connections
 
     def logout(self) -> None:
         if self.logged_in:
@@ -125,6 +144,7 @@ class DataHandler():
             msg_aggregator=self.msg_aggregator,
             initial_settings=initial_settings,
             sql_vm_instructions_cb=self.sql_vm_instructions_cb,
+            sql_read_connections=self.sql_read_connections,
         )
         self.user_data_dir = user_data_dir
         self.logged_in = True
@@ -195,31 +215,27 @@ class DataHandler():
         """Decrypt the DB, dump in temporary plaintextdb, compress it,
         and then re-encrypt it
 
+        The temporary DB file is streamed through hashing, compression, encryption and
+        base64 encoding in blocks of BUFFERSIZE so that only the final encoded result
+        is kept whole in memory.
+
         Returns a b64 encoded binary blob"""
-        compressor = zlib.compressobj(level=9)
         with tempfile.NamedTemporaryFile(delete=False, suffix='.db') as tempdbfile:
             tempdbpath = Path(tempdbfile.name)
             log.info(f'Compress and encrypt DB at temporary path: {tempdbpath}')
             tempdbfile.close()  # close the file to allow re-opening by export_unencrypted in windows https://github.com/rotki/rotki/issues/5051  # noqa: E501
             self.db.export_unencrypted(tempdbpath)
-            source_data = bytearray()
-            compressed_data = bytearray()
+            source_hash = hashlib.sha256()
             with open(tempdbpath, 'rb') as src_f:
-                block = src_f.read(BUFFERSIZE)
-                while block:
-                    source_data += block
-                    compressed_data += compressor.compress(block)
-                    block = src_f.read(BUFFERSIZE)
-
-                compressed_data += compressor.flush()
-
-        original_data_hash = base64.b64encode(
-            hashlib.sha256(source_data).digest(),
-        ).decode()
-        encrypted_data = encrypt(password.encode(), bytes(compressed_data))
+                encrypted_data = b64encode_chunks(encrypt_chunks(
+                    key=password.encode(),
+                    chunks=_compressed_file_chunks(src_f=src_f, source_hash=source_hash),
+                ))
+
+        original_data_hash = base64.b64encode(source_hash.digest()).decode()
         # cleanup temp file to avoid windows problem (https://github.com/rotki/rotki/issues/5051)
         tempdbpath.unlink()
-        return B64EncodedBytes(encrypted_data.encode()), original_data_hash
+        return B64EncodedBytes(encrypted_data), original_data_hash
 
     def decompress_and_decrypt_db(self, password: str, encrypted_data: B64EncodedString) -> None:
         """Decrypt and decompress the encrypted data we receive from the server
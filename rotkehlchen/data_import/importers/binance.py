@@ -11,7 +11,6 @@ from rotkehlchen.assets.converters import asset_from_binance
 from rotkehlchen.constants import ZERO
 from rotkehlchen.constants.assets import A_USD
 from rotkehlchen.data_import.utils import BaseExchangeImporter
-from rotkehlchen.db.drivers.gevent import DBCursor
 from rotkehlchen.errors.asset import UnknownAsset
 from rotkehlchen.errors.price import NoPriceForGivenTimestamp
 from rotkehlchen.errors.serialization import DeserializationError
@@ -65,7 +64,6 @@ class BinanceSingleEntry(BinanceEntry, metaclass=abc.ABCMeta):
     @abc.abstractmethod
     def process_entry(
             self,
-            cursor: DBCursor,
             importer: BaseExchangeImporter,
             timestamp: Timestamp,
             data: BinanceCsvRow,
@@ -83,7 +81,6 @@ class BinanceMultipleEntry(BinanceEntry, metaclass=abc.ABCMeta):
     @abc.abstractmethod
     def process_entries(
             self,
-            cursor: DBCursor,
             importer: BaseExchangeImporter,
             timestamp: Timestamp,
             data: list[BinanceCsvRow],
@@ -264,14 +261,13 @@ class BinanceTradeEntry(BinanceMultipleEntry):
 
     def process_entries(
             self,
-            cursor: DBCursor,
             importer: BaseExchangeImporter,
             timestamp: Timestamp,
             data: list[BinanceCsvRow],
     ) -> int:
         trades = self.process_trades(importer=importer, timestamp=timestamp, data=data)
         for trade in trades:
-            importer.add_trade(cursor, trade)
+            importer.add_trade(trade)
         return len(trades)
 
 
@@ -283,7 +279,6 @@ class BinanceDepositWithdrawEntry(BinanceSingleEntry):
 
     def process_entry(
             self,
-            cursor: DBCursor,
             importer: BaseExchangeImporter,
             timestamp: Timestamp,
             data: BinanceCsvRow,
@@ -306,7 +301,7 @@ class BinanceDepositWithdrawEntry(BinanceSingleEntry):
             fee_asset=A_USD,
             link=f'Imported from binance CSV file. Binance operation: {data["Operation"]}',
         )
-        importer.add_asset_movement(cursor, asset_movement)
+        importer.add_asset_movement(asset_movement)
 
 
 class BinanceStakingRewardsEntry(BinanceSingleEntry):
@@ -317,7 +312,6 @@ class BinanceStakingRewardsEntry(BinanceSingleEntry):
 
     def process_entry(
             self,
-            cursor: DBCursor,
             importer: BaseExchangeImporter,
             timestamp: Timestamp,
             data: BinanceCsvRow,
@@ -336,7 +330,7 @@ class BinanceStakingRewardsEntry(BinanceSingleEntry):
             link=None,
             notes=f'Imported from binance CSV file. Binance operation: {data["Operation"]}',
         )
-        importer.add_ledger_action(cursor, ledger_action)
+        importer.add_ledger_action(ledger_action)
 
 
 class BinancePOSEntry(BinanceSingleEntry):
@@ -351,7 +345,6 @@ class BinancePOSEntry(BinanceSingleEntry):
 
     def process_entry(
             self,
-            cursor: DBCursor,
             importer: BaseExchangeImporter,
             timestamp: Timestamp,
             data: BinanceCsvRow,
@@ -372,7 +365,7 @@ class BinancePOSEntry(BinanceSingleEntry):
             link=None,
             notes=f'Imported from binance CSV file. Binance operation: {data["Operation"]}',
         )
-        importer.add_ledger_action(cursor, ledger_action)
+        importer.add_ledger_action(ledger_action)
 
 
 SINGLE_BINANCE_ENTRIES = [
@@ -388,6 +381,7 @@ MULTIPLE_BINANCE_ENTRIES = [
 
 def _group_binance_rows(
         rows: list[BinanceCsvRow],
+        importer: BaseExchangeImporter,
         timestamp_format: str = '%Y-%m-%d %H:%M:%S',
 ) -> tuple[int, dict[Timestamp, list[BinanceCsvRow]]]:
     """Groups Binance rows by timestamp and deletes unused columns"""
@@ -400,7 +394,7 @@ def _group_binance_rows(
                 formatstr=timestamp_format,
                 location='binance',
             )
-            csv_row['Coin'] = asset_from_binance(csv_row['Coin'])
+            csv_row['Coin'] = importer.resolve_asset(asset_from_binance, csv_row['Coin'])
             csv_row['Change'] = deserialize_asset_amount(csv_row['Change'])
             multirows[timestamp].append(csv_row)
         except (DeserializationError, UnknownAsset) as e:
@@ -417,7 +411,6 @@ class BinanceImporter(BaseExchangeImporter):
 
     def _process_single_binance_entries(
             self,
-            cursor: DBCursor,
             timestamp: Timestamp,
             rows: list[BinanceCsvRow],
     ) -> tuple[dict[BinanceSingleEntry, int], list[BinanceCsvRow]]:
@@ -428,7 +421,6 @@ class BinanceImporter(BaseExchangeImporter):
             for single_entry_class in SINGLE_BINANCE_ENTRIES:
                 if single_entry_class.is_entry(row['Operation']):
                     single_entry_class.process_entry(
-                        cursor=cursor,
                         importer=self,
                         timestamp=timestamp,
                         data=row,
@@ -441,7 +433,6 @@ class BinanceImporter(BaseExchangeImporter):
 
     def _process_multiple_binance_entries(
             self,
-            cursor: DBCursor,
             timestamp: Timestamp,
             rows: list[BinanceCsvRow],
     ) -> tuple[Optional[BinanceEntry], int]:
@@ -451,7 +442,6 @@ class BinanceImporter(BaseExchangeImporter):
         for multiple_entry_class in MULTIPLE_BINANCE_ENTRIES:
             if multiple_entry_class.are_entries([row['Operation'] for row in rows]):
                 processed_count = multiple_entry_class.process_entries(
-                    cursor=cursor,
                     importer=self,
                     timestamp=timestamp,
                     data=rows,
@@ -461,14 +451,12 @@ class BinanceImporter(BaseExchangeImporter):
 
     def _process_binance_rows(
             self,
-            cursor: DBCursor,
             multi: dict[Timestamp, list[BinanceCsvRow]],
     ) -> None:
         stats: dict[BinanceEntry, int] = defaultdict(int)
         skipped_rows: list[Any] = []
         for timestamp, rows in multi.items():
             single_processed, rows_without_single = self._process_single_binance_entries(
-                cursor=cursor,
                 timestamp=timestamp,
                 rows=rows,
             )
@@ -476,7 +464,6 @@ class BinanceImporter(BaseExchangeImporter):
                 stats[entry_type] += amount
 
             multiple_type, multiple_count = self._process_multiple_binance_entries(
-                cursor=cursor,
                 timestamp=timestamp,
                 rows=rows_without_single,
             )
@@ -512,12 +499,16 @@ class BinanceImporter(BaseExchangeImporter):
                 f'Check logs for details',
             )
 
-    def _import_csv(self, cursor: DBCursor, filepath: Path, **kwargs: Any) -> None:
+    def _import_csv(self, filepath: Path, **kwargs: Any) -> None:
         with open(filepath, encoding='utf-8-sig') as csvfile:
             input_rows = list(csv.DictReader(csvfile))
-            skipped_count, multirows = _group_binance_rows(rows=input_rows, **kwargs)
+            skipped_count, multirows = _group_binance_rows(
+                rows=input_rows,
+                importer=self,
+                **kwargs,
+            )
             if skipped_count > 0:
                 self.db.msg_aggregator.add_warning(
                     f'{skipped_count} Binance rows have bad format. Check logs for details.',
                 )
-            self._process_binance_rows(cursor, multirows)
+            self._process_binance_rows(multirows)
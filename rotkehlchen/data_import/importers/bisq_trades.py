@@ -5,7 +5,6 @@ from typing import Any
 from rotkehlchen.assets.utils import symbol_to_asset_or_token
 from rotkehlchen.constants.assets import A_BSQ, A_BTC
 from rotkehlchen.data_import.utils import BaseExchangeImporter
-from rotkehlchen.db.drivers.gevent import DBCursor
 from rotkehlchen.errors.asset import UnknownAsset
 from rotkehlchen.errors.misc import InputError
 from rotkehlchen.errors.serialization import DeserializationError
@@ -21,7 +20,6 @@ from rotkehlchen.types import Location, Price, TradeType
 class BisqTradesImporter(BaseExchangeImporter):
     def _consume_bisq_trade(
             self,
-            cursor: DBCursor,
             csv_row: dict[str, Any],
             timestamp_format: str = '%d %b %Y %H:%M:%S',
     ) -> None:
@@ -84,9 +82,9 @@ class BisqTradesImporter(BaseExchangeImporter):
             link='',
             notes=f'ID: {csv_row["Trade ID"]}',
         )
-        self.add_trade(cursor, trade)
+        self.add_trade(trade)
 
-    def _import_csv(self, cursor: DBCursor, filepath: Path, **kwargs: Any) -> None:
+    def _import_csv(self, filepath: Path, **kwargs: Any) -> None:
         """
         Import trades from bisq. The information and comments about this importer were addressed
         at the issue https://github.com/rotki/rotki/issues/824
@@ -97,7 +95,7 @@ class BisqTradesImporter(BaseExchangeImporter):
             data = csv.DictReader(csvfile)
             for row in data:
                 try:
-                    self._consume_bisq_trade(cursor, row, **kwargs)
+                    self._consume_bisq_trade(row, **kwargs)
                 except UnknownAsset as e:
                     self.db.msg_aggregator.add_warning(
                         f'During Bisq CSV import found action with unknown '
@@ -8,7 +8,6 @@ from rotkehlchen.assets.converters import asset_from_blockfi
 from rotkehlchen.constants import ZERO
 from rotkehlchen.constants.assets import A_USD
 from rotkehlchen.data_import.utils import BaseExchangeImporter, UnsupportedCSVEntry
-from rotkehlchen.db.drivers.gevent import DBCursor
 from rotkehlchen.errors.asset import UnknownAsset
 from rotkehlchen.errors.misc import InputError
 from rotkehlchen.errors.serialization import DeserializationError
@@ -27,7 +26,6 @@ log = RotkehlchenLogsAdapter(logger)
 class BlockfiTransactionsImporter(BaseExchangeImporter):
     def _consume_blockfi_entry(
             self,
-            cursor: DBCursor,
             csv_row: dict[str, Any],
             timestamp_format: str = '%Y-%m-%d %H:%M:%S',
     ) -> None:
@@ -70,7 +68,7 @@ class BlockfiTransactionsImporter(BaseExchangeImporter):
                 fee_asset=fee_asset,
                 link='',
             )
-            self.add_asset_movement(cursor, asset_movement)
+            self.add_asset_movement(asset_movement)
         elif entry_type in ('Withdrawal', 'Wire Withdrawal', 'ACH Withdrawal'):
             asset_movement = AssetMovement(
                 location=Location.BLOCKFI,
@@ -84,7 +82,7 @@ class BlockfiTransactionsImporter(BaseExchangeImporter):
                 fee_asset=fee_asset,
                 link='',
             )
-            self.add_asset_movement(cursor, asset_movement)
+            self.add_asset_movement(asset_movement)
         elif entry_type == 'Withdrawal Fee':
             action = LedgerAction(
                 identifier=0,  # whatever is not used at insertion
@@ -98,7 +96,7 @@ class BlockfiTransactionsImporter(BaseExchangeImporter):
                 link=None,
                 notes=f'{entry_type} from BlockFi',
             )
-            self.add_ledger_action(cursor, action)
+            self.add_ledger_action(action)
         elif entry_type in ('Interest Payment', 'Bonus Payment', 'Referral Bonus'):
             action = LedgerAction(
                 identifier=0,  # whatever is not used at insertion
@@ -112,7 +110,7 @@ class BlockfiTransactionsImporter(BaseExchangeImporter):
                 link=None,
                 notes=f'{entry_type} from BlockFi',
             )
-            self.add_ledger_action(cursor, action)
+            self.add_ledger_action(action)
         elif entry_type == 'Crypto Transfer':
             category = (
                 AssetMovementCategory.WITHDRAWAL if raw_amount < ZERO
@@ -130,13 +128,13 @@ class BlockfiTransactionsImporter(BaseExchangeImporter):
                 fee_asset=fee_asset,
                 link='',
             )
-            self.add_asset_movement(cursor, asset_movement)
+            self.add_asset_movement(asset_movement)
         elif entry_type == 'Trade':
             pass
         else:
             raise UnsupportedCSVEntry(f'Unsuported entry {entry_type}. Data: {csv_row}')
 
-    def _import_csv(self, cursor: DBCursor, filepath: Path, **kwargs: Any) -> None:
+    def _import_csv(self, filepath: Path, **kwargs: Any) -> None:
         """
         Information for the values that the columns can have has been obtained from
         https://github.com/BittyTax/BittyTax/blob/06794f51223398759852d6853bc7112ffb96129a/bittytax/conv/parsers/blockfi.py#L67
@@ -147,7 +145,7 @@ class BlockfiTransactionsImporter(BaseExchangeImporter):
             data = csv.DictReader(csvfile)
             for row in data:
                 try:
-                    self._consume_blockfi_entry(cursor, row, **kwargs)
+                    self._consume_blockfi_entry(row, **kwargs)
                 except UnknownAsset as e:
                     self.db.msg_aggregator.add_warning(
                         f'During BlockFi CSV import found action with unknown '
@@ -9,7 +9,6 @@ from rotkehlchen.assets.utils import symbol_to_asset_or_token
 from rotkehlchen.constants import ZERO
 from rotkehlchen.constants.assets import A_USD
 from rotkehlchen.data_import.utils import BaseExchangeImporter, UnsupportedCSVEntry
-from rotkehlchen.db.drivers.gevent import DBCursor
 from rotkehlchen.errors.asset import UnknownAsset
 from rotkehlchen.errors.misc import InputError
 from rotkehlchen.errors.serialization import DeserializationError
@@ -82,7 +81,6 @@ class CointrackingImporter(BaseExchangeImporter):
 
     def _consume_cointracking_entry(
             self,
-            cursor: DBCursor,
             csv_row: dict[str, Any],
             timestamp_format: str = '%d.%m.%Y %H:%M:%S',
     ) -> None:
@@ -145,7 +143,7 @@ class CointrackingImporter(BaseExchangeImporter):
                 link='',
                 notes=notes,
             )
-            self.add_trade(cursor, trade)
+            self.add_trade(trade)
         elif row_type in ('Deposit', 'Withdrawal'):
             category = deserialize_asset_movement_category(row_type.lower())
             if category == AssetMovementCategory.DEPOSIT:
@@ -167,7 +165,7 @@ class CointrackingImporter(BaseExchangeImporter):
                 fee_asset=fee_currency,
                 link='',
             )
-            self.add_asset_movement(cursor, asset_movement)
+            self.add_asset_movement(asset_movement)
         else:
             raise UnsupportedCSVEntry(
                 f'Unknown entrype type "{row_type}" encountered during cointracking '
@@ -176,7 +174,6 @@ class CointrackingImporter(BaseExchangeImporter):
 
     def _import_csv(
             self,
-            cursor: DBCursor,
             filepath: Path,
             **kwargs: Any,
     ) -> None:
@@ -188,7 +185,7 @@ class CointrackingImporter(BaseExchangeImporter):
             header = remap_header(next(data))
             for row in data:
                 try:
-                    self._consume_cointracking_entry(cursor, dict(zip(header, row)), **kwargs)
+                    self._consume_cointracking_entry(dict(zip(header, row)), **kwargs)
                 except UnknownAsset as e:
                     self.db.msg_aggregator.add_warning(
                         f'During cointracking CSV import found action with unknown '
@@ -9,7 +9,6 @@ from rotkehlchen.accounting.structures.types import HistoryEventSubType, History
 from rotkehlchen.assets.utils import symbol_to_asset_or_token
 from rotkehlchen.constants import ZERO
 from rotkehlchen.data_import.utils import BaseExchangeImporter, UnsupportedCSVEntry
-from rotkehlchen.db.drivers.gevent import DBCursor
 from rotkehlchen.errors.asset import UnknownAsset
 from rotkehlchen.errors.misc import InputError
 from rotkehlchen.errors.serialization import DeserializationError
@@ -28,7 +27,6 @@ GENERIC_TYPE_TO_HISTORY_EVENT_TYPE_MAPPINGS = {
 class RotkiGenericEventsImporter(BaseExchangeImporter):
     def _consume_rotki_event(
             self,
-            cursor: DBCursor,
             csv_row: dict[str, Any],
             sequence_index: int,
     ) -> None:
@@ -83,9 +81,9 @@ class RotkiGenericEventsImporter(BaseExchangeImporter):
                 notes=csv_row['Description'],
             )
             events.append(fee_event)
-        self.add_history_events(cursor, events)  # event assets are always resolved here
+        self.add_history_events(events)  # event assets are always resolved here
 
-    def _import_csv(self, cursor: DBCursor, filepath: Path, **kwargs: Any) -> None:
+    def _import_csv(self, filepath: Path, **kwargs: Any) -> None:
         """May raise:
         - InputError if one of the rows is malformed
         """
@@ -94,7 +92,7 @@ class RotkiGenericEventsImporter(BaseExchangeImporter):
             for idx, row in enumerate(data):
                 try:
                     kwargs['sequence_index'] = idx
-                    self._consume_rotki_event(cursor, row, **kwargs)
+                    self._consume_rotki_event(row, **kwargs)
                 except UnknownAsset as e:
                     self.db.msg_aggregator.add_warning(
                         f'During rotki generic events CSV import, found action with unknown '
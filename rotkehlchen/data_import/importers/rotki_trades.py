@@ -6,7 +6,6 @@ from typing import Any
 
 from rotkehlchen.assets.utils import symbol_to_asset_or_token
 from rotkehlchen.data_import.utils import BaseExchangeImporter
-from rotkehlchen.db.drivers.gevent import DBCursor
 from rotkehlchen.errors.asset import UnknownAsset
 from rotkehlchen.errors.misc import InputError
 from rotkehlchen.errors.serialization import DeserializationError
@@ -23,7 +22,6 @@ log = RotkehlchenLogsAdapter(logger)
 class RotkiGenericTradesImporter(BaseExchangeImporter):
     def _consume_rotki_trades(
             self,
-            cursor: DBCursor,
             csv_row: dict[str, Any],
     ) -> None:
         """Consume rotki generic trades import CSV file.
@@ -55,9 +53,9 @@ class RotkiGenericTradesImporter(BaseExchangeImporter):
             amount=amount_bought,
             notes=csv_row['Description'],
         )
-        self.add_trade(cursor, trade)
+        self.add_trade(trade)
 
-    def _import_csv(self, cursor: DBCursor, filepath: Path, **kwargs: Any) -> None:
+    def _import_csv(self, filepath: Path, **kwargs: Any) -> None:
         """May raise:
         - InputError if one of the rows is malformed
         """
@@ -65,7 +63,7 @@ class RotkiGenericTradesImporter(BaseExchangeImporter):
             data = csv.DictReader(csvfile)
             for row in data:
                 try:
-                    self._consume_rotki_trades(cursor, row)
+                    self._consume_rotki_trades(row)
                 except UnknownAsset as e:
                     self.db.msg_aggregator.add_warning(
                         f'During rotki generic trades CSV import, found action with unknown '
@@ -7,7 +7,6 @@ from rotkehlchen.assets.converters import asset_from_kraken
 from rotkehlchen.constants import ZERO
 from rotkehlchen.constants.assets import A_DAI, A_SAI
 from rotkehlchen.data_import.utils import BaseExchangeImporter
-from rotkehlchen.db.drivers.gevent import DBCursor
 from rotkehlchen.errors.asset import UnknownAsset
 from rotkehlchen.errors.misc import InputError
 from rotkehlchen.errors.serialization import DeserializationError
@@ -37,7 +36,6 @@ class ShapeshiftTradesImporter(BaseExchangeImporter):
 
     def _consume_shapeshift_trade(
             self,
-            cursor: DBCursor,
             csv_row: dict[str, Any],
             timestamp_format: str = 'iso8601',
     ) -> None:
@@ -102,9 +100,9 @@ Trade from ShapeShift with ShapeShift Deposit Address:
             link='',
             notes=notes,
         )
-        self.add_trade(cursor, trade)
+        self.add_trade(trade)
 
-    def _import_csv(self, cursor: DBCursor, filepath: Path, **kwargs: Any) -> None:
+    def _import_csv(self, filepath: Path, **kwargs: Any) -> None:
         """
         Information for the values that the columns can have has been obtained from sample CSVs
         May raise:
@@ -114,7 +112,7 @@ Trade from ShapeShift with ShapeShift Deposit Address:
             data = csv.DictReader(csvfile)
             for row in data:
                 try:
-                    self._consume_shapeshift_trade(cursor, row, **kwargs)
+                    self._consume_shapeshift_trade(row, **kwargs)
                 except UnknownAsset as e:
                     self.db.msg_aggregator.add_warning(
                         f'During ShapeShift CSV import found action with unknown '
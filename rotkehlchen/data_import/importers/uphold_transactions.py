@@ -7,7 +7,6 @@ from rotkehlchen.accounting.ledger_actions import LedgerAction, LedgerActionType
 from rotkehlchen.assets.converters import asset_from_uphold
 from rotkehlchen.constants import ZERO
 from rotkehlchen.data_import.utils import BaseExchangeImporter
-from rotkehlchen.db.drivers.gevent import DBCursor
 from rotkehlchen.errors.asset import UnknownAsset
 from rotkehlchen.errors.misc import InputError
 from rotkehlchen.errors.serialization import DeserializationError
@@ -28,7 +27,6 @@ log = RotkehlchenLogsAdapter(logger)
 class UpholdTransactionsImporter(BaseExchangeImporter):
     def _consume_uphold_transaction(
             self,
-            cursor: DBCursor,
             csv_row: dict[str, Any],
             timestamp_format: str = '%a %b %d %Y %H:%M:%S %Z%z',
     ) -> None:
@@ -84,7 +82,7 @@ Activity from uphold with uphold transaction id:
                     link='',
                     notes=notes,
                 )
-                self.add_ledger_action(cursor, action)
+                self.add_ledger_action(action)
             else:  # Assets or amounts differ (Trades)
                 # in uphold UI the exchanged amount includes the fee.
                 if fee_asset == destination_asset:
@@ -103,7 +101,7 @@ Activity from uphold with uphold transaction id:
                         link='',
                         notes=notes,
                     )
-                    self.add_trade(cursor, trade)
+                    self.add_trade(trade)
                 else:
                     log.debug(f'Ignoring trade with Destination Amount: {destination_amount}.')
         elif origin == 'uphold' and transaction_type == 'out':
@@ -120,7 +118,7 @@ Activity from uphold with uphold transaction id:
                     fee_asset=fee_asset,
                     link='',
                 )
-                self.add_asset_movement(cursor, asset_movement)
+                self.add_asset_movement(asset_movement)
             else:  # Trades (sell)
                 if origin_amount > 0:
                     trade = Trade(
@@ -136,7 +134,7 @@ Activity from uphold with uphold transaction id:
                         link='',
                         notes=notes,
                     )
-                    self.add_trade(cursor, trade)
+                    self.add_trade(trade)
                 else:
                     log.debug(f'Ignoring trade with Origin Amount: {origin_amount}.')
         elif destination == 'uphold' and transaction_type == 'in':
@@ -153,7 +151,7 @@ Activity from uphold with uphold transaction id:
                     fee_asset=fee_asset,
                     link='',
                 )
-                self.add_asset_movement(cursor, asset_movement)
+                self.add_asset_movement(asset_movement)
             else:  # Trades (buy)
                 if destination_amount > 0:
                     trade = Trade(
@@ -169,11 +167,11 @@ Activity from uphold with uphold transaction id:
                         link='',
                         notes=notes,
                     )
-                    self.add_trade(cursor, trade)
+                    self.add_trade(trade)
                 else:
                     log.debug(f'Ignoring trade with Destination Amount: {destination_amount}.')
 
-    def _import_csv(self, cursor: DBCursor, filepath: Path, **kwargs: Any) -> None:
+    def _import_csv(self, filepath: Path, **kwargs: Any) -> None:
         """
         Information for the values that the columns can have has been obtained from sample CSVs
         """
@@ -181,7 +179,7 @@ Activity from uphold with uphold transaction id:
             data = csv.DictReader(csvfile)
             for row in data:
                 try:
-                    self._consume_uphold_transaction(cursor, row, **kwargs)
+                    self._consume_uphold_transaction(row, **kwargs)
                 except UnknownAsset as e:
                     self.db.msg_aggregator.add_warning(
                         f'During uphold CSV import found action with unknown '
@@ -71,5 +71,9 @@ class CSVDataImporter:
         Returns (True, '') if imported successfully and (False, message) otherwise."""
         importer_type = source.get_importer_type()
         importer = importer_type(db=self.db)
-        success, msg = importer.import_csv(filepath=filepath, **kwargs)
+        success, msg = importer.import_csv(
+            filepath=filepath,
+            source=source.name.lower(),
+            **kwargs,
+        )
         return success, msg
@@ -1,75 +1,133 @@
 from abc import ABCMeta, abstractmethod
+from collections.abc import Callable
 from pathlib import Path
-from typing import Any
+from typing import Any, Union
+
+import gevent
 
 from rotkehlchen.accounting.ledger_actions import LedgerAction
 from rotkehlchen.accounting.structures.base import HistoryBaseEntry
+from rotkehlchen.api.websockets.typedefs import WSMessageType
+from rotkehlchen.assets.asset import AssetWithOracles
 from rotkehlchen.db.dbhandler import DBHandler
-from rotkehlchen.db.drivers.gevent import DBCursor
 from rotkehlchen.db.history_events import DBHistoryEvents
 from rotkehlchen.db.ledger_actions import DBLedgerActions
+from rotkehlchen.errors.asset import UnknownAsset, UnsupportedAsset
 from rotkehlchen.errors.misc import InputError
+from rotkehlchen.errors.serialization import DeserializationError
 from rotkehlchen.exchanges.data_structures import AssetMovement, Trade
 
 ITEMS_PER_DB_WRITE = 400
 
+AssetConversionError = tuple[type[Union[DeserializationError, UnsupportedAsset, UnknownAsset]], str]  # noqa: E501
+
 
 class BaseExchangeImporter(metaclass=ABCMeta):
     def __init__(self, db: DBHandler) -> None:
         self.db = db
         self.db_ledger = DBLedgerActions(self.db, self.db.msg_aggregator)
         self.history_db = DBHistoryEvents(self.db)
+        self.source = ''
+        self.imported_entries = 0
         self._trades: list[Trade] = []
         self._asset_movements: list[AssetMovement] = []
         self._ledger_actions: list[LedgerAction] = []
         self._history_events: list[HistoryBaseEntry] = []
+        self._assets: dict[tuple[Callable[[str], AssetWithOracles], str], Union[AssetWithOracles, AssetConversionError]] = {}  # noqa: E501
 
-    def import_csv(self, filepath: Path, **kwargs: Any) -> tuple[bool, str]:
+    def import_csv(self, filepath: Path, source: str, **kwargs: Any) -> tuple[bool, str]:
+        """Imports the csv file. The parsed entries are written in bounded transactions of
+        ITEMS_PER_DB_WRITE entries so that a big file does not keep the DB locked for the
+        whole import. This also means that if a row is malformed the entries written
+        before it are kept.
+        """
+        self.source = source
         try:
-            with self.db.user_write() as cursor:
-                self._import_csv(cursor, filepath=filepath, **kwargs)
-                self._flush_all(cursor)
+            self._import_csv(filepath=filepath, **kwargs)
+            self._flush_all()
         except InputError as e:
             return False, str(e)
         else:
             return True, ''
 
     @abstractmethod
-    def _import_csv(self, cursor: DBCursor, filepath: Path, **kwargs: Any) -> None:
+    def _import_csv(self, filepath: Path, **kwargs: Any) -> None:
         """The method that processes csv. Should be implemented by subclasses.
+        Entries should be given to the add_* methods which take care of writing them.
         May raise:
         - InputError if one of the rows is malformed
         """
 
-    def add_trade(self, cursor: DBCursor, trade: Trade) -> None:
+    def resolve_asset(
+            self,
+            converter: Callable[[str], AssetWithOracles],
+            name: str,
+    ) -> AssetWithOracles:
+        """Memoized version of converter(name) for the duration of the import since
+        the same few symbols appear in most rows of a csv file.
+
+        May raise:
+        - DeserializationError
+        - UnsupportedAsset
+        - UnknownAsset
+        """
+        key = (converter, name)
+        if (result := self._assets.get(key)) is None:
+            try:
+                result = converter(name)
+            except (DeserializationError, UnsupportedAsset, UnknownAsset) as e:
+                # the error is remembered so that rows with the same bad symbol fail fast.
+                # Its class and argument are kept so each row raises a new exception.
+                result = (type(e), getattr(e, 'identifier', str(e)))
+            self._assets[key] = result
+
+        if isinstance(result, tuple):
+            error_class, error_argument = result
+            raise error_class(error_argument)
+        return result
+
+    def add_trade(self, trade: Trade) -> None:
         self._trades.append(trade)
-        self.maybe_flush_all(cursor)
+        self.maybe_flush_all()
 
-    def add_asset_movement(self, cursor: DBCursor, asset_movement: AssetMovement) -> None:
+    def add_asset_movement(self, asset_movement: AssetMovement) -> None:
         self._asset_movements.append(asset_movement)
-        self.maybe_flush_all(cursor)
+        self.maybe_flush_all()
 
-    def add_ledger_action(self, cursor: DBCursor, ledger_action: LedgerAction) -> None:
+    def add_ledger_action(self, ledger_action: LedgerAction) -> None:
         self._ledger_actions.append(ledger_action)
-        self.maybe_flush_all(cursor)
+        self.maybe_flush_all()
 
-    def add_history_events(self, cursor: DBCursor, history_events: list[HistoryBaseEntry]) -> None:
+    def add_history_events(self, history_events: list[HistoryBaseEntry]) -> None:
         self._history_events.extend(history_events)
-        self.maybe_flush_all(cursor)
+        self.maybe_flush_all()
 
-    def maybe_flush_all(self, cursor: DBCursor) -> None:
+    def maybe_flush_all(self) -> None:
         if len(self._trades) + len(self._asset_movements) + len(self._ledger_actions) + len(self._history_events) >= ITEMS_PER_DB_WRITE:  # noqa: E501
-            self._flush_all(cursor)
+            self._flush_all()
+
+    def _flush_all(self) -> None:
+        """Writes all pending entries in one transaction, notifies the frontend of the
+        progress and lets other greenlets run before parsing continues"""
+        entries_num = len(self._trades) + len(self._asset_movements) + len(self._ledger_actions) + len(self._history_events)  # noqa: E501
+        if entries_num == 0:
+            return
 
-    def _flush_all(self, cursor: DBCursor) -> None:
-        self.db.add_trades(cursor, trades=self._trades)
-        self.db.add_asset_movements(cursor, asset_movements=self._asset_movements)
-        self.db_ledger.add_ledger_actions(cursor, actions=self._ledger_actions)
-        self.history_db.add_history_events(cursor, history=self._history_events)
+        with self.db.user_write() as write_cursor:
+            self.db.add_trades(write_cursor, trades=self._trades)
+            self.db.add_asset_movements(write_cursor, asset_movements=self._asset_movements)
+            self.db_ledger.add_ledger_actions(write_cursor, actions=self._ledger_actions)
+            self.history_db.add_history_events(write_cursor, history=self._history_events)
         self._trades = []
         self._asset_movements = []
         self._ledger_actions = []
         self._history_events = []
+        self.imported_entries += entries_num
+        self.db.msg_aggregator.add_message(
+            message_type=WSMessageType.CSV_IMPORT_PROGRESS,
+            data={'source': self.source, 'processed_entries': self.imported_entries},
+        )
+        gevent.sleep(0)
 
 
 class UnsupportedCSVEntry(Exception):
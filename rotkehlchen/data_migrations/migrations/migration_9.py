@@ -7,6 +7,7 @@ from rotkehlchen.db.constants import (
     HISTORY_MAPPING_STATE_CUSTOMIZED,
     HISTORY_MAPPING_STATE_DECODED,
 )
+from rotkehlchen.db.history_events import rebuild_value_stats
 from rotkehlchen.logging import RotkehlchenLogsAdapter
 from rotkehlchen.types import ChainID, make_evm_tx_hash
 
@@ -91,5 +92,6 @@ def data_migration_9(rotki: 'Rotkehlchen', progress_handler: 'MigrationProgressH
 
         progress_handler.new_step('Remove curve decoded events')
         _reset_curve_decoded_events(write_cursor)
+        rebuild_value_stats(write_cursor)  # the aggregates are keyed by location
 
     log.debug('Exit data migration 9')
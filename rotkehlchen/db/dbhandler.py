@@ -46,8 +46,7 @@ from rotkehlchen.constants.limits import (
     FREE_TRADES_LIMIT,
     FREE_USER_NOTES_LIMIT,
 )
-from rotkehlchen.constants.misc import NFT_DIRECTIVE, ONE, ZERO
-from rotkehlchen.constants.timing import HOUR_IN_SECONDS
+from rotkehlchen.constants.misc import DEFAULT_SQL_READ_CONNECTIONS, NFT_DIRECTIVE, ONE, ZERO
 from rotkehlchen.db.constants import (
     BINANCE_MARKETS_KEY,
     EVM_ACCOUNTS_DETAILS_LAST_QUERIED_TS,
@@ -63,6 +62,7 @@ from rotkehlchen.db.filtering import (
     TradesFilterQuery,
     UserNotesFilterQuery,
 )
+from rotkehlchen.db.history_events import DBHistoryEvents, rebuild_value_stats
 from rotkehlchen.db.loopring import DBLoopring
 from rotkehlchen.db.misc import detect_sqlcipher_version
 from rotkehlchen.db.schema import DB_SCRIPT_CREATE_TABLES
@@ -75,6 +75,7 @@ from rotkehlchen.db.settings import (
     ModifiableDBSettings,
     db_settings_from_dict,
 )
+from rotkehlchen.db.timeseries import query_balances_series, query_netvalue_series
 from rotkehlchen.db.upgrade_manager import DBUpgradeManager
 from rotkehlchen.db.utils import (
     DBAssetBalance,
@@ -82,7 +83,6 @@ from rotkehlchen.db.utils import (
     LocationData,
     SingleDBAssetBalance,
     Tag,
-    combine_asset_balances,
     db_tuple_to_str,
     deserialize_tags_from_db,
     form_query_to_filter_timestamps,
@@ -182,9 +182,13 @@ class DBHandler:
             msg_aggregator: MessagesAggregator,
             initial_settings: Optional[ModifiableDBSettings],
             sql_vm_instructions_cb: int,
+            sql_read_connections: int = DEFAULT_SQL_READ_CONNECTIONS,
     ):
         """Database constructor
 
+        If sql_read_connections is not zero the user DB uses WAL journaling and up to
+        that many read only connections serve the reads. Check DBConnection for details.
+
         May raise:
         - DBUpgradeError if the rotki DB version is newer than the software or
         there is a DB upgrade and there is an error or if the version is older
@@ -196,6 +200,7 @@ class DBHandler:
         self.msg_aggregator = msg_aggregator
         self.user_data_dir = user_data_dir
         self.sql_vm_instructions_cb = sql_vm_instructions_cb
+        self.sql_read_connections = sql_read_connections
         self.sqlcipher_version = detect_sqlcipher_version()
         self.setting_to_default_type = {
             'version': (int, ROTKEHLCHEN_DB_VERSION),
@@ -217,6 +222,8 @@ class DBHandler:
                 self.set_settings(cursor, initial_settings)
             self.update_owned_assets_in_globaldb(cursor)
             self.add_globaldb_assetids(cursor)
+        # only after the upgrades since they may restore the DB file from a backup
+        self._enable_read_connections(password)
 
     def _check_unfinished_upgrades(self, password: str) -> None:
         """
@@ -391,6 +398,23 @@ class DBHandler:
             (name, str(value)),
         )
 
+    def _key_script(self, password: str) -> str:
+        """The script that sets the key of a newly opened connection to the user DBs"""
+        password_for_sqlcipher = _protect_password_sqlcipher(password)
+        script = f'PRAGMA key="{password_for_sqlcipher}";'
+        if self.sqlcipher_version == 3:
+            script += f'PRAGMA kdf_iter={KDF_ITER};'
+        return script
+
+    def _enable_read_connections(self, password: str) -> None:
+        if self.sql_read_connections == 0:
+            return
+
+        self.conn.enable_read_connections(
+            number=self.sql_read_connections,
+            setup_script=self._key_script(password),
+        )
+
     def _connect(
             self,
             password: str,
@@ -420,18 +444,18 @@ class DBHandler:
                 f'Could not open database file: {fullpath}. Permission errors?',
             ) from e
 
-        password_for_sqlcipher = _protect_password_sqlcipher(password)
-        script = f'PRAGMA key="{password_for_sqlcipher}";'
-        if self.sqlcipher_version == 3:
-            script += f'PRAGMA kdf_iter={KDF_ITER};'
         try:
-            conn.executescript(script)
+            conn.executescript(self._key_script(password))
             conn.execute('PRAGMA foreign_keys=ON')
             # Optimizations for the combined trades view
             # the following will fail with DatabaseError in case of wrong password.
             # If this goes away at any point it needs to be replaced by something
             # that checks the password is correct at this same point in the code
             conn.execute('PRAGMA cache_size = -32768')
+            if conn_attribute == 'conn':
+                # Read connections switch the DB to WAL journaling and back when closed.
+                # Make sure a WAL left by a crash is moved into the DB file before using it.
+                conn.execute('PRAGMA journal_mode=DELETE')
         except sqlcipher.DatabaseError as e:  # pylint: disable=no-member
             raise AuthenticationError(
                 'Wrong password or invalid/corrupt database for user',
@@ -455,6 +479,9 @@ class DBHandler:
         script = f'PRAGMA rekey="{new_password_for_sqlcipher}";'
         if self.sqlcipher_version == 3:
             script += f'PRAGMA kdf_iter={KDF_ITER};'
+        # the read connections are keyed with the old password so close them while rekeying
+        read_connections = conn.max_read_connections
+        conn.disable_read_connections()
         try:
             conn.executescript(script)
         except sqlcipher.OperationalError as e:  # pylint: disable=no-member
@@ -462,7 +489,10 @@ class DBHandler:
                 f'At change password could not re-key the open {conn_attribute} '
                 f'database: {str(e)}',
             )
-            return False
+            return False  # the main connection keeps serving the reads
+
+        if read_connections != 0:
+            self._enable_read_connections(new_password)
         return True
 
     def change_password(self, new_password: str) -> bool:
@@ -531,6 +561,7 @@ class DBHandler:
                 f'Permission error when reopening the DB. {str(e)}. Should never happen here',
             ) from e
         self._run_actions_after_first_connection(password)
+        self._enable_read_connections(password)
         # all went okay, remove the original temp backup
         (self.user_data_dir / 'rotkehlchen_temp_backup.db').unlink()
 
@@ -1016,16 +1047,15 @@ class DBHandler:
             'DELETE FROM asset_movements WHERE location = ?;',
             (location.serialize_for_db(),),
         )
-        write_cursor.execute(
-            'DELETE FROM history_events WHERE location = ?;',
-            (location.serialize_for_db(),),
-        )
+        DBHistoryEvents(self).delete_events_by_location(write_cursor, location)
 
     def update_used_query_range(self, write_cursor: 'DBCursor', name: str, start_ts: Timestamp, end_ts: Timestamp) -> None:  # noqa: E501
         write_cursor.execute(
             'INSERT OR REPLACE INTO used_query_ranges(name, start_ts, end_ts) VALUES (?, ?, ?)',
             (name, str(start_ts), str(end_ts)),
         )
+        # the whole range is now considered queried so any gaps saved for it are obsolete
+        write_cursor.execute('DELETE FROM used_query_range_gaps WHERE name=?', (name,))
 
     def update_used_block_query_range(self, write_cursor: 'DBCursor', name: str, from_block: int, to_block: int) -> None:  # noqa: E501
         self.update_used_query_range(write_cursor, name, from_block, to_block)  # type: ignore
@@ -2113,9 +2143,13 @@ class DBHandler:
     ) -> tuple[list[Trade], int]:
         """Gets all trades for the query from the DB
 
-        Also returns how many are the total found for the filter
+        Also returns how many are the total found for the filter. When continuing from a
+        keyset cursor the count of the first page is returned instead of counting again.
         """
         trades = self.get_trades(cursor, filter_query=filter_query, has_premium=has_premium)
+        if (keyset_cursor := filter_query.keyset_cursor) is not None:
+            return trades, keyset_cursor.entries_found
+
         query, bindings = filter_query.prepare(with_pagination=False)
         query = 'SELECT COUNT(*) from trades ' + query
         total_found_result = cursor.execute(query, bindings)
@@ -2216,34 +2250,15 @@ class DBHandler:
             self,
             from_ts: Timestamp,
             include_nfts: bool = True,
-    ) -> tuple[list[str], list[str]]:
+    ) -> tuple[list[Timestamp], list[str]]:
         """Get all entries of net value data from the DB"""
         with self.conn.read_ctx() as cursor:
-            # Get the total location ("H") entries in ascending time
-            cursor.execute(
-                'SELECT timestamp, usd_value FROM timed_location_data '
-                'WHERE location="H" AND timestamp >= ? ORDER BY timestamp ASC;',
-                (from_ts,),
+            series = query_netvalue_series(
+                cursor=cursor,
+                from_ts=from_ts,
+                include_nfts=include_nfts,
             )
-            if not include_nfts:
-                with self.conn.read_ctx() as nft_cursor:
-                    nft_cursor.execute(
-                        'SELECT timestamp, SUM(usd_value) FROM timed_balances WHERE '
-                        'timestamp >= ? AND currency LIKE ? GROUP BY timestamp',
-                        (from_ts, f'{NFT_DIRECTIVE}%'),
-                    )
-                    nft_values = dict(nft_cursor)
-
-            data = []
-            times_int = []
-            for entry in cursor:
-                times_int.append(entry[0])
-                if include_nfts:
-                    total = entry[1]
-                else:
-                    total = str(FVal(entry[1]) - FVal(nft_values.get(entry[0], 0)))
-                data.append(total)
-        return times_int, data
+        return series.times, series.usd_values
 
     def query_timed_balances(
             self,
@@ -2257,66 +2272,14 @@ class DBHandler:
 
         Can optionally filter by balance type
         """
-        if from_ts is None:
-            from_ts = Timestamp(0)
-        if to_ts is None:
-            to_ts = ts_now()
-
-        settings = self.get_settings(cursor)
-        querystr = (
-            'SELECT timestamp, amount, usd_value, category FROM timed_balances '
-            'WHERE timestamp BETWEEN ? AND ? AND currency=?'
-        )
-        bindings = [from_ts, to_ts, asset.identifier]
-
-        if settings.treat_eth2_as_eth and asset.identifier == 'ETH':
-            assert balance_type is not None, 'Asset balances and liabilities can\'t be queried at the same time when eth2 is equivalent to eth'  # noqa: E501
-            querystr = querystr.replace('currency=?', 'currency IN (?,?)')
-            bindings.append('ETH2')
-
-        if balance_type is not None:
-            querystr += ' AND category=?'
-            bindings.append(balance_type.serialize_for_db())
-        querystr += ' ORDER BY timestamp ASC;'
-
-        cursor.execute(querystr, bindings)
-        results = cursor.fetchall()
-        balances = []
-        results_length = len(results)
-        for idx, result in enumerate(results):
-            entry_time = result[0]
-            category = BalanceType.deserialize_from_db(result[3])
-            balances.append(
-                SingleDBAssetBalance(
-                    time=entry_time,
-                    amount=FVal(result[1]),
-                    usd_value=FVal(result[2]),
-                    category=category,
-                ),
-            )
-            if settings.ssf_0graph_multiplier == 0 or idx == results_length - 1:
-                continue
-
-            next_result_time = results[idx + 1][0]
-            max_diff = settings.balance_save_frequency * HOUR_IN_SECONDS * settings.ssf_0graph_multiplier  # noqa: E501
-            while next_result_time - entry_time > max_diff:
-                entry_time = entry_time + settings.balance_save_frequency * HOUR_IN_SECONDS
-                if entry_time >= next_result_time:
-                    break
-
-                balances.append(
-                    SingleDBAssetBalance(
-                        time=entry_time,
-                        amount=ZERO,
-                        usd_value=ZERO,
-                        category=category,
-                    ),
-                )
-
-        if settings.treat_eth2_as_eth and asset.identifier == 'ETH':
-            return combine_asset_balances(balances)
-
-        return balances
+        return query_balances_series(
+            cursor=cursor,
+            settings=self.get_settings(cursor),
+            asset=asset,
+            from_ts=from_ts,
+            to_ts=to_ts,
+            balance_type=balance_type,
+        ).to_single_balances()
 
     def query_owned_assets(self, cursor: 'DBCursor') -> list[Asset]:
         """Query the DB for a list of all assets ever owned
@@ -2452,6 +2415,10 @@ class DBHandler:
                     'UPDATE assets SET identifier=? WHERE identifier=?;',
                     (target_asset.identifier, source_identifier),
                 )
+                rebuild_value_stats(  # the aggregates are keyed by asset so merge them
+                    write_cursor=write_cursor,
+                    assets=[source_identifier, target_asset.identifier],
+                )
 
     def get_latest_location_value_distribution(self) -> list[LocationData]:
         """Gets the latest location data
@@ -3028,6 +2995,7 @@ class DBHandler:
             version = self.get_setting(cursor, 'version')
         new_db_filename = f'{ts_now()}_rotkehlchen_db_v{version}.backup'
         new_db_path = self.user_data_dir / new_db_filename
+        self.conn.wal_checkpoint()
         shutil.copyfile(
             self.user_data_dir / 'rotkehlchen.db',
             new_db_path,
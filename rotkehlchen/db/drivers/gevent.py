@@ -5,17 +5,24 @@ but heavily modified"""
 import random
 import re
 import sqlite3
-from collections.abc import Generator, Sequence
+import time
+from collections import deque
+from collections.abc import Callable, Generator, Iterator, Sequence
 from contextlib import contextmanager
 from enum import Enum, auto
+from functools import partial
+from itertools import islice
 from pathlib import Path
 from types import TracebackType
-from typing import TYPE_CHECKING, Any, Literal, Optional, Union
+from typing import TYPE_CHECKING, Any, Literal, NamedTuple, Optional, Union
 from uuid import uuid4
 
 import gevent
+from gevent.event import AsyncResult, Event
+from gevent.threadpool import ThreadPool
 from pysqlcipher3 import dbapi2 as sqlcipher
 
+from rotkehlchen.db.drivers.instrumentation import SQL_INSTRUMENTATION, StatementExecution
 from rotkehlchen.db.minimized_schema import MINIMIZED_USER_DB_SCHEMA
 from rotkehlchen.errors.misc import DBSchemaError
 from rotkehlchen.globaldb.minimized_schema import MINIMIZED_GLOBAL_DB_SCHEMA
@@ -33,7 +40,6 @@ DEFAULT_SANITY_CHECK_MESSAGE = (
     'github or contact us in our discord server.'
 )
 
-CONTEXT_SWITCH_WAIT = 1  # seconds to wait for a status change in a DB context switch
 import logging
 
 logger: 'RotkehlchenLogger' = logging.getLogger(__name__)  # type: ignore
@@ -43,11 +49,179 @@ class ContextError(Exception):
     """Intended to be raised when something is wrong with db context management"""
 
 
+class WriteLockStats(NamedTuple):
+    """How long greenlets waited for the write lock of a connection since it was created"""
+    acquisitions: int
+    contended: int  # acquisitions that had to wait for another greenlet
+    total_wait: float  # seconds
+    max_wait: float  # seconds
+
+    @property
+    def average_wait(self) -> float:
+        return self.total_wait / self.contended if self.contended != 0 else 0.0
+
+    def serialize(self) -> dict[str, Union[int, float]]:
+        return {
+            'acquisitions': self.acquisitions,
+            'contended': self.contended,
+            'total_wait': round(self.total_wait, 6),
+            'average_wait': round(self.average_wait, 6),
+            'max_wait': round(self.max_wait, 6),
+        }
+
+
+class DBWriteLock:
+    """Held during a write transaction or the outermost savepoint of a greenlet
+
+    Greenlets that have to wait are queued and woken up one by one as soon as the lock
+    is released. The lock is handed over directly to the first one in the queue so a
+    greenlet writing in a loop can't take it again before the ones already waiting.
+    """
+
+    def __init__(self) -> None:
+        self.locked = False
+        self._waiters: deque[Event] = deque()
+        self.acquisitions = 0
+        self.contended = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def acquire(self) -> None:
+        self.acquisitions += 1
+        if self.locked is False:  # there can't be waiters if it's not locked
+            self.locked = True
+            return
+
+        waiter = Event()
+        self._waiters.append(waiter)
+        start = time.perf_counter()
+        try:
+            waiter.wait()
+        except BaseException:  # killed while waiting
+            if waiter.is_set():
+                self.release()  # it was already handed over to us so pass it on
+            else:
+                self._waiters.remove(waiter)
+            raise
+
+        wait = time.perf_counter() - start
+        self.contended += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+
+    def release(self) -> None:
+        if len(self._waiters) != 0:
+            self._waiters.popleft().set()  # stays locked for the next greenlet
+        else:
+            self.locked = False
+
+    def __enter__(self) -> None:
+        self.acquire()
+
+    def __exit__(
+            self,
+            exctype: Optional[type[BaseException]],
+            value: Optional[BaseException],
+            traceback: Optional[TracebackType],
+    ) -> None:
+        self.release()
+
+    def stats(self) -> WriteLockStats:
+        return WriteLockStats(
+            acquisitions=self.acquisitions,
+            contended=self.contended,
+            total_wait=self.total_wait,
+            max_wait=self.max_wait,
+        )
+
+
+class ThreadedCursor:
+    """Wraps a cursor of a read connection so that its statements run in a native thread
+
+    Each statement is executed and all of its rows are fetched in a single call to the
+    threadpool, while the hub keeps running the other greenlets. The rows are then
+    returned from memory. The connection of the cursor must not have a progress
+    handler since that would context switch from inside the thread.
+    """
+
+    def __init__(self, cursor: UnderlyingCursor, threadpool: ThreadPool) -> None:
+        self._cursor = cursor
+        self._threadpool = threadpool
+        self._rows: Iterator[Any] = iter(())
+        self._call: Optional[AsyncResult] = None
+        self.arraysize = cursor.arraysize
+
+    def _run(self, method: Callable[..., Any], *args: Any) -> None:
+        def execute_and_fetch() -> list[Any]:
+            method(*args)
+            return self._cursor.fetchall()
+
+        self._call = self._threadpool.spawn(execute_and_fetch)
+        self._rows = iter(self._call.get())
+
+    @property
+    def running_call(self) -> Optional[AsyncResult]:
+        """The call of the threadpool that still uses the cursor. Only happens if the
+        greenlet waiting for it was killed or timed out."""
+        if self._call is None or self._call.ready() is True:
+            return None
+        return self._call
+
+    def __iter__(self) -> 'ThreadedCursor':
+        return self
+
+    def __next__(self) -> Any:
+        return next(self._rows)
+
+    def execute(self, statement: str, *bindings: Sequence) -> None:
+        self._run(self._cursor.execute, statement, *bindings)
+
+    def executemany(self, statement: str, *bindings: Sequence[Sequence]) -> None:
+        self._run(self._cursor.executemany, statement, *bindings)
+
+    def executescript(self, script: str) -> None:
+        self._run(self._cursor.executescript, script)
+
+    def fetchone(self) -> Any:
+        return next(self._rows, None)
+
+    def fetchmany(self, size: int) -> list[Any]:
+        return list(islice(self._rows, size))
+
+    def fetchall(self) -> list[Any]:
+        return list(self._rows)
+
+    @property
+    def rowcount(self) -> int:
+        return self._cursor.rowcount
+
+    @property
+    def lastrowid(self) -> Optional[int]:
+        return self._cursor.lastrowid
+
+    @property
+    def description(self) -> Any:
+        return self._cursor.description
+
+    @property
+    def connection(self) -> UnderlyingConnection:
+        return self._cursor.connection
+
+    def close(self) -> None:
+        self._cursor.close()
+
+
 class DBCursor:
 
-    def __init__(self, connection: 'DBConnection', cursor: UnderlyingCursor) -> None:
+    def __init__(
+            self,
+            connection: 'DBConnection',
+            cursor: Union[UnderlyingCursor, ThreadedCursor],
+    ) -> None:
         self._cursor = cursor
         self.connection = connection
+        # Only set if the SQL instrumentation is enabled. Check instrumentation.py
+        self._execution: Optional[StatementExecution] = None
 
     def __iter__(self) -> 'DBCursor':
         if __debug__:
@@ -62,7 +236,10 @@ class DBCursor:
         """
         if __debug__:
             logger.trace(f'Get next item for cursor {self._cursor}')
-        result = next(self._cursor, None)
+        if self._execution is None:
+            result = next(self._cursor, None)
+        else:
+            result = self._instrumented_fetch(self._execution, next, self._cursor, None)
         if result is None:
             if __debug__:
                 logger.trace(f'Stopping iteration for cursor {self._cursor}')
@@ -87,7 +264,12 @@ class DBCursor:
     def execute(self, statement: str, *bindings: Sequence) -> 'DBCursor':
         if __debug__:
             logger.trace(f'EXECUTE {statement}')
-        self._cursor.execute(statement, *bindings)
+        if self._execution is not None:
+            self._finish_execution()
+        if SQL_INSTRUMENTATION.enabled is True:
+            self._instrumented_execute(self._cursor.execute, statement, bindings)
+        else:
+            self._cursor.execute(statement, *bindings)
         if __debug__:
             logger.trace(f'FINISH EXECUTE {statement}')
         return self
@@ -95,7 +277,17 @@ class DBCursor:
     def executemany(self, statement: str, *bindings: Sequence[Sequence]) -> 'DBCursor':
         if __debug__:
             logger.trace(f'EXECUTEMANY {statement}')
-        self._cursor.executemany(statement, *bindings)
+        if self._execution is not None:
+            self._finish_execution()
+        if SQL_INSTRUMENTATION.enabled is True:
+            self._instrumented_execute(
+                method=self._cursor.executemany,
+                statement=statement,
+                bindings=bindings,
+                explain_bindings=next(iter(bindings[0]), ()) if len(bindings) != 0 else (),
+            )
+        else:
+            self._cursor.executemany(statement, *bindings)
         if __debug__:
             logger.trace(f'FINISH EXECUTEMANY {statement}')
         return self
@@ -128,7 +320,10 @@ class DBCursor:
     def fetchone(self) -> Any:
         if __debug__:
             logger.trace('CURSOR FETCHONE')
-        result = self._cursor.fetchone()
+        if self._execution is None:
+            result = self._cursor.fetchone()
+        else:
+            result = self._instrumented_fetch(self._execution, self._cursor.fetchone)
         if __debug__:
             logger.trace('FINISH CURSOR FETCHONE')
         return result
@@ -138,7 +333,10 @@ class DBCursor:
             logger.trace(f'CURSOR FETCHMANY with {size=}')
         if size is None:
             size = self._cursor.arraysize
-        result = self._cursor.fetchmany(size)
+        if self._execution is None:
+            result = self._cursor.fetchmany(size)
+        else:
+            result = self._instrumented_fetch(self._execution, self._cursor.fetchmany, size)
         if __debug__:
             logger.trace('FINISH CURSOR FETCHMANY')
         return result
@@ -146,7 +344,10 @@ class DBCursor:
     def fetchall(self) -> list[Any]:
         if __debug__:
             logger.trace('CURSOR FETCHALL')
-        result = self._cursor.fetchall()
+        if self._execution is None:
+            result = self._cursor.fetchall()
+        else:
+            result = self._instrumented_fetch(self._execution, self._cursor.fetchall)
         if __debug__:
             logger.trace('FINISH CURSOR FETCHALL')
         return result
@@ -160,8 +361,57 @@ class DBCursor:
         return self._cursor.lastrowid  # type: ignore
 
     def close(self) -> None:
+        self._finish_execution()
         self._cursor.close()
 
+    def _instrumented_execute(
+            self,
+            method: Callable[..., Any],
+            statement: str,
+            bindings: tuple[Sequence, ...],
+            explain_bindings: Optional[Sequence] = None,
+    ) -> None:
+        """Executes the statement measuring its time. For executemany the query
+        plan of a slow statement is explained with the first set of bindings."""
+        if explain_bindings is None:
+            explain_bindings = bindings[0] if len(bindings) != 0 else ()
+        execution = SQL_INSTRUMENTATION.start(
+            database=self.connection.connection_type.name.lower(),
+            statement=statement,
+            bindings=explain_bindings,
+            connection=self._cursor.connection,
+        )
+        execution.timed(method, statement, *bindings)
+        if self._cursor.description is None:  # returns no rows. Record the changed rows
+            execution.rows = max(self._cursor.rowcount, 0)
+            execution.finish()
+        else:
+            self._execution = execution
+
+    def _instrumented_fetch(
+            self,
+            execution: StatementExecution,
+            method: Callable[..., Any],
+            *args: Any,
+    ) -> Any:
+        """Calls a fetch method of the underlying cursor and accounts its time and rows
+        to the statement. The execution is recorded once all rows are fetched."""
+        result = execution.timed(method, *args)
+        if isinstance(result, list):  # fetchall or fetchmany
+            execution.rows += len(result)
+            exhausted = len(args) == 0 or len(result) < args[0]
+        else:  # a single row
+            exhausted = result is None
+            execution.rows += 0 if exhausted else 1
+        if exhausted is True:
+            self._finish_execution()
+        return result
+
+    def _finish_execution(self) -> None:
+        if (execution := self._execution) is not None:
+            self._execution = None
+            execution.finish()
+
 
 class DBConnectionType(Enum):
     USER = auto()
@@ -176,7 +426,47 @@ class DBConnectionType(Enum):
 CONNECTION_MAP: dict[DBConnectionType, 'DBConnection'] = {}
 
 
-def _progress_callback(connection: Optional['DBConnection']) -> int:
+class DBReadConnection:
+    """An extra connection to the database of a DBConnection that is only used for reads
+
+    Only used when the database is in WAL mode, where readers see the last committed
+    state of the database and neither block nor are blocked by the writer.
+    """
+
+    def __init__(self, connection: 'DBConnection', generation: int) -> None:
+        self._conn = connection.connect_underlying()
+        self.in_callback = gevent.lock.Semaphore()
+        self.connection_type = connection.connection_type
+        self.generation = generation
+        self.sql_vm_instructions_cb = connection.sql_vm_instructions_cb
+        self.set_progress_handler(enabled=True)
+
+    def set_progress_handler(self, enabled: bool) -> None:
+        """The progress handler has to be disabled while the connection is used
+        from a thread of the threadpool"""
+        if self.sql_vm_instructions_cb == 0:
+            return
+
+        self._conn.set_progress_handler(
+            partial(_progress_callback, self) if enabled else None,
+            self.sql_vm_instructions_cb,
+        )
+
+    def cursor(self) -> UnderlyingCursor:
+        return self._conn.cursor()
+
+    def executescript(self, script: str) -> None:
+        self._conn.executescript(script)
+
+    def interrupt(self) -> None:
+        """Aborts the statement running in the connection. Can be called from any thread"""
+        self._conn.interrupt()
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def _progress_callback(connection: Optional[Union['DBConnection', DBReadConnection]]) -> int:
     """Needs to be a static function. Cannot be a connection class method
     or sqlite breaks in funny ways. Raises random Operational errors.
     """
@@ -242,10 +532,21 @@ class DBConnection:
     ) -> None:
         CONNECTION_MAP[connection_type] = self
         self._conn: UnderlyingConnection
+        self.path = path
         self.in_callback = gevent.lock.Semaphore()
-        self.transaction_lock = gevent.lock.Semaphore()
+        self.transaction_lock = DBWriteLock()
         self.connection_type = connection_type
         self.sql_vm_instructions_cb = sql_vm_instructions_cb
+        # Read only connections used by read_ctx in WAL mode. They are opened lazily up to
+        # max_read_connections. Connections of an older generation are closed when returned.
+        self.max_read_connections = 0
+        self.read_connections_setup = ''
+        self.read_connections_generation = 0
+        self.idle_read_connections: list[DBReadConnection] = []
+        self.open_read_connections = 0
+        # Runs the statements of read_ctx(offload=True). Separate from the threadpool of the
+        # hub which is small and is also used for DNS resolution.
+        self.threadpool: Optional[ThreadPool] = None
         # We need an ordered set. Python doesn't have such thing as a standalone object, but has
         # `dict` which preserves the order of its keys. So we use dict with None values.
         self.savepoints: dict[str, None] = {}
@@ -253,18 +554,13 @@ class DBConnection:
         # https://www.gevent.org/api/gevent.greenlet.html#gevent.Greenlet.minimal_ident
         self.savepoint_greenlet_id: Optional[str] = None
         self.write_greenlet_id: Optional[str] = None
-        if connection_type == DBConnectionType.GLOBAL:
-            self._conn = sqlite3.connect(
-                database=path,
-                check_same_thread=False,
-                isolation_level=None,
-            )
-        else:
-            self._conn = sqlcipher.connect(  # pylint: disable=no-member
-                database=path,
-                check_same_thread=False,
-                isolation_level=None,
-            )
+        # True if the savepoints hold the transaction lock. They don't if they are
+        # opened inside a write transaction of the same greenlet.
+        self.savepoints_hold_lock = False
+        # Incremented each time a write transaction or an outermost savepoint is committed.
+        # Unlike total_changes it is not affected by exporting the DB.
+        self.committed_writes = 0
+        self._conn = self.connect_underlying()
         self._set_progress_handler()
         self.minimized_schema = None
         if connection_type == DBConnectionType.USER:
@@ -272,9 +568,25 @@ class DBConnection:
         elif connection_type == DBConnectionType.GLOBAL:
             self.minimized_schema = MINIMIZED_GLOBAL_DB_SCHEMA
 
+    def connect_underlying(self) -> UnderlyingConnection:
+        if self.connection_type == DBConnectionType.GLOBAL:
+            return sqlite3.connect(
+                database=self.path,
+                check_same_thread=False,
+                isolation_level=None,
+            )
+        # else
+        return sqlcipher.connect(  # pylint: disable=no-member
+            database=self.path,
+            check_same_thread=False,
+            isolation_level=None,
+        )
+
     def execute(self, statement: str, *bindings: Sequence) -> DBCursor:
         if __debug__:
             logger.trace(f'DB CONNECTION EXECUTE {statement}')
+        if SQL_INSTRUMENTATION.enabled is True:
+            return self.cursor().execute(statement, *bindings)
         underlying_cursor = self._conn.execute(statement, *bindings)
         if __debug__:
             logger.trace(f'FINISH DB CONNECTION EXECUTEMANY {statement}')
@@ -283,6 +595,8 @@ class DBConnection:
     def executemany(self, statement: str, *bindings: Sequence[Sequence]) -> DBCursor:
         if __debug__:
             logger.trace(f'DB CONNECTION EXECUTEMANY {statement}')
+        if SQL_INSTRUMENTATION.enabled is True:
+            return self.cursor().executemany(statement, *bindings)
         underlying_cursor = self._conn.executemany(statement, *bindings)
         if __debug__:
             logger.trace(f'FINISH DB CONNECTION EXECUTEMANY {statement}')
@@ -323,16 +637,154 @@ class DBConnection:
         return DBCursor(connection=self, cursor=self._conn.cursor())
 
     def close(self) -> None:
+        self.disable_read_connections()
         self._conn.close()
         CONNECTION_MAP.pop(self.connection_type, None)
 
+    def enable_read_connections(self, number: int, setup_script: str) -> bool:
+        """Switches the database to WAL journaling and lets read_ctx use up to `number`
+        read only connections so that reads don't wait for, or see the uncommitted
+        data of, the write transactions of other greenlets.
+
+        `setup_script` is executed in each new read connection. For sqlcipher it
+        has to set the key. Returns False if the database can't use WAL journaling.
+        """
+        journal_mode = self._conn.execute('PRAGMA journal_mode=WAL').fetchone()[0]
+        if journal_mode != 'wal':
+            logger.error(
+                f'Could not enable read connections for the {self.connection_type.name} DB '
+                f'since its journal mode could not be set to WAL. It is {journal_mode}',
+            )
+            return False
+
+        self.close_read_connections()
+        self.max_read_connections = number
+        self.read_connections_setup = setup_script + 'PRAGMA query_only=ON;'
+        if self.threadpool is None:
+            self.threadpool = ThreadPool(maxsize=number)
+        else:
+            self.threadpool.maxsize = number
+        return True
+
+    def disable_read_connections(self) -> None:
+        """Closes the read connections and switches the database back to the default
+        journal mode so that the database file is complete without the WAL file.
+        Read connections that are in use are closed when they are returned."""
+        if self.max_read_connections == 0:
+            return
+
+        self.close_read_connections()
+        self.max_read_connections = 0
+        self.read_connections_setup = ''
+        if self.threadpool is not None:
+            self.threadpool.kill()
+            self.threadpool = None
+        try:
+            self._conn.execute('PRAGMA journal_mode=DELETE')
+        except (sqlite3.OperationalError, sqlcipher.OperationalError) as e:  # pylint: disable=no-member  # noqa: E501
+            # a read connection is still in use. The WAL file is moved into the database
+            # file anyway when the last connection closes.
+            logger.warning(f'Could not switch the {self.connection_type.name} DB out of WAL mode: {str(e)}')  # noqa: E501
+
+    def close_read_connections(self) -> None:
+        """Closes the idle read connections and retires the ones in use"""
+        self.read_connections_generation += 1
+        for read_connection in self.idle_read_connections:
+            read_connection.close()
+        self.idle_read_connections = []
+        self.open_read_connections = 0
+
+    def wal_checkpoint(self) -> None:
+        """Moves the content of the WAL file into the database file so that it can be
+        copied. Does nothing if the database is not in WAL mode."""
+        if self.max_read_connections != 0:
+            self._conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+
+    def _checkout_read_connection(self) -> Optional[DBReadConnection]:
+        """Returns a read connection if one can be used by the current greenlet.
+        Returns None if the main connection should be used instead."""
+        if self.max_read_connections == 0:
+            return None
+
+        current_id = get_greenlet_name(gevent.getcurrent())
+        if current_id in (self.write_greenlet_id, self.savepoint_greenlet_id):
+            return None  # it has to see its own uncommitted writes
+
+        if len(self.idle_read_connections) != 0:
+            return self.idle_read_connections.pop()
+
+        if self.open_read_connections >= self.max_read_connections:
+            return None  # all are busy. Share the main connection as without the pool
+
+        self.open_read_connections += 1
+        read_connection = DBReadConnection(self, generation=self.read_connections_generation)
+        try:
+            read_connection.executescript(self.read_connections_setup)
+        except Exception:
+            read_connection.close()
+            self.open_read_connections -= 1
+            raise
+        return read_connection
+
+    def _checkin_read_connection(
+            self,
+            read_connection: DBReadConnection,
+            offloaded: bool,
+    ) -> None:
+        if read_connection.generation != self.read_connections_generation:
+            read_connection.close()
+            return
+
+        if offloaded is True:
+            read_connection.set_progress_handler(enabled=True)
+        self.idle_read_connections.append(read_connection)
+
+    def _retire_read_connection(
+            self,
+            read_connection: DBReadConnection,
+            _call: AsyncResult,
+    ) -> None:
+        """Closes a read connection once the threadpool call using it has finished"""
+        read_connection.close()
+        if read_connection.generation == self.read_connections_generation:
+            self.open_read_connections -= 1
+
     @contextmanager
-    def read_ctx(self) -> Generator['DBCursor', None, None]:
-        cursor = self.cursor()
+    def read_ctx(self, offload: bool = False) -> Generator['DBCursor', None, None]:
+        """Gives a cursor for reading from the DB
+
+        If offload is True and read connections are enabled, the statements of the cursor
+        run in a native thread without the progress handler, so that a long query such as
+        the ones of a PnL report or of the statistics doesn't keep the hub busy. Only use
+        it for queries whose results are fetched whole.
+        """
+        read_connection = self._checkout_read_connection()
+        threadpool = self.threadpool if offload is True else None
+        threaded_cursor = None
+        if read_connection is None:
+            cursor = self.cursor()
+        elif threadpool is not None:
+            read_connection.set_progress_handler(enabled=False)
+            threaded_cursor = ThreadedCursor(read_connection.cursor(), threadpool)
+            cursor = DBCursor(connection=self, cursor=threaded_cursor)
+        else:
+            cursor = DBCursor(connection=self, cursor=read_connection.cursor())
         try:
             yield cursor
         finally:
-            cursor.close()
+            running_call = None if threaded_cursor is None else threaded_cursor.running_call
+            if running_call is not None and read_connection is not None:
+                # the greenlet stopped waiting for a statement that still runs in a native
+                # thread. Abort it and retire the connection once the thread is done with it
+                read_connection.interrupt()
+                running_call.rawlink(partial(self._retire_read_connection, read_connection))
+            else:
+                cursor.close()
+                if read_connection is not None:
+                    self._checkin_read_connection(
+                        read_connection=read_connection,
+                        offloaded=threadpool is not None,
+                    )
 
     @contextmanager
     def write_ctx(self, commit_ts: bool = False) -> Generator['DBCursor', None, None]:
@@ -343,18 +795,12 @@ class DBConnection:
         In order for savepoints to work then, we will need to open a savepoint instead of a write
         transaction in that case. This should be used sparingly.
         """
-        if len(self.savepoints) != 0:
-            current_id = get_greenlet_name(gevent.getcurrent())
-            if current_id != self.savepoint_greenlet_id:
-                # savepoint exists but in other greenlet. Wait till it's done.
-                while self.savepoint_greenlet_id is not None:
-                    gevent.sleep(CONTEXT_SWITCH_WAIT)
-                # and now continue with the normal write context logic
-            else:  # open another savepoint instead of a write transaction
-                with self.savepoint_ctx() as cursor:
-                    yield cursor
-                    return
-        # else
+        if len(self.savepoints) != 0 and get_greenlet_name(gevent.getcurrent()) == self.savepoint_greenlet_id:  # noqa: E501
+            # open another savepoint instead of a write transaction
+            with self.savepoint_ctx() as cursor:
+                yield cursor
+                return
+        # else wait for the write transaction or the savepoints of other greenlets
         with self.critical_section(), self.transaction_lock:
             cursor = self.cursor()
             self.write_greenlet_id = get_greenlet_name(gevent.getcurrent())
@@ -371,6 +817,7 @@ class DBConnection:
                         ('last_write_ts', str(ts_now())),
                     )
                 self._conn.commit()
+                self.committed_writes += 1
             finally:
                 cursor.close()
                 self.write_greenlet_id = None
@@ -410,22 +857,26 @@ class DBConnection:
             savepoint_name = str(uuid4())
 
         current_id = get_greenlet_name(gevent.getcurrent())
-        if self._conn.in_transaction is True and self.write_greenlet_id != current_id:
-            # a transaction is open in a different greenlet
-            while self.write_greenlet_id is not None:
-                gevent.sleep(CONTEXT_SWITCH_WAIT)  # wait until that transaction ends
-
-        if self.savepoint_greenlet_id is not None:
-            # savepoints exist but in other greenlet
-            while self.savepoint_greenlet_id is not None and current_id != self.savepoint_greenlet_id:  # noqa: E501
-                gevent.sleep(CONTEXT_SWITCH_WAIT)  # wait until no other savepoint exists
-        if savepoint_name in self.savepoints:
-            raise ContextError(
-                f'Wanted to enter savepoint {savepoint_name} but a savepoint with the same name '
-                f'already exists. Current savepoints: {list(self.savepoints)}',
-            )
+        acquired_lock = False
+        if current_id not in (self.write_greenlet_id, self.savepoint_greenlet_id):
+            # outermost savepoint of this greenlet. Wait until the write transaction or
+            # the savepoints of other greenlets end.
+            self.transaction_lock.acquire()
+            self.savepoints_hold_lock = acquired_lock = True
         cursor = self.cursor()
-        cursor.execute(f'SAVEPOINT "{savepoint_name}"')
+        try:
+            if savepoint_name in self.savepoints:
+                raise ContextError(
+                    f'Wanted to enter savepoint {savepoint_name} but a savepoint with the same '
+                    f'name already exists. Current savepoints: {list(self.savepoints)}',
+                )
+            cursor.execute(f'SAVEPOINT "{savepoint_name}"')
+        except BaseException:  # no savepoint was entered so nothing else would release the lock
+            cursor.close()
+            if acquired_lock is True:
+                self.savepoints_hold_lock = False
+                self.transaction_lock.release()
+            raise
         self.savepoints[savepoint_name] = None
         self.savepoint_greenlet_id = current_id
         return cursor, savepoint_name
@@ -456,6 +907,10 @@ class DBConnection:
             self.savepoints = dict.fromkeys(list_savepoints[:list_savepoints.index(savepoint_name)])  # noqa: E501
             if len(self.savepoints) == 0:  # mark if we are out of all savepoints
                 self.savepoint_greenlet_id = None
+                self.committed_writes += 1
+                if self.savepoints_hold_lock is True:
+                    self.savepoints_hold_lock = False
+                    self.transaction_lock.release()  # wakes up the next waiting greenlet
 
     def rollback_savepoint(self, savepoint_name: Optional[str] = None) -> None:
         """
@@ -0,0 +1,216 @@
+"""Opt-in measurements of the SQL statements executed through the gevent driver
+
+When disabled the driver only checks the `enabled` flag once per statement.
+"""
+import json
+import logging
+import re
+import sqlite3
+import time
+from collections import deque
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Final, NamedTuple, Union
+
+from pysqlcipher3 import dbapi2 as sqlcipher
+
+from rotkehlchen.logging import RotkehlchenLogsAdapter
+from rotkehlchen.types import Timestamp
+from rotkehlchen.utils.misc import ts_now
+
+if TYPE_CHECKING:
+    from rotkehlchen.db.drivers.gevent import UnderlyingConnection
+
+logger = logging.getLogger(__name__)
+log = RotkehlchenLogsAdapter(logger)
+
+DURATION_SAMPLES_KEPT: Final = 1000  # per statement, to compute the p99
+SLOW_QUERIES_KEPT: Final = 100
+SQL_INSTRUMENTATION_FILENAME: Final = 'sql_instrumentation.json'
+
+_LITERALS_RE: Final = re.compile(r"'(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"|\b\d+(?:\.\d+)?\b")
+_IN_LISTS_RE: Final = re.compile(r'\bIN ?\(\?(?:, ?\?)+\)', flags=re.IGNORECASE)
+_WHITESPACE_RE: Final = re.compile(r'\s+')
+
+
+@lru_cache(maxsize=4096)
+def normalize_statement(statement: str) -> str:
+    """Returns the same key for all the executions of a statement. Literals become ?
+    and the bindings of an IN clause become IN (...) whatever their number."""
+    normalized = _WHITESPACE_RE.sub(' ', statement).strip()
+    normalized = _LITERALS_RE.sub('?', normalized)
+    return _IN_LISTS_RE.sub('IN (...)', normalized)
+
+
+@dataclass
+class StatementStats:
+    """Aggregated measurements of all the executions of a normalized statement"""
+    count: int = 0
+    total_time: float = 0.0  # seconds
+    rows: int = 0  # rows returned or, for modifying statements, rows changed
+    durations: deque[float] = field(default_factory=lambda: deque(maxlen=DURATION_SAMPLES_KEPT))  # noqa: E501
+
+    def p99_time(self) -> float:
+        if len(self.durations) == 0:
+            return 0.0
+        ordered = sorted(self.durations)
+        return ordered[int(0.99 * (len(ordered) - 1))]
+
+    def serialize(self) -> dict[str, Union[int, float]]:
+        return {
+            'count': self.count,
+            'total_time': round(self.total_time, 6),
+            'avg_time': round(self.total_time / self.count, 6) if self.count != 0 else 0.0,
+            'p99_time': round(self.p99_time(), 6),
+            'rows': self.rows,
+        }
+
+
+class SlowQuery(NamedTuple):
+    timestamp: Timestamp
+    database: str
+    statement: str
+    duration: float  # seconds
+    query_plan: list[str]
+
+    def serialize(self) -> dict[str, Any]:
+        return {
+            'timestamp': self.timestamp,
+            'database': self.database,
+            'statement': self.statement,
+            'duration': round(self.duration, 6),
+            'query_plan': self.query_plan,
+        }
+
+
+class StatementExecution:
+    """Measures one execution of a statement, including the fetching of its rows.
+
+    The execution is recorded once all rows have been fetched or when the cursor
+    executes another statement or gets closed.
+    """
+    __slots__ = ('instrumentation', 'database', 'statement', 'bindings', 'connection', 'duration', 'rows')  # noqa: E501
+
+    def __init__(
+            self,
+            instrumentation: 'SQLInstrumentation',
+            database: str,
+            statement: str,
+            bindings: Sequence,
+            connection: 'UnderlyingConnection',
+    ) -> None:
+        self.instrumentation = instrumentation
+        self.database = database
+        self.statement = statement
+        self.bindings = bindings
+        self.connection = connection
+        self.duration = 0.0
+        self.rows = 0
+
+    def timed(self, method: Callable[..., Any], *args: Any) -> Any:
+        start = time.perf_counter()
+        try:
+            return method(*args)
+        finally:
+            self.duration += time.perf_counter() - start
+
+    def explain(self) -> list[str]:
+        """Returns the query plan of the statement. Empty if it can't be explained"""
+        try:
+            cursor = self.connection.execute(f'EXPLAIN QUERY PLAN {self.statement}', self.bindings)  # noqa: E501
+            return [row[3] for row in cursor]
+        except (sqlite3.Error, sqlcipher.Error, ValueError) as e:  # pylint: disable=no-member
+            log.debug(f'Could not get the query plan of {self.statement}: {str(e)}')
+            return []
+
+    def finish(self) -> None:
+        self.instrumentation.record(self)
+
+
+class SQLInstrumentation:
+    """Keeps count of how many times each statement is executed and how long it takes.
+
+    Statements slower than the threshold are kept along with their query plan.
+    """
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.slow_query_threshold = 0.0  # seconds. 0 means no slow query log
+        self.statements: dict[tuple[str, str], StatementStats] = {}
+        self.slow_queries: deque[SlowQuery] = deque(maxlen=SLOW_QUERIES_KEPT)
+
+    def enable(self, slow_query_threshold: float) -> None:
+        self.slow_query_threshold = slow_query_threshold
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def reset(self) -> None:
+        self.statements = {}
+        self.slow_queries.clear()
+
+    def start(
+            self,
+            database: str,
+            statement: str,
+            bindings: Sequence,
+            connection: 'UnderlyingConnection',
+    ) -> StatementExecution:
+        return StatementExecution(
+            instrumentation=self,
+            database=database,
+            statement=statement,
+            bindings=bindings,
+            connection=connection,
+        )
+
+    def record(self, execution: StatementExecution) -> None:
+        normalized = normalize_statement(execution.statement)
+        if (stats := self.statements.get((execution.database, normalized))) is None:
+            stats = self.statements[(execution.database, normalized)] = StatementStats()
+        stats.count += 1
+        stats.total_time += execution.duration
+        stats.rows += execution.rows
+        stats.durations.append(execution.duration)
+        if self.slow_query_threshold != 0 and execution.duration >= self.slow_query_threshold:
+            slow_query = SlowQuery(
+                timestamp=ts_now(),
+                database=execution.database,
+                statement=normalized,
+                duration=execution.duration,
+                query_plan=execution.explain(),
+            )
+            self.slow_queries.append(slow_query)
+            log.warning(
+                f'Slow {execution.database} DB query took {execution.duration:.3f}s: '
+                f'{normalized}. Query plan: {slow_query.query_plan}',
+            )
+
+    def serialize(self) -> dict[str, Any]:
+        """Statements are sorted by the total time spent in them"""
+        ordered = sorted(self.statements.items(), key=lambda x: x[1].total_time, reverse=True)
+        return {
+            'statements': [
+                {'database': database, 'statement': statement, **stats.serialize()}
+                for (database, statement), stats in ordered
+            ],
+            'slow_queries': [x.serialize() for x in self.slow_queries],
+        }
+
+    def dump(self, filepath: Path) -> None:
+        """Writes the measurements in the given json file"""
+        try:
+            with open(filepath, 'w') as f:
+                json.dump(self.serialize(), f, indent=2)
+        except OSError as e:
+            log.error(f'Could not write the SQL instrumentation data to {filepath}: {str(e)}')
+            return
+
+        log.info(f'Wrote the SQL instrumentation data to {filepath}')
+
+
+SQL_INSTRUMENTATION: Final = SQLInstrumentation()
+
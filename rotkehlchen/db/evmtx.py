@@ -222,9 +222,13 @@ class DBEvmTx():
     ) -> tuple[list[EvmTransaction], int]:
         """Gets all evm transactions for the query from the DB.
 
-        Also returns how many are the total found for the filter.
+        Also returns how many are the total found for the filter. When continuing from a
+        keyset cursor the count of the first page is returned instead of counting again.
         """
         txs = self.get_evm_transactions(cursor, filter_=filter_, has_premium=has_premium)
+        if (keyset_cursor := filter_.keyset_cursor) is not None:
+            return txs, keyset_cursor.entries_found
+
         query, bindings = filter_.prepare(with_pagination=False)
         query = 'SELECT COUNT(DISTINCT evm_transactions.tx_hash) FROM evm_transactions ' + query  # noqa: E501
         total_found_result = cursor.execute(query, bindings)
@@ -491,9 +495,10 @@ class DBEvmTx():
             tx_hashes=tx_hashes,
             chain_id=chain_id,  # type: ignore[arg-type] # comes from SUPPORTED_EVM_CHAINS
         )
-        write_cursor.execute(  # delete genesis tx events related to the provided address
-            'DELETE FROM history_events WHERE event_identifier=? AND location_label=?',
-            (GENESIS_HASH, address),
+        dbevents.delete_events_by_location_label(  # delete genesis tx events of the address
+            write_cursor=write_cursor,
+            event_identifier=GENESIS_HASH,
+            location_label=address,
         )
         genesis_events_count = write_cursor.execute(
             'SELECT COUNT (*) FROM history_events WHERE event_identifier=?',
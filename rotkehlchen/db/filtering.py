@@ -1,7 +1,21 @@
+import base64
+import json
 import logging
-from collections.abc import Collection, Iterable
+from abc import ABCMeta, abstractmethod
+from collections.abc import Collection, Iterable, Sequence
 from dataclasses import dataclass
-from typing import Any, Generic, Literal, NamedTuple, Optional, TypeVar, Union, cast
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    ClassVar,
+    Generic,
+    Literal,
+    NamedTuple,
+    Optional,
+    TypeVar,
+    Union,
+    cast,
+)
 
 from rotkehlchen.accounting.ledger_actions import LedgerActionType
 from rotkehlchen.accounting.structures.types import HistoryEventSubType, HistoryEventType
@@ -18,6 +32,7 @@ from rotkehlchen.types import (
     AssetMovementCategory,
     ChainID,
     ChecksumEvmAddress,
+    EvmTransaction,
     EVMTxHash,
     Location,
     Timestamp,
@@ -25,6 +40,10 @@ from rotkehlchen.types import (
 )
 from rotkehlchen.utils.misc import ts_now
 
+if TYPE_CHECKING:
+    from rotkehlchen.accounting.structures.base import HistoryBaseEntry
+    from rotkehlchen.exchanges.data_structures import Trade
+
 logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
 
@@ -61,6 +80,72 @@ class DBFilterPagination(NamedTuple):
         return f'LIMIT {self.limit} OFFSET {self.offset}'
 
 
+class DBKeysetCursor(NamedTuple):
+    """The position after which a keyset paginated query continues
+
+    It's given to the API as an opaque continuation token. It also carries the counts
+    of the first page so that they are not counted again for every following page.
+    """
+    after: tuple[Union[int, str, bytes], ...]  # keyset column values of the last entry
+    entries_found: int
+    entries_total: int
+
+    def serialize(self) -> str:
+        data = {
+            'after': [{'bytes': x.hex()} if isinstance(x, bytes) else x for x in self.after],
+            'found': self.entries_found,
+            'total': self.entries_total,
+        }
+        return base64.urlsafe_b64encode(json.dumps(data, separators=(',', ':')).encode()).decode()  # noqa: E501
+
+    @classmethod
+    def deserialize(cls, token: str) -> 'DBKeysetCursor':
+        """May raise DeserializationError if the token is not valid"""
+        try:
+            data = json.loads(base64.urlsafe_b64decode(token.encode()))
+            after = tuple(
+                bytes.fromhex(x['bytes']) if isinstance(x, dict) else x
+                for x in data['after']
+            )
+            entries_found, entries_total = data['found'], data['total']
+        except (ValueError, TypeError, KeyError) as e:
+            raise DeserializationError(f'Invalid continuation token {token}') from e
+
+        if (
+            len(after) == 0 or
+            not all(isinstance(x, (int, str, bytes)) and not isinstance(x, bool) for x in after) or  # noqa: E501
+            not isinstance(entries_found, int) or
+            not isinstance(entries_total, int)
+        ):
+            raise DeserializationError(f'Invalid continuation token {token}')
+
+        return cls(after=after, entries_found=entries_found, entries_total=entries_total)
+
+
+class DBFilterKeyset(NamedTuple):
+    """Keyset pagination. Instead of skipping `offset` rows the query continues after
+    the keyset column values of the last entry of the previous page. With an index on the
+    keyset columns every page is as cheap to get as the first one.
+
+    The query has to be ordered by the keyset columns in the given direction.
+    """
+    columns: tuple[str, ...]
+    ascending: bool
+    limit: int
+    cursor: Optional[DBKeysetCursor]
+
+    def prepare_filter(self) -> tuple[Optional[str], list[Any]]:
+        if self.cursor is None:  # first page
+            return None, []
+
+        columns = ','.join(self.columns)
+        placeholders = ','.join('?' * len(self.columns))
+        return f'({columns}) {">" if self.ascending else "<"} ({placeholders})', list(self.cursor.after)  # noqa: E501
+
+    def prepare(self) -> str:
+        return f'LIMIT {self.limit}'
+
+
 @dataclass(init=True, repr=True, eq=True, order=False, unsafe_hash=False, frozen=False)
 class DBFilter():
     and_op: bool
@@ -246,6 +331,15 @@ class DBReportDataReportIDFilter(DBFilter):
         return ['report_id=?'], [value]
 
 
+@dataclass(init=True, repr=True, eq=True, order=False, unsafe_hash=False, frozen=False)
+class DBReportDataMaxIdentifierFilter(DBFilter):
+    """Filters out the PnL events added after the one with the given identifier"""
+    identifier: int
+
+    def prepare(self) -> tuple[list[str], list[Any]]:
+        return ['identifier<=?'], [self.identifier]
+
+
 @dataclass(init=True, repr=True, eq=True, order=False, unsafe_hash=False, frozen=False)
 class DBReportDataEventTypeFilter(DBFilter):
     event_type: Optional[Union[str, SchemaEventType]] = None
@@ -290,6 +384,7 @@ class DBFilterQuery():
     join_clause: Optional[DBFilter] = None
     order_by: Optional[DBFilterOrder] = None
     pagination: Optional[DBFilterPagination] = None
+    keyset: Optional[DBFilterKeyset] = None  # only used by FilterWithKeyset queries
 
     def prepare(
             self,
@@ -314,21 +409,36 @@ class DBFilterQuery():
             filterstrings.append(f'({operator.join(filters)})')
             bindings.extend(single_bindings)
 
-        if len(filterstrings) != 0:
+        keyset_filter = None
+        if with_pagination and self.keyset is not None:
+            keyset_filter, keyset_bindings = self.keyset.prepare_filter()
+            bindings.extend(keyset_bindings)
+
+        if len(filterstrings) != 0 or keyset_filter is not None:
             operator = ' AND ' if self.and_op else ' OR '
-            filter_query = f'{"WHERE " if self.join_clause is None else "AND ("}{operator.join(filterstrings)}{"" if self.join_clause is None else ")"}'  # noqa: E501
+            filterstring = operator.join(filterstrings)
+            if keyset_filter is not None:
+                filterstring = keyset_filter if filterstring == '' else f'({filterstring}) AND {keyset_filter}'  # noqa: E501
+            filter_query = f'{"WHERE " if self.join_clause is None else "AND ("}{filterstring}{"" if self.join_clause is None else ")"}'  # noqa: E501
             query_parts.append(filter_query)
 
         if with_order and self.order_by is not None:
             orderby_query = self.order_by.prepare()
             query_parts.append(orderby_query)
 
-        if with_pagination and self.pagination is not None:
+        if with_pagination and self.keyset is not None:
+            query_parts.append(self.keyset.prepare())
+        elif with_pagination and self.pagination is not None:
             pagination_query = self.pagination.prepare()
             query_parts.append(pagination_query)
 
         return ' '.join(query_parts), bindings
 
+    @property
+    def keyset_cursor(self) -> Optional[DBKeysetCursor]:
+        """The cursor this page continues from. Its counts can be used instead of counting"""
+        return None if self.keyset is None else self.keyset.cursor
+
     @classmethod
     def create(
             cls,
@@ -337,8 +447,42 @@ class DBFilterQuery():
             offset: Optional[int],
             order_by_case_sensitive: bool = True,
             order_by_rules: Optional[list[tuple[str, bool]]] = None,
+            continuation: Optional[DBKeysetCursor] = None,
     ) -> 'DBFilterQuery':
-        if limit is None or offset is None:
+        """If the query is ordered only by timestamp and the class is a FilterWithKeyset then
+        the order is made unique by the keyset columns. In that case a query for the first page
+        or one continuing from a cursor uses keyset instead of offset pagination.
+
+        May raise:
+        - DeserializationError if the continuation cursor does not match the keyset columns
+        """
+        keyset = None
+        keyset_columns = cls.keyset_columns if issubclass(cls, FilterWithKeyset) else ()
+        if (
+            len(keyset_columns) != 0 and
+            order_by_rules is not None and
+            len(order_by_rules) == 1 and
+            order_by_rules[0][0] == 'timestamp'
+        ):
+            ascending = order_by_rules[0][1]
+            order_by_rules = [(column, ascending) for column in keyset_columns]
+            if limit is not None and (continuation is not None or offset == 0):
+                keyset = DBFilterKeyset(
+                    columns=keyset_columns,
+                    ascending=ascending,
+                    limit=limit,
+                    cursor=continuation,
+                )
+
+        if continuation is not None and (
+                keyset is None or len(continuation.after) != len(keyset_columns)
+        ):
+            raise DeserializationError(
+                'Continuation token can only be used with a limit and ordering by timestamp '
+                'for the type of entries it was given for',
+            )
+
+        if keyset is not None or limit is None or offset is None:
             pagination = None
         else:
             pagination = DBFilterPagination(limit=limit, offset=offset)
@@ -353,6 +497,7 @@ class DBFilterQuery():
             filters=[],
             order_by=order_by,
             pagination=pagination,
+            keyset=keyset,
         )
 
 
@@ -383,6 +528,44 @@ class FilterWithTimestamp():
         self.timestamp_filter.to_ts = to_ts
 
 
+class FilterWithKeyset(metaclass=ABCMeta):
+    """Filter queries that support keyset pagination. Subclasses have to give the
+    keyset columns and how to get their values from an entry returned by the query."""
+
+    keyset: Optional[DBFilterKeyset]
+    # Columns that give a unique order starting with timestamp
+    keyset_columns: ClassVar[tuple[str, ...]]
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        if len(getattr(cls, 'keyset_columns', ())) == 0 or cls.keyset_key is FilterWithKeyset.keyset_key:  # noqa: E501
+            raise TypeError(f'{cls.__name__} should define keyset_columns and keyset_key')
+
+    @staticmethod
+    @abstractmethod
+    def keyset_key(entry: Any) -> tuple[Union[int, str, bytes], ...]:
+        """Returns the values of the keyset columns for an entry returned by the query"""
+
+    def next_continuation_token(
+            self,
+            entries: Sequence[Any],
+            entries_found: int,
+            entries_total: int,
+    ) -> Optional[str]:
+        """Returns the token with which the page after the given entries can be queried
+
+        Returns None if keyset pagination is not used or if this was the last page.
+        """
+        if self.keyset is None or len(entries) < self.keyset.limit:
+            return None
+
+        return DBKeysetCursor(
+            after=self.keyset_key(entries[-1]),
+            entries_found=entries_found,
+            entries_total=entries_total,
+        ).serialize()
+
+
 class FilterWithLocation():
 
     location_filter: Optional[DBLocationFilter] = None
@@ -396,7 +579,13 @@ class FilterWithLocation():
 
 
 @dataclass(init=True, repr=True, eq=True, order=False, unsafe_hash=False, frozen=False)
-class EvmTransactionsFilterQuery(DBFilterQuery, FilterWithTimestamp):
+class EvmTransactionsFilterQuery(DBFilterQuery, FilterWithTimestamp, FilterWithKeyset):
+
+    keyset_columns = ('timestamp', 'evm_transactions.tx_hash', 'evm_transactions.chain_id')
+
+    @staticmethod
+    def keyset_key(entry: EvmTransaction) -> tuple[Union[int, str, bytes], ...]:
+        return entry.timestamp, entry.tx_hash, entry.chain_id.serialize_for_db()
 
     @property
     def accounts(self) -> Optional[list[EvmAccount]]:
@@ -429,6 +618,7 @@ class EvmTransactionsFilterQuery(DBFilterQuery, FilterWithTimestamp):
             exclude_ignored_assets: bool = False,
             event_types: Optional[list[HistoryEventType]] = None,
             event_subtypes: Optional[list[HistoryEventSubType]] = None,
+            continuation: Optional[DBKeysetCursor] = None,
     ) -> 'EvmTransactionsFilterQuery':
         if order_by_rules is None:
             order_by_rules = [('timestamp', True)]
@@ -438,6 +628,7 @@ class EvmTransactionsFilterQuery(DBFilterQuery, FilterWithTimestamp):
             limit=limit,
             offset=offset,
             order_by_rules=order_by_rules,
+            continuation=continuation,
         )
         filter_query = cast('EvmTransactionsFilterQuery', filter_query)
         # Create the timestamp filter so that from/to ts works. But add it only if needed
@@ -588,7 +779,13 @@ class DBMultiBytesFilter(DBMultiValueFilter[bytes]):
     """Filter a column having a bytes value out of a selection of values"""
 
 
-class TradesFilterQuery(DBFilterQuery, FilterWithTimestamp, FilterWithLocation):
+class TradesFilterQuery(DBFilterQuery, FilterWithTimestamp, FilterWithLocation, FilterWithKeyset):  # noqa: E501
+
+    keyset_columns = ('timestamp', 'id')
+
+    @staticmethod
+    def keyset_key(entry: 'Trade') -> tuple[Union[int, str, bytes], ...]:
+        return entry.timestamp, entry.identifier
 
     @classmethod
     def make(
@@ -604,6 +801,7 @@ class TradesFilterQuery(DBFilterQuery, FilterWithTimestamp, FilterWithLocation):
             trade_type: Optional[list[TradeType]] = None,
             location: Optional[Location] = None,
             trades_idx_to_ignore: Optional[set[str]] = None,
+            continuation: Optional[DBKeysetCursor] = None,
     ) -> 'TradesFilterQuery':
         if order_by_rules is None:
             order_by_rules = [('timestamp', True)]
@@ -613,6 +811,7 @@ class TradesFilterQuery(DBFilterQuery, FilterWithTimestamp, FilterWithLocation):
             limit=limit,
             offset=offset,
             order_by_rules=order_by_rules,
+            continuation=continuation,
         )
         filter_query = cast('TradesFilterQuery', filter_query)
         filters: list[DBFilter] = []
@@ -884,7 +1083,14 @@ class DBNullFilter(DBFilter):
         return null_columns, []
 
 
-class HistoryEventFilterQuery(DBFilterQuery, FilterWithTimestamp, FilterWithLocation):
+class HistoryEventFilterQuery(DBFilterQuery, FilterWithTimestamp, FilterWithLocation, FilterWithKeyset):  # noqa: E501
+
+    keyset_columns = ('timestamp', 'identifier')
+
+    @staticmethod
+    def keyset_key(entry: 'HistoryBaseEntry') -> tuple[Union[int, str, bytes], ...]:
+        # entries are read from the DB so they always have an identifier
+        return entry.timestamp, entry.identifier  # type: ignore[return-value]
 
     @classmethod
     def make(
@@ -906,6 +1112,7 @@ class HistoryEventFilterQuery(DBFilterQuery, FilterWithTimestamp, FilterWithLoca
             event_identifiers: Optional[list[bytes]] = None,
             protocols: Optional[list[str]] = None,
             exclude_ignored_assets: bool = False,
+            continuation: Optional[DBKeysetCursor] = None,
     ) -> 'HistoryEventFilterQuery':
         if order_by_rules is None:
             order_by_rules = [('timestamp', True), ('sequence_index', True)]
@@ -915,6 +1122,7 @@ class HistoryEventFilterQuery(DBFilterQuery, FilterWithTimestamp, FilterWithLoca
             limit=limit,
             offset=offset,
             order_by_rules=order_by_rules,
+            continuation=continuation,
         )
         filter_query = cast('HistoryEventFilterQuery', filter_query)
         filters: list[DBFilter] = []
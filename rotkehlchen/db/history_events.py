@@ -1,15 +1,26 @@
+import copy
 import logging
-from collections.abc import Sequence
+from collections.abc import Iterable, Sequence
 from typing import TYPE_CHECKING, Any, Optional
 
 from pysqlcipher3 import dbapi2 as sqlcipher
 
 from rotkehlchen.accounting.structures.base import HistoryBaseEntry
 from rotkehlchen.assets.asset import Asset
+from rotkehlchen.assets.resolver import AssetResolver
 from rotkehlchen.constants import ZERO
 from rotkehlchen.constants.limits import FREE_HISTORY_EVENTS_LIMIT
+from rotkehlchen.constants.timing import DAY_IN_SECONDS
 from rotkehlchen.db.constants import HISTORY_MAPPING_KEY_STATE, HISTORY_MAPPING_STATE_CUSTOMIZED
-from rotkehlchen.db.filtering import HistoryEventFilterQuery
+from rotkehlchen.db.filtering import (
+    DBAssetFilter,
+    DBEqualsFilter,
+    DBIgnoredAssetsFilter,
+    DBLocationFilter,
+    DBMultiValueFilter,
+    DBTimestampFilter,
+    HistoryEventFilterQuery,
+)
 from rotkehlchen.errors.asset import UnknownAsset
 from rotkehlchen.errors.serialization import DeserializationError
 from rotkehlchen.fval import FVal
@@ -22,7 +33,7 @@ from rotkehlchen.types import (
     Timestamp,
     TimestampMS,
 )
-from rotkehlchen.utils.misc import ts_ms_to_sec
+from rotkehlchen.utils.misc import get_chunks, ts_ms_to_sec
 
 if TYPE_CHECKING:
     from rotkehlchen.db.dbhandler import DBHandler
@@ -35,6 +46,155 @@ HISTORY_INSERT = """INSERT OR IGNORE INTO history_events(event_identifier, seque
 timestamp, location, location_label, asset, amount, usd_value, notes,
 type, subtype, counterparty, extra_data) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?);"""
 
+DAY_IN_MS = DAY_IN_SECONDS * 1000
+# The history_events columns needed to update history_events_value_stats, in this order
+VALUE_STATS_COLUMNS = 'location, type, subtype, asset, timestamp, amount, usd_value'
+VALUE_STATS_KEY_COLUMNS = ('location', 'type', 'subtype', 'asset')
+ValueStatsKey = tuple[str, str, str, str, int]
+# Aggregate keys looked up per query. Each key takes 5 of the 999 allowed bindings
+VALUE_STATS_LOOKUP_CHUNK = 150
+
+
+def _sum_value_stats(rows: Iterable[tuple]) -> dict[ValueStatsKey, list]:
+    """Sums the given history_events rows of VALUE_STATS_COLUMNS per aggregate key.
+    Returns a mapping of the key to [amount, usd_value, number of events]"""
+    sums: dict[ValueStatsKey, list] = {}
+    for location, event_type, subtype, asset, timestamp, amount, usd_value in rows:
+        key = (location, event_type, subtype, asset, timestamp - timestamp % DAY_IN_MS)
+        if (entry := sums.get(key)) is None:
+            entry = sums[key] = [ZERO, ZERO, 0]
+        entry[0] += FVal(amount)
+        entry[1] += FVal(usd_value)
+        entry[2] += 1
+
+    return sums
+
+
+def update_value_stats(write_cursor: 'DBCursor', rows: Iterable[tuple], added: bool) -> None:
+    """Adds the given history_events rows to history_events_value_stats if `added` is True
+    or subtracts them if it's False. The rows are tuples of VALUE_STATS_COLUMNS.
+
+    Has to be called for every write to history_events so that the aggregates stay correct.
+    All these writes are done in this module.
+    """
+    deltas = _sum_value_stats(rows)
+    if len(deltas) == 0:
+        return
+
+    current_values = {}
+    for chunk in get_chunks(list(deltas), n=VALUE_STATS_LOOKUP_CHUNK):
+        write_cursor.execute(
+            'SELECT location, type, subtype, asset, timestamp, amount, usd_value, events '
+            'FROM history_events_value_stats WHERE (location, type, subtype, asset, timestamp) '
+            f'IN (VALUES {",".join(["(?, ?, ?, ?, ?)"] * len(chunk))})',
+            [value for key in chunk for value in key],
+        )
+        current_values.update({tuple(x[:5]): x[5:] for x in write_cursor})
+
+    upserts, deletions = [], []
+    for key, (amount, usd_value, events) in deltas.items():
+        if (result := current_values.get(key)) is None:
+            current_amount, current_usd_value, current_events = ZERO, ZERO, 0
+        else:
+            current_amount, current_usd_value, current_events = FVal(result[0]), FVal(result[1]), result[2]  # noqa: E501
+
+        if added is True:
+            current_events += events
+            new_values = (str(current_amount + amount), str(current_usd_value + usd_value))
+        else:
+            current_events -= events
+            new_values = (str(current_amount - amount), str(current_usd_value - usd_value))
+
+        if current_events <= 0:
+            deletions.append(key)
+        else:
+            upserts.append((*key, *new_values, current_events))
+
+    write_cursor.executemany(
+        'DELETE FROM history_events_value_stats WHERE '
+        'location=? AND type=? AND subtype=? AND asset=? AND timestamp=?',
+        deletions,
+    )
+    write_cursor.executemany(
+        'INSERT OR REPLACE INTO history_events_value_stats(location, type, subtype, asset, '
+        'timestamp, amount, usd_value, events) VALUES(?, ?, ?, ?, ?, ?, ?, ?)',
+        upserts,
+    )
+
+
+def update_value_stats_for(
+        write_cursor: 'DBCursor',
+        where_clause: str,
+        bindings: Sequence[Any],
+        added: bool,
+) -> None:
+    """Updates history_events_value_stats for the history events matching the where clause.
+
+    Call it with added=False before deleting or modifying events and with added=True
+    after inserting or modifying them.
+    """
+    write_cursor.execute(
+        f'SELECT {VALUE_STATS_COLUMNS} FROM history_events {where_clause}',
+        bindings,
+    )
+    update_value_stats(write_cursor, write_cursor.fetchall(), added=added)
+
+
+def _can_use_value_stats(filter_query: HistoryEventFilterQuery) -> bool:
+    """Whether the filter query only filters by columns that the aggregates also have"""
+    if filter_query.join_clause is not None or filter_query.and_op is False:
+        return False
+
+    for query_filter in filter_query.filters:
+        if isinstance(query_filter, (DBLocationFilter, DBTimestampFilter, DBIgnoredAssetsFilter)):  # noqa: E501
+            continue
+        if isinstance(query_filter, DBAssetFilter) and query_filter.asset_key == 'asset':
+            continue
+        if isinstance(query_filter, DBMultiValueFilter) and query_filter.column in VALUE_STATS_KEY_COLUMNS:  # noqa: E501
+            continue
+        if (
+            isinstance(query_filter, DBEqualsFilter) and
+            query_filter.alias is None and
+            query_filter.column in VALUE_STATS_KEY_COLUMNS
+        ):
+            continue
+        return False
+
+    return True
+
+
+def _prepare_in_range(
+        filter_query: HistoryEventFilterQuery,
+        from_ms: int,
+        to_ms: int,
+) -> tuple[str, list[Any]]:
+    """Prepares the filter query with its time range replaced by the given one"""
+    range_query = copy.copy(filter_query)
+    timestamp_filter = DBTimestampFilter(  # no scaling since the range is already in ms
+        and_op=True,
+        from_ts=Timestamp(from_ms),
+        to_ts=Timestamp(to_ms),
+    )
+    range_query.filters = [
+        timestamp_filter if x is filter_query.timestamp_filter else x
+        for x in filter_query.filters
+    ]
+    return range_query.prepare(with_pagination=False, with_order=False)
+
+
+def rebuild_value_stats(write_cursor: 'DBCursor', assets: Optional[list[str]] = None) -> None:
+    """Recomputes history_events_value_stats from all the history events.
+
+    If assets is given only the aggregates of these asset identifiers are recomputed.
+    """
+    where_clause, bindings = '', []
+    if assets is not None:
+        where_clause = f'WHERE asset IN ({",".join("?" * len(assets))})'
+        bindings = assets
+
+    write_cursor.execute(f'DELETE FROM history_events_value_stats {where_clause}', bindings)
+    update_value_stats_for(write_cursor, where_clause, bindings, added=True)
+
 
 class DBHistoryEvents():
 
@@ -58,11 +218,17 @@ class DBHistoryEvents():
         - sqlcipher.IntegrityError: If the asset of the added history event does not exist in
         the DB. Can only happen if an event with an unresolved asset is passed.
         """
-        write_cursor.execute(HISTORY_INSERT, event.serialize_for_db())
+        serialized = event.serialize_for_db()
+        write_cursor.execute(HISTORY_INSERT, serialized)
         if write_cursor.rowcount == 0:
             return None  # already exists
 
         identifier = write_cursor.lastrowid
+        update_value_stats(
+            write_cursor=write_cursor,
+            rows=[(serialized[3], serialized[9], serialized[10], serialized[5], serialized[2], serialized[6], serialized[7])],  # noqa: E501
+            added=True,
+        )
         if mapping_values is not None:
             write_cursor.executemany(
                 'INSERT OR IGNORE INTO history_events_mappings(parent_identifier, name, value) '
@@ -76,17 +242,45 @@ class DBHistoryEvents():
             self,
             write_cursor: 'DBCursor',
             history: Sequence[HistoryBaseEntry],
+            mapping_values: Optional[dict[str, int]] = None,
     ) -> None:
-        """Insert a list of history events in the database.
+        """Insert a list of history events in the database with a single executemany.
+        Events that already exist are ignored, same as in `add_history_event`.
+
+        Optionally map the newly inserted events to a specific value used to map
+        attributes to some events. Events that already existed are not mapped.
 
         May raise:
-        - InputError if the events couldn't be stored in the database
+        - DeserializationError if an event could not be serialized for the DB
+        - sqlcipher.IntegrityError: If the asset of an added history event does not exist in
+        the DB. Can only happen if an event with an unresolved asset is passed.
         """
-        for event in history:
-            self.add_history_event(
-                write_cursor=write_cursor,
-                event=event,
-            )
+        if len(history) == 0:
+            return
+
+        # identifier is an alias of rowid so new rows always get a bigger identifier
+        write_cursor.execute('SELECT MAX(identifier) FROM history_events')
+        max_identifier = write_cursor.fetchone()[0] or 0
+
+        write_cursor.executemany(HISTORY_INSERT, [x.serialize_for_db() for x in history])
+        update_value_stats_for(
+            write_cursor=write_cursor,
+            where_clause='WHERE identifier > ?',
+            bindings=(max_identifier,),
+            added=True,
+        )
+        if mapping_values is None:
+            return
+
+        write_cursor.execute(
+            'SELECT identifier FROM history_events WHERE identifier > ?',
+            (max_identifier,),
+        )
+        write_cursor.executemany(
+            'INSERT OR IGNORE INTO history_events_mappings(parent_identifier, name, value) '
+            'VALUES(?, ?, ?)',
+            [(x[0], k, v) for x in write_cursor.fetchall() for k, v in mapping_values.items()],
+        )
 
     def edit_history_event(self, event: HistoryBaseEntry) -> tuple[bool, str]:
         """
@@ -94,6 +288,12 @@ class DBHistoryEvents():
         NOTE: It edits all the fields except the extra_data one.
         """
         with self.db.user_write() as cursor:
+            update_value_stats_for(
+                write_cursor=cursor,
+                where_clause='WHERE identifier=?',
+                bindings=(event.identifier,),
+                added=False,
+            )
             try:
                 cursor.execute(
                     'UPDATE history_events SET event_identifier=?, sequence_index=?, timestamp=?, '
@@ -102,6 +302,12 @@ class DBHistoryEvents():
                     (*event.serialize_for_db_without_extra_data(), event.identifier),
                 )
             except sqlcipher.IntegrityError:  # pylint: disable=no-member
+                update_value_stats_for(  # the event was not changed so add it back
+                    write_cursor=cursor,
+                    where_clause='WHERE identifier=?',
+                    bindings=(event.identifier,),
+                    added=True,
+                )
                 msg = (
                     f'Tried to edit event to have event_identifier {event.serialized_event_identifier} '  # noqa: 501
                     f'and sequence_index {event.sequence_index} but it already exists'
@@ -112,6 +318,13 @@ class DBHistoryEvents():
                 msg = f'Tried to edit event with id {event.identifier} but could not find it in the DB'  # noqa: E501
                 return False, msg
 
+            update_value_stats_for(
+                write_cursor=cursor,
+                where_clause='WHERE identifier=?',
+                bindings=(event.identifier,),
+                added=True,
+            )
+
             # Also mark it as customized
             cursor.execute(
                 'INSERT OR IGNORE INTO history_events_mappings(parent_identifier, name, value) '
@@ -143,6 +356,12 @@ class DBHistoryEvents():
                     )
 
             with self.db.user_write() as write_cursor:
+                update_value_stats_for(
+                    write_cursor=write_cursor,
+                    where_clause='WHERE identifier=?',
+                    bindings=(identifier,),
+                    added=False,
+                )
                 write_cursor.execute(
                     'DELETE FROM history_events WHERE identifier=?', (identifier,),
                 )
@@ -164,13 +383,70 @@ class DBHistoryEvents():
         are customized"""
         customized_event_ids = self.get_customized_event_identifiers(cursor=write_cursor, chain_id=chain_id)  # noqa: E501
         length = len(customized_event_ids)
-        querystr = 'DELETE FROM history_events WHERE event_identifier=?'
+        where_clause = 'WHERE event_identifier=?'
         if length != 0:
-            querystr += f' AND identifier NOT IN ({", ".join(["?"] * length)})'
+            where_clause += f' AND identifier NOT IN ({", ".join(["?"] * length)})'
             bindings = [(x, *customized_event_ids) for x in tx_hashes]
         else:
             bindings = [(x,) for x in tx_hashes]
-        write_cursor.executemany(querystr, bindings)
+        for entry in bindings:
+            update_value_stats_for(write_cursor, where_clause, entry, added=False)
+        write_cursor.executemany(f'DELETE FROM history_events {where_clause}', bindings)
+
+    def delete_events_by_location(self, write_cursor: 'DBCursor', location: Location) -> None:
+        """Deletes all the history events of a location along with their aggregates"""
+        write_cursor.execute(
+            'DELETE FROM history_events WHERE location = ?;',
+            (location.serialize_for_db(),),
+        )
+        write_cursor.execute(
+            'DELETE FROM history_events_value_stats WHERE location = ?;',
+            (location.serialize_for_db(),),
+        )
+
+    def delete_events_by_location_label(
+            self,
+            write_cursor: 'DBCursor',
+            event_identifier: bytes,
+            location_label: str,
+    ) -> None:
+        """Deletes the history events of an event identifier with the given location label"""
+        where_clause = 'WHERE event_identifier=? AND location_label=?'
+        update_value_stats_for(
+            write_cursor=write_cursor,
+            where_clause=where_clause,
+            bindings=(event_identifier, location_label),
+            added=False,
+        )
+        write_cursor.execute(
+            f'DELETE FROM history_events {where_clause}',
+            (event_identifier, location_label),
+        )
+
+    def set_history_events_usd_values(
+            self,
+            write_cursor: 'DBCursor',
+            updates: list[tuple[str, str]],
+    ) -> None:
+        """Sets the usd values of history events. Each update is a tuple of the
+        serialized usd value and the event identifier."""
+        old_rows, new_rows = [], []
+        for usd_value, identifier in updates:
+            write_cursor.execute(
+                f'SELECT {VALUE_STATS_COLUMNS} FROM history_events WHERE identifier=?',
+                (identifier,),
+            )
+            if (row := write_cursor.fetchone()) is None:
+                continue
+            old_rows.append(row)
+            new_rows.append((*row[:6], usd_value))
+
+        update_value_stats(write_cursor=write_cursor, rows=old_rows, added=False)
+        write_cursor.executemany(
+            'UPDATE history_events SET usd_value=? WHERE identifier=?',
+            updates,
+        )
+        update_value_stats(write_cursor=write_cursor, rows=new_rows, added=True)
 
     def get_customized_event_identifiers(
             self,
@@ -234,8 +510,11 @@ class DBHistoryEvents():
             query = 'SELECT * FROM (SELECT * from history_events ORDER BY timestamp DESC, sequence_index ASC LIMIT ?) ' + query  # noqa: E501
             cursor.execute(query, [FREE_HISTORY_EVENTS_LIMIT] + bindings)
 
+        entries = cursor.fetchall()
+        # resolve all the assets in bulk so that deserializing each event hits the cache
+        AssetResolver().resolve_assets({entry[6] for entry in entries})
         output = []
-        for entry in cursor:
+        for entry in entries:
             try:
                 deserialized = HistoryBaseEntry.deserialize_from_db(entry)
             except (DeserializationError, UnknownAsset) as e:
@@ -254,13 +533,17 @@ class DBHistoryEvents():
     ) -> tuple[list[HistoryBaseEntry], int]:
         """Gets all history events for the query from the DB
 
-        Also returns how many are the total found for the filter
+        Also returns how many are the total found for the filter. When continuing from a
+        keyset cursor the count of the first page is returned instead of counting again.
         """
         events = self.get_history_events(
             cursor=cursor,
             filter_query=filter_query,
             has_premium=has_premium,
         )
+        if (keyset_cursor := filter_query.keyset_cursor) is not None:
+            return events, keyset_cursor.entries_found
+
         query, bindings = filter_query.prepare(with_pagination=False)
         query = 'SELECT COUNT(*) from history_events ' + query
         cursor.execute(query, bindings)
@@ -332,6 +615,70 @@ class DBHistoryEvents():
         cursor.execute(query, bindings)
         return cursor.fetchone()[0]  # count(*) always returns
 
+    def get_value_stats_for_filter(
+            self,
+            cursor: 'DBCursor',
+            filter_query: HistoryEventFilterQuery,
+    ) -> tuple[FVal, list[tuple[str, FVal, FVal]]]:
+        """Same as get_value_stats but for the events matching the given filter query
+
+        The whole days of the time range are read from the history_events_value_stats
+        aggregates and only the events of the partial days at the edges of the range are
+        read from history_events. If the filter uses columns that the aggregates don't have
+        then all events are read from history_events. Sums are done with FVal so no
+        precision is lost as with summing in SQL.
+        """
+        from_ms, to_ms = filter_query.from_ts * 1000, filter_query.to_ts * 1000
+        raw_ranges = [(from_ms, to_ms)]
+        queries = []
+        if _can_use_value_stats(filter_query):
+            first_day = from_ms + (-from_ms % DAY_IN_MS)
+            days_end = (to_ms + 1) - (to_ms + 1) % DAY_IN_MS
+            if first_day < days_end:
+                raw_ranges = [(from_ms, first_day - 1), (days_end, to_ms)]
+                query, bindings = _prepare_in_range(filter_query, first_day, days_end - DAY_IN_MS)  # noqa: E501
+                queries.append(('SELECT asset, amount, usd_value FROM history_events_value_stats ' + query, bindings))  # noqa: E501
+
+        for range_start, range_end in raw_ranges:
+            if range_start <= range_end:
+                query, bindings = _prepare_in_range(filter_query, range_start, range_end)
+                queries.append(('SELECT asset, amount, usd_value FROM history_events ' + query, bindings))  # noqa: E501
+
+        sums: dict[str, list[FVal]] = {}
+        for query, bindings in queries:
+            cursor.execute(query, bindings)
+            for asset, amount, usd_value in cursor:
+                try:
+                    amount = deserialize_fval(amount, name='amount', location='get_value_stats_for_filter')  # noqa: E501
+                    usd_value = deserialize_fval(usd_value, name='usd value', location='get_value_stats_for_filter')  # noqa: E501
+                except DeserializationError as e:
+                    log.error(f'Failed to read value of {asset} in history events stats. {str(e)}')  # noqa: E501
+                    continue
+
+                if (entry := sums.get(asset)) is None:
+                    entry = sums[asset] = [ZERO, ZERO]
+                entry[0] += amount
+                entry[1] += usd_value
+
+        assets_amounts = [(asset, x[0], x[1]) for asset, x in sorted(sums.items())]
+        return sum((x[2] for x in assets_amounts), ZERO), assets_amounts
+
+    def check_value_stats(self, cursor: 'DBCursor') -> list[ValueStatsKey]:
+        """Compares history_events_value_stats against a full recomputation from the history
+        events. Returns the keys of the aggregates that are wrong. They can be fixed with
+        rebuild_value_stats."""
+        cursor.execute(f'SELECT {VALUE_STATS_COLUMNS} FROM history_events')
+        expected = _sum_value_stats(cursor.fetchall())
+        cursor.execute(
+            'SELECT location, type, subtype, asset, timestamp, amount, usd_value, events '
+            'FROM history_events_value_stats',
+        )
+        stored = {tuple(x[:5]): [FVal(x[5]), FVal(x[6]), x[7]] for x in cursor}
+        return sorted(
+            key for key in expected.keys() | stored.keys()  # type: ignore[operator]
+            if expected.get(key) != stored.get(key)  # type: ignore[arg-type]
+        )
+
     def get_value_stats(
             self,
             cursor: 'DBCursor',
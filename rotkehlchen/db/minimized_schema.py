@@ -25,6 +25,7 @@ MINIMIZED_USER_DB_SCHEMA = {
     'margin_positions': 'idTEXTPRIMARYKEY,locationCHAR(1)NOTNULLDEFAULT("A")REFERENCESlocation(location),open_timeINTEGER,close_timeINTEGER,profit_lossTEXT,pl_currencyTEXTNOTNULL,feeTEXT,fee_currencyTEXT,linkTEXT,notesTEXT,FOREIGNKEY(pl_currency)REFERENCESassets(identifier)ONUPDATECASCADE,FOREIGNKEY(fee_currency)REFERENCESassets(identifier)ONUPDATECASCADE',
     'asset_movements': 'idTEXTPRIMARYKEY,locationCHAR(1)NOTNULLDEFAULT("A")REFERENCESlocation(location),categoryCHAR(1)NOTNULLDEFAULT("A")REFERENCESasset_movement_category(category),addressTEXT,transaction_idTEXT,timestampINTEGER,assetTEXTNOTNULL,amountTEXT,fee_assetTEXT,feeTEXT,linkTEXT,FOREIGNKEY(asset)REFERENCESassets(identifier)ONUPDATECASCADE,FOREIGNKEY(fee_asset)REFERENCESassets(identifier)ONUPDATECASCADE',
     'used_query_ranges': 'nameVARCHAR[24]NOTNULLPRIMARYKEY,start_tsINTEGER,end_tsINTEGER',
+    'used_query_range_gaps': 'nameVARCHAR[24]NOTNULL,start_tsINTEGERNOTNULL,end_tsINTEGERNOTNULL,FOREIGNKEY(name)REFERENCESused_query_ranges(name)ONUPDATECASCADEONDELETECASCADE,PRIMARYKEY(name,start_ts)',
     'evm_tx_mappings': 'tx_hashBLOBNOTNULL,chain_idINTEGERNOTNULL,valueINTEGERNOTNULL,FOREIGNKEY(tx_hash,chain_id)referencesevm_transactions(tx_hash,chain_id)ONUPDATECASCADEONDELETECASCADE,PRIMARYKEY(tx_hash,chain_id,value)',
     'settings': 'nameVARCHAR[24]NOTNULLPRIMARYKEY,valueTEXT',
     'tags': 'nameTEXTNOTNULLPRIMARYKEYCOLLATENOCASE,descriptionTEXT,background_colorTEXT,foreground_colorTEXT',
@@ -39,6 +40,7 @@ MINIMIZED_USER_DB_SCHEMA = {
     'eth2_daily_staking_details': 'validator_indexINTEGERNOTNULL,timestampintegerNOTNULL,start_usd_priceTEXTNOTNULL,end_usd_priceTEXTNOTNULL,pnlTEXTNOTNULL,start_amountTEXTNOTNULL,end_amountTEXTNOTNULL,missed_attestationsINTEGER,orphaned_attestationsINTEGER,proposed_blocksINTEGER,missed_blocksINTEGER,orphaned_blocksINTEGER,included_attester_slashingsINTEGER,proposer_attester_slashingsINTEGER,deposits_numberINTEGER,amount_depositedTEXT,FOREIGNKEY(validator_index)REFERENCESeth2_validators(validator_index)ONUPDATECASCADEONDELETECASCADE,PRIMARYKEY(validator_index,timestamp)',
     'history_events': 'identifierINTEGERNOTNULLPRIMARYKEY,event_identifierBLOBNOTNULL,sequence_indexINTEGERNOTNULL,timestampINTEGERNOTNULL,locationTEXTNOTNULL,location_labelTEXT,assetTEXTNOTNULL,amountTEXTNOTNULL,usd_valueTEXTNOTNULL,notesTEXT,typeTEXTNOTNULL,subtypeTEXTNOTNULL,counterpartyTEXT,extra_dataTEXT,FOREIGNKEY(asset)REFERENCESassets(identifier)ONUPDATECASCADE,UNIQUE(event_identifier,sequence_index)',
     'history_events_mappings': 'parent_identifierINTEGERNOTNULL,nameTEXTNOTNULL,valueINTEGERNOTNULL,FOREIGNKEY(parent_identifier)referenceshistory_events(identifier)ONUPDATECASCADEONDELETECASCADE,PRIMARYKEY(parent_identifier,name,value)',
+    'history_events_value_stats': 'locationTEXTNOTNULL,typeTEXTNOTNULL,subtypeTEXTNOTNULL,assetTEXTNOTNULL,timestampINTEGERNOTNULL,amountTEXTNOTNULL,usd_valueTEXTNOTNULL,eventsINTEGERNOTNULL,PRIMARYKEY(location,type,subtype,asset,timestamp)',
     'ledger_action_type': 'typeCHAR(1)PRIMARYKEYNOTNULL,seqINTEGERUNIQUE',
     'ledger_actions': 'identifierINTEGERNOTNULLPRIMARYKEY,timestampINTEGERNOTNULL,typeCHAR(1)NOTNULLDEFAULT("A")REFERENCESledger_action_type(type),locationCHAR(1)NOTNULLDEFAULT("A")REFERENCESlocation(location),amountTEXTNOTNULL,assetTEXTNOTNULL,rateTEXT,rate_assetTEXT,linkTEXT,notesTEXT,FOREIGNKEY(asset)REFERENCESassets(identifier)ONUPDATECASCADE,FOREIGNKEY(rate_asset)REFERENCESassets(identifier)ONUPDATECASCADE',
     'action_type': 'typeCHAR(1)PRIMARYKEYNOTNULL,seqINTEGERUNIQUE',
@@ -7,11 +7,84 @@ if TYPE_CHECKING:
     from rotkehlchen.db.drivers.gevent import DBCursor
 
 
+def merge_ranges(ranges: list[tuple[Timestamp, Timestamp]]) -> list[tuple[Timestamp, Timestamp]]:
+    """Merges the given inclusive ranges into a sorted list of disjoint ranges.
+
+    Overlapping and adjacent ranges (e.g. (1, 5) and (6, 10)) are merged into one.
+    """
+    merged: list[tuple[Timestamp, Timestamp]] = []
+    for start, end in sorted(ranges):
+        if len(merged) != 0 and start <= merged[-1][1] + 1:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+            continue
+
+        merged.append((start, end))
+
+    return merged
+
+
+def subtract_ranges(
+        start_ts: Timestamp,
+        end_ts: Timestamp,
+        ranges: list[tuple[Timestamp, Timestamp]],
+) -> list[tuple[Timestamp, Timestamp]]:
+    """Returns the parts of the inclusive range [start_ts, end_ts] that are not
+    covered by any of the given ranges. The given ranges need to be sorted and disjoint
+    as returned by `merge_ranges`.
+    """
+    result = []
+    current_start = start_ts
+    for range_start, range_end in ranges:
+        if range_end < current_start:
+            continue
+        if range_start > end_ts:
+            break
+
+        if range_start > current_start:
+            result.append((current_start, Timestamp(range_start - 1)))
+        current_start = Timestamp(range_end + 1)
+        if current_start > end_ts:
+            return result
+
+    if current_start <= end_ts:
+        result.append((current_start, end_ts))
+
+    return result
+
+
 class DBQueryRanges():
+    """Keeps track of the timestamp ranges that have been queried per location string
+
+    The outer span of all queried ranges lives in `used_query_ranges` and the gaps
+    inside that span, if any, in `used_query_range_gaps`. This way the set of queried
+    ranges can be disjoint and only what is missing needs to be queried again.
+    """
 
     def __init__(self, database: 'DBHandler') -> None:
         self.db = database
 
+    def get_queried_ranges(
+            self,
+            cursor: 'DBCursor',
+            location_string: str,
+    ) -> list[tuple[Timestamp, Timestamp]]:
+        """Returns the sorted disjoint ranges that have been queried for the location"""
+        queried_range = self.db.get_used_query_range(cursor, location_string)
+        if queried_range is None:
+            return []
+
+        cursor.execute(
+            'SELECT start_ts, end_ts FROM used_query_range_gaps WHERE name=? ORDER BY start_ts',
+            (location_string,),
+        )
+        gaps = [(Timestamp(int(x[0])), Timestamp(int(x[1]))) for x in cursor]
+        return subtract_ranges(
+            start_ts=queried_range[0],
+            end_ts=queried_range[1],
+            ranges=merge_ranges(gaps),
+        )
+
     def get_location_query_ranges(
             self,
             cursor: 'DBCursor',
@@ -20,24 +93,15 @@ class DBQueryRanges():
             end_ts: Timestamp,
     ) -> list[tuple[Timestamp, Timestamp]]:
         """Takes in the start/end ts for a location query and after checking the
-        last query ranges of the DB provides a list of timestamp ranges that still
-        need to be queried.
-
-        May return a bit more liberal ranges so that we can avoid further queries
-        in the future.
+        already queried ranges of the DB provides a list of timestamp ranges that still
+        need to be queried. These include any gaps left inside the queried span,
+        for example from a failed query in the middle of it.
         """
-        queried_range = self.db.get_used_query_range(cursor, location_string)
-        if not queried_range:
-            ranges_to_query = [(start_ts, end_ts)]
-        else:
-            ranges_to_query = []
-            if start_ts < queried_range[0]:
-                ranges_to_query.append((start_ts, Timestamp(queried_range[0] - 1)))
-
-            if end_ts > queried_range[1]:
-                ranges_to_query.append((Timestamp(queried_range[1] + 1), end_ts))
-
-        return ranges_to_query
+        return subtract_ranges(
+            start_ts=start_ts,
+            end_ts=end_ts,
+            ranges=self.get_queried_ranges(cursor, location_string),
+        )
 
     def update_used_query_range(
             self,
@@ -45,20 +109,24 @@ class DBQueryRanges():
             location_string: str,
             queried_ranges: list[tuple[Timestamp, Timestamp]],
     ) -> None:
-        """Depending on the queried ranges update the DB"""
+        """Merges the queried ranges with the ones already saved in the DB for the
+        location and saves the result"""
         if len(queried_ranges) == 0:
             return
 
-        starts = [x[0] for x in queried_ranges]
-        ends = [x[1] for x in queried_ranges]
-        saved_range = self.db.get_used_query_range(write_cursor, location_string)
-        if saved_range is not None:
-            starts.append(saved_range[0])
-            ends.append(saved_range[1])
-
-        self.db.update_used_query_range(
+        merged = merge_ranges(
+            self.get_queried_ranges(write_cursor, location_string) + queried_ranges,
+        )
+        start_ts, end_ts = merged[0][0], merged[-1][1]
+        self.db.update_used_query_range(  # this also clears the old gaps
             write_cursor=write_cursor,
             name=location_string,
-            start_ts=min(starts),
-            end_ts=max(ends),
+            start_ts=start_ts,
+            end_ts=end_ts,
         )
+        gaps = subtract_ranges(start_ts=start_ts, end_ts=end_ts, ranges=merged)
+        if len(gaps) != 0:
+            write_cursor.executemany(
+                'INSERT INTO used_query_range_gaps(name, start_ts, end_ts) VALUES (?, ?, ?)',
+                [(location_string, gap_start, gap_end) for gap_start, gap_end in gaps],
+            )
@@ -1,4 +1,5 @@
 import logging
+from collections.abc import Generator, Iterator
 from copy import deepcopy
 from typing import TYPE_CHECKING, Any, Callable, Literal, Optional, Union, overload
 
@@ -7,6 +8,7 @@ from pysqlcipher3 import dbapi2 as sqlcipher
 from rotkehlchen.accounting.constants import FREE_PNL_EVENTS_LIMIT, FREE_REPORTS_LOOKUP_LIMIT
 from rotkehlchen.accounting.pnl import PnlTotals
 from rotkehlchen.accounting.structures.processed_event import ProcessedAccountingEvent
+from rotkehlchen.db.filtering import DBReportDataMaxIdentifierFilter
 from rotkehlchen.db.settings import DBSettings
 from rotkehlchen.errors.misc import InputError
 from rotkehlchen.errors.serialization import DeserializationError
@@ -61,6 +63,75 @@ def _get_reports_or_events_maybe_limit(
     return entries[:returning_entries_length], entries_found
 
 
+def _deserialize_report_events(
+        database: 'DBHandler',
+        cursor: 'DBCursor',
+) -> Iterator[ProcessedAccountingEvent]:
+    """Deserializes the PnL events selected by the cursor, skipping the invalid ones"""
+    for result in cursor:
+        try:
+            yield ProcessedAccountingEvent.deserialize_from_db(result[0], result[1])
+        except DeserializationError as e:
+            database.msg_aggregator.add_error(
+                f'Error deserializing AccountingEvent from the DB. Skipping it.'
+                f'Error was: {str(e)}',
+            )
+
+
+class ReportEventsStream:
+    """The events of a PnL report, read from the DB and deserialized while they are iterated
+
+    The events found are counted the same way as in get_report_data, so entries_found is
+    only set once the events are exhausted. The DB cursor is closed then or by close().
+    """
+
+    def __init__(
+            self,
+            database: 'DBHandler',
+            filter_: 'ReportDataFilterQuery',
+            with_limit: bool,
+    ) -> None:
+        self.entries_found: Optional[int] = None
+        self._events = self._read_events(database, filter_, with_limit)
+
+    def __iter__(self) -> 'ReportEventsStream':
+        return self
+
+    def __next__(self) -> ProcessedAccountingEvent:
+        return next(self._events)
+
+    def close(self) -> None:
+        self._events.close()
+
+    def _read_events(
+            self,
+            database: 'DBHandler',
+            filter_: 'ReportDataFilterQuery',
+            with_limit: bool,
+    ) -> Generator[ProcessedAccountingEvent, None, None]:
+        cursor = database.conn_transient.cursor()
+        try:
+            query, bindings = filter_.prepare()
+            cursor.execute('SELECT timestamp, data FROM pnl_events ' + query, bindings)
+            events_num = 0
+            for event in _deserialize_report_events(database, cursor):
+                events_num += 1
+                if with_limit is False or events_num <= FREE_PNL_EVENTS_LIMIT:
+                    yield event
+
+            if filter_.pagination is not None:
+                no_pagination_filter = deepcopy(filter_)
+                no_pagination_filter.pagination = None
+                query, bindings = no_pagination_filter.prepare()
+                events_num = cursor.execute(
+                    'SELECT COUNT(*) FROM pnl_events ' + query,
+                    bindings,
+                ).fetchone()[0]
+            self.entries_found = events_num
+        finally:
+            cursor.close()
+
+
 class DBAccountingReports():
 
     def __init__(self, database: 'DBHandler'):
@@ -262,18 +333,11 @@ class DBAccountingReports():
                     f'Probably report {report_id} does not exist?',
                 ) from e
 
-    def get_report_data(
-            self,
-            filter_: 'ReportDataFilterQuery',
-            with_limit: bool,
-    ) -> tuple[list[ProcessedAccountingEvent], int]:
-        """Retrieve the event data of a PnL report depending on the given filter
-
-        May raise:
+    @staticmethod
+    def _check_report_exists(cursor: 'DBCursor', report_id: Optional[Union[str, int]]) -> None:
+        """May raise:
         - InputError if the report ID does not exist in the DB
         """
-        cursor = self.db.conn_transient.cursor()
-        report_id = filter_.report_id
         query_result = cursor.execute(
             'SELECT COUNT(*) FROM pnl_reports WHERE identifier=?',
             (report_id,),
@@ -283,22 +347,22 @@ class DBAccountingReports():
                 f'Tried to get PnL events from non existing report with id {report_id}',
             )
 
+    def get_report_data(
+            self,
+            filter_: 'ReportDataFilterQuery',
+            with_limit: bool,
+    ) -> tuple[list[ProcessedAccountingEvent], int]:
+        """Retrieve the event data of a PnL report depending on the given filter
+
+        May raise:
+        - InputError if the report ID does not exist in the DB
+        """
+        cursor = self.db.conn_transient.cursor()
+        self._check_report_exists(cursor, filter_.report_id)
         query, bindings = filter_.prepare()
         query = 'SELECT timestamp, data FROM pnl_events ' + query
         cursor.execute(query, bindings)
-
-        records = []
-        for result in cursor:
-            try:
-                record = ProcessedAccountingEvent.deserialize_from_db(result[0], result[1])
-            except DeserializationError as e:
-                self.db.msg_aggregator.add_error(
-                    f'Error deserializing AccountingEvent from the DB. Skipping it.'
-                    f'Error was: {str(e)}',
-                )
-                continue
-
-            records.append(record)
+        records = list(_deserialize_report_events(self.db, cursor))
 
         if filter_.pagination is not None:
             no_pagination_filter = deepcopy(filter_)
@@ -316,3 +380,26 @@ class DBAccountingReports():
             entries=records,
             with_limit=with_limit,
         )
+
+    def iterate_report_data(
+            self,
+            filter_: 'ReportDataFilterQuery',
+            with_limit: bool,
+    ) -> ReportEventsStream:
+        """Same as get_report_data but the events are read from the DB and deserialized
+        while they are iterated instead of all at once. Events added to the DB after
+        this is called are not included.
+
+        May raise:
+        - InputError if the report ID does not exist in the DB
+        """
+        with self.db.conn_transient.read_ctx() as cursor:
+            self._check_report_exists(cursor, filter_.report_id)
+            last_identifier = cursor.execute('SELECT MAX(identifier) FROM pnl_events').fetchone()[0]  # noqa: E501
+
+        filter_ = deepcopy(filter_)
+        filter_.filters.append(DBReportDataMaxIdentifierFilter(
+            and_op=True,
+            identifier=0 if last_identifier is None else last_identifier,
+        ))
+        return ReportEventsStream(database=self.db, filter_=filter_, with_limit=with_limit)
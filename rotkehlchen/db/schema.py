@@ -534,6 +534,17 @@ CREATE TABLE IF NOT EXISTS used_query_ranges (
 );
 """
 
+# Gaps inside the [start_ts, end_ts] span of a used_query_ranges entry that are not queried yet
+DB_CREATE_USED_QUERY_RANGE_GAPS = """
+CREATE TABLE IF NOT EXISTS used_query_range_gaps (
+    name VARCHAR[24] NOT NULL,
+    start_ts INTEGER NOT NULL,
+    end_ts INTEGER NOT NULL,
+    FOREIGN KEY(name) REFERENCES used_query_ranges(name) ON UPDATE CASCADE ON DELETE CASCADE,
+    PRIMARY KEY(name, start_ts)
+);
+"""
+
 # Currently this table is used only to store a flag that shows whether a transaction is decoded.
 DB_CREATE_EVM_TX_MAPPINGS = """
 CREATE TABLE IF NOT EXISTS evm_tx_mappings (
@@ -650,6 +661,24 @@ CREATE TABLE IF NOT EXISTS history_events_mappings (
 );
 """  # noqa: E501
 
+# Sums of the amount and usd_value of the history events per location, type, subtype, asset
+# and UTC day. timestamp is the start of the day in milliseconds, same as history_events.
+# It is kept up to date by all writes to history_events so that stats don't need to
+# sum all the events every time.
+DB_CREATE_HISTORY_EVENTS_VALUE_STATS = """
+CREATE TABLE IF NOT EXISTS history_events_value_stats (
+    location TEXT NOT NULL,
+    type TEXT NOT NULL,
+    subtype TEXT NOT NULL,
+    asset TEXT NOT NULL,
+    timestamp INTEGER NOT NULL,
+    amount TEXT NOT NULL,
+    usd_value TEXT NOT NULL,
+    events INTEGER NOT NULL,
+    PRIMARY KEY(location, type, subtype, asset, timestamp)
+);
+"""
+
 DB_CREATE_BALANCER_EVENTS = """
 CREATE TABLE IF NOT EXISTS balancer_events (
     tx_hash BLOB NOT NULL,
@@ -732,6 +761,14 @@ CREATE TABLE IF NOT EXISTS user_notes(
 );
 """
 
+# Indices in the order used by the keyset pagination of the API. history_events.identifier
+# is the rowid so an index on the timestamp already orders by (timestamp, identifier).
+DB_CREATE_PAGINATION_INDICES = """
+CREATE INDEX IF NOT EXISTS idx_history_events_timestamp ON history_events(timestamp);
+CREATE INDEX IF NOT EXISTS idx_trades_timestamp ON trades(timestamp, id);
+CREATE INDEX IF NOT EXISTS idx_evm_transactions_timestamp ON evm_transactions(timestamp, tx_hash, chain_id);
+"""  # noqa: E501
+
 DB_SCRIPT_CREATE_TABLES = f"""
 PRAGMA foreign_keys=off;
 BEGIN TRANSACTION;
@@ -759,6 +796,7 @@ BEGIN TRANSACTION;
 {DB_CREATE_MARGIN}
 {DB_CREATE_ASSET_MOVEMENTS}
 {DB_CREATE_USED_QUERY_RANGES}
+{DB_CREATE_USED_QUERY_RANGE_GAPS}
 {DB_CREATE_EVM_TX_MAPPINGS}
 {DB_CREATE_SETTINGS}
 {DB_CREATE_TAGS_TABLE}
@@ -773,6 +811,7 @@ BEGIN TRANSACTION;
 {DB_CREATE_ETH2_DAILY_STAKING_DETAILS}
 {DB_CREATE_HISTORY_EVENTS}
 {DB_CREATE_HISTORY_EVENTS_MAPPINGS}
+{DB_CREATE_HISTORY_EVENTS_VALUE_STATS}
 {DB_CREATE_LEDGER_ACTION_TYPE}
 {DB_CREATE_LEDGER_ACTIONS}
 {DB_CREATE_ACTION_TYPE}
@@ -783,6 +822,7 @@ BEGIN TRANSACTION;
 {DB_CREATE_ADDRESS_BOOK}
 {DB_CREATE_RPC_NODES}
 {DB_CREATE_USER_NOTES}
+{DB_CREATE_PAGINATION_INDICES}
 COMMIT;
 PRAGMA foreign_keys=on;
 """
@@ -7,8 +7,10 @@ from rotkehlchen.chain.constants import LAST_EVM_ACCOUNTS_DETECT_KEY
 from rotkehlchen.constants.assets import A_USD
 from rotkehlchen.constants.timing import YEAR_IN_SECONDS
 from rotkehlchen.data_migrations.manager import LAST_DATA_MIGRATION
+from rotkehlchen.db.timeseries import SNAPSHOTS_COMPACTION_KEYS
 from rotkehlchen.db.updates import LAST_DATA_UPDATES_KEY, UpdateType
 from rotkehlchen.db.utils import str_to_bool
+from rotkehlchen.db.warm_assets import WARM_ASSETS_STATE_KEY
 from rotkehlchen.errors.serialization import DeserializationError
 from rotkehlchen.history.types import DEFAULT_HISTORICAL_PRICE_ORACLES_ORDER, HistoricalPriceOracle
 from rotkehlchen.inquirer import DEFAULT_CURRENT_PRICE_ORACLES_ORDER, CurrentPriceOracle
@@ -57,6 +59,8 @@ DEFAULT_LAST_DATA_MIGRATION = LAST_DATA_MIGRATION
 DEFAULT_COST_BASIS_METHOD = CostBasisMethod.FIFO
 DEFAULT_TREAT_ETH2_AS_ETH = False
 DEFAULT_ETH_STAKING_TAXABLE_AFTER_WITHDRAWAL_ENABLED = False
+DEFAULT_DAILY_SNAPSHOTS_AFTER_DAYS = 0
+DEFAULT_WEEKLY_SNAPSHOTS_AFTER_DAYS = 0
 
 
 JSON_KEYS = (
@@ -86,6 +90,8 @@ INTEGER_KEYS = (
     'btc_derivation_gap_limit',
     'ssf_0graph_multiplier',
     'last_data_migration',
+    'daily_snapshots_after_days',
+    'weekly_snapshots_after_days',
 )
 STRING_KEYS = (
     'ksm_rpc_endpoint',
@@ -94,7 +100,7 @@ STRING_KEYS = (
     'frontend_settings',
 )
 TIMESTAMP_KEYS = ('last_write_ts', 'last_data_upload_ts', 'last_balance_save')
-IGNORED_KEYS = (LAST_EVM_ACCOUNTS_DETECT_KEY, LAST_DATA_UPDATES_KEY) + tuple(x.serialize() for x in UpdateType)  # noqa: E501
+IGNORED_KEYS = (LAST_EVM_ACCOUNTS_DETECT_KEY, LAST_DATA_UPDATES_KEY, WARM_ASSETS_STATE_KEY, *SNAPSHOTS_COMPACTION_KEYS) + tuple(x.serialize() for x in UpdateType)  # noqa: E501
 
 
 class DBSettings(NamedTuple):
@@ -132,6 +138,8 @@ class DBSettings(NamedTuple):
     treat_eth2_as_eth: bool = DEFAULT_TREAT_ETH2_AS_ETH
     eth_staking_taxable_after_withdrawal_enabled: bool = DEFAULT_ETH_STAKING_TAXABLE_AFTER_WITHDRAWAL_ENABLED  # noqa: 501
     address_name_priority: list[AddressNameSource] = DEFAULT_ADDRESS_NAME_PRIORITY
+    daily_snapshots_after_days: int = DEFAULT_DAILY_SNAPSHOTS_AFTER_DAYS
+    weekly_snapshots_after_days: int = DEFAULT_WEEKLY_SNAPSHOTS_AFTER_DAYS
 
     def serialize(self) -> dict[str, Any]:
         settings_dict = self._asdict()   # pylint: disable=no-member
@@ -176,6 +184,8 @@ class ModifiableDBSettings(NamedTuple):
     treat_eth2_as_eth: Optional[bool] = None
     eth_staking_taxable_after_withdrawal_enabled: Optional[bool] = None
     address_name_priority: Optional[list[AddressNameSource]] = None
+    daily_snapshots_after_days: Optional[int] = None
+    weekly_snapshots_after_days: Optional[int] = None
 
     def serialize(self) -> dict[str, Any]:
         settings_dict = {}
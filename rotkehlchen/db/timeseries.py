@@ -0,0 +1,349 @@
+"""Columnar views over the balance snapshots used by the statistics
+
+The snapshots are read into one list per column instead of one object per row, so that
+merging, zero filling and resampling are single passes over the columns and objects are
+only created when they are serialized.
+
+Old snapshots can be compacted so that only the last snapshot of each day or week is
+kept. The times before which each resolution applies are remembered so that reading the
+snapshots works the same across the compacted and the full resolution parts.
+"""
+import logging
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Final, Literal, Optional
+
+from rotkehlchen.accounting.structures.balance import BalanceType
+from rotkehlchen.constants import ZERO
+from rotkehlchen.constants.misc import NFT_DIRECTIVE
+from rotkehlchen.constants.timing import DAY_IN_SECONDS, HOUR_IN_SECONDS, WEEK_IN_SECONDS
+from rotkehlchen.db.utils import SingleDBAssetBalance
+from rotkehlchen.fval import FVal
+from rotkehlchen.logging import RotkehlchenLogsAdapter
+from rotkehlchen.types import Timestamp
+from rotkehlchen.utils.misc import ts_now
+
+if TYPE_CHECKING:
+    from rotkehlchen.assets.asset import Asset
+    from rotkehlchen.db.dbhandler import DBHandler
+    from rotkehlchen.db.drivers.gevent import DBCursor
+    from rotkehlchen.db.settings import DBSettings
+
+logger = logging.getLogger(__name__)
+log = RotkehlchenLogsAdapter(logger)
+
+TimeSeriesResolution = Literal['daily', 'weekly']
+RESOLUTION_SECONDS: dict[TimeSeriesResolution, int] = {
+    'daily': DAY_IN_SECONDS,
+    'weekly': WEEK_IN_SECONDS,
+}
+# Keys of the settings table. The last time the snapshots were compacted and the time
+# before which the snapshots are kept only daily/weekly
+LAST_SNAPSHOTS_COMPACTION_KEY: Final = 'last_snapshots_compaction_ts'
+SNAPSHOTS_COMPACTED_BEFORE_KEYS: Final[dict[TimeSeriesResolution, str]] = {
+    'daily': 'daily_snapshots_before_ts',
+    'weekly': 'weekly_snapshots_before_ts',
+}
+SNAPSHOTS_COMPACTION_KEYS: Final = (LAST_SNAPSHOTS_COMPACTION_KEY, *SNAPSHOTS_COMPACTED_BEFORE_KEYS.values())  # noqa: E501
+# A tier is the time before which snapshots are kept at the given resolution in seconds
+SnapshotsTier = tuple[Timestamp, int]
+
+
+def _last_of_each_period(times: list[Timestamp], keys: list[Any], period: int) -> list[int]:
+    """Returns the sorted indices of the last entry of each period of the given times.
+    Entries with different keys are kept apart even if they are in the same period."""
+    last_indices: dict[tuple[int, Any], int] = {}
+    for idx, (entry_time, key) in enumerate(zip(times, keys)):
+        last_indices[(entry_time // period, key)] = idx
+
+    return sorted(last_indices.values())
+
+
+@dataclass(init=True, repr=True, eq=True, order=False, unsafe_hash=False, frozen=False)
+class BalancesTimeSeries:
+    """The balance snapshots of an asset. The entries at the same index of each column
+    form one snapshot and the snapshots are sorted by time."""
+    times: list[Timestamp]
+    categories: list[BalanceType]
+    amounts: list[FVal]
+    usd_values: list[FVal]
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    def merge_same_times(self) -> 'BalancesTimeSeries':
+        """Sums the snapshots that have the same time. Used to merge ETH and ETH2."""
+        merged = BalancesTimeSeries(times=[], categories=[], amounts=[], usd_values=[])
+        for entry_time, category, amount, usd_value in zip(self.times, self.categories, self.amounts, self.usd_values):  # noqa: E501
+            if len(merged.times) != 0 and merged.times[-1] == entry_time:
+                merged.amounts[-1] += amount
+                merged.usd_values[-1] += usd_value
+                continue
+
+            merged.times.append(entry_time)
+            merged.categories.append(category)
+            merged.amounts.append(amount)
+            merged.usd_values.append(usd_value)
+
+        return merged
+
+    def fill_gaps(
+            self,
+            step: int,
+            multiplier: int,
+            tiers: Sequence[SnapshotsTier] = (),
+    ) -> 'BalancesTimeSeries':
+        """Adds zero snapshots every `step` seconds in the gaps between snapshots that are
+        bigger than `multiplier` steps so that the graphs show the asset was not owned.
+        The last zero snapshot of each gap is at least `multiplier - 1` steps before
+        the snapshot that follows the gap.
+
+        In the compacted tiers the step is the resolution of the tier instead, if bigger,
+        so that compacting the snapshots does not create gaps.
+        """
+        filled = BalancesTimeSeries(times=[], categories=[], amounts=[], usd_values=[])
+        last_idx = len(self.times) - 1
+        for idx, entry_time in enumerate(self.times):
+            category = self.categories[idx]
+            filled.times.append(entry_time)
+            filled.categories.append(category)
+            filled.amounts.append(self.amounts[idx])
+            filled.usd_values.append(self.usd_values[idx])
+            if idx == last_idx:
+                continue
+
+            gap_step = step
+            for before_ts, resolution in tiers:
+                if entry_time < before_ts and resolution > gap_step:
+                    gap_step = resolution
+
+            max_gap = gap_step * multiplier
+            if (next_time := self.times[idx + 1]) - entry_time <= max_gap:
+                continue
+
+            gap_times = range(entry_time + gap_step, min(next_time, next_time - max_gap + gap_step), gap_step)  # noqa: E501
+            filled.times.extend(Timestamp(x) for x in gap_times)
+            filled.categories.extend([category] * len(gap_times))
+            filled.amounts.extend([ZERO] * len(gap_times))
+            filled.usd_values.extend([ZERO] * len(gap_times))
+
+        return filled
+
+    def resample(self, resolution: TimeSeriesResolution) -> 'BalancesTimeSeries':
+        """Keeps only the last snapshot of each day or week per balance category"""
+        indices = _last_of_each_period(self.times, self.categories, RESOLUTION_SECONDS[resolution])  # noqa: E501
+        return BalancesTimeSeries(
+            times=[self.times[x] for x in indices],
+            categories=[self.categories[x] for x in indices],
+            amounts=[self.amounts[x] for x in indices],
+            usd_values=[self.usd_values[x] for x in indices],
+        )
+
+    def to_single_balances(self) -> list[SingleDBAssetBalance]:
+        return [
+            SingleDBAssetBalance(
+                time=entry_time,
+                category=category,
+                amount=amount,
+                usd_value=usd_value,
+            ) for entry_time, category, amount, usd_value in zip(self.times, self.categories, self.amounts, self.usd_values)  # noqa: E501
+        ]
+
+    def serialize(self) -> list[dict[str, Any]]:
+        """Serializes the snapshots the same way as a list of SingleDBAssetBalance"""
+        return [
+            {
+                'time': entry_time,
+                'category': str(category),
+                'amount': str(amount),
+                'usd_value': str(usd_value),
+            } for entry_time, category, amount, usd_value in zip(self.times, self.categories, self.amounts, self.usd_values)  # noqa: E501
+        ]
+
+
+@dataclass(init=True, repr=True, eq=True, order=False, unsafe_hash=False, frozen=False)
+class NetValueTimeSeries:
+    """The total net value snapshots sorted by time"""
+    times: list[Timestamp]
+    usd_values: list[str]
+
+    def resample(self, resolution: TimeSeriesResolution) -> 'NetValueTimeSeries':
+        """Keeps only the last snapshot of each day or week"""
+        indices = _last_of_each_period(self.times, [None] * len(self.times), RESOLUTION_SECONDS[resolution])  # noqa: E501
+        return NetValueTimeSeries(
+            times=[self.times[x] for x in indices],
+            usd_values=[self.usd_values[x] for x in indices],
+        )
+
+
+def query_balances_series(
+        cursor: 'DBCursor',
+        settings: 'DBSettings',
+        asset: 'Asset',
+        from_ts: Optional[Timestamp] = None,
+        to_ts: Optional[Timestamp] = None,
+        balance_type: Optional[BalanceType] = None,
+        resolution: Optional[TimeSeriesResolution] = None,
+) -> BalancesTimeSeries:
+    """Query the balance snapshots of an asset within a range of timestamps
+
+    Can optionally filter by balance type. If ETH2 is treated as ETH then the ETH2
+    snapshots are added to the ETH ones. The gaps in the snapshots are filled with zero
+    balances according to the ssf_0graph_multiplier setting and the compacted tiers.
+    If a resolution is given then only the last snapshot of each day or week is returned.
+    """
+    if from_ts is None:
+        from_ts = Timestamp(0)
+    if to_ts is None:
+        to_ts = ts_now()
+
+    querystr = (
+        'SELECT timestamp, amount, usd_value, category FROM timed_balances '
+        'WHERE timestamp BETWEEN ? AND ? AND currency=?'
+    )
+    bindings = [from_ts, to_ts, asset.identifier]
+    merge_eth2 = settings.treat_eth2_as_eth and asset.identifier == 'ETH'
+    if merge_eth2:
+        assert balance_type is not None, 'Asset balances and liabilities can\'t be queried at the same time when eth2 is equivalent to eth'  # noqa: E501
+        querystr = querystr.replace('currency=?', 'currency IN (?,?)')
+        bindings.append('ETH2')
+
+    if balance_type is not None:
+        querystr += ' AND category=?'
+        bindings.append(balance_type.serialize_for_db())
+    querystr += ' ORDER BY timestamp ASC;'
+
+    cursor.execute(querystr, bindings)
+    series = BalancesTimeSeries(times=[], categories=[], amounts=[], usd_values=[])
+    categories: dict[str, BalanceType] = {}
+    for entry_time, amount, usd_value, category in cursor:
+        if (balance_category := categories.get(category)) is None:
+            balance_category = categories[category] = BalanceType.deserialize_from_db(category)  # noqa: E501
+        series.times.append(entry_time)
+        series.categories.append(balance_category)
+        series.amounts.append(FVal(amount))
+        series.usd_values.append(FVal(usd_value))
+
+    if merge_eth2:
+        series = series.merge_same_times()
+    if settings.ssf_0graph_multiplier != 0:
+        series = series.fill_gaps(
+            step=settings.balance_save_frequency * HOUR_IN_SECONDS,
+            multiplier=settings.ssf_0graph_multiplier,
+            tiers=get_snapshots_tiers(cursor),
+        )
+    if resolution is not None:
+        series = series.resample(resolution)
+
+    return series
+
+
+def query_netvalue_series(
+        cursor: 'DBCursor',
+        from_ts: Timestamp,
+        include_nfts: bool = True,
+        resolution: Optional[TimeSeriesResolution] = None,
+) -> NetValueTimeSeries:
+    """Query the total net value snapshots since the given timestamp
+
+    If include_nfts is False the value of the NFTs of each snapshot is subtracted. If a
+    resolution is given then only the last snapshot of each day or week is returned.
+    """
+    if include_nfts:
+        cursor.execute(
+            'SELECT timestamp, usd_value, NULL FROM timed_location_data '
+            'WHERE location="H" AND timestamp >= ? ORDER BY timestamp ASC;',
+            (from_ts,),
+        )
+    else:
+        cursor.execute(
+            'SELECT A.timestamp, A.usd_value, B.nfts_value FROM timed_location_data AS A '
+            'LEFT JOIN (SELECT timestamp, SUM(usd_value) AS nfts_value FROM timed_balances '
+            'WHERE timestamp >= ? AND currency LIKE ? GROUP BY timestamp) AS B '
+            'ON A.timestamp = B.timestamp '
+            'WHERE A.location="H" AND A.timestamp >= ? ORDER BY A.timestamp ASC;',
+            (from_ts, f'{NFT_DIRECTIVE}%', from_ts),
+        )
+
+    series = NetValueTimeSeries(times=[], usd_values=[])
+    for entry_time, usd_value, nfts_value in cursor:
+        series.times.append(entry_time)
+        if nfts_value is None:  # only the snapshots with NFTs need FVal arithmetic
+            series.usd_values.append(usd_value)
+        else:
+            series.usd_values.append(str(FVal(usd_value) - FVal(nfts_value)))
+
+    if resolution is not None:
+        series = series.resample(resolution)
+
+    return series
+
+
+def get_snapshots_tiers(cursor: 'DBCursor') -> list[SnapshotsTier]:
+    """Returns the tiers of the snapshots that have been compacted"""
+    cursor.execute(
+        f'SELECT name, value FROM settings WHERE name IN ({",".join("?" * len(SNAPSHOTS_COMPACTED_BEFORE_KEYS))})',  # noqa: E501
+        tuple(SNAPSHOTS_COMPACTED_BEFORE_KEYS.values()),
+    )
+    before_timestamps = dict(cursor)
+    return [
+        (Timestamp(int(before_timestamps[key])), RESOLUTION_SECONDS[resolution])
+        for resolution, key in SNAPSHOTS_COMPACTED_BEFORE_KEYS.items()
+        if key in before_timestamps
+    ]
+
+
+def compact_snapshots(database: 'DBHandler') -> int:
+    """Downsamples the old balance snapshots according to the user's settings
+
+    Snapshots older than `weekly_snapshots_after_days` days are compacted to the last
+    snapshot of each week and the ones older than `daily_snapshots_after_days` days to
+    the last snapshot of each day. Zero days disable the respective tier. Snapshots are
+    never kept weekly before they are kept daily, whatever the settings. The same
+    timestamps are kept for timed_balances and timed_location_data so that the net value
+    and the balances of each kept snapshot stay consistent.
+
+    Returns the number of deleted rows.
+    """
+    now = ts_now()
+    deleted_rows = 0
+    with database.user_write() as write_cursor:
+        settings = database.get_settings(write_cursor)
+        weekly_after_days = settings.weekly_snapshots_after_days
+        if weekly_after_days != 0:
+            weekly_after_days = max(weekly_after_days, settings.daily_snapshots_after_days)
+        policies: list[tuple[TimeSeriesResolution, int]] = [
+            ('weekly', weekly_after_days),  # coarsest first
+            ('daily', settings.daily_snapshots_after_days),
+        ]
+        compacted_before = {period: before_ts for before_ts, period in get_snapshots_tiers(write_cursor)}  # noqa: E501
+        for resolution, after_days in policies:
+            if after_days == 0:
+                continue
+
+            period = RESOLUTION_SECONDS[resolution]
+            before_ts = Timestamp(now - after_days * DAY_IN_SECONDS)
+            for table in ('timed_balances', 'timed_location_data'):
+                write_cursor.execute(
+                    f'DELETE FROM {table} WHERE timestamp < ? AND timestamp NOT IN ('
+                    'SELECT MAX(timestamp) FROM (SELECT timestamp FROM timed_balances '
+                    'WHERE timestamp < ? UNION SELECT timestamp FROM timed_location_data '
+                    'WHERE timestamp < ?) GROUP BY timestamp / ?)',
+                    (before_ts, before_ts, before_ts, period),
+                )
+                deleted_rows += write_cursor.rowcount
+
+            # a bigger policy later on does not undo the already compacted snapshots
+            if before_ts > compacted_before.get(period, 0):
+                write_cursor.execute(
+                    'INSERT OR REPLACE INTO settings(name, value) VALUES(?, ?)',
+                    (SNAPSHOTS_COMPACTED_BEFORE_KEYS[resolution], str(before_ts)),
+                )
+
+        write_cursor.execute(
+            'INSERT OR REPLACE INTO settings(name, value) VALUES(?, ?)',
+            (LAST_SNAPSHOTS_COMPACTION_KEY, str(now)),
+        )
+
+    log.debug(f'Compacted the balance snapshots. Deleted {deleted_rows} rows')
+    return deleted_rows
@@ -1,6 +1,8 @@
 import logging
 from typing import TYPE_CHECKING
 
+from rotkehlchen.constants import ZERO
+from rotkehlchen.fval import FVal
 from rotkehlchen.logging import RotkehlchenLogsAdapter
 
 if TYPE_CHECKING:
@@ -52,15 +54,88 @@ def _update_history_events_schema(write_cursor: 'DBCursor', conn: 'DBConnection'
     log.debug('Exit _update_history_events_schema')
 
 
+def _create_used_query_range_gaps(write_cursor: 'DBCursor') -> None:
+    """Create the table that keeps the not yet queried gaps inside a used query range"""
+    log.debug('Enter _create_used_query_range_gaps')
+    write_cursor.execute("""CREATE TABLE IF NOT EXISTS used_query_range_gaps (
+    name VARCHAR[24] NOT NULL,
+    start_ts INTEGER NOT NULL,
+    end_ts INTEGER NOT NULL,
+    FOREIGN KEY(name) REFERENCES used_query_ranges(name) ON UPDATE CASCADE ON DELETE CASCADE,
+    PRIMARY KEY(name, start_ts)
+    );""")
+    log.debug('Exit _create_used_query_range_gaps')
+
+
+def _create_pagination_indices(write_cursor: 'DBCursor') -> None:
+    """Create the indices used by the keyset pagination of history events, trades and
+    evm transactions. Has to run after history_events is recreated."""
+    log.debug('Enter _create_pagination_indices')
+    write_cursor.execute('CREATE INDEX IF NOT EXISTS idx_history_events_timestamp ON history_events(timestamp);')  # noqa: E501
+    write_cursor.execute('CREATE INDEX IF NOT EXISTS idx_trades_timestamp ON trades(timestamp, id);')  # noqa: E501
+    write_cursor.execute('CREATE INDEX IF NOT EXISTS idx_evm_transactions_timestamp ON evm_transactions(timestamp, tx_hash, chain_id);')  # noqa: E501
+    log.debug('Exit _create_pagination_indices')
+
+
+def _create_history_events_value_stats(write_cursor: 'DBCursor') -> None:
+    """Create and populate the table of the per day aggregates of the history events
+    amounts and usd values. Has to run after history_events is recreated."""
+    log.debug('Enter _create_history_events_value_stats')
+    write_cursor.execute("""CREATE TABLE IF NOT EXISTS history_events_value_stats (
+    location TEXT NOT NULL,
+    type TEXT NOT NULL,
+    subtype TEXT NOT NULL,
+    asset TEXT NOT NULL,
+    timestamp INTEGER NOT NULL,
+    amount TEXT NOT NULL,
+    usd_value TEXT NOT NULL,
+    events INTEGER NOT NULL,
+    PRIMARY KEY(location, type, subtype, asset, timestamp)
+    );""")
+    day_in_ms = 86400 * 1000
+    sums: dict[tuple, list] = {}
+    write_cursor.execute(
+        'SELECT location, type, subtype, asset, timestamp, amount, usd_value FROM history_events',
+    )
+    for location, event_type, subtype, asset, timestamp, amount, usd_value in write_cursor:
+        key = (location, event_type, subtype, asset, timestamp - timestamp % day_in_ms)
+        try:
+            amount, usd_value = FVal(amount), FVal(usd_value)
+        except ValueError as e:
+            log.error(f'Skipping history event with invalid values in the value stats. {str(e)}')  # noqa: E501
+            amount, usd_value = ZERO, ZERO
+        if (entry := sums.get(key)) is None:
+            entry = sums[key] = [ZERO, ZERO, 0]
+        entry[0] += amount
+        entry[1] += usd_value
+        entry[2] += 1
+
+    write_cursor.executemany(
+        'INSERT OR REPLACE INTO history_events_value_stats(location, type, subtype, asset, '
+        'timestamp, amount, usd_value, events) VALUES(?, ?, ?, ?, ?, ?, ?, ?)',
+        [(*key, str(amount), str(usd_value), events) for key, (amount, usd_value, events) in sums.items()],  # noqa: E501
+    )
+    log.debug('Exit _create_history_events_value_stats')
+
+
 def upgrade_v36_to_v37(db: 'DBHandler', progress_handler: 'DBUpgradeProgressHandler') -> None:
     """Upgrades the DB from v36 to v37. This was in v1.28.0 release.
 
         - Replace null history event subtype
+        - Add the used query range gaps table
+        - Add the indices used for keyset pagination
+        - Add the per day aggregates of the history events values
     """
     log.debug('Entered userdb v36->v36 upgrade')
-    progress_handler.set_total_steps(1)
+    progress_handler.set_total_steps(4)
     with db.user_write() as write_cursor:
         _update_history_events_schema(write_cursor, db.conn)
         progress_handler.new_step()
+        _create_used_query_range_gaps(write_cursor)
+        progress_handler.new_step()
+        _create_pagination_indices(write_cursor)
+        progress_handler.new_step()
+        _create_history_events_value_stats(write_cursor)
+        progress_handler.new_step()
 
     log.debug('Finished userdb v36->v36 upgrade')
@@ -0,0 +1,85 @@
+import logging
+from typing import TYPE_CHECKING, Final
+
+from rotkehlchen.assets.resolver import AssetResolver
+from rotkehlchen.constants.assets import CONSTANT_ASSETS
+from rotkehlchen.globaldb.handler import GlobalDBHandler
+from rotkehlchen.globaldb.updates import ASSETS_VERSION_KEY
+from rotkehlchen.logging import RotkehlchenLogsAdapter
+
+if TYPE_CHECKING:
+    from rotkehlchen.db.dbhandler import DBHandler
+    from rotkehlchen.db.drivers.gevent import DBCursor
+
+logger = logging.getLogger(__name__)
+log = RotkehlchenLogsAdapter(logger)
+
+WARM_ASSET_NAME: Final = 'warm_asset'
+WARM_ASSETS_STATE_KEY: Final = 'warm_assets_globaldb_state'
+MAX_WARM_ASSETS: Final = 4096
+
+
+def _globaldb_assets_state() -> str:
+    """Changes whenever the assets of the globaldb may have changed identifiers,
+    which is after a globaldb upgrade or an assets update"""
+    return f'{GlobalDBHandler().get_setting_value("version", 0)}_{GlobalDBHandler().get_setting_value(ASSETS_VERSION_KEY, 0)}'  # noqa: E501
+
+
+class DBWarmAssets():
+    """Snapshot of the assets the user needs the most so that the next login can
+    resolve all of them in bulk instead of one by one as they get used
+
+    Only the identifiers are stored. The assets themselves are always read from the
+    globaldb so a snapshot can't contain stale asset data.
+    """
+
+    def __init__(self, database: 'DBHandler') -> None:
+        self.db = database
+
+    def save_snapshot(self) -> None:
+        """Stores the assets the user owns and the ones that are in the asset cache
+
+        The snapshot is not user data, so the last write timestamp that premium sync
+        compares is not updated. Since it only speeds up the next login, failing to save
+        it is only logged.
+        """
+        try:
+            with self.db.conn.write_ctx() as write_cursor:
+                self._save_snapshot(write_cursor)
+        except Exception as e:  # pylint: disable=broad-except  # should never stop the logout
+            log.error(f'Failed to save the snapshot of the warm assets due to {str(e)}')
+
+    def _save_snapshot(self, write_cursor: 'DBCursor') -> None:
+        identifiers = {x.identifier for x in self.db.query_owned_assets(write_cursor)}
+        for identifier in AssetResolver().cached_identifiers():
+            if len(identifiers) >= MAX_WARM_ASSETS:
+                break
+            identifiers.add(identifier)
+
+        write_cursor.execute('DELETE FROM multisettings WHERE name=?', (WARM_ASSET_NAME,))
+        write_cursor.executemany(
+            'INSERT OR IGNORE INTO multisettings(name, value) VALUES(?, ?)',
+            [(WARM_ASSET_NAME, x) for x in identifiers],
+        )
+        write_cursor.execute(
+            'INSERT OR REPLACE INTO settings(name, value) VALUES(?, ?)',
+            (WARM_ASSETS_STATE_KEY, _globaldb_assets_state()),
+        )
+        log.debug(f'Saved a snapshot of {len(identifiers)} assets to warm up the next login')
+
+    def load_snapshot(self) -> int:
+        """Resolves the assets of the snapshot and the constant assets in bulk. A snapshot
+        taken before the globaldb assets changed is ignored.
+
+        Returns the number of assets that were loaded in the cache.
+        """
+        identifiers = [x.identifier for x in CONSTANT_ASSETS]
+        with self.db.conn.read_ctx() as cursor:
+            cursor.execute('SELECT value FROM settings WHERE name=?', (WARM_ASSETS_STATE_KEY,))
+            if (result := cursor.fetchone()) is not None and result[0] == _globaldb_assets_state():  # noqa: E501
+                cursor.execute('SELECT value FROM multisettings WHERE name=?', (WARM_ASSET_NAME,))
+                identifiers.extend(x[0] for x in cursor)
+
+        loaded = len(AssetResolver().resolve_assets(identifiers))
+        log.debug(f'Warmed up the asset cache with {loaded} assets')
+        return loaded
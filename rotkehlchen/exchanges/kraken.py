@@ -9,6 +9,7 @@ import logging
 import operator
 import time
 from collections import defaultdict
+from contextlib import suppress
 from typing import TYPE_CHECKING, Any, DefaultDict, Optional, Union
 from urllib.parse import urlencode
 
@@ -1129,10 +1130,23 @@ class Kraken(ExchangeInterface):
                             f'to {query_end_ts} in database. {str(e)}',
                         )
 
+            # The newest entries come first. So if there were errors only the part from the
+            # oldest fetched entry until the end of the range was queried
+            if with_errors is True:
+                queried_start_ts: Optional[Timestamp] = None
+                for raw_event in response:
+                    with suppress(DeserializationError, KeyError):
+                        event_ts = Timestamp(max(int(deserialize_fval(raw_event['time'], 'time', 'kraken ledgers')), query_start_ts))  # noqa: E501
+                        queried_start_ts = event_ts if queried_start_ts is None else min(queried_start_ts, event_ts)  # noqa: E501
+            else:
+                queried_start_ts = query_start_ts
+
+            if queried_start_ts is not None:
+                with self.db.user_write() as write_cursor:
                     ranges.update_used_query_range(
                         write_cursor=write_cursor,
                         location_string=range_query_name,
-                        queried_ranges=[(start_ts, end_ts)] + ranges_to_query,
+                        queried_ranges=[(queried_start_ts, query_end_ts)],
                     )
 
             if with_errors is True:
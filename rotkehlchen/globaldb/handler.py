@@ -26,7 +26,7 @@ from rotkehlchen.history.deserialization import deserialize_price
 from rotkehlchen.history.types import HistoricalPrice, HistoricalPriceOracle
 from rotkehlchen.logging import RotkehlchenLogsAdapter
 from rotkehlchen.types import ChainID, ChecksumEvmAddress, EvmTokenKind, Price, Timestamp
-from rotkehlchen.utils.misc import timestamp_to_date, ts_now
+from rotkehlchen.utils.misc import get_chunks, timestamp_to_date, ts_now
 from rotkehlchen.utils.serialization import (
     deserialize_asset_with_oracles_from_db,
     deserialize_generic_asset_from_db,
@@ -44,6 +44,9 @@ if TYPE_CHECKING:
 logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
 
+# Each identifier is bound 3 times in the resolve query so this stays below the
+# default limit of 999 variables per query of older sqlite versions
+RESOLVE_ASSETS_CHUNK_SIZE = 300
 
 _ALL_ASSETS_TABLES_JOINS = """
 FROM assets LEFT JOIN common_asset_details on assets.identifier=common_asset_details.identifier
@@ -1771,6 +1774,72 @@ class GlobalDBHandler():
                 underlying_tokens=underlying_tokens,
             )
 
+    @staticmethod
+    def resolve_assets(identifiers: list[str]) -> list[AssetWithNameAndType]:
+        """
+        Resolve many assets with one query to the database per chunk of identifiers.
+        Same as `resolve_asset` but the identifiers that are not in the database or
+        that fail to deserialize are skipped instead of raising.
+        """
+        assets: list[AssetWithNameAndType] = []
+        db_identifiers = []
+        for identifier in identifiers:
+            if not identifier.startswith(NFT_DIRECTIVE):
+                db_identifiers.append(identifier)
+                continue
+            try:
+                assets.append(Nft(identifier))
+            except UnknownAsset:
+                log.debug(f'Skipping malformed nft identifier {identifier} when resolving assets')  # noqa: E501
+
+        with GlobalDBHandler().conn.read_ctx() as cursor:
+            for chunk in get_chunks(db_identifiers, n=RESOLVE_ASSETS_CHUNK_SIZE):
+                placeholders = ','.join('?' * len(chunk))
+                cursor.execute(
+                    f"""
+                    SELECT A.identifier, A.type, B.address, B.decimals, A.name, C.symbol, C.started, null, C.swapped_for, C.coingecko, C.cryptocompare, B.protocol, B.chain, B.token_kind, null, null FROM assets as A JOIN evm_tokens as B
+                    ON B.identifier = A.identifier JOIN common_asset_details AS C ON C.identifier = B.identifier WHERE A.type = ? AND A.identifier IN ({placeholders})
+                    UNION ALL
+                    SELECT A.identifier, A.type, null, null, A.name, B.symbol, B.started, B.forked, B.swapped_for, B.coingecko, B.cryptocompare, null, null, null, null, null from assets as A JOIN common_asset_details as B
+                    ON B.identifier = A.identifier WHERE A.type != ? AND A.type != ? AND A.identifier IN ({placeholders})
+                    UNION ALL
+                    SELECT A.identifier, A.type, null, null, A.name, null, null, null, null, null, null, null, null, null, B.notes, B.type FROM assets AS A JOIN custom_assets AS B on A.identifier=B.identifier WHERE A.identifier IN ({placeholders})
+                    """,  # noqa: E501
+                    (
+                        AssetType.EVM_TOKEN.serialize_for_db(),
+                        *chunk,
+                        AssetType.EVM_TOKEN.serialize_for_db(),
+                        AssetType.CUSTOM_ASSET.serialize_for_db(),
+                        *chunk,
+                        *chunk,
+                    ),
+                )
+                rows = cursor.fetchall()
+                token_identifiers = [
+                    x[0] for x in rows if x[1] == AssetType.EVM_TOKEN.serialize_for_db()
+                ]
+                underlying_tokens: defaultdict[str, list[UnderlyingToken]] = defaultdict(list)
+                if len(token_identifiers) != 0:
+                    cursor.execute(
+                        f'SELECT A.parent_token_entry, B.address, B.token_kind, A.weight FROM underlying_tokens_list AS A JOIN evm_tokens as B WHERE A.identifier=B.identifier AND parent_token_entry IN ({",".join("?" * len(token_identifiers))})',  # noqa: E501
+                        token_identifiers,
+                    )
+                    for entry in cursor:
+                        underlying_tokens[entry[0]].append(UnderlyingToken.deserialize_from_db(entry[1:]))  # noqa: E501
+
+                for asset_data in rows:
+                    try:
+                        asset_type = AssetType.deserialize_from_db(asset_data[1])
+                        assets.append(deserialize_generic_asset_from_db(
+                            asset_type=asset_type,
+                            asset_data=asset_data,
+                            underlying_tokens=underlying_tokens.get(asset_data[0]),
+                        ))
+                    except (DeserializationError, WrongAssetType) as e:
+                        log.error(f'Failed to resolve asset {asset_data[0]} due to {str(e)}')
+
+        return assets
+
     @staticmethod
     def resolve_asset_from_packaged_and_store(identifier: str) -> AssetWithNameAndType:
         """
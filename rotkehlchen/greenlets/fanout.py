@@ -0,0 +1,78 @@
+import logging
+import time
+from collections.abc import Callable
+from typing import Any, NamedTuple, Optional
+
+import gevent
+from gevent.pool import Pool
+
+from rotkehlchen.errors.misc import RemoteError
+from rotkehlchen.logging import RotkehlchenLogsAdapter
+
+logger = logging.getLogger(__name__)
+log = RotkehlchenLogsAdapter(logger)
+
+
+class FanoutQuery(NamedTuple):
+    name: str
+    method: Callable[[], Any]
+
+
+class FanoutResult(NamedTuple):
+    name: str
+    result: Any
+    error: Optional[Exception]
+    duration: float  # in seconds
+
+    def get(self) -> Any:
+        """Returns the result or raises the exception of the query"""
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+def _run_query(query: FanoutQuery, timeout: float) -> FanoutResult:
+    start = time.monotonic()
+    result, error = None, None
+    query_timeout = gevent.Timeout(timeout)
+    try:
+        with query_timeout:
+            result = query.method()
+    except gevent.Timeout as e:
+        if e is not query_timeout:  # started by the query code. Not the query timing out
+            raise
+        error = RemoteError(f'{query.name} query timed out after {timeout} seconds')
+    except Exception as e:  # pylint: disable=broad-except  # given to the caller to handle
+        error = e
+
+    duration = time.monotonic() - start
+    log.debug(
+        f'{query.name} query finished in {duration:.2f} seconds',
+        error=None if error is None else str(error),
+    )
+    return FanoutResult(name=query.name, result=result, error=error, duration=duration)
+
+
+def fanout(queries: list[FanoutQuery], pool_size: int, timeout: float) -> list[FanoutResult]:
+    """Runs the given independent queries concurrently in a pool of at most pool_size
+    greenlets and waits for all of them to finish.
+
+    The results are returned in the same order as the queries so that callers can
+    process them exactly as if the queries had run serially. Any exception, including
+    a RemoteError if the query takes more than timeout seconds, is kept in the result
+    for the caller to handle. The only thing raised here is a gevent Timeout started
+    inside a query and not handled there, since it is not the query timing out.
+
+    If the calling greenlet stops waiting, for example because an outer fanout timed it
+    out, the queries still running are killed so that they do not keep running unseen.
+    """
+    if len(queries) == 0:
+        return []
+
+    pool = Pool(size=pool_size)
+    greenlets = [pool.spawn(_run_query, query, timeout) for query in queries]
+    try:
+        pool.join()
+    finally:
+        pool.kill()
+    return [x.get() for x in greenlets]
@@ -361,7 +361,7 @@ class EventsHistorian:
         # Query all trades, asset movements and margin positions from the DB for all
         # possible locations.
         self.processing_state_name = 'Reading trades, asset movements and margin positions from the DB'  # noqa: E501
-        with self.db.conn.read_ctx() as cursor:
+        with self.db.conn.read_ctx(offload=True) as cursor:
             # Include all trades
             trades = self.db.get_trades(
                 cursor,
@@ -443,7 +443,7 @@ class EventsHistorian:
         self.processing_state_name = 'Querying base history events'
         # Include base history entries
         history_events_db = DBHistoryEvents(self.db)
-        with self.db.conn.read_ctx() as cursor:
+        with self.db.conn.read_ctx(offload=True) as cursor:
             base_entries, _ = history_events_db.get_history_events_and_limit_info(
                 cursor=cursor,
                 filter_query=HistoryEventFilterQuery.make(
@@ -1,12 +1,18 @@
 import argparse
+import copy
+import datetime
+import json
 import logging.config
+import logging.handlers
 import re
 import sys
 from collections.abc import MutableMapping
 from pathlib import Path
-from typing import TYPE_CHECKING, Any, Optional
+from typing import TYPE_CHECKING, Any, Optional, Union
 
 import gevent
+from gevent.monkey import get_original
+from gevent.threadpool import ThreadPool
 
 from rotkehlchen.greenlets.utils import get_greenlet_name
 from rotkehlchen.utils.misc import timestamp_to_date, ts_now
@@ -83,20 +89,32 @@ if TYPE_CHECKING:
 
 class RotkehlchenLogsAdapter(logging.LoggerAdapter):
 
+    # Set by configure_logging since the formatters it sets up render structured records
+    structured = False
+
     def __init__(self, logger: logging.Logger):
         super().__init__(logger, extra={})
 
-    def process(self, given_msg: Any, kwargs: MutableMapping[str, Any]) -> tuple[str, dict]:
+    def process(self, given_msg: Any, kwargs: MutableMapping[str, Any]) -> tuple[Any, dict]:
         """
-        This is the main post-processing function for rotki logs
+        This is the main post-processing function for rotki logs. It only runs for
+        the records of enabled levels.
 
         This function:
         - appends all kwargs to the final message
         - appends the greenlet id in the log message
+
+        In structured mode the message is left as is and the greenlet name and kwargs
+        are kept in the record, to be rendered by the formatter of the handler.
+        `exc_info`, `stack_info` and `stacklevel` are then passed on to the logger.
         """
-        msg = str(given_msg)
         greenlet = gevent.getcurrent()
         greenlet_name = get_greenlet_name(greenlet)
+        if self.structured is True:
+            logger_kwargs = {x: kwargs.pop(x) for x in ('exc_info', 'stack_info', 'stacklevel') if x in kwargs}  # noqa: E501
+            return given_msg, {'extra': {'greenlet': greenlet_name, 'structured_data': kwargs}, **logger_kwargs}  # noqa: E501
+
+        msg = str(given_msg)
         msg = greenlet_name + ': ' + msg + ','.join(f' {a[0]}={a[1]}' for a in kwargs.items())  # noqa: E501
         return msg, {}
 
@@ -104,7 +122,16 @@ class RotkehlchenLogsAdapter(logging.LoggerAdapter):
         """
         Delegate a trace call to the underlying logger.
         """
-        self.log(TRACE, msg, *args, **kwargs)
+        if self.logger.isEnabledFor(TRACE):
+            self.log(TRACE, msg, *args, **kwargs)
+
+    def debug(self, msg: Any, *args: Any, **kwargs: Any) -> None:
+        """
+        Delegate a debug call to the underlying logger. The level is checked before
+        passing on the kwargs as debug logs are mostly disabled in hot paths.
+        """
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.log(logging.DEBUG, msg, *args, **kwargs)
 
 
 class PywsgiFilter(logging.Filter):
@@ -126,19 +153,121 @@ class PywsgiFilter(logging.Filter):
         return True
 
 
+def _plain_value(value: Any) -> Union[str, int, float, bool, None]:
+    """Turns a kwarg of a structured record into a json type"""
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    if isinstance(value, bytes):
+        return '0x' + value.hex()
+    return str(value)
+
+
+class TextFormatter(logging.Formatter):
+    """Renders structured records the same way the logs adapter renders them when
+    not in structured mode: greenlet name, message and then the kwargs. Bytes kwargs
+    are rendered as hex."""
+
+    def formatMessage(self, record: logging.LogRecord) -> str:
+        if (greenlet_name := getattr(record, 'greenlet', None)) is not None:
+            record.message = greenlet_name + ': ' + record.message + ','.join(f' {a[0]}={_plain_value(a[1])}' for a in record.structured_data.items())  # noqa: E501
+        return super().formatMessage(record)
+
+
+class JSONLinesFormatter(logging.Formatter):
+    """Formats each record as a json object in a single line"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: dict[str, Any] = {
+            'timestamp': datetime.datetime.fromtimestamp(record.created, tz=datetime.timezone.utc).isoformat(timespec='milliseconds'),  # noqa: E501
+            'level': record.levelname,
+            'logger': record.name,
+            'greenlet': getattr(record, 'greenlet', None),
+            'message': record.getMessage(),
+        }
+        if len(structured_data := getattr(record, 'structured_data', {})) != 0:
+            entry['data'] = {key: _plain_value(value) for key, value in structured_data.items()}  # noqa: E501
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        if record.stack_info:
+            entry['stack'] = self.formatStack(record.stack_info)
+        return json.dumps(entry)
+
+
+class QueuedLogHandler(logging.handlers.QueueHandler):
+    """Hands the records over to a native thread that emits them with the given handler
+
+    Writing to the log file then never blocks the hub. The records are prepared in the
+    calling greenlet since rendering arbitrary objects is not safe from another thread.
+    The formatting and writing happen in the thread.
+
+    The app is monkey patched, where a thread of the threading module is a greenlet. So
+    the thread is one of a gevent threadpool and the queue is the unpatched one.
+    """
+
+    def __init__(self, handler: logging.Handler) -> None:
+        super().__init__(get_original('queue', 'SimpleQueue')())
+        self.handler = handler
+        self.threadpool: Optional[ThreadPool] = ThreadPool(maxsize=1)
+        self.emitting = self.threadpool.spawn(self._emit_queued_records)
+
+    def _emit_queued_records(self) -> None:
+        """Runs in the thread until the None sentinel is queued"""
+        while (record := self.queue.get()) is not None:
+            if record.levelno >= self.handler.level:
+                self.handler.handle(record)
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        if (structured_data := getattr(record, 'structured_data', None)) is not None:
+            record.structured_data = {key: _plain_value(value) for key, value in structured_data.items()}  # noqa: E501
+        return record
+
+    def close(self) -> None:
+        """Waits for the queued records to be written"""
+        if self.threadpool is not None:
+            self.queue.put_nowait(None)
+            self.emitting.get()
+            self.threadpool.kill()
+            self.threadpool = None
+        super().close()
+
+
+def _use_queued_handlers(loggers: list[logging.Logger]) -> None:
+    """Makes the handlers of the given loggers emit their records from a separate thread"""
+    queued_handlers: dict[logging.Handler, QueuedLogHandler] = {}
+    for logger in loggers:
+        for handler in logger.handlers[:]:
+            if (queued_handler := queued_handlers.get(handler)) is None:
+                queued_handler = queued_handlers[handler] = QueuedLogHandler(handler)
+            logger.removeHandler(handler)
+            logger.addHandler(queued_handler)
+
+
 def configure_logging(args: argparse.Namespace) -> None:
     loglevel = args.loglevel.upper()
     formatters = {
         'default': {
+            'class': 'rotkehlchen.logging.TextFormatter',
             'format': '[%(asctime)s] %(levelname)s %(name)s %(message)s',
             'datefmt': '%d/%m/%Y %H:%M:%S %Z',
         },
+        'json': {
+            'class': 'rotkehlchen.logging.JSONLinesFormatter',
+        },
     }
+    formatter = 'json' if args.logformat == 'json' else 'default'
     handlers = {
         'console': {
             'class': 'logging.StreamHandler',
             'level': loglevel,
-            'formatter': 'default',
+            'formatter': formatter,
         },
     }
 
@@ -170,7 +299,7 @@ def configure_logging(args: argparse.Namespace) -> None:
             'maxBytes': single_log_max_bytes,
             'backupCount': backups_num,
             'level': loglevel,
-            'formatter': 'default',
+            'formatter': formatter,
             'encoding': 'utf-8',
         }
     else:
@@ -201,6 +330,9 @@ def configure_logging(args: argparse.Namespace) -> None:
         'handlers': handlers,
         'loggers': loggers,
     })
+    RotkehlchenLogsAdapter.structured = True
+    if args.logasync is True:
+        _use_queued_handlers([logging.getLogger(), logging.getLogger('rotkehlchen.api.server.pywsgi')])  # noqa: E501
 
     if not args.logfromothermodules:
         logging.getLogger('urllib3').setLevel(logging.CRITICAL)
@@ -0,0 +1,262 @@
+"""Block level delta format for premium DB backups
+
+The exported plaintext DB is split into content defined chunks. Each chunk is compressed,
+encrypted and stored remotely under an identifier that is a keyed hash of its content.
+A manifest with the ordered chunk identifiers describes the whole DB. Syncing then only
+needs to transfer the chunks that the other side does not already have.
+
+SQLite writes whole pages in place so chunk boundaries are only considered at page
+boundaries. A boundary is placed after a page whose digest matches BOUNDARY_MASK which
+keeps chunks stable when pages are appended or removed in the middle of the file.
+"""
+import abc
+import hashlib
+import hmac
+import json
+import logging
+import zlib
+from collections.abc import Iterator
+from contextlib import ExitStack
+from pathlib import Path
+from typing import BinaryIO, NamedTuple, Optional
+
+from rotkehlchen.crypto import decrypt, encrypt
+from rotkehlchen.errors.misc import UnableToDecryptRemoteData
+from rotkehlchen.errors.serialization import DeserializationError
+from rotkehlchen.logging import RotkehlchenLogsAdapter
+from rotkehlchen.utils.serialization import jsonloads_dict
+
+logger = logging.getLogger(__name__)
+log = RotkehlchenLogsAdapter(logger)
+
+DELTA_FORMAT_VERSION = 1
+PAGE_SIZE = 4096  # default page size of sqlite databases
+MIN_CHUNK_PAGES = 4
+MAX_CHUNK_PAGES = 64
+BOUNDARY_MASK = 0x0f  # on average a boundary every 16 pages after the minimum
+
+
+class ChunkInfo(NamedTuple):
+    identifier: str
+    offset: int
+    size: int
+
+
+class DeltaManifest(NamedTuple):
+    chunks: list[ChunkInfo]
+    data_hash: str  # sha256 hex digest of the whole plaintext DB
+
+    def serialize(self) -> str:
+        return json.dumps({
+            'version': DELTA_FORMAT_VERSION,
+            'data_hash': self.data_hash,
+            'chunks': [[x.identifier, x.size] for x in self.chunks],
+        })
+
+    @classmethod
+    def deserialize(cls, data: str) -> 'DeltaManifest':
+        """May raise DeserializationError if the manifest has an unexpected format"""
+        try:
+            manifest = jsonloads_dict(data)
+            if manifest['version'] != DELTA_FORMAT_VERSION:
+                raise DeserializationError(
+                    f'Unsupported delta manifest version {manifest["version"]}',
+                )
+            chunks, offset = [], 0
+            for identifier, size in manifest['chunks']:
+                chunks.append(ChunkInfo(identifier=identifier, offset=offset, size=size))
+                offset += size
+            return cls(chunks=chunks, data_hash=manifest['data_hash'])
+        except (KeyError, TypeError, ValueError) as e:
+            raise DeserializationError(f'Invalid delta manifest: {str(e)}') from e
+
+
+class DeltaSyncResult(NamedTuple):
+    total_chunks: int
+    transferred_chunks: int
+    transferred_bytes: int  # size of the transferred chunks before compression
+
+
+class DeltaSyncRemoteInterface(metaclass=abc.ABCMeta):
+    """The remote side of the delta sync. Everything stored in it is encrypted"""
+
+    @abc.abstractmethod
+    def get_manifest(self) -> Optional[str]:
+        """Returns the encrypted manifest or None if nothing was uploaded yet"""
+
+    @abc.abstractmethod
+    def put_manifest(self, data: str) -> None:
+        """Stores the encrypted manifest replacing the existing one"""
+
+    @abc.abstractmethod
+    def missing_chunks(self, identifiers: list[str]) -> set[str]:
+        """Returns which of the given chunk identifiers are not stored remotely"""
+
+    @abc.abstractmethod
+    def put_chunks(self, chunks: dict[str, str]) -> None:
+        """Stores the given encrypted chunks by identifier"""
+
+    @abc.abstractmethod
+    def get_chunks(self, identifiers: list[str]) -> dict[str, str]:
+        """Returns the encrypted chunks for the given identifiers"""
+
+
+def iterate_chunks(src_f: BinaryIO) -> Iterator[bytes]:
+    """Splits the given file into content defined chunks of whole pages"""
+    chunk = bytearray()
+    pages = 0
+    while True:
+        page = src_f.read(PAGE_SIZE)
+        if not page:
+            break
+
+        chunk += page
+        pages += 1
+        if pages < MIN_CHUNK_PAGES:
+            continue
+        if pages == MAX_CHUNK_PAGES or hashlib.blake2b(page, digest_size=1).digest()[0] & BOUNDARY_MASK == 0:  # noqa: E501
+            yield bytes(chunk)
+            chunk = bytearray()
+            pages = 0
+
+    if len(chunk) != 0:
+        yield bytes(chunk)
+
+
+class DBDeltaSync():
+    """Uploads and downloads plaintext DB files to a remote in the delta format"""
+
+    def __init__(self, remote: DeltaSyncRemoteInterface, password: str) -> None:
+        self.remote = remote
+        self.password = password.encode()
+        # different key for the chunk identifiers so they say nothing about the encryption key
+        self.id_key = hashlib.sha256(b'rotki-delta-chunk-id' + self.password).digest()
+
+    def _chunk_identifier(self, chunk: bytes) -> str:
+        return hmac.new(self.id_key, chunk, hashlib.sha256).hexdigest()
+
+    def _encrypt_chunk(self, chunk: bytes) -> str:
+        return encrypt(self.password, zlib.compress(chunk, level=9))
+
+    def _decrypt_chunk(self, identifier: str, data: str) -> bytes:
+        """May raise UnableToDecryptRemoteData if the chunk is corrupt"""
+        try:
+            chunk = zlib.decompress(decrypt(self.password, data))
+        except zlib.error as e:
+            raise UnableToDecryptRemoteData(f'Could not decompress chunk {identifier}') from e
+
+        if self._chunk_identifier(chunk) != identifier:
+            raise UnableToDecryptRemoteData(f'Chunk {identifier} has unexpected contents')
+        return chunk
+
+    def get_remote_manifest(self) -> Optional[DeltaManifest]:
+        """May raise:
+        - UnableToDecryptRemoteData if the manifest can't be decrypted with our password
+        - DeserializationError if the manifest has an unexpected format
+        """
+        data = self.remote.get_manifest()
+        if data is None:
+            return None
+
+        try:
+            manifest_data = decrypt(self.password, data).decode()
+        except UnicodeDecodeError as e:  # can happen with a wrong password and valid padding
+            raise UnableToDecryptRemoteData('Could not decrypt the delta manifest') from e
+
+        return DeltaManifest.deserialize(manifest_data)
+
+    def create_manifest(self, path: Path) -> DeltaManifest:
+        chunks, offset = [], 0
+        data_hash = hashlib.sha256()
+        with open(path, 'rb') as src_f:
+            for chunk in iterate_chunks(src_f):
+                data_hash.update(chunk)
+                chunks.append(ChunkInfo(
+                    identifier=self._chunk_identifier(chunk),
+                    offset=offset,
+                    size=len(chunk),
+                ))
+                offset += len(chunk)
+
+        return DeltaManifest(chunks=chunks, data_hash=data_hash.hexdigest())
+
+    def upload(self, path: Path) -> DeltaSyncResult:
+        """Uploads the plaintext DB at path sending only the chunks the remote is missing"""
+        manifest = self.create_manifest(path)
+        missing = self.remote.missing_chunks(list({x.identifier for x in manifest.chunks}))
+        transferred_chunks, transferred_bytes = 0, 0
+        with open(path, 'rb') as src_f:
+            for chunk_info in manifest.chunks:
+                if chunk_info.identifier not in missing:
+                    continue
+
+                src_f.seek(chunk_info.offset)
+                chunk = src_f.read(chunk_info.size)
+                self.remote.put_chunks({chunk_info.identifier: self._encrypt_chunk(chunk)})
+                missing.remove(chunk_info.identifier)  # in case it appears again in the DB
+                transferred_chunks += 1
+                transferred_bytes += chunk_info.size
+
+        # The manifest goes last so that the remote never points to chunks it does not have
+        self.remote.put_manifest(encrypt(self.password, manifest.serialize().encode()))
+        result = DeltaSyncResult(
+            total_chunks=len(manifest.chunks),
+            transferred_chunks=transferred_chunks,
+            transferred_bytes=transferred_bytes,
+        )
+        log.debug(f'Delta upload finished: {result}')
+        return result
+
+    def download(self, target_path: Path, local_path: Optional[Path]) -> Optional[DeltaSyncResult]:
+        """Writes the remote DB to target_path reusing all chunks found in the DB at local_path
+
+        Returns None if there is nothing saved remotely.
+
+        May raise:
+        - UnableToDecryptRemoteData if the remote data can't be decrypted with our
+        password or if the result does not match the remote hash
+        - DeserializationError if the manifest has an unexpected format
+        """
+        manifest = self.get_remote_manifest()
+        if manifest is None:
+            return None
+
+        local_chunks = {}
+        if local_path is not None and local_path.exists():
+            local_chunks = {x.identifier: x for x in self.create_manifest(local_path).chunks}
+
+        to_fetch = list({x.identifier for x in manifest.chunks if x.identifier not in local_chunks})  # noqa: E501
+        fetched = {
+            identifier: self._decrypt_chunk(identifier, data)
+            for identifier, data in self.remote.get_chunks(to_fetch).items()
+        }
+        if len(fetched) != len(to_fetch):
+            raise UnableToDecryptRemoteData(
+                f'Remote is missing {len(to_fetch) - len(fetched)} chunks of the manifest',
+            )
+
+        data_hash = hashlib.sha256()
+        with open(target_path, 'wb') as target_f, ExitStack() as stack:
+            if len(local_chunks) != 0:
+                local_f = stack.enter_context(open(local_path, 'rb'))  # type: ignore  # local_path exists if we have local chunks  # noqa: E501
+            for chunk_info in manifest.chunks:
+                if chunk_info.identifier in fetched:
+                    chunk = fetched[chunk_info.identifier]
+                else:
+                    local_info = local_chunks[chunk_info.identifier]
+                    local_f.seek(local_info.offset)
+                    chunk = local_f.read(local_info.size)
+                data_hash.update(chunk)
+                target_f.write(chunk)
+
+        if data_hash.hexdigest() != manifest.data_hash:
+            target_path.unlink()
+            raise UnableToDecryptRemoteData('Downloaded DB does not match the remote DB hash')
+
+        result = DeltaSyncResult(
+            total_chunks=len(manifest.chunks),
+            transferred_chunks=len(fetched),
+            transferred_bytes=sum(len(x) for x in fetched.values()),
+        )
+        log.debug(f'Delta download finished: {result}')
+        return result
@@ -12,6 +12,7 @@ from rotkehlchen.errors.api import PremiumAuthenticationError, RotkehlchenPermis
 from rotkehlchen.errors.misc import RemoteError, UnableToDecryptRemoteData
 from rotkehlchen.logging import RotkehlchenLogsAdapter
 from rotkehlchen.premium.premium import Premium, PremiumCredentials, premium_create_and_verify
+from rotkehlchen.types import Timestamp
 from rotkehlchen.utils.misc import ts_now
 
 logger = logging.getLogger(__name__)
@@ -32,6 +33,14 @@ class SyncCheckResult(NamedTuple):
     payload: Optional[dict[str, Any]]
 
 
+class LocalDBSignature(NamedTuple):
+    """Cheap to query values that change whenever something is written to the local DB"""
+    connection_id: int  # the connection is replaced on import or password change
+    committed_writes: int  # writes committed through our connection
+    data_version: int  # changes committed by other connections
+    last_write_ts: Timestamp
+
+
 class PremiumSyncManager():
 
     def __init__(
@@ -48,6 +57,24 @@ class PremiumSyncManager():
         self.password = password
         self.premium: Optional[Premium] = None
         self.upload_lock = Semaphore()
+        # Signature of the local DB when it was last known to be in sync with the server
+        self.last_synced_signature: Optional[LocalDBSignature] = None
+        self.upload_checks = 0
+        self.upload_checks_skipped = 0
+
+    def _local_db_signature(self) -> LocalDBSignature:
+        # data_version is per connection and the one of a read connection changes with every
+        # commit of the main connection. So read it with the main one like the writes.
+        with self.data.db.conn.cursor() as cursor:
+            data_version = cursor.execute('PRAGMA data_version').fetchone()[0]
+            last_write_ts = self.data.db.get_setting(cursor=cursor, name='last_write_ts')
+
+        return LocalDBSignature(
+            connection_id=id(self.data.db.conn),
+            committed_writes=self.data.db.conn.committed_writes,
+            data_version=data_version,
+            last_write_ts=last_write_ts,
+        )
 
     def _can_sync_data_from_server(self, new_account: bool) -> SyncCheckResult:
         """
@@ -148,11 +175,25 @@ class PremiumSyncManager():
         with self.upload_lock:
             assert self.premium is not None, 'caller should make sure premium exists'
             log.debug('Starting maybe_upload_data_to_server')
+            self.upload_checks += 1
+            signature = self._local_db_signature()
+            if signature == self.last_synced_signature and not force_upload:
+                # nothing was written since the last time we were in sync with the server
+                self.upload_checks_skipped += 1
+                log.debug(
+                    'upload to server stopped -- no local changes since last sync',
+                    checks=self.upload_checks,
+                    skipped=self.upload_checks_skipped,
+                )
+                return False
+
             try:
                 metadata = self.premium.query_last_data_metadata()
             except (RemoteError, PremiumAuthenticationError) as e:
                 log.debug('upload to server -- fetching metadata error', error=str(e))
                 return False
+            # query again right before exporting since writes may have happened meanwhile
+            signature = self._local_db_signature()
             b64_encoded_data, our_hash = self.data.compress_and_encrypt_db(self.password)
 
             log.debug(
@@ -163,6 +204,7 @@ class PremiumSyncManager():
             if our_hash == metadata.data_hash and not force_upload:
                 log.debug('upload to server stopped -- same hash')
                 # same hash -- no need to upload anything
+                self.last_synced_signature = signature
                 return False
 
             with self.data.db.conn.read_ctx() as cursor:
@@ -200,6 +242,13 @@ class PremiumSyncManager():
             self.last_data_upload_ts = ts_now()
             with self.data.db.user_write() as cursor:
                 self.data.db.set_setting(cursor, name='last_data_upload_ts', value=self.last_data_upload_ts)  # noqa: E501
+            new_signature = self._local_db_signature()
+            if (
+                    new_signature.connection_id == signature.connection_id and
+                    new_signature.data_version == signature.data_version and
+                    new_signature.committed_writes == signature.committed_writes + 1
+            ):  # the only write since the export was saving last_data_upload_ts
+                self.last_synced_signature = new_signature
 
             log.debug('upload to server -- success')
         return True
@@ -6,6 +6,7 @@ import logging.config
 import os
 import time
 from collections import defaultdict
+from functools import partial
 from pathlib import Path
 from types import FunctionType
 from typing import TYPE_CHECKING, Any, DefaultDict, Literal, Optional, Union, cast, overload
@@ -40,13 +41,19 @@ from rotkehlchen.chain.substrate.utils import (
     POLKADOT_NODES_TO_CONNECT_AT_START,
 )
 from rotkehlchen.config import default_data_directory
-from rotkehlchen.constants.misc import ONE, ZERO
+from rotkehlchen.constants.misc import BALANCE_QUERIES_CONCURRENCY, ONE, ZERO
+from rotkehlchen.constants.timing import BALANCE_QUERY_TIMEOUT
 from rotkehlchen.data_handler import DataHandler
 from rotkehlchen.data_import.manager import CSVDataImporter
 from rotkehlchen.data_migrations.manager import DataMigrationManager
+from rotkehlchen.db.drivers.instrumentation import (
+    SQL_INSTRUMENTATION,
+    SQL_INSTRUMENTATION_FILENAME,
+)
 from rotkehlchen.db.filtering import NFTFilterQuery
 from rotkehlchen.db.settings import DBSettings, ModifiableDBSettings
 from rotkehlchen.db.updates import RotkiDataUpdater
+from rotkehlchen.db.warm_assets import DBWarmAssets
 from rotkehlchen.errors.api import PremiumAuthenticationError
 from rotkehlchen.errors.asset import UnknownAsset
 from rotkehlchen.errors.misc import (
@@ -66,6 +73,7 @@ from rotkehlchen.fval import FVal
 from rotkehlchen.globaldb.handler import GlobalDBHandler
 from rotkehlchen.globaldb.manual_price_oracles import ManualCurrentOracle
 from rotkehlchen.globaldb.updates import AssetsUpdater
+from rotkehlchen.greenlets.fanout import FanoutQuery, fanout
 from rotkehlchen.greenlets.manager import GreenletManager
 from rotkehlchen.history.events import EventsHistorian
 from rotkehlchen.history.price import PriceHistorian
@@ -146,6 +154,8 @@ class Rotkehlchen():
         self.rotki_notifier = RotkiNotifier(greenlet_manager=self.greenlet_manager)
         self.msg_aggregator.rotki_notifier = self.rotki_notifier
         self.exchange_manager = ExchangeManager(msg_aggregator=self.msg_aggregator)
+        if self.args.sqlite_instrumentation is True:
+            SQL_INSTRUMENTATION.enable(slow_query_threshold=self.args.sqlite_slow_query_ms / 1000)
         # Initialize the GlobalDBHandler singleton. Has to be initialized BEFORE asset resolver
         globaldb = GlobalDBHandler(
             data_dir=self.data_dir,
@@ -160,6 +170,7 @@ class Rotkehlchen():
             self.data_dir,
             self.msg_aggregator,
             sql_vm_instructions_cb=args.sqlite_instructions,
+            sql_read_connections=args.sqlite_read_connections,
         )
         self.cryptocompare = Cryptocompare(data_directory=self.data_dir, database=None)
         self.coingecko = Coingecko()
@@ -309,6 +320,8 @@ class Rotkehlchen():
             # else let's just continue. User signed in succesfully, but he just
             # has unauthenticable/invalid premium credentials remaining in his DB
 
+        # resolve in bulk the assets that will be needed anyway now that the DB is final
+        DBWarmAssets(self.data.db).load_snapshot()
         with self.data.db.conn.read_ctx() as cursor:
             settings = self.get_settings(cursor)
             self.greenlet_manager.spawn_and_track(
@@ -485,6 +498,7 @@ class Rotkehlchen():
         del self.events_historian
         del self.data_importer
 
+        DBWarmAssets(self.data.db).save_snapshot()
         self.data.logout()
         self.password = ''
         self.cryptocompare.unset_database()
@@ -843,10 +857,55 @@ class Rotkehlchen():
             save_despite_errors=save_despite_errors,
         )
 
+        # All sources are independent so they are queried concurrently. The results are then
+        # processed in the same order as they would have been queried serially.
+        exchanges = list(self.exchange_manager.iterate_exchanges())
+        queries = [FanoutQuery(
+            name=f'{exchange.name} balances',
+            method=partial(exchange.query_balances, ignore_cache=ignore_cache),
+        ) for exchange in exchanges]
+        queries.append(FanoutQuery(
+            name='blockchain balances',
+            method=partial(
+                self.chains_aggregator.query_balances,
+                blockchain=None,
+                ignore_cache=ignore_cache,
+            ),
+        ))
+        # retrieve loopring balances if module is activated
+        loopring = self.chains_aggregator.get_module('loopring')
+        if loopring is not None:
+            queries.append(FanoutQuery(
+                name='loopring balances',
+                method=self.chains_aggregator.get_loopring_balances,
+            ))
+        # retrieve nft balances if module is activated
+        nfts = self.chains_aggregator.get_module('nfts')
+        if nfts is not None:
+            queries.append(FanoutQuery(
+                name='nft balances',
+                method=partial(nfts.get_db_nft_balances, filter_query=NFTFilterQuery.make()),
+            ))
+        results = fanout(
+            queries=queries,
+            pool_size=BALANCE_QUERIES_CONCURRENCY,
+            timeout=BALANCE_QUERY_TIMEOUT,
+        )
+        log.debug(
+            'query_balances per source timings',
+            timings={x.name: round(x.duration, 2) for x in results},
+        )
+        exchange_results = results[:len(exchanges)]
+        blockchain_query_result = results[len(exchanges)]
+        module_results = iter(results[len(exchanges) + 1:])
+
         balances: dict[str, dict[Asset, Balance]] = {}
         problem_free = True
-        for exchange in self.exchange_manager.iterate_exchanges():
-            exchange_balances, error_msg = exchange.query_balances(ignore_cache=ignore_cache)
+        for exchange, exchange_result in zip(exchanges, exchange_results):
+            try:
+                exchange_balances, error_msg = exchange_result.get()
+            except RemoteError as e:  # can only be a timeout
+                exchange_balances, error_msg = None, str(e)
             # If we got an error, disregard that exchange but make sure we don't save data
             if not isinstance(exchange_balances, dict):
                 problem_free = False
@@ -866,10 +925,7 @@ class Rotkehlchen():
 
         liabilities: dict[Asset, Balance]
         try:
-            blockchain_result = self.chains_aggregator.query_balances(
-                blockchain=None,
-                ignore_cache=ignore_cache,
-            )
+            blockchain_result = blockchain_query_result.get()
             if len(blockchain_result.totals.assets) != 0:
                 balances[str(Location.BLOCKCHAIN)] = blockchain_result.totals.assets
             liabilities = blockchain_result.totals.liabilities
@@ -891,10 +947,9 @@ class Rotkehlchen():
             manual_liabilities_as_dict[manual_liability.asset] += manual_liability.value
 
         liabilities = combine_dicts(liabilities, manual_liabilities_as_dict)
-        # retrieve loopring balances if module is activated
-        if self.chains_aggregator.get_module('loopring'):
+        if loopring is not None:
             try:
-                loopring_balances = self.chains_aggregator.get_loopring_balances()
+                loopring_balances = next(module_results).get()
             except RemoteError as e:
                 problem_free = False
                 self.msg_aggregator.add_message(
@@ -905,11 +960,9 @@ class Rotkehlchen():
                 if len(loopring_balances) != 0:
                     balances[str(Location.LOOPRING)] = loopring_balances
 
-        # retrieve nft balances if module is activated
-        nfts = self.chains_aggregator.get_module('nfts')
         if nfts is not None:
             try:
-                nft_mapping = nfts.get_db_nft_balances(filter_query=NFTFilterQuery.make())['entries']  # noqa: E501
+                nft_mapping = next(module_results).get()['entries']
             except RemoteError as e:
                 log.error(
                     f'At balance snapshot NFT balances query failed due to {str(e)}. Error '
@@ -1003,6 +1056,17 @@ class Rotkehlchen():
 
     def set_settings(self, settings: ModifiableDBSettings) -> tuple[bool, str]:
         """Tries to set new settings. Returns True in success or False with message if error"""
+        daily_after, weekly_after = settings.daily_snapshots_after_days, settings.weekly_snapshots_after_days  # noqa: E501
+        if daily_after is not None or weekly_after is not None:  # check against the saved ones
+            with self.data.db.conn.read_ctx() as cursor:
+                db_settings = self.data.db.get_settings(cursor)
+            if daily_after is None:
+                daily_after = db_settings.daily_snapshots_after_days
+            if weekly_after is None:
+                weekly_after = db_settings.weekly_snapshots_after_days
+            if daily_after != 0 and weekly_after != 0 and weekly_after < daily_after:
+                return False, 'Snapshots can only be kept weekly after they are kept daily'
+
         if settings.ksm_rpc_endpoint is not None:
             result, msg = self.chains_aggregator.set_ksm_rpc_endpoint(settings.ksm_rpc_endpoint)
             if not result:
@@ -1099,6 +1163,8 @@ class Rotkehlchen():
 
     def shutdown(self) -> None:
         self.logout()
+        if SQL_INSTRUMENTATION.enabled is True:
+            SQL_INSTRUMENTATION.dump(self.data_dir / SQL_INSTRUMENTATION_FILENAME)
         self.shutdown_event.set()
 
     def create_oracle_cache(
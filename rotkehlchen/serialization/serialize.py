@@ -1,4 +1,7 @@
-from typing import Any, Union
+import math
+from collections.abc import Callable
+from json.encoder import encode_basestring_ascii
+from typing import Any, Final, NoReturn, Optional, Union
 
 from hexbytes import HexBytes
 from web3.datastructures import AttributeDict
@@ -74,125 +77,165 @@ from rotkehlchen.types import (
 from rotkehlchen.utils.version_check import VersionCheckResult
 
 
+def _serialize_location_data(entry: LocationData) -> dict[str, Any]:
+    return {
+        'time': entry.time,
+        'location': str(Location.deserialize_from_db(entry.location)),
+        'usd_value': entry.usd_value,
+    }
+
+
+def _serialize_single_db_asset_balance(entry: SingleDBAssetBalance) -> dict[str, Any]:
+    return {
+        'time': entry.time,
+        'category': str(entry.category),
+        'amount': str(entry.amount),
+        'usd_value': str(entry.usd_value),
+    }
+
+
+def _serialize_db_asset_balance(entry: DBAssetBalance) -> dict[str, Any]:
+    return {
+        'time': entry.time,
+        'category': str(entry.category),
+        'asset': entry.asset.identifier,
+        'amount': str(entry.amount),
+        'usd_value': str(entry.usd_value),
+    }
+
+
+def _serialize_plain_tuple(entry: tuple) -> NoReturn:
+    raise ValueError('Query results should not contain plain tuples')
+
+
+# Markers for the containers whose entries get processed one by one
+_LIST: Final = 'list'
+_DICT: Final = 'dict'
+
+# How each type is processed. The first row whose types an entry is an instance of
+# decides, so the order matters for types that inherit from more than one of them.
+# The boolean says if what the converter returns needs to be processed further.
+# Entries of any other type are returned as they are.
+_HANDLERS: Final[tuple[tuple[tuple[type, ...], Union[str, Callable[[Any], Any]], bool], ...]] = (  # noqa: E501
+    ((FVal,), str, False),
+    ((list,), _LIST, True),
+    ((dict, AttributeDict), _DICT, True),
+    ((HexBytes,), HexBytes.hex, False),
+    ((LocationData,), _serialize_location_data, False),
+    ((SingleDBAssetBalance,), _serialize_single_db_asset_balance, False),
+    ((DBAssetBalance,), _serialize_db_asset_balance, False),
+    ((
+        AddressbookEntry,
+        AssetBalance,
+        DefiProtocol,
+        MakerdaoVault,
+        XpubData,
+        Eth2Deposit,
+        StakingEvent,
+        NodeName,
+        ChainID,
+        SingleBlockchainAccountData,
+        SupportedBlockchain,
+    ), lambda x: x.serialize(), False),
+    ((
+        Trade,
+        EvmTransaction,
+        DSRAccountReport,
+        Balance,
+        AaveLendingBalance,
+        AaveBorrowingBalance,
+        CompoundBalance,
+        YearnVaultEvent,
+        YearnVaultBalance,
+        AaveEvent,
+        UniswapPool,
+        UniswapPoolAsset,
+        UniswapPoolEventsBalance,
+        BalancerBPTEventPoolToken,
+        BalancerEvent,
+        BalancerPoolEventsBalance,
+        BalancerPoolBalance,
+        BalancerPoolTokenBalance,
+        ManuallyTrackedBalanceWithValue,
+        Trove,
+        DillBalance,
+        NFTResult,
+        ExchangeLocationID,
+        WeightedNode,
+    ), lambda x: x.serialize(), True),
+    ((
+        DBSettings,
+        CompoundEvent,
+        VersionCheckResult,
+        DSRCurrentBalances,
+        VaultEvent,
+        MakerdaoVaultDetails,
+        AaveBalances,
+        AaveHistory,
+        DefiBalance,
+        DefiProtocolBalances,
+        YearnVaultHistory,
+        BlockchainAccountData,
+    ), lambda x: x._asdict(), True),
+    ((tuple,), _serialize_plain_tuple, False),
+    ((Asset,), lambda x: x.identifier, False),
+    ((
+        TradeType,
+        Location,
+        KrakenAccountType,
+        VaultEventType,
+        AssetMovementCategory,
+        CurrentPriceOracle,
+        HistoricalPriceOracle,
+        LedgerActionType,
+        BalanceType,
+        CostBasisMethod,
+        EvmTokenKind,
+    ), str, False),
+)
+# Handler of each type that has been processed so far. None if the type is returned as is
+_handlers_cache: dict[type, Optional[tuple[Union[str, Callable[[Any], Any]], bool]]] = {}
+# Json encoder of each type that has been serialized to json so far
+_json_encoders: dict[type, Callable[[Any], str]] = {}
+# Same for the encoding without processing of what the converters return
+_plain_json_encoders: dict[type, Callable[[Any], str]] = {}
+
+
+def _find_handler(entry_type: type) -> Optional[tuple[Union[str, Callable[[Any], Any]], bool]]:
+    """Returns how entries of the given type are processed. Only walks the handlers
+    the first time a type is seen. After that it's a dict lookup."""
+    try:
+        return _handlers_cache[entry_type]
+    except KeyError:
+        pass
+
+    handler = None
+    for types, converter, process_further in _HANDLERS:
+        if issubclass(entry_type, types):
+            handler = (converter, process_further)
+            break
+
+    _handlers_cache[entry_type] = handler
+    return handler
+
+
 def _process_entry(entry: Any) -> Union[str, list[Any], dict[str, Any], Any]:
-    if isinstance(entry, FVal):
-        return str(entry)
-    if isinstance(entry, list):
-        new_list = []
-        for new_entry in entry:
-            new_list.append(_process_entry(new_entry))
-        return new_list
-    if isinstance(entry, (dict, AttributeDict)):
+    if (handler := _find_handler(type(entry))) is None:
+        return entry
+
+    converter, process_further = handler
+    if converter is _LIST:
+        return [_process_entry(x) for x in entry]
+    if converter is _DICT:
         new_dict = {}
         for k, v in entry.items():
             if isinstance(k, Asset):
                 k = k.identifier
             new_dict[k] = _process_entry(v)
         return new_dict
-    if isinstance(entry, HexBytes):
-        return entry.hex()
-    if isinstance(entry, LocationData):
-        return {
-            'time': entry.time,
-            'location': str(Location.deserialize_from_db(entry.location)),
-            'usd_value': entry.usd_value,
-        }
-    if isinstance(entry, SingleDBAssetBalance):
-        return {
-            'time': entry.time,
-            'category': str(entry.category),
-            'amount': str(entry.amount),
-            'usd_value': str(entry.usd_value),
-        }
-    if isinstance(entry, DBAssetBalance):
-        return {
-            'time': entry.time,
-            'category': str(entry.category),
-            'asset': entry.asset.identifier,
-            'amount': str(entry.amount),
-            'usd_value': str(entry.usd_value),
-        }
-    if isinstance(entry, (
-            AddressbookEntry,
-            AssetBalance,
-            DefiProtocol,
-            MakerdaoVault,
-            XpubData,
-            Eth2Deposit,
-            StakingEvent,
-            NodeName,
-            NodeName,
-            ChainID,
-            SingleBlockchainAccountData,
-            SupportedBlockchain,
-    )):
-        return entry.serialize()
-    if isinstance(entry, (
-            Trade,
-            EvmTransaction,
-            MakerdaoVault,
-            DSRAccountReport,
-            Balance,
-            AaveLendingBalance,
-            AaveBorrowingBalance,
-            CompoundBalance,
-            YearnVaultEvent,
-            YearnVaultBalance,
-            AaveEvent,
-            UniswapPool,
-            UniswapPoolAsset,
-            UniswapPoolEventsBalance,
-            BalancerBPTEventPoolToken,
-            BalancerEvent,
-            BalancerPoolEventsBalance,
-            BalancerPoolBalance,
-            BalancerPoolTokenBalance,
-            ManuallyTrackedBalanceWithValue,
-            Trove,
-            DillBalance,
-            NFTResult,
-            ExchangeLocationID,
-            WeightedNode,
-    )):
-        return process_result(entry.serialize())
-    if isinstance(entry, (
-            DBSettings,
-            CompoundEvent,
-            VersionCheckResult,
-            DBSettings,
-            DSRCurrentBalances,
-            VaultEvent,
-            MakerdaoVaultDetails,
-            AaveBalances,
-            AaveHistory,
-            DefiBalance,
-            DefiProtocolBalances,
-            YearnVaultHistory,
-            BlockchainAccountData,
-    )):
-        return process_result(entry._asdict())
-    if isinstance(entry, tuple):
-        raise ValueError('Query results should not contain plain tuples')
-    if isinstance(entry, Asset):
-        return entry.identifier
-    if isinstance(entry, (
-            TradeType,
-            Location,
-            KrakenAccountType,
-            Location,
-            VaultEventType,
-            AssetMovementCategory,
-            CurrentPriceOracle,
-            HistoricalPriceOracle,
-            LedgerActionType,
-            BalanceType,
-            CostBasisMethod,
-            EvmTokenKind,
-    )):
-        return str(entry)
-
-    # else
-    return entry
+
+    converted = converter(entry)  # type: ignore  # can only be a callable here
+    return _process_entry(converted) if process_further else converted
 
 
 def process_result(result: Any) -> dict[Any, Any]:
@@ -216,3 +259,157 @@ def process_result_list(result: list[Any]) -> list[Any]:
     processed_result = _process_entry(result)
     assert isinstance(processed_result, list)  # pylint: disable=isinstance-second-argument-not-valid-type  # noqa: E501
     return processed_result
+
+
+def _encode_float(value: float) -> str:
+    """Same as the json module does it"""
+    if value != value:  # pylint: disable=comparison-with-itself
+        return 'NaN'
+    if value == math.inf:
+        return 'Infinity'
+    if value == -math.inf:
+        return '-Infinity'
+    return float.__repr__(value)
+
+
+def _encode_null(value: None) -> str:
+    return 'null'
+
+
+def _encode_bool(value: bool) -> str:
+    return 'true' if value else 'false'
+
+
+def _encode_int(value: int) -> str:
+    return int.__repr__(value)  # not str() so that int enums are encoded as numbers
+
+
+def _encode_key(key: Any) -> str:
+    """Encodes a dict key the way the json module does"""
+    if isinstance(key, str):
+        return encode_basestring_ascii(key)
+    if isinstance(key, float):
+        return f'"{_encode_float(key)}"'
+    if key is True or key is False:
+        return f'"{_encode_bool(key)}"'
+    if key is None:
+        return '"null"'
+    if isinstance(key, int):
+        return f'"{int.__repr__(key)}"'
+    raise TypeError(f'keys must be str, int, float, bool or None, not {key.__class__.__name__}')  # noqa: E501
+
+
+def _encode_entry(entry: Any) -> str:
+    if (encoder := _json_encoders.get(type(entry))) is None:
+        encoder = _find_json_encoder(type(entry))
+    return encoder(entry)
+
+
+def _encode_list(entry: list[Any]) -> str:
+    get_encoder = _json_encoders.get
+    return '[' + ', '.join([
+        (get_encoder(type(x)) or _find_json_encoder(type(x)))(x) for x in entry
+    ]) + ']'
+
+
+def _encode_dict(entry: dict[Any, Any]) -> str:
+    get_encoder = _json_encoders.get
+    return '{' + ', '.join([
+        f'{encode_basestring_ascii(k) if type(k) is str else _encode_key(k.identifier if isinstance(k, Asset) else k)}: '  # noqa: E501
+        f'{(get_encoder(type(v)) or _find_json_encoder(type(v)))(v)}'
+        for k, v in entry.items()
+    ]) + '}'
+
+
+def _encode_plain_list(entry: Union[list[Any], tuple[Any, ...]]) -> str:
+    get_encoder = _plain_json_encoders.get
+    return '[' + ', '.join([
+        (get_encoder(type(x)) or _find_plain_json_encoder(type(x)))(x) for x in entry
+    ]) + ']'
+
+
+def _encode_plain_dict(entry: dict[Any, Any]) -> str:
+    get_encoder = _plain_json_encoders.get
+    return '{' + ', '.join([
+        f'{encode_basestring_ascii(k) if type(k) is str else _encode_key(k)}: '
+        f'{(get_encoder(type(v)) or _find_plain_json_encoder(type(v)))(v)}'
+        for k, v in entry.items()
+    ]) + '}'
+
+
+def _encode_not_serializable(entry: Any) -> NoReturn:
+    raise TypeError(f'Object of type {entry.__class__.__name__} is not JSON serializable')
+
+
+def _find_native_json_encoder(entry_type: type) -> Callable[[Any], str]:
+    """Encoders of the types that the json module serializes, other than containers"""
+    if entry_type is type(None):
+        return _encode_null
+    if entry_type is bool:
+        return _encode_bool
+    if issubclass(entry_type, str):
+        return encode_basestring_ascii
+    if issubclass(entry_type, int):
+        return _encode_int
+    if issubclass(entry_type, float):
+        return _encode_float
+    return _encode_not_serializable
+
+
+def _find_plain_json_encoder(entry_type: type) -> Callable[[Any], str]:
+    """Returns the function encoding entries of the given type as json.dumps does,
+    without processing them. Used for what the converters return."""
+    encoder: Callable[[Any], str]
+    if issubclass(entry_type, (list, tuple)):
+        encoder = _encode_plain_list
+    elif issubclass(entry_type, dict):
+        encoder = _encode_plain_dict
+    else:
+        encoder = _find_native_json_encoder(entry_type)
+
+    _plain_json_encoders[entry_type] = encoder
+    return encoder
+
+
+def _make_converter_encoder(
+        converter: Callable[[Any], Any],
+        process_further: bool,
+) -> Callable[[Any], str]:
+    if process_further:
+        return lambda entry: _encode_entry(converter(entry))
+
+    def encode_converted(entry: Any) -> str:
+        converted = converter(entry)
+        if (encoder := _plain_json_encoders.get(type(converted))) is None:
+            encoder = _find_plain_json_encoder(type(converted))
+        return encoder(converted)
+    return encode_converted
+
+
+def _find_json_encoder(entry_type: type) -> Callable[[Any], str]:
+    """Returns the function encoding entries of the given type, following the same
+    rules as process_result and then json.dumps"""
+    handler = _find_handler(entry_type)
+    encoder: Callable[[Any], str]
+    if handler is not None:
+        converter, process_further = handler
+        if converter is _LIST:
+            encoder = _encode_list
+        elif converter is _DICT:
+            encoder = _encode_dict
+        else:
+            encoder = _make_converter_encoder(converter, process_further)  # type: ignore  # can only be a callable here  # noqa: E501
+    else:
+        encoder = _find_native_json_encoder(entry_type)
+
+    _json_encoders[entry_type] = encoder
+    return encoder
+
+
+def process_result_to_json(result: Any) -> str:
+    """Returns the same as json.dumps(process_result(result)) but in a single pass.
+
+    Entries are encoded to json while they are processed, dispatching on their type,
+    so the processed copy of the whole result is never created.
+    """
+    return _encode_entry(result)
@@ -16,7 +16,11 @@ from rotkehlchen.chain.ethereum.modules.makerdao.cache import (
 from rotkehlchen.chain.ethereum.modules.yearn.utils import query_yearn_vaults
 from rotkehlchen.chain.ethereum.utils import should_update_protocol_cache
 from rotkehlchen.constants.assets import A_USD
-from rotkehlchen.constants.timing import DATA_UPDATES_REFRESH, EVM_ACCOUNTS_DETECTION_REFRESH
+from rotkehlchen.constants.timing import (
+    DATA_UPDATES_REFRESH,
+    EVM_ACCOUNTS_DETECTION_REFRESH,
+    SNAPSHOTS_COMPACTION_REFRESH,
+)
 from rotkehlchen.db.evmtx import DBEvmTx
 from rotkehlchen.db.filtering import (
     DBEqualsFilter,
@@ -25,6 +29,7 @@ from rotkehlchen.db.filtering import (
     HistoryEventFilterQuery,
 )
 from rotkehlchen.db.history_events import DBHistoryEvents
+from rotkehlchen.db.timeseries import LAST_SNAPSHOTS_COMPACTION_KEY, compact_snapshots
 from rotkehlchen.db.updates import LAST_DATA_UPDATES_KEY
 from rotkehlchen.errors.api import PremiumAuthenticationError
 from rotkehlchen.errors.asset import UnknownAsset, WrongAssetType
@@ -151,6 +156,7 @@ class TaskManager():
             self._maybe_update_yearn_vaults,
             self._maybe_detect_evm_accounts,
             self._maybe_update_ilk_cache,
+            self._maybe_compact_snapshots,
         ]
         if self.premium_sync_manager is not None:
             self.potential_tasks.append(self._maybe_schedule_db_upload)
@@ -458,9 +464,11 @@ class TaskManager():
             usd_value = amount * price
             updates.append((str(usd_value), identifier))
 
-        query = 'UPDATE history_events SET usd_value=? WHERE rowid=?'
-        with self.database.user_write() as cursor:
-            cursor.executemany(query, updates)
+        with self.database.user_write() as write_cursor:
+            DBHistoryEvents(self.database).set_history_events_usd_values(
+                write_cursor=write_cursor,
+                updates=updates,
+            )
 
     def _maybe_decode_evm_transactions(self) -> Optional[list[gevent.Greenlet]]:
         """Schedules the evm transaction decoding task
@@ -631,6 +639,27 @@ class TaskManager():
             method=self.chains_aggregator.detect_evm_accounts,
         )]
 
+    def _maybe_compact_snapshots(self) -> Optional[list[gevent.Greenlet]]:
+        """
+        Function that schedules the compaction of the old balance snapshots if the user
+        has enabled it and there has been more than SNAPSHOTS_COMPACTION_REFRESH seconds
+        since the last time it ran.
+        """
+        with self.database.conn.read_ctx() as cursor:
+            settings = self.database.get_settings(cursor)
+        if settings.daily_snapshots_after_days == 0 and settings.weekly_snapshots_after_days == 0:  # noqa: E501
+            return None
+        if should_run_periodic_task(self.database, LAST_SNAPSHOTS_COMPACTION_KEY, SNAPSHOTS_COMPACTION_REFRESH) is False:  # noqa: E501
+            return None
+
+        return [self.greenlet_manager.spawn_and_track(
+            after_seconds=None,
+            task_name='Compact balance snapshots',
+            exception_is_error=True,
+            method=compact_snapshots,
+            database=self.database,
+        )]
+
     def _maybe_update_ilk_cache(self) -> Optional[list[gevent.Greenlet]]:
         if should_update_protocol_cache(GeneralCacheType.MAKERDAO_VAULT_ILK, 'ETH-A') is True:
             return [self.greenlet_manager.spawn_and_track(
@@ -9,7 +9,7 @@ if TYPE_CHECKING:
 
 def should_run_periodic_task(
         database: 'DBHandler',
-        key_name: Literal['last_data_updates_ts', 'last_evm_accounts_detect_ts'],
+        key_name: Literal['last_data_updates_ts', 'last_evm_accounts_detect_ts', 'last_snapshots_compaction_ts'],  # noqa: E501
         refresh_period: int,
 ) -> bool:
     """
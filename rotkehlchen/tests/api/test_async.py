@@ -144,3 +144,46 @@ def test_query_async_task_that_died(rotkehlchen_api_server_with_exchanges):
     assert result['outcome']['result'] is None
     msg = 'The backend query task died unexpectedly: BOOM!'
     assert result['outcome']['message'] == msg
+
+
+@pytest.mark.parametrize('added_exchanges', [(Location.BINANCE,)])
+def test_deduplicated_async_tasks(rotkehlchen_api_server_with_exchanges, websocket_connection):
+    """Test that identical async queries are served by a single task, that each of them
+    gets its own task id and outcome and that their completion is pushed via websockets"""
+    server = rotkehlchen_api_server_with_exchanges
+    binance = try_get_first_exchange(server.rest_api.rotkehlchen.exchange_manager, Location.BINANCE)  # noqa: E501
+
+    def mock_slow_binance_response(url, **kwargs):
+        gevent.sleep(0.5)
+        return mock_binance_balance_response(url, **kwargs)
+
+    binance_patch = patch.object(binance.session, 'get', side_effect=mock_slow_binance_response)
+    with binance_patch:
+        task_ids = []
+        for _ in range(2):
+            response = requests.get(api_url_for(
+                server,
+                'named_exchanges_balances_resource',
+                location='binance',
+            ), json={'async_query': True, 'ignore_cache': True})
+            task_ids.append(assert_ok_async_response(response))
+
+        assert task_ids[0] != task_ids[1]
+        assert len(server.rest_api.rotkehlchen.api_task_greenlets) == 1
+        websocket_connection.wait_until_messages_num(num=2, timeout=10)
+
+    for task_id in task_ids:
+        msg = websocket_connection.pop_message()
+        assert msg == {'type': 'async_task_status', 'data': {'task_id': task_id, 'status': 'completed'}}  # noqa: E501
+
+    outcomes = []
+    for task_id in task_ids:
+        response = requests.get(
+            api_url_for(server, 'specific_async_tasks_resource', task_id=task_id),
+        )
+        result = assert_proper_response_with_result(response)
+        assert result['status'] == 'completed'
+        outcomes.append(result['outcome'])
+    assert outcomes[0] == outcomes[1]
+    assert outcomes[0]['result'] is not None
+    assert len(server.rest_api.rotkehlchen.api_task_greenlets) == 0
@@ -3,6 +3,7 @@ import shutil
 from http import HTTPStatus
 from pathlib import Path
 from tempfile import TemporaryDirectory
+from unittest.mock import patch
 
 import pytest
 import requests
@@ -490,6 +491,33 @@ def test_data_import_rotki_generic_trades(rotkehlchen_api_server):
     assert_rotki_generic_trades_import_results(rotki)
 
 
+def test_data_import_in_batches(rotkehlchen_api_server, websocket_connection):
+    """Test that the imported entries are written in batches and that the progress
+    of each batch is reported via websockets"""
+    rotki = rotkehlchen_api_server.rest_api.rotkehlchen
+    dir_path = Path(__file__).resolve().parent.parent
+    filepath = dir_path / 'data' / 'rotki_generic_trades.csv'
+
+    json_data = {'source': 'rotki_trades', 'file': str(filepath)}
+    with patch('rotkehlchen.data_import.utils.ITEMS_PER_DB_WRITE', new=2):
+        response = requests.put(
+            api_url_for(
+                rotkehlchen_api_server,
+                'dataimportresource',
+            ), json=json_data,
+        )
+    assert assert_proper_response_with_result(response) is True
+    assert_rotki_generic_trades_import_results(rotki)
+
+    websocket_connection.wait_until_messages_num(num=3, timeout=10)
+    for processed_entries in (2, 4, 5):
+        assert websocket_connection.pop_message() == {
+            'type': 'csv_import_progress',
+            'data': {'source': 'rotki_trades', 'processed_entries': processed_entries},
+        }
+    assert websocket_connection.messages_num() == 0
+
+
 def test_data_import_rotki_generic_events(rotkehlchen_api_server):
     """Test that data import works for rotki generic events import csv file."""
     rotki = rotkehlchen_api_server.rest_api.rotkehlchen
@@ -6,6 +6,7 @@ from pathlib import Path
 import pytest
 import requests
 
+from rotkehlchen.db.drivers.instrumentation import SQL_INSTRUMENTATION
 from rotkehlchen.db.settings import ROTKEHLCHEN_DB_VERSION
 from rotkehlchen.tests.utils.api import (
     api_url_for,
@@ -159,3 +160,36 @@ def test_delete_download_backup_errors(rotkehlchen_api_server, data_dir, usernam
     )
     assert undeletable_file.exists()
     assert filepath.exists()
+
+
+def test_sql_instrumentation(rotkehlchen_api_server):
+    """Test that the SQL instrumentation can be queried and reset if it's enabled"""
+    response = requests.get(api_url_for(rotkehlchen_api_server, 'sqlinstrumentationresource'))
+    assert_error_response(
+        response=response,
+        contained_in_msg='SQL instrumentation is not enabled',
+        status_code=HTTPStatus.CONFLICT,
+    )
+
+    SQL_INSTRUMENTATION.enable(slow_query_threshold=0)
+    try:
+        assert_proper_response_with_result(
+            requests.get(api_url_for(rotkehlchen_api_server, 'settingsresource')),
+        )
+        response = requests.get(api_url_for(rotkehlchen_api_server, 'sqlinstrumentationresource'))  # noqa: E501
+        result = assert_proper_response_with_result(response)
+        settings_query = next(
+            x for x in result['statements']
+            if x['database'] == 'user' and x['statement'] == 'SELECT name, value FROM settings;'
+        )
+        assert settings_query['count'] >= 1
+        assert settings_query['rows'] >= 1
+        assert result['slow_queries'] == []
+
+        assert_simple_ok_response(requests.delete(
+            api_url_for(rotkehlchen_api_server, 'sqlinstrumentationresource'),
+        ))
+        assert SQL_INSTRUMENTATION.statements == {}
+    finally:
+        SQL_INSTRUMENTATION.disable()
+        SQL_INSTRUMENTATION.reset()
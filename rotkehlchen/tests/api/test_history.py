@@ -281,6 +281,16 @@ def test_query_pnl_report_events_pagination_filtering(
     )
     events_result = assert_proper_response_with_result(response)
     master_events = events_result['entries']
+    streamed_response = requests.post(
+        api_url_for(
+            rotkehlchen_api_server_with_exchanges,
+            'per_report_data_resource',
+            report_id=report_id,
+        ),
+        json={'stream': True},
+    )
+    assert streamed_response.status_code == HTTPStatus.OK
+    assert streamed_response.content == response.content
 
     events = []
     for offset in (0, 10, 20, 30, 40):
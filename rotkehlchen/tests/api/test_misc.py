@@ -41,6 +41,7 @@ def generate_expected_info(
             'max_logfiles_num': 3,
             'max_size_in_mb_all_logs': 300,
             'sqlite_instructions': 5000,
+            'sqlite_read_connections': 0,
         },
     }
     return result
@@ -381,6 +382,7 @@ def test_configuration(rotkehlchen_api_server):
     assert result['max_logfiles_num']['value'] == DEFAULT_MAX_LOG_BACKUP_FILES
     assert result['sqlite_instructions']['is_default'] is True
     assert result['sqlite_instructions']['value'] == DEFAULT_SQL_VM_INSTRUCTIONS_CB
+    assert result['sqlite_read_connections'] == {'value': 0, 'is_default': True}
 
 
 def test_query_supported_chains(rotkehlchen_api_server):
@@ -403,3 +405,29 @@ def test_query_supported_chains(rotkehlchen_api_server):
                 break  # found
         else:  # internal for loop found nothing
             raise AssertionError(f'Did not find {entry} in the supported chains result')
+
+
+def test_request_metrics(rotkehlchen_api_server):
+    """Test that the latency and payload sizes of the requests are recorded per endpoint"""
+    for _ in range(3):
+        assert_proper_response(requests.get(api_url_for(rotkehlchen_api_server, 'pingresource')))
+    assert_proper_response_with_result(
+        requests.get(api_url_for(rotkehlchen_api_server, 'specific_async_tasks_resource', task_id=42)),  # noqa: E501
+        message='No task with id 42 found',
+        status_code=HTTPStatus.NOT_FOUND,
+    )
+
+    response = requests.get(api_url_for(rotkehlchen_api_server, 'requestmetricsresource'))
+    result = assert_proper_response_with_result(response)
+    metrics = {(x['endpoint'], x['method']): x for x in result}
+    ping_metrics = metrics[('/api/1/ping', 'GET')]
+    assert ping_metrics['count'] == 3
+    assert sum(ping_metrics['latency_histogram'].values()) == 3
+    assert ping_metrics['max_time'] <= ping_metrics['total_time']
+    assert ping_metrics['response_bytes'] == 3 * ping_metrics['max_response_bytes'] > 0
+    assert metrics[('/api/1/tasks/<int:task_id>', 'GET')]['count'] == 1
+
+    assert_proper_response(requests.delete(
+        api_url_for(rotkehlchen_api_server, 'requestmetricsresource'),
+    ))
+    assert rotkehlchen_api_server.rest_api.request_metrics.endpoints == {}
@@ -420,6 +420,18 @@ def test_set_settings_errors(rotkehlchen_api_server):
         status_code=HTTPStatus.BAD_REQUEST,
     )
 
+    # snapshots kept weekly before the saved daily tier
+    data = {'settings': {'daily_snapshots_after_days': 30}}
+    response = requests.put(api_url_for(rotkehlchen_api_server, 'settingsresource'), json=data)
+    assert_proper_response(response)
+    data = {'settings': {'weekly_snapshots_after_days': 10}}
+    response = requests.put(api_url_for(rotkehlchen_api_server, 'settingsresource'), json=data)
+    assert_error_response(
+        response=response,
+        contained_in_msg='Snapshots can only be kept weekly after they are kept daily',
+        status_code=HTTPStatus.CONFLICT,
+    )
+
 
 def assert_queried_addresses_match(
         result: dict[ModuleName, list[ChecksumEvmAddress]],
@@ -1,3 +1,4 @@
+from dataclasses import replace
 from http import HTTPStatus
 from typing import Any
 
@@ -95,6 +96,16 @@ def test_query_trades(rotkehlchen_api_server_with_exchanges, start_with_valid_pr
             ) + '?location=binance',
         )
     assert_okay(response)
+    # A streamed response has the same body
+    with setup.binance_patch, setup.polo_patch:
+        streamed_response = requests.get(
+            api_url_for(
+                rotkehlchen_api_server_with_exchanges,
+                'tradesresource',
+            ) + '?location=binance&stream=true',
+        )
+    assert streamed_response.status_code == HTTPStatus.OK
+    assert streamed_response.content == response.content
 
     # Now filter by time
     with setup.binance_patch, setup.polo_patch:
@@ -272,6 +283,18 @@ def test_query_trades_errors(rotkehlchen_api_server_with_exchanges):
         contained_in_msg='Failed to deserialize Location value foo',
         status_code=HTTPStatus.BAD_REQUEST,
     )
+    # Test that a response can't be streamed for an async query
+    response = requests.get(
+        api_url_for(
+            rotkehlchen_api_server_with_exchanges,
+            'tradesresource',
+        ), json={'stream': True, 'async_query': True},
+    )
+    assert_error_response(
+        response=response,
+        contained_in_msg='A response can not be streamed for an async query',
+        status_code=HTTPStatus.BAD_REQUEST,
+    )
 
 
 @pytest.mark.parametrize('start_with_valid_premium', [False, True])
@@ -1246,3 +1269,66 @@ def test_ignoring_trades_with_pagination(rotkehlchen_api_server):
     assert len(result['entries']) == 7
     assert result['entries_found'] == 10
     assert result['entries_total'] == len(trades)
+
+
+def test_query_trades_with_continuation_token(rotkehlchen_api_server):
+    """Test that trades can be paginated with continuation tokens and that the counts of
+    the first page are reused by the following pages"""
+    rotki = rotkehlchen_api_server.rest_api.rotkehlchen
+    trades = [Trade(
+        timestamp=Timestamp(1600000000 + x // 3),  # make sure timestamps are not unique
+        location=Location.EXTERNAL,
+        base_asset=A_BTC,
+        quote_asset=A_EUR,
+        trade_type=TradeType.BUY,
+        amount=AssetAmount(FVal(x + 1)),
+        rate=Price(ONE),
+        fee=Fee(ZERO),
+        fee_currency=A_EUR,
+        link='',
+        notes='') for x in range(25)
+    ]
+    with rotki.data.db.user_write() as cursor:
+        rotki.data.db.add_trades(cursor, trades)
+
+    request_data: dict[str, Any] = {'only_cache': True, 'limit': 10, 'offset': 0}
+    returned_ids: list[str] = []
+    pages = 0
+    while True:
+        response = requests.get(
+            api_url_for(rotkehlchen_api_server, 'tradesresource'),
+            json=request_data,
+        )
+        result = assert_proper_response_with_result(response)
+        pages += 1
+        returned_ids.extend(entry['entry']['trade_id'] for entry in result['entries'])
+        assert result['entries_found'] == 25
+        assert result['entries_total'] == 25
+        if result['next_continuation_token'] is None:
+            break
+
+        request_data = {
+            'only_cache': True,
+            'limit': 10,
+            'continuation_token': result['next_continuation_token'],
+        }
+        if pages == 1:  # a newer trade is not in the next pages and is not counted by them
+            with rotki.data.db.user_write() as cursor:
+                rotki.data.db.add_trades(cursor, [replace(trades[0], timestamp=Timestamp(1700000000))])  # noqa: E501
+
+    assert pages == 3
+    expected_ids = [
+        trade.identifier for trade in
+        sorted(trades, key=lambda x: (x.timestamp, x.identifier), reverse=True)
+    ]
+    assert returned_ids == expected_ids
+
+    response = requests.get(
+        api_url_for(rotkehlchen_api_server, 'tradesresource'),
+        json={**request_data, 'offset': 10},
+    )
+    assert_error_response(
+        response=response,
+        contained_in_msg='continuation_token has to be given with a limit and without an offset',
+        status_code=HTTPStatus.BAD_REQUEST,
+    )
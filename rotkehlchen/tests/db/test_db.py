@@ -28,6 +28,7 @@ from rotkehlchen.db.settings import (
     DEFAULT_BTC_DERIVATION_GAP_LIMIT,
     DEFAULT_CALCULATE_PAST_COST_BASIS,
     DEFAULT_CURRENT_PRICE_ORACLES,
+    DEFAULT_DAILY_SNAPSHOTS_AFTER_DAYS,
     DEFAULT_DATE_DISPLAY_FORMAT,
     DEFAULT_DISPLAY_DATE_IN_LOCALTIME,
     DEFAULT_ETH_STAKING_TAXABLE_AFTER_WITHDRAWAL_ENABLED,
@@ -42,6 +43,7 @@ from rotkehlchen.db.settings import (
     DEFAULT_TAXABLE_LEDGER_ACTIONS,
     DEFAULT_TREAT_ETH2_AS_ETH,
     DEFAULT_UI_FLOATING_PRECISION,
+    DEFAULT_WEEKLY_SNAPSHOTS_AFTER_DAYS,
     ROTKEHLCHEN_DB_VERSION,
     DBSettings,
     ModifiableDBSettings,
@@ -111,6 +113,7 @@ TABLES_AT_INIT = [
     'location',
     'settings',
     'used_query_ranges',
+    'used_query_range_gaps',
     'margin_positions',
     'asset_movements',
     'tag_mappings',
@@ -129,6 +132,7 @@ TABLES_AT_INIT = [
     'nfts',
     'history_events',
     'history_events_mappings',
+    'history_events_value_stats',
     'ens_mappings',
     'address_book',
     'rpc_nodes',
@@ -380,6 +384,8 @@ def test_writing_fetching_data(data_dir, username, sql_vm_instructions_cb):
         'treat_eth2_as_eth': DEFAULT_TREAT_ETH2_AS_ETH,
         'eth_staking_taxable_after_withdrawal_enabled': DEFAULT_ETH_STAKING_TAXABLE_AFTER_WITHDRAWAL_ENABLED,  # noqa: E501
         'address_name_priority': DEFAULT_ADDRESS_NAME_PRIORITY,
+        'daily_snapshots_after_days': DEFAULT_DAILY_SNAPSHOTS_AFTER_DAYS,
+        'weekly_snapshots_after_days': DEFAULT_WEEKLY_SNAPSHOTS_AFTER_DAYS,
     }
     assert len(expected_dict) == len(DBSettings()), 'One or more settings are missing'
 
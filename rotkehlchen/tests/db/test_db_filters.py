@@ -6,10 +6,14 @@ from rotkehlchen.db.filtering import (
     DBFilterOrder,
     DBFilterPagination,
     DBFilterQuery,
+    DBKeysetCursor,
     DBLocationFilter,
     DBTimestampFilter,
     EvmTransactionsFilterQuery,
+    FilterWithKeyset,
+    TradesFilterQuery,
 )
+from rotkehlchen.errors.serialization import DeserializationError
 from rotkehlchen.tests.utils.factories import make_evm_address
 from rotkehlchen.types import Location, Timestamp
 
@@ -24,7 +28,7 @@ def test_ethereum_transaction_filter():
         to_ts=Timestamp(999),
     )
     query, bindings = filter_query.prepare()
-    assert query == ' INNER JOIN evmtx_address_mappings WHERE evm_transactions.tx_hash=evmtx_address_mappings.tx_hash AND ((evmtx_address_mappings.address = ?))  AND ((timestamp >= ? AND timestamp <= ?)) ORDER BY timestamp ASC LIMIT 10 OFFSET 10'  # noqa: E501
+    assert query == ' INNER JOIN evmtx_address_mappings WHERE evm_transactions.tx_hash=evmtx_address_mappings.tx_hash AND ((evmtx_address_mappings.address = ?))  AND ((timestamp >= ? AND timestamp <= ?)) ORDER BY timestamp ASC,evm_transactions.tx_hash ASC,evm_transactions.chain_id ASC LIMIT 10 OFFSET 10'  # noqa: E501
     assert bindings == [
         address,
         filter_query.from_ts,
@@ -76,3 +80,60 @@ def test_filter_arguments(and_op, order_by, pagination):
         time_filter.to_ts,
         location_filter.location.serialize_for_db(),
     ]
+
+
+def test_keyset_pagination():
+    """Test that the first page and the pages continuing from a cursor use keyset pagination
+    and that other pages keep using offsets ordered by the keyset columns"""
+    first_page = TradesFilterQuery.make(
+        order_by_rules=[('timestamp', False)],
+        limit=10,
+        offset=0,
+        location=Location.KRAKEN,
+    )
+    query, bindings = first_page.prepare()
+    assert query == 'WHERE (location=?) ORDER BY timestamp DESC,id DESC LIMIT 10'
+    assert bindings == [Location.KRAKEN.serialize_for_db()]
+    query, bindings = first_page.prepare(with_pagination=False)  # used for counting
+    assert query == 'WHERE (location=?) ORDER BY timestamp DESC,id DESC'
+
+    cursor = DBKeysetCursor(after=(1600000000, 'abc'), entries_found=25, entries_total=50)
+    token = first_page.next_continuation_token(
+        entries=[None] * 9,
+        entries_found=25,
+        entries_total=50,
+    )
+    assert token is None  # less entries than the limit means this was the last page
+    assert DBKeysetCursor.deserialize(cursor.serialize()) == cursor
+    next_page = TradesFilterQuery.make(
+        order_by_rules=[('timestamp', False)],
+        limit=10,
+        continuation=cursor,
+        location=Location.KRAKEN,
+    )
+    assert next_page.keyset_cursor == cursor
+    query, bindings = next_page.prepare()
+    assert query == 'WHERE ((location=?)) AND (timestamp,id) < (?,?) ORDER BY timestamp DESC,id DESC LIMIT 10'  # noqa: E501
+    assert bindings == [Location.KRAKEN.serialize_for_db(), 1600000000, 'abc']
+
+    offset_page = TradesFilterQuery.make(order_by_rules=[('timestamp', True)], limit=10, offset=20)  # noqa: E501
+    assert offset_page.prepare()[0] == 'ORDER BY timestamp ASC,id ASC LIMIT 10 OFFSET 20'
+    other_order = TradesFilterQuery.make(order_by_rules=[('amount', True)], limit=10, offset=0)
+    assert other_order.prepare()[0] == 'ORDER BY CAST(amount AS REAL) ASC LIMIT 10 OFFSET 0'
+
+    tx_cursor = DBKeysetCursor(after=(1, b'\x01' * 32, 1), entries_found=2, entries_total=2)
+    assert DBKeysetCursor.deserialize(tx_cursor.serialize()) == tx_cursor
+    with pytest.raises(DeserializationError):
+        EvmTransactionsFilterQuery.make(limit=10, continuation=cursor)
+    with pytest.raises(DeserializationError):
+        DBKeysetCursor.deserialize('invalid')
+
+
+def test_keyset_filter_query_definition():
+    """Test that a keyset paginated filter query without its keyset key can't be defined"""
+    with pytest.raises(TypeError, match='should define keyset_columns and keyset_key'):
+        class MissingKeysetKeyFilterQuery(DBFilterQuery, FilterWithKeyset):  # pylint: disable=unused-variable  # noqa: E501
+            keyset_columns = ('timestamp', 'identifier')
+
+    offset_page = DBFilterQuery.create(and_op=True, limit=10, offset=0, order_by_rules=[('timestamp', True)])  # noqa: E501
+    assert offset_page.keyset is None, 'only keyset filter queries use keyset pagination'
@@ -12,6 +12,7 @@ from rotkehlchen.constants.misc import DEFAULT_SQL_VM_INSTRUCTIONS_CB
 from rotkehlchen.data_handler import DataHandler
 from rotkehlchen.db.dbhandler import DBHandler
 from rotkehlchen.db.drivers.gevent import DBConnection, DBConnectionType
+from rotkehlchen.db.history_events import DBHistoryEvents
 from rotkehlchen.db.schema import DB_SCRIPT_CREATE_TABLES
 from rotkehlchen.db.settings import ROTKEHLCHEN_DB_VERSION
 from rotkehlchen.db.upgrade_manager import (
@@ -1326,6 +1327,20 @@ def test_upgrade_db_36_to_37(user_data_dir):  # pylint: disable=unused-argument
         else:
             assert entry == new_history_events[idx]
 
+    assert table_exists(cursor, 'used_query_range_gaps') is True
+    indices = cursor.execute(
+        'SELECT name FROM sqlite_master WHERE type="index" AND name LIKE "idx_%"',
+    ).fetchall()
+    assert {x[0] for x in indices} == {
+        'idx_history_events_timestamp',
+        'idx_trades_timestamp',
+        'idx_evm_transactions_timestamp',
+    }
+    assert table_exists(cursor, 'history_events_value_stats') is True
+    assert DBHistoryEvents(db).check_value_stats(cursor) == []
+    result = cursor.execute('SELECT SUM(events) FROM history_events_value_stats')
+    assert result.fetchone()[0] == 172
+
 
 def test_latest_upgrade_adds_remove_tables(user_data_dir):
     """
@@ -1,10 +1,17 @@
+import os
+import re
+from pathlib import Path
+from unittest.mock import patch
+
 from rotkehlchen.accounting.structures.balance import Balance
 from rotkehlchen.accounting.structures.base import HistoryBaseEntry
 from rotkehlchen.accounting.structures.types import HistoryEventSubType, HistoryEventType
-from rotkehlchen.constants.assets import A_ETH
+from rotkehlchen.constants.assets import A_BTC, A_ETH
 from rotkehlchen.db.constants import HISTORY_MAPPING_KEY_STATE, HISTORY_MAPPING_STATE_CUSTOMIZED
-from rotkehlchen.db.history_events import DBHistoryEvents
-from rotkehlchen.types import ChainID, EVMTxHash, Location, TimestampMS
+from rotkehlchen.db.filtering import HistoryEventFilterQuery
+from rotkehlchen.db.history_events import DAY_IN_MS, DBHistoryEvents
+from rotkehlchen.fval import FVal
+from rotkehlchen.types import ChainID, EVMTxHash, Location, Timestamp, TimestampMS
 
 
 def test_get_customized_event_identifiers(database):
@@ -67,3 +74,120 @@ def test_get_customized_event_identifiers(database):
         assert db.get_customized_event_identifiers(cursor, chain_id=None) == [1, 4]
         assert db.get_customized_event_identifiers(cursor, chain_id=ChainID.ETHEREUM) == [1]
         assert db.get_customized_event_identifiers(cursor, chain_id=ChainID.OPTIMISM) == [4]
+
+
+def test_add_history_events_in_bulk(database):
+    """Test that existing events are ignored and only the new events get the mapping values"""
+    db = DBHistoryEvents(database)
+
+    def make_event(tx_hash_prefix, amount):
+        return HistoryBaseEntry(
+            event_identifier=EVMTxHash(f'0x{tx_hash_prefix}5ceef8e258c08fc2724c1286da0426cb6ec8df208a9ec269108430c30262791'),  # noqa: E501
+            sequence_index=1,
+            timestamp=TimestampMS(1),
+            location=Location.ETHEREUM,
+            event_type=HistoryEventType.TRADE,
+            event_subtype=HistoryEventSubType.NONE,
+            asset=A_ETH,
+            balance=Balance(amount),
+        )
+
+    with db.db.user_write() as write_cursor:
+        db.add_history_events(write_cursor=write_cursor, history=[make_event(1, 1)])
+        db.add_history_events(write_cursor=write_cursor, history=[])
+        db.add_history_events(
+            write_cursor=write_cursor,
+            history=[make_event(1, 5), make_event(2, 2), make_event(3, 3), make_event(2, 6)],
+            mapping_values={HISTORY_MAPPING_KEY_STATE: HISTORY_MAPPING_STATE_CUSTOMIZED},
+        )
+
+    with db.db.conn.read_ctx() as cursor:
+        assert cursor.execute(
+            'SELECT identifier, amount FROM history_events ORDER BY identifier',
+        ).fetchall() == [(1, '1'), (2, '2'), (3, '3')]
+        assert db.get_customized_event_identifiers(cursor, chain_id=None) == [2, 3]
+
+
+def test_value_stats(database):
+    """Test that the per day value aggregates follow the writes to the history events and
+    that the stats read from them are the same as the ones summed from the events"""
+    db = DBHistoryEvents(database)
+    start = 1600000000000 - 1600000000000 % DAY_IN_MS
+    events = [
+        HistoryBaseEntry(
+            event_identifier=f'{idx // 2:064x}'.encode(),
+            sequence_index=idx % 2,
+            timestamp=TimestampMS(start + idx * DAY_IN_MS // 3),
+            location=Location.KRAKEN,
+            event_type=HistoryEventType.STAKING,
+            event_subtype=HistoryEventSubType.REWARD if idx % 4 else HistoryEventSubType.DEPOSIT_ASSET,  # noqa: E501
+            asset=A_ETH if idx % 2 else A_BTC,
+            balance=Balance(amount=FVal(idx) / 10, usd_value=FVal(idx)),
+        ) for idx in range(1, 31)
+    ]
+    with db.db.user_write() as write_cursor, patch('rotkehlchen.db.history_events.VALUE_STATS_LOOKUP_CHUNK', new=2):  # noqa: E501
+        db.add_history_events(write_cursor=write_cursor, history=events[:20])
+        for event in events[20:]:
+            db.add_history_event(write_cursor=write_cursor, event=event)
+
+    edited_event = db.get_history_event_by_identifier(3)
+    edited_event.balance = Balance(amount=FVal('5.5'), usd_value=FVal(100))
+    edited_event.timestamp = TimestampMS(edited_event.timestamp + 5 * DAY_IN_MS)
+    assert db.edit_history_event(edited_event)[0] is True
+    assert db.delete_history_events_by_identifier([4, 6]) is None
+    with db.db.user_write() as write_cursor:
+        db.set_history_events_usd_values(write_cursor=write_cursor, updates=[('42', '6')])
+
+    with db.db.conn.read_ctx() as cursor:
+        assert db.check_value_stats(cursor) == []
+        for from_ts, to_ts in (
+                (start // 1000, start // 1000 + 12 * 86400),  # whole days
+                (start // 1000 + 3600, start // 1000 + 5 * 86400 + 100),  # partial days
+                (start // 1000 + 7 * 3600, start // 1000 + 9 * 3600),  # inside a single day
+        ):
+            filter_query = HistoryEventFilterQuery.make(
+                from_ts=Timestamp(from_ts),
+                to_ts=Timestamp(to_ts),
+                location=Location.KRAKEN,
+                event_subtypes=[HistoryEventSubType.REWARD],
+            )
+            query, bindings = filter_query.prepare(with_pagination=False, with_order=False)
+            expected: dict[str, list[FVal]] = {}
+            for asset, amount, usd_value in cursor.execute(
+                    'SELECT asset, amount, usd_value FROM history_events ' + query,
+                    bindings,
+            ):
+                entry = expected.setdefault(asset, [FVal(0), FVal(0)])
+                entry[0] += FVal(amount)
+                entry[1] += FVal(usd_value)
+
+            total_usd, assets_amounts = db.get_value_stats_for_filter(cursor, filter_query)
+            assert len(assets_amounts) != 0
+            assert assets_amounts == [(k, v[0], v[1]) for k, v in sorted(expected.items())]
+            assert total_usd == sum((v[1] for v in expected.values()), FVal(0))
+
+
+def test_history_events_written_only_in_module():
+    """Test that the history events are only written in rotkehlchen/db/history_events.py,
+    which keeps history_events_value_stats up to date for every write.
+
+    DB upgrades run before the aggregates are created and data migrations that write
+    history events have to rebuild them, so these are allowed.
+    """
+    rotki_path = Path(__file__).resolve().parent.parent.parent
+    allowed = {
+        rotki_path / 'db' / 'history_events.py',
+        rotki_path / 'data_migrations' / 'migrations' / 'migration_9.py',  # rebuilds them
+    }
+    write_re = re.compile(r'(INSERT(\s+OR\s+\w+)?\s+INTO|UPDATE|DELETE\s+FROM)\s+history_events\b', re.IGNORECASE)  # noqa: E501
+    bypassing_files = []
+    for root, dirs, files in os.walk(rotki_path):
+        for directory in ('__pycache__', 'tests', 'upgrades'):
+            if directory in dirs:
+                dirs.remove(directory)
+        for name in files:
+            filepath = Path(root) / name
+            if name.endswith('.py') and filepath not in allowed and write_re.search(filepath.read_text()):  # noqa: E501
+                bypassing_files.append(filepath)
+
+    assert bypassing_files == [], 'history events should be written via DBHistoryEvents'
@@ -0,0 +1,66 @@
+import json
+
+from rotkehlchen.db.drivers.gevent import DBConnection, DBConnectionType
+from rotkehlchen.db.drivers.instrumentation import SQLInstrumentation, normalize_statement
+
+
+def test_normalize_statement():
+    assert normalize_statement(
+        'SELECT  * FROM a\n    WHERE b IN (?,?, ?) AND c="x" AND d=\'y\'\'s\' AND e > 12.5',
+    ) == 'SELECT * FROM a WHERE b IN (...) AND c=? AND d=? AND e > ?'
+    assert normalize_statement('SELECT * FROM a WHERE b IN (?)') == 'SELECT * FROM a WHERE b IN (?)'  # noqa: E501
+    # savepoints have a new name each time
+    assert normalize_statement('SAVEPOINT "a"') == normalize_statement('SAVEPOINT "b"')
+    # identifiers containing numbers are kept
+    assert normalize_statement('SELECT eth2_daily_staking_details.v2') == 'SELECT eth2_daily_staking_details.v2'  # noqa: E501
+
+
+def test_sql_instrumentation(tmp_path, monkeypatch):
+    instrumentation = SQLInstrumentation()
+    monkeypatch.setattr('rotkehlchen.db.drivers.gevent.SQL_INSTRUMENTATION', instrumentation)
+    conn = DBConnection(
+        path=':memory:',
+        connection_type=DBConnectionType.GLOBAL,
+        sql_vm_instructions_cb=0,
+    )
+    conn.execute('CREATE TABLE a(b INTEGER PRIMARY KEY, c TEXT)')
+    conn.executemany('INSERT INTO a VALUES (?, ?)', [(x, str(x)) for x in range(10)])
+    assert instrumentation.statements == {}, 'nothing should be recorded while disabled'
+
+    instrumentation.enable(slow_query_threshold=0)
+    conn.executemany('INSERT INTO a VALUES (?, ?)', [(x, str(x)) for x in range(10, 20)])
+    with conn.read_ctx() as cursor:
+        for limit in (5, 15):  # rows of a query are counted however they are fetched
+            assert len(cursor.execute('SELECT * FROM a WHERE b < ?', (limit,)).fetchall()) == limit  # noqa: E501
+        assert len(list(cursor.execute('SELECT * FROM a WHERE b IN (1, 2, 3)'))) == 3
+        cursor.execute('SELECT * FROM a WHERE b IN (?, ?)', (4, 5))
+        assert cursor.fetchone() == (4, '4')  # recorded when the cursor is closed
+
+    stats = {statement: x for (_, statement), x in instrumentation.statements.items()}
+    assert stats['INSERT INTO a VALUES (?, ?)'].count == 1
+    assert stats['INSERT INTO a VALUES (?, ?)'].rows == 10
+    assert stats['SELECT * FROM a WHERE b < ?'].count == 2
+    assert stats['SELECT * FROM a WHERE b < ?'].rows == 20
+    assert stats['SELECT * FROM a WHERE b IN (...)'].count == 2
+    assert stats['SELECT * FROM a WHERE b IN (...)'].rows == 4
+    assert all(x.p99_time() <= x.total_time for x in stats.values())
+    assert instrumentation.slow_queries.maxlen is not None
+    assert len(instrumentation.slow_queries) == 0
+
+    instrumentation.enable(slow_query_threshold=1e-9)  # everything is slow
+    with conn.read_ctx() as cursor:
+        cursor.execute('SELECT c FROM a WHERE b=?', (1,)).fetchall()
+    slow_query = instrumentation.slow_queries[-1]
+    assert slow_query.statement == 'SELECT c FROM a WHERE b=?'
+    assert slow_query.database == 'global'
+    assert len(slow_query.query_plan) == 1
+    assert 'USING INTEGER PRIMARY KEY' in slow_query.query_plan[0]
+
+    filepath = tmp_path / 'dump.json'
+    instrumentation.dump(filepath)
+    dumped = json.loads(filepath.read_text())
+    assert dumped == json.loads(json.dumps(instrumentation.serialize()))
+    assert dumped['statements'][0]['total_time'] >= dumped['statements'][-1]['total_time']
+    instrumentation.reset()
+    assert instrumentation.serialize() == {'statements': [], 'slow_queries': []}
+    conn.close()
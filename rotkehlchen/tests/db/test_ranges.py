@@ -1,4 +1,4 @@
-from rotkehlchen.db.ranges import DBQueryRanges
+from rotkehlchen.db.ranges import DBQueryRanges, merge_ranges, subtract_ranges
 
 
 def test_get_location_query_ranges(database):
@@ -61,3 +61,51 @@ def test_update_used_query_range(database):
             queried_ranges=[(start_ts, end_ts)] + query_range,
         )
         assert database.get_used_query_range(cursor, location2) == (10, 500)
+
+
+def test_merge_and_subtract_ranges():
+    assert merge_ranges([]) == []
+    assert merge_ranges([(20, 30), (1, 5), (6, 10), (25, 40), (50, 60)]) == [(1, 10), (20, 40), (50, 60)]  # noqa: E501
+    assert merge_ranges([(1, 100), (5, 10)]) == [(1, 100)]
+
+    ranges = [(1, 10), (20, 40), (50, 60)]
+    assert subtract_ranges(0, 100, []) == [(0, 100)]
+    assert subtract_ranges(0, 100, ranges) == [(0, 0), (11, 19), (41, 49), (61, 100)]
+    assert subtract_ranges(5, 45, ranges) == [(11, 19), (41, 45)]
+    assert subtract_ranges(21, 39, ranges) == []
+    assert subtract_ranges(11, 19, ranges) == [(11, 19)]
+
+
+def test_query_range_gaps(database):
+    """Test that gaps left inside the queried span are remembered and queried again"""
+    dbranges = DBQueryRanges(database)
+    location = 'location'
+
+    with database.user_write() as cursor:
+        dbranges.update_used_query_range(cursor, location, [(10, 20)])
+        dbranges.update_used_query_range(cursor, location, [(50, 60)])
+        dbranges.update_used_query_range(cursor, location, [(80, 90)])
+        assert database.get_used_query_range(cursor, location) == (10, 90)
+        assert dbranges.get_queried_ranges(cursor, location) == [(10, 20), (50, 60), (80, 90)]
+        result = dbranges.get_location_query_ranges(cursor, location, 0, 100)
+        assert result == [(0, 9), (21, 49), (61, 79), (91, 100)]
+        result = dbranges.get_location_query_ranges(cursor, location, 15, 55)
+        assert result == [(21, 49)]
+
+        # fill one of the gaps partially and the other one fully
+        dbranges.update_used_query_range(cursor, location, [(21, 30), (61, 79)])
+        assert dbranges.get_queried_ranges(cursor, location) == [(10, 30), (50, 90)]
+        result = dbranges.get_location_query_ranges(cursor, location, 0, 100)
+        assert result == [(0, 9), (31, 49), (91, 100)]
+
+        # setting the range directly marks everything in it as queried
+        database.update_used_query_range(cursor, location, 5, 95)
+        assert dbranges.get_queried_ranges(cursor, location) == [(5, 95)]
+        assert cursor.execute('SELECT COUNT(*) FROM used_query_range_gaps').fetchone()[0] == 0
+
+        # deleting the range also deletes its gaps
+        dbranges.update_used_query_range(cursor, location, [(200, 300)])
+        assert cursor.execute('SELECT COUNT(*) FROM used_query_range_gaps').fetchone()[0] == 1
+        cursor.execute('DELETE FROM used_query_ranges WHERE name=?', (location,))
+        assert cursor.execute('SELECT COUNT(*) FROM used_query_range_gaps').fetchone()[0] == 0
+        assert dbranges.get_location_query_ranges(cursor, location, 0, 100) == [(0, 100)]
@@ -1,7 +1,19 @@
-from rotkehlchen.accounting.pnl import PnlTotals
+from unittest.mock import patch
+
+import pytest
+
+from rotkehlchen.accounting.mixins.event import AccountingEventType
+from rotkehlchen.accounting.pnl import PNL, PnlTotals
+from rotkehlchen.accounting.structures.processed_event import ProcessedAccountingEvent
+from rotkehlchen.constants.assets import A_ETH
+from rotkehlchen.db.filtering import ReportDataFilterQuery
 from rotkehlchen.db.reports import DBAccountingReports
 from rotkehlchen.db.settings import DBSettings
+from rotkehlchen.errors.misc import InputError
+from rotkehlchen.fval import FVal
 from rotkehlchen.tests.utils.constants import A_GBP
+from rotkehlchen.types import Location, Price, Timestamp
+from rotkehlchen.utils.misc import timestamp_to_date
 
 
 def test_report_settings(database):
@@ -55,3 +67,72 @@ def test_report_settings(database):
         else:
             value = getattr(settings, setting_name)
         assert returned_settings[x] == value
+
+
+def test_iterate_report_data(database):
+    """Test that iterating the events of a report gives the same as getting them all"""
+    dbreport = DBAccountingReports(database)
+    report_id = dbreport.add_report(
+        first_processed_timestamp=Timestamp(1),
+        start_ts=Timestamp(0),
+        end_ts=Timestamp(100),
+        settings=DBSettings(),
+    )
+    for idx in range(10):
+        dbreport.add_report_data(
+            report_id=report_id,
+            time=Timestamp(idx),
+            ts_converter=timestamp_to_date,
+            event=ProcessedAccountingEvent(
+                type=AccountingEventType.TRADE,
+                notes=f'event {idx}',
+                location=Location.KRAKEN,
+                timestamp=Timestamp(idx),
+                asset=A_ETH,
+                free_amount=FVal(idx),
+                taxable_amount=FVal(1),
+                price=Price(FVal(2)),
+                pnl=PNL(free=FVal(idx), taxable=FVal(1)),
+                cost_basis=None,
+                index=idx,
+            ),
+        )
+
+    with database.conn_transient.write_ctx() as write_cursor:  # an event that can't be read
+        write_cursor.execute(
+            'INSERT INTO pnl_events(report_id, timestamp, data) VALUES(?, ?, ?)',
+            (report_id, 3, '{}'),
+        )
+
+    for filter_query, with_limit in (
+            (ReportDataFilterQuery.make(report_id=report_id), False),
+            (ReportDataFilterQuery.make(report_id=report_id, limit=3, offset=2), False),
+            (ReportDataFilterQuery.make(report_id=report_id, from_ts=Timestamp(2)), True),
+    ):
+        events = dbreport.iterate_report_data(filter_query, with_limit)
+        expected_events, expected_entries_found = dbreport.get_report_data(filter_query, with_limit)  # noqa: E501
+        assert list(events) == expected_events
+        assert events.entries_found == expected_entries_found
+
+    with patch('rotkehlchen.db.reports.FREE_PNL_EVENTS_LIMIT', new=5):
+        events = dbreport.iterate_report_data(ReportDataFilterQuery.make(report_id=report_id), True)  # noqa: E501
+        assert len(list(events)) == 5
+        assert events.entries_found == 10, 'events that fail to deserialize are not counted'
+
+    events = dbreport.iterate_report_data(ReportDataFilterQuery.make(report_id=report_id), False)
+    next(events)
+    dbreport.add_report_data(  # events added after the iteration started are not included
+        report_id=report_id,
+        time=Timestamp(20),
+        ts_converter=timestamp_to_date,
+        event=expected_events[0],
+    )
+    assert len(list(events)) == 9
+    assert events.entries_found == 10
+    events = dbreport.iterate_report_data(ReportDataFilterQuery.make(report_id=report_id), False)
+    next(events)
+    events.close()  # the cursor is closed if the events are not exhausted
+    assert events.entries_found is None
+
+    with pytest.raises(InputError):
+        dbreport.iterate_report_data(ReportDataFilterQuery.make(report_id=report_id + 1), False)
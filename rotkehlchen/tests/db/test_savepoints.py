@@ -51,6 +51,25 @@ def test_savepoint_errors():
         conn.rollback_savepoint('abc')
 
 
+def test_failed_savepoint_releases_lock():
+    """Test that if entering the outermost savepoint fails the write lock is released"""
+    conn = DBConnection(
+        path=':memory:',
+        connection_type=DBConnectionType.GLOBAL,
+        sql_vm_instructions_cb=0,
+    )
+    conn.execute('CREATE TABLE a(b INTEGER PRIMARY KEY)')
+    with pytest.raises(sqlite3.OperationalError), conn.savepoint_ctx('bad"name'):
+        ...
+
+    assert conn.savepoints_hold_lock is False
+    with gevent.Timeout(1), conn.write_ctx() as write_cursor:
+        write_cursor.execute('INSERT INTO a VALUES (1)')
+    with gevent.Timeout(1), conn.savepoint_ctx() as cursor:
+        cursor.execute('INSERT INTO a VALUES (2)')
+    assert conn.execute('SELECT b FROM a').fetchall() == [(1,), (2,)]
+
+
 def test_write_transaction_with_savepoint():
     """Test that opening a savepoint within a write transaction in the
     same greenlet is okay"""
@@ -245,3 +264,171 @@ def test_rollback_in_savepoints():
     # again the savepoint should raise an error because we have already released it.
     with pytest.raises(sqlite3.OperationalError):
         conn.execute('RELEASE SAVEPOINT "mysave"')
+
+
+def test_read_connections(tmp_path):
+    """Test that with read connections the reads of other greenlets don't see the
+    uncommitted data of a write transaction while the writer sees its own writes"""
+    def read_values(conn: 'DBConnection') -> list[tuple[int]]:
+        with conn.read_ctx() as cursor:
+            return cursor.execute('SELECT b FROM a').fetchall()
+
+    db_path = tmp_path / 'test.db'
+    conn = DBConnection(
+        path=str(db_path),
+        connection_type=DBConnectionType.GLOBAL,
+        sql_vm_instructions_cb=0,
+    )
+    conn.execute('CREATE TABLE a(b INTEGER PRIMARY KEY)')
+    assert conn.enable_read_connections(number=2, setup_script='') is True
+    with conn.write_ctx() as write_cursor:
+        write_cursor.execute('INSERT INTO a VALUES (1)')
+        reader = gevent.spawn(read_values, conn)
+        assert reader.get(timeout=1) == [], 'should not see the uncommitted write'
+        assert read_values(conn) == [(1,)], 'the writer should see its own writes'
+
+    assert gevent.spawn(read_values, conn).get(timeout=1) == [(1,)]
+    assert len(conn.idle_read_connections) == 1, 'the read connection should be reused'
+    with conn.read_ctx() as cursor, pytest.raises(sqlite3.OperationalError):
+        cursor.execute('INSERT INTO a VALUES (2)')  # read connections are read only
+
+    # a read connection in use while the pool is closed is not reused
+    with conn.read_ctx():
+        conn.close_read_connections()
+    assert len(conn.idle_read_connections) == 0
+    assert read_values(conn) == [(1,)]
+    assert len(conn.idle_read_connections) == 1
+
+    conn.close()
+    assert len(conn.idle_read_connections) == 0
+    conn = sqlite3.connect(db_path)
+    assert conn.execute('PRAGMA journal_mode').fetchone()[0] == 'delete'
+    assert conn.execute('SELECT b FROM a').fetchall() == [(1,)]
+    conn.close()
+
+
+def test_offloaded_reads(tmp_path):
+    """Test that offloaded reads return the same results and let other greenlets run
+    during a long query even without the progress handler"""
+    def tick(ticks: list[int]) -> None:
+        while True:
+            ticks.append(1)
+            gevent.sleep(0.001)
+
+    conn = DBConnection(
+        path=str(tmp_path / 'test.db'),
+        connection_type=DBConnectionType.GLOBAL,
+        sql_vm_instructions_cb=0,
+    )
+    conn.execute('CREATE TABLE a(b INTEGER PRIMARY KEY)')
+    conn.executemany('INSERT INTO a VALUES (?)', [(x,) for x in range(10)])
+    long_query = 'WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x+1 FROM c WHERE x < 1000000) SELECT COUNT(*) FROM c'  # noqa: E501
+    ticks: list[int] = []
+    ticker = gevent.spawn(tick, ticks)
+    gevent.sleep(0.01)
+    with conn.read_ctx(offload=True) as cursor:  # no read connections. Runs in the hub
+        before = len(ticks)
+        assert cursor.execute(long_query).fetchone()[0] == 1000000
+        assert len(ticks) == before
+
+    assert conn.enable_read_connections(number=1, setup_script='') is True
+    with conn.read_ctx(offload=True) as cursor:
+        before = len(ticks)
+        assert cursor.execute(long_query).fetchone()[0] == 1000000
+        assert len(ticks) > before, 'other greenlets should run during the query'
+        assert [x[0] for x in cursor.execute('SELECT b FROM a')] == list(range(10))
+        cursor.execute('SELECT b FROM a WHERE b < 5')
+        assert cursor.fetchone() == (0,)
+        assert cursor.fetchmany(2) == [(1,), (2,)]
+        assert cursor.fetchall() == [(3,), (4,)]
+        with pytest.raises(sqlite3.OperationalError):
+            cursor.execute('INSERT INTO a VALUES (11)')
+
+    ticker.kill()
+    assert len(conn.idle_read_connections) == 1
+    with conn.read_ctx() as cursor:  # the same connection is also usable from the hub
+        assert cursor.execute('SELECT COUNT(*) FROM a').fetchone()[0] == 10
+
+    # a connection still used by a thread after its greenlet stopped waiting is retired
+    with pytest.raises(gevent.Timeout), gevent.Timeout(0.01), conn.read_ctx(offload=True) as cursor:  # noqa: E501
+        cursor.execute(long_query.replace('1000000', '100000000'))
+    assert conn.idle_read_connections == []
+    with gevent.Timeout(5):
+        while conn.open_read_connections != 0:
+            gevent.sleep(0.01)
+    with conn.read_ctx(offload=True) as cursor:
+        assert cursor.execute('SELECT COUNT(*) FROM a').fetchone()[0] == 10
+    assert len(conn.idle_read_connections) == 1
+    conn.close()
+    assert conn.threadpool is None
+
+
+def test_write_lock_fairness():
+    """Test that a greenlet writing in a loop can't take the lock again before
+    the other greenlets that wait for it, whether they write or use savepoints"""
+    def write(conn: 'DBConnection', name: str, order: list[str]) -> None:
+        for _ in range(3):
+            with conn.write_ctx():
+                order.append(name)
+                gevent.sleep(0.001)
+
+    def savepoint(conn: 'DBConnection', name: str, order: list[str]) -> None:
+        for _ in range(3):
+            with conn.savepoint_ctx():
+                order.append(name)
+                gevent.sleep(0.001)
+
+    conn = DBConnection(
+        path=':memory:',
+        connection_type=DBConnectionType.GLOBAL,
+        sql_vm_instructions_cb=0,
+    )
+    order: list[str] = []
+    gevent.joinall([
+        gevent.spawn(write, conn, 'a', order),
+        gevent.spawn(savepoint, conn, 'b', order),
+        gevent.spawn(write, conn, 'c', order),
+    ], raise_error=True)
+    assert order == ['a', 'b', 'c'] * 3
+    stats = conn.transaction_lock.stats()
+    assert stats.acquisitions == 9
+    assert stats.contended == 8
+
+
+def test_many_concurrent_writers():
+    """Stress test with many greenlets writing with both write transactions and savepoints.
+    A greenlet waiting for a savepoint used to poll every second so the tail wait was
+    more than a second. Now it should be about the time all the others hold the lock."""
+    def write(conn: 'DBConnection', writer: int) -> None:
+        for idx in range(10):
+            if (writer + idx) % 2 == 0:
+                with conn.write_ctx() as write_cursor:
+                    write_cursor.execute('INSERT INTO a VALUES (?)', (writer * 100 + idx,))
+                    gevent.sleep(0)
+            else:
+                with conn.savepoint_ctx() as savepoint_cursor:
+                    savepoint_cursor.execute('INSERT INTO a VALUES (?)', (writer * 100 + idx,))
+                    gevent.sleep(0)
+                    with suppress(ValueError), conn.savepoint_ctx() as nested_cursor:
+                        nested_cursor.execute('INSERT INTO a VALUES (?)', (-writer * 100 - idx,))  # noqa: E501
+                        raise ValueError('roll back the nested savepoint')
+
+    conn = DBConnection(
+        path=':memory:',
+        connection_type=DBConnectionType.GLOBAL,
+        sql_vm_instructions_cb=0,
+    )
+    conn.execute('CREATE TABLE a(b INTEGER PRIMARY KEY)')
+    writers = 50
+    gevent.joinall([gevent.spawn(write, conn, idx) for idx in range(writers)], raise_error=True)
+
+    with conn.read_ctx() as cursor:
+        assert cursor.execute('SELECT b FROM a ORDER BY b').fetchall() == [
+            (writer * 100 + idx,) for writer in range(writers) for idx in range(10)
+        ]
+    assert conn.savepoints == {}
+    assert conn.transaction_lock.locked is False
+    stats = conn.transaction_lock.stats()
+    assert stats.acquisitions == writers * 10
+    assert stats.contended > 0
+    assert stats.max_wait < 0.5
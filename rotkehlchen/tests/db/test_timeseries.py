@@ -0,0 +1,168 @@
+from rotkehlchen.accounting.structures.balance import BalanceType
+from rotkehlchen.constants import ZERO
+from rotkehlchen.constants.assets import A_BTC, A_ETH
+from rotkehlchen.constants.timing import DAY_IN_SECONDS, HOUR_IN_SECONDS, WEEK_IN_SECONDS
+from rotkehlchen.db.settings import ModifiableDBSettings
+from rotkehlchen.db.timeseries import (
+    SNAPSHOTS_COMPACTED_BEFORE_KEYS,
+    BalancesTimeSeries,
+    NetValueTimeSeries,
+    compact_snapshots,
+    get_snapshots_tiers,
+)
+from rotkehlchen.db.utils import DBAssetBalance, LocationData
+from rotkehlchen.fval import FVal
+from rotkehlchen.types import Location, Timestamp
+from rotkehlchen.utils.misc import ts_now
+
+
+def _make_series(times, category=BalanceType.ASSET):
+    return BalancesTimeSeries(
+        times=times,
+        categories=[category] * len(times),
+        amounts=[FVal(idx + 1) for idx in range(len(times))],
+        usd_values=[FVal((idx + 1) * 10) for idx in range(len(times))],
+    )
+
+
+def test_balances_series_fill_gaps():
+    series = _make_series([0, HOUR_IN_SECONDS, 10 * HOUR_IN_SECONDS, 12 * HOUR_IN_SECONDS])
+    filled = series.fill_gaps(step=HOUR_IN_SECONDS, multiplier=2)
+    # zeros are added after the gap starts until 2 hours before the next snapshot
+    assert filled.times == [x * HOUR_IN_SECONDS for x in (0, 1, 2, 3, 4, 5, 6, 7, 8, 10, 12)]
+    assert filled.amounts == [FVal(1), FVal(2)] + [ZERO] * 7 + [FVal(3), FVal(4)]
+    assert filled.usd_values == [FVal(10), FVal(20)] + [ZERO] * 7 + [FVal(30), FVal(40)]
+    assert set(filled.categories) == {BalanceType.ASSET}
+    assert series.fill_gaps(step=HOUR_IN_SECONDS, multiplier=9) == series
+
+    # in a compacted tier the gaps are measured in the resolution of the tier
+    daily = _make_series([0, DAY_IN_SECONDS, 2 * DAY_IN_SECONDS, 6 * DAY_IN_SECONDS])
+    tiers = [(Timestamp(2 * DAY_IN_SECONDS), DAY_IN_SECONDS)]
+    assert daily.fill_gaps(step=HOUR_IN_SECONDS, multiplier=2, tiers=tiers).times == [
+        0, DAY_IN_SECONDS, 2 * DAY_IN_SECONDS,
+    ] + [x * HOUR_IN_SECONDS for x in range(49, 143)] + [6 * DAY_IN_SECONDS]
+
+
+def test_balances_series_merge_and_resample():
+    series = _make_series([100, 100, 200, DAY_IN_SECONDS, DAY_IN_SECONDS + 5])
+    merged = series.merge_same_times()
+    assert merged.times == [100, 200, DAY_IN_SECONDS, DAY_IN_SECONDS + 5]
+    assert merged.amounts == [FVal(3), FVal(3), FVal(4), FVal(5)]
+    assert merged.usd_values == [FVal(30), FVal(30), FVal(40), FVal(50)]
+
+    daily = merged.resample('daily')
+    assert daily.times == [200, DAY_IN_SECONDS + 5]
+    assert daily.amounts == [FVal(3), FVal(5)]
+    assert merged.resample('weekly').times == [DAY_IN_SECONDS + 5]
+    assert daily.serialize() == [
+        {'time': 200, 'category': 'asset', 'amount': '3', 'usd_value': '30'},
+        {'time': DAY_IN_SECONDS + 5, 'category': 'asset', 'amount': '5', 'usd_value': '50'},
+    ]
+    assert [x.time for x in daily.to_single_balances()] == daily.times
+
+    # the last snapshot of each period is kept separately for each balance category
+    mixed = BalancesTimeSeries(
+        times=[1, 2, 3],
+        categories=[BalanceType.ASSET, BalanceType.LIABILITY, BalanceType.ASSET],
+        amounts=[ZERO, ZERO, ZERO],
+        usd_values=[ZERO, ZERO, ZERO],
+    )
+    assert mixed.resample('daily').times == [2, 3]
+
+    netvalue = NetValueTimeSeries(times=[1, 2, DAY_IN_SECONDS], usd_values=['1', '2', '3'])
+    assert netvalue.resample('daily') == NetValueTimeSeries(
+        times=[2, DAY_IN_SECONDS],
+        usd_values=['2', '3'],
+    )
+
+
+def test_compact_snapshots(database):
+    now = ts_now()
+    start = now - 30 * DAY_IN_SECONDS
+    snapshot_times = list(range(start - start % DAY_IN_SECONDS, now, 6 * HOUR_IN_SECONDS))
+    with database.user_write() as write_cursor:
+        database.add_multiple_balances(write_cursor, [
+            DBAssetBalance(
+                category=BalanceType.ASSET,
+                time=Timestamp(ts),
+                asset=asset,
+                amount=FVal(1),
+                usd_value=FVal(ts),
+            ) for ts in snapshot_times for asset in (A_BTC, A_ETH)
+        ])
+        database.add_multiple_location_data(write_cursor, [
+            LocationData(time=Timestamp(ts), location=Location.TOTAL.serialize_for_db(), usd_value=str(ts))  # noqa: E501
+            for ts in snapshot_times
+        ])
+
+    # disabled by default
+    assert compact_snapshots(database) == 0
+    with database.conn.read_ctx() as cursor:
+        assert get_snapshots_tiers(cursor) == []
+
+    with database.user_write() as write_cursor:
+        database.set_settings(write_cursor, ModifiableDBSettings(
+            ssf_0graph_multiplier=2,
+            daily_snapshots_after_days=5,
+            weekly_snapshots_after_days=20,
+        ))
+    assert compact_snapshots(database) > 0
+
+    with database.conn.read_ctx() as cursor:
+        tiers = {period: before_ts for before_ts, period in get_snapshots_tiers(cursor)}
+        assert set(tiers) == {DAY_IN_SECONDS, WEEK_IN_SECONDS}
+        assert tiers[DAY_IN_SECONDS] - tiers[WEEK_IN_SECONDS] == 15 * DAY_IN_SECONDS
+        balance_times = [x[0] for x in cursor.execute(
+            'SELECT DISTINCT timestamp FROM timed_balances ORDER BY timestamp',
+        )]
+        location_times = [x[0] for x in cursor.execute(
+            'SELECT timestamp FROM timed_location_data ORDER BY timestamp',
+        )]
+
+    assert balance_times == location_times
+    expected_times = []
+    for ts in snapshot_times:
+        if ts < tiers[WEEK_IN_SECONDS]:
+            period = WEEK_IN_SECONDS
+        elif ts < tiers[DAY_IN_SECONDS]:
+            period = DAY_IN_SECONDS
+        else:
+            expected_times.append(ts)
+            continue
+        if len(expected_times) != 0 and expected_times[-1] // period == ts // period:
+            expected_times[-1] = ts
+        else:
+            expected_times.append(ts)
+    assert balance_times == expected_times
+
+    # running it again before the boundaries move does not delete anything else
+    assert compact_snapshots(database) == 0
+    # the daily tier does not create zero filled gaps in the graphs
+    with database.conn.read_ctx() as cursor:
+        balances = database.query_timed_balances(
+            cursor=cursor,
+            asset=A_BTC,
+            balance_type=BalanceType.ASSET,
+        )
+    assert all(x.amount == FVal(1) for x in balances if x.time >= tiers[WEEK_IN_SECONDS])
+    with database.conn.read_ctx() as cursor:
+        assert cursor.execute(
+            'SELECT COUNT(*) FROM settings WHERE name IN (?, ?)',
+            tuple(SNAPSHOTS_COMPACTED_BEFORE_KEYS.values()),
+        ).fetchone()[0] == 2
+
+    # a weekly tier before the daily one is not applied to the daily snapshots
+    with database.user_write() as write_cursor:
+        database.set_settings(write_cursor, ModifiableDBSettings(
+            daily_snapshots_after_days=3,
+            weekly_snapshots_after_days=1,
+        ))
+    assert compact_snapshots(database) > 0
+    with database.conn.read_ctx() as cursor:
+        new_tiers = {period: before_ts for before_ts, period in get_snapshots_tiers(cursor)}
+        balance_times = [x[0] for x in cursor.execute(
+            'SELECT DISTINCT timestamp FROM timed_balances WHERE timestamp >= ?',
+            (new_tiers[WEEK_IN_SECONDS],),
+        )]
+    assert new_tiers[WEEK_IN_SECONDS] == new_tiers[DAY_IN_SECONDS]
+    assert len(balance_times) > 3 * 2, 'the snapshots of the last days should be kept'
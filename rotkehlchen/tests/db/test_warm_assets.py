@@ -0,0 +1,56 @@
+from unittest.mock import patch
+
+from rotkehlchen.accounting.structures.balance import BalanceType
+from rotkehlchen.assets.resolver import AssetResolver
+from rotkehlchen.constants.assets import A_DAI, A_ETH, CONSTANT_ASSETS
+from rotkehlchen.db.utils import DBAssetBalance
+from rotkehlchen.db.warm_assets import DBWarmAssets
+from rotkehlchen.fval import FVal
+from rotkehlchen.globaldb.handler import GlobalDBHandler
+from rotkehlchen.globaldb.updates import ASSETS_VERSION_KEY
+from rotkehlchen.types import Timestamp
+
+
+def test_warm_assets_snapshot(database):
+    constant_identifiers = {x.identifier for x in CONSTANT_ASSETS}
+    with GlobalDBHandler().conn.read_ctx() as cursor:
+        token_identifier = next(
+            x[0] for x in cursor.execute('SELECT identifier FROM evm_tokens')
+            if x[0] not in constant_identifiers
+        )
+    with database.user_write() as write_cursor:
+        database.add_multiple_balances(write_cursor, [DBAssetBalance(
+            category=BalanceType.ASSET,
+            time=Timestamp(1),
+            asset=A_DAI,
+            amount=FVal(1),
+            usd_value=FVal(1),
+        )])
+    AssetResolver().resolve_asset(token_identifier)  # used during the session
+    with database.conn.write_ctx() as write_cursor:
+        write_cursor.execute(
+            'INSERT OR REPLACE INTO settings(name, value) VALUES(?, ?)',
+            ('last_write_ts', 1),
+        )
+    DBWarmAssets(database).save_snapshot()
+    with database.conn.read_ctx() as cursor:
+        cursor.execute('SELECT value FROM multisettings WHERE name="warm_asset"')
+        saved = {x[0] for x in cursor}
+        assert database.get_setting(cursor, 'last_write_ts') == 1, 'should not trigger a premium sync'  # noqa: E501
+    assert {A_DAI.identifier, token_identifier} <= saved
+
+    with patch.object(database, 'query_owned_assets', side_effect=ValueError('bad')):
+        DBWarmAssets(database).save_snapshot()  # a failure is only logged
+
+    AssetResolver().clean_memory_cache()
+    loaded = DBWarmAssets(database).load_snapshot()
+    assert loaded >= len(saved)
+    for identifier in (A_ETH.identifier, A_DAI.identifier, token_identifier):
+        assert AssetResolver().assets_cache.get(identifier) is not None
+
+    # after an assets update the snapshot is ignored and only the constant assets are loaded
+    assets_version = GlobalDBHandler().get_setting_value(ASSETS_VERSION_KEY, 0)
+    GlobalDBHandler().add_setting_value(ASSETS_VERSION_KEY, assets_version + 1)
+    AssetResolver().clean_memory_cache()
+    assert DBWarmAssets(database).load_snapshot() < loaded
+    assert AssetResolver().assets_cache.get(token_identifier) is None
@@ -26,6 +26,7 @@ from rotkehlchen.constants.assets import (
     A_XRP,
 )
 from rotkehlchen.constants.limits import FREE_HISTORY_EVENTS_LIMIT
+from rotkehlchen.db.ranges import DBQueryRanges
 from rotkehlchen.db.settings import ModifiableDBSettings
 from rotkehlchen.errors.asset import UnknownAsset, UnprocessableTradePair
 from rotkehlchen.errors.serialization import DeserializationError
@@ -201,8 +202,10 @@ def test_querying_rate_limit_exhaustion(function_scope_kraken, database):
     assert len(trades) == 1
     with database.conn.read_ctx() as cursor:
         from_ts, to_ts = database.get_used_query_range(cursor, 'kraken_trades_mockkraken')
+        queried_ranges = DBQueryRanges(database).get_queried_ranges(cursor, 'kraken_history_events_mockkraken')  # noqa: E501
     assert from_ts == 0
     assert to_ts == 1638529919, 'should have saved only until the last trades timestamp'
+    assert queried_ranges == [(1609950165, 1638529919)], 'the ledger range before the oldest fetched entry should not be marked as queried'  # noqa: E501
 
 
 def test_querying_deposits_withdrawals(function_scope_kraken):
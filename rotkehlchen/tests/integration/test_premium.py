@@ -150,6 +150,50 @@ def test_upload_data_to_server_same_hash(rotkehlchen_instance, db_password):
         assert not put_mock.called
 
 
+@pytest.mark.parametrize('start_with_valid_premium', [True])
+def test_upload_data_to_server_skipped_without_local_changes(rotkehlchen_instance, db_password):
+    """Test that if nothing was written since the last sync the DB is not exported again"""
+    sync_manager = rotkehlchen_instance.premium_sync_manager
+    with rotkehlchen_instance.data.db.user_write() as write_cursor:
+        rotkehlchen_instance.data.db.set_settings(write_cursor, ModifiableDBSettings(main_currency=A_EUR))  # noqa: E501
+
+    _, our_hash = rotkehlchen_instance.data.compress_and_encrypt_db(db_password)
+    patched_put = patch.object(
+        rotkehlchen_instance.premium.session,
+        'put',
+        return_value=MockResponse(200, '{"success": true}'),
+    )
+    patched_get = create_patched_requests_get_for_premium(
+        session=rotkehlchen_instance.premium.session,
+        metadata_last_modify_ts=0,
+        metadata_data_hash=our_hash,
+        metadata_data_size=2,
+        saved_data='foo',
+    )
+    compress_spy = patch.object(
+        rotkehlchen_instance.data,
+        'compress_and_encrypt_db',
+        wraps=rotkehlchen_instance.data.compress_and_encrypt_db,
+    )
+
+    with patched_get, patched_put as put_mock, compress_spy as compress_mock:
+        sync_manager.maybe_upload_data_to_server()  # same hash so the DB is in sync
+        assert compress_mock.call_count == 1
+        sync_manager.maybe_upload_data_to_server()  # nothing changed so skipped
+        assert compress_mock.call_count == 1
+        assert (sync_manager.upload_checks, sync_manager.upload_checks_skipped) == (2, 1)
+
+        with rotkehlchen_instance.data.db.user_write() as write_cursor:
+            rotkehlchen_instance.data.db.set_settings(write_cursor, ModifiableDBSettings(main_currency=A_GBP))  # noqa: E501
+        assert not put_mock.called
+        sync_manager.maybe_upload_data_to_server()  # there was a write so upload
+        assert compress_mock.call_count == 2
+        assert put_mock.call_count == 1
+        sync_manager.maybe_upload_data_to_server()  # nothing changed since the upload
+        assert compress_mock.call_count == 2
+        assert (sync_manager.upload_checks, sync_manager.upload_checks_skipped) == (4, 2)
+
+
 @pytest.mark.parametrize('start_with_valid_premium', [True])
 def test_upload_data_to_server_smaller_db(rotkehlchen_instance, db_password):
     """Test that if the server has bigger DB size no upload happens"""
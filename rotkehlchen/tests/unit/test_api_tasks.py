@@ -0,0 +1,91 @@
+import gevent
+from gevent.event import Event
+
+from rotkehlchen.api.tasks import (
+    APITaskClass,
+    APITaskExecutor,
+    APITaskPriority,
+    make_dedup_key,
+)
+from rotkehlchen.constants.assets import A_BTC, A_ETH
+from rotkehlchen.db.filtering import TradesFilterQuery
+from rotkehlchen.errors.misc import GreenletKilledError
+from rotkehlchen.types import Location
+
+
+def _submit(executor, task_id, function, task_class, priority=APITaskPriority.NORMAL):
+    greenlet = gevent.Greenlet(function, task_id)
+    executor.submit(
+        task_id=task_id,
+        greenlet=greenlet,
+        task_class=task_class,
+        priority=priority,
+        dedup_key=None,
+    )
+    return greenlet
+
+
+def test_task_class_limits_and_priorities():
+    """Test that tasks over the limit of their class are queued and started by priority"""
+    greenlets = []
+    executor = APITaskExecutor(
+        greenlets=greenlets,
+        class_limits={x: 1 for x in APITaskClass},
+    )
+    release = Event()
+    started = []
+
+    def task(task_id):
+        started.append(task_id)
+        release.wait()
+
+    first = _submit(executor, 0, task, APITaskClass.REPORTS)
+    _submit(executor, 1, task, APITaskClass.REPORTS, APITaskPriority.LOW)
+    _submit(executor, 2, task, APITaskClass.REPORTS, APITaskPriority.HIGH)
+    killed = _submit(executor, 3, task, APITaskClass.REPORTS, APITaskPriority.HIGH)
+    _submit(executor, 4, task, APITaskClass.BALANCES)  # other classes are not blocked
+    gevent.sleep(0.1)
+    assert started == [0, 4]
+    assert len(greenlets) == 5, 'queued greenlets should be in the api task greenlets'
+
+    killed.kill(exception=GreenletKilledError('removed'))
+    assert killed.dead is True
+    release.set()
+    first.join()
+    gevent.joinall(greenlets, timeout=5)
+    assert started == [0, 4, 2, 1], 'queued tasks should start by priority, killed ones never'
+    assert all(len(x) == 0 for x in executor.running.values())
+
+
+def test_deduplicated_tasks():
+    greenlets = []
+    executor = APITaskExecutor(greenlets=greenlets)
+    dedup_key = make_dedup_key(test_deduplicated_tasks, {'assets': [A_ETH, A_BTC]})
+    assert executor.join_in_flight(task_id=0, dedup_key=dedup_key) is False
+    greenlet = gevent.Greenlet(gevent.sleep, 0.1)
+    executor.submit(
+        task_id=0,
+        greenlet=greenlet,
+        task_class=APITaskClass.OTHER,
+        priority=APITaskPriority.NORMAL,
+        dedup_key=dedup_key,
+    )
+    assert executor.join_in_flight(task_id=1, dedup_key=dedup_key) is True
+    assert executor.tasks[0] is executor.tasks[1]
+    assert greenlets == [greenlet]
+    other_key = make_dedup_key(test_deduplicated_tasks, {'assets': [A_ETH]})
+    assert executor.join_in_flight(task_id=2, dedup_key=other_key) is False
+
+    assert executor.finish(0) == [0, 1]
+    assert executor.join_in_flight(task_id=3, dedup_key=dedup_key) is False, 'task is done'
+    executor.remove(0)
+    assert greenlets == [greenlet], 'the greenlet is kept until all outcomes are returned'
+    executor.remove(1)
+    assert greenlets == []
+
+
+def test_make_dedup_key():
+    assert make_dedup_key(test_make_dedup_key, {'a': 1, 'b': Location.KRAKEN}) == make_dedup_key(test_make_dedup_key, {'b': Location.KRAKEN, 'a': 1})  # noqa: E501
+    assert make_dedup_key(test_make_dedup_key, {'a': 1}) != make_dedup_key(test_make_dedup_key, {'a': 2})  # noqa: E501
+    assert make_dedup_key(test_make_dedup_key, {'a': 1}) != make_dedup_key(test_deduplicated_tasks, {'a': 1})  # noqa: E501
+    assert make_dedup_key(test_make_dedup_key, {'filter_query': TradesFilterQuery.make()}) is None  # noqa: E501
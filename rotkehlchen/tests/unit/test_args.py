@@ -1,7 +1,7 @@
 import pytest
 
 from rotkehlchen.args import app_args
-from rotkehlchen.constants.misc import DEFAULT_SQL_VM_INSTRUCTIONS_CB
+from rotkehlchen.constants.misc import DEFAULT_SQL_READ_CONNECTIONS, DEFAULT_SQL_VM_INSTRUCTIONS_CB
 
 
 @pytest.fixture(name='argparser')
@@ -28,3 +28,13 @@ def test_arg_sql_vm_instructions_cb(argparser):
     assert args.sqlite_instructions == 200
     args = argparser.parse_args(['--sqlite-instructions', '0'])
     assert args.sqlite_instructions == 0
+
+
+def test_arg_sql_read_connections(argparser):
+    with pytest.raises(SystemExit):
+        argparser.parse_args(['--sqlite-read-connections', '-1'])
+
+    args = argparser.parse_args(['--data-dir', 'foo'])
+    assert args.sqlite_read_connections == DEFAULT_SQL_READ_CONNECTIONS
+    args = argparser.parse_args(['--sqlite-read-connections', '4'])
+    assert args.sqlite_read_connections == 4
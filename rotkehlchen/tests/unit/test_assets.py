@@ -10,6 +10,7 @@ import pytest
 from eth_utils import is_checksum_address
 
 from rotkehlchen.assets.asset import Asset, CryptoAsset, CustomAsset, EvmToken, FiatAsset, Nft
+from rotkehlchen.assets.resolver import AssetResolver
 from rotkehlchen.assets.types import AssetType
 from rotkehlchen.assets.utils import get_or_create_evm_token, symbol_to_ethereum_token
 from rotkehlchen.constants.assets import A_DAI, A_USDT
@@ -705,6 +706,34 @@ def test_symbol_or_name(database):
         Asset('i-dont-exist').symbol_or_name()
 
 
+def test_resolve_assets_in_bulk(globaldb: GlobalDBHandler):
+    """Test that resolving many assets at once gives the same assets as resolving them one
+    by one and that they are cached for both resolving them and checking their type"""
+    with globaldb.conn.read_ctx() as cursor:
+        token_with_underlying = cursor.execute(
+            'SELECT parent_token_entry FROM underlying_tokens_list LIMIT 1',
+        ).fetchone()[0]
+    identifiers = ['ETH', 'eur', A_DAI.identifier, token_with_underlying, '_nft_foo', 'xyz']
+    AssetResolver().clean_memory_cache()
+    assets = AssetResolver().resolve_assets(identifiers + ['ETH'])
+    assert set(assets) == set(identifiers[:-1])
+    for identifier, asset in assets.items():
+        assert asset == globaldb.resolve_asset(identifier)
+    assert assets[token_with_underlying].underlying_tokens == globaldb.resolve_asset(token_with_underlying).underlying_tokens is not None  # type: ignore  # noqa: E501
+    assert assets['eur'] == FiatAsset('EUR')
+
+    hits = AssetResolver().cache_stats()['assets'].hits
+    resolve_patch = patch.object(GlobalDBHandler, 'resolve_asset', side_effect=AssertionError)
+    type_patch = patch.object(GlobalDBHandler, 'get_asset_type', side_effect=AssertionError)
+    with resolve_patch, type_patch:
+        for identifier in identifiers[:-1]:
+            assert Asset(identifier).check_existence().resolve() == assets[identifier]
+        assert AssetResolver().resolve_assets(identifiers[:-1]) == assets
+    # Asset.resolve() creates nfts without the resolver
+    assert AssetResolver().cache_stats()['assets'].hits == hits + 2 * len(assets) - 1
+    assert AssetResolver().get_asset_type('_nft_foo') == AssetType.NFT
+
+
 def test_load_from_packaged_db(globaldb: GlobalDBHandler):
     """Test that connecting to the packaged globaldb doesn't try to write into it."""
     packaged_db_path = Path(__file__).resolve().parent.parent.parent / 'data' / 'global.db'
@@ -0,0 +1,22 @@
+import base64
+import os
+
+from rotkehlchen.crypto import b64encode_chunks, decrypt, encrypt_chunks
+
+
+def test_b64encode_chunks():
+    data = os.urandom(1000)
+    for chunk_size in (1, 2, 3, 7, 64, 1000):
+        chunks = [data[i:i + chunk_size] for i in range(0, len(data), chunk_size)]
+        assert b64encode_chunks(chunks) == base64.b64encode(data)
+
+    assert b64encode_chunks([]) == b''
+
+
+def test_encrypt_chunks_decrypts():
+    """Test that the streamed encryption can be decrypted as the non-streamed one"""
+    for size in (0, 1, 15, 16, 17, 1000):
+        data = os.urandom(size)
+        chunks = [data[i:i + 7] for i in range(0, len(data), 7)]
+        encrypted = b64encode_chunks(encrypt_chunks(b'123', chunks))
+        assert decrypt(b'123', encrypted.decode()) == data
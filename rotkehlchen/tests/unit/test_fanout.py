@@ -0,0 +1,92 @@
+import time
+
+import gevent
+import pytest
+
+from rotkehlchen.errors.misc import RemoteError
+from rotkehlchen.greenlets.fanout import FanoutQuery, fanout
+
+
+def test_fanout_runs_concurrently_and_keeps_order():
+    def make_query(name, seconds):
+        def query():
+            gevent.sleep(seconds)
+            return name
+        return FanoutQuery(name=name, method=query)
+
+    start = time.monotonic()
+    results = fanout(
+        queries=[make_query('a', 0.3), make_query('b', 0.1), make_query('c', 0.2)],
+        pool_size=3,
+        timeout=5,
+    )
+    assert time.monotonic() - start < 0.5
+    assert [x.name for x in results] == ['a', 'b', 'c']
+    assert [x.get() for x in results] == ['a', 'b', 'c']
+    assert all(x.duration >= 0.1 for x in results)
+
+
+def test_fanout_errors_and_timeouts():
+    def failing_query():
+        raise ValueError('boom')
+
+    def slow_query():
+        gevent.sleep(5)
+
+    results = fanout(
+        queries=[
+            FanoutQuery(name='ok', method=lambda: 1),
+            FanoutQuery(name='failing', method=failing_query),
+            FanoutQuery(name='slow', method=slow_query),
+        ],
+        pool_size=2,
+        timeout=0.2,
+    )
+    assert results[0].get() == 1
+    with pytest.raises(ValueError, match='boom'):
+        results[1].get()
+    with pytest.raises(RemoteError, match='slow query timed out after 0.2 seconds'):
+        results[2].get()
+
+
+def test_fanout_inner_timeout_is_not_query_timeout():
+    """Test that a timeout started inside a query is not reported as the query timing out"""
+    inner_timeout = gevent.Timeout(0.05)
+
+    def query_with_inner_timeout():
+        inner_timeout.start()
+        gevent.sleep(1)
+
+    with pytest.raises(gevent.Timeout) as e:
+        fanout(
+            queries=[FanoutQuery(name='inner', method=query_with_inner_timeout)],
+            pool_size=1,
+            timeout=0.5,
+        )
+    assert e.value is inner_timeout
+
+
+def test_nested_fanout_timeout_kills_inner_queries():
+    """Test that when an outer query times out the inner queries it fanned out stop running"""
+    finished = []
+
+    def inner_query():
+        gevent.sleep(0.5)
+        finished.append('inner')
+
+    def outer_query():
+        return fanout(
+            queries=[FanoutQuery(name='inner', method=inner_query)],
+            pool_size=1,
+            timeout=5,
+        )
+
+    results = fanout(
+        queries=[FanoutQuery(name='outer', method=outer_query)],
+        pool_size=1,
+        timeout=0.1,
+    )
+    with pytest.raises(RemoteError, match='outer query timed out after 0.1 seconds'):
+        results[0].get()
+    gevent.sleep(0.6)
+    assert finished == []
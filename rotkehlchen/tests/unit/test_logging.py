@@ -0,0 +1,136 @@
+import json
+import logging
+from unittest.mock import patch
+
+import gevent
+from gevent.monkey import get_original
+
+from rotkehlchen.logging import (
+    JSONLinesFormatter,
+    QueuedLogHandler,
+    RotkehlchenLogsAdapter,
+    TextFormatter,
+)
+
+
+class RecordsHandler(logging.Handler):
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.records: list[logging.LogRecord] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.records.append(record)
+
+
+def _make_logger(handler: logging.Handler) -> RotkehlchenLogsAdapter:
+    logger = logging.getLogger('rotkehlchen.tests.unit.test_logging')
+    logger.handlers = [handler]
+    logger.propagate = False
+    logger.setLevel(logging.DEBUG)
+    return RotkehlchenLogsAdapter(logger)
+
+
+def test_structured_records():
+    """Test that in structured mode the kwargs are kept in the record and rendered by
+    the formatters, the text one the same way as the adapter does without it"""
+    handler = RecordsHandler()
+    log = _make_logger(handler)
+    with patch.object(RotkehlchenLogsAdapter, 'structured', False):
+        log.info('Decoding failed', log_index=1, method='decode_action')
+    with patch.object(RotkehlchenLogsAdapter, 'structured', True):
+        log.info('Decoding failed', log_index=1, method='decode_action')
+        log.info('Decoding failed', tx_hash=b'\x01\x02', error=ValueError('bad'))
+        try:
+            raise ValueError('bad value')
+        except ValueError:
+            log.error('Unhandled exception', exc_info=True)
+
+    old_record, record, bytes_record, exception_record = handler.records
+    assert old_record.getMessage() == 'Main Greenlet: Decoding failed log_index=1, method=decode_action'  # noqa: E501
+    assert record.getMessage() == 'Decoding failed'
+    assert record.structured_data == {'log_index': 1, 'method': 'decode_action'}
+    assert exception_record.exc_info is not None
+
+    text_formatter = TextFormatter('%(message)s')
+    assert text_formatter.format(record) == old_record.getMessage()
+    assert text_formatter.format(old_record) == old_record.getMessage()
+    assert text_formatter.format(bytes_record) == 'Main Greenlet: Decoding failed tx_hash=0x0102, error=bad'  # noqa: E501
+
+    entry = json.loads(JSONLinesFormatter().format(bytes_record))
+    assert {k: v for k, v in entry.items() if k != 'timestamp'} == {
+        'level': 'INFO',
+        'logger': 'rotkehlchen.tests.unit.test_logging',
+        'greenlet': 'Main Greenlet',
+        'message': 'Decoding failed',
+        'data': {'tx_hash': '0x0102', 'error': 'bad'},
+    }
+    entry = json.loads(JSONLinesFormatter().format(exception_record))
+    assert entry['exception'].endswith('ValueError: bad value')
+
+
+def test_disabled_levels_are_not_processed():
+    handler = RecordsHandler()
+    log = _make_logger(handler)
+    log.logger.setLevel(logging.INFO)
+    with patch.object(RotkehlchenLogsAdapter, 'process') as process:
+        log.debug('Skipped', value=1)
+        log.trace('Skipped', value=1)
+    assert process.call_count == 0
+    assert handler.records == []
+
+
+def test_queued_handler():
+    """Test that the queued handler emits prepared records from its thread"""
+    target = RecordsHandler()
+    target.setFormatter(TextFormatter('%(levelname)s %(message)s'))
+    queued_handler = QueuedLogHandler(target)
+    log = _make_logger(queued_handler)
+
+    class Unsafe:
+        def __str__(self) -> str:
+            return 'rendered by the caller'
+
+    with patch.object(RotkehlchenLogsAdapter, 'structured', True):
+        log.info('Queued %s', 'message', value=Unsafe())
+        try:
+            raise ValueError('bad value')
+        except ValueError:
+            log.error('Unhandled exception', exc_info=True)
+    queued_handler.close()
+
+    record, exception_record = target.records
+    assert record.structured_data == {'value': 'rendered by the caller'}
+    assert target.format(record) == 'INFO Main Greenlet: Queued message value=rendered by the caller'  # noqa: E501
+    assert exception_record.exc_info is None
+    assert exception_record.exc_text.endswith('ValueError: bad value')
+
+
+def test_queued_handler_does_not_block_the_hub():
+    """Test that the queued handler writes from a native thread even when monkey patched,
+    as the app and the test runner are, so that a slow write doesn't block the greenlets"""
+    class SlowHandler(RecordsHandler):
+
+        def emit(self, record: logging.LogRecord) -> None:
+            get_original('time', 'sleep')(0.2)
+            self.thread_id = get_original('_thread', 'get_ident')()
+            super().emit(record)
+
+    def tick(ticks: list[int]) -> None:
+        while True:
+            ticks.append(1)
+            gevent.sleep(0.01)
+
+    target = SlowHandler()
+    queued_handler = QueuedLogHandler(target)
+    log = _make_logger(queued_handler)
+    ticks: list[int] = []
+    ticker = gevent.spawn(tick, ticks)
+    log.info('Slow to write')
+    gevent.sleep(0.1)
+    assert len(ticks) > 3, 'the hub should keep running while the record is written'
+    queued_handler.close()
+    ticker.kill()
+
+    assert len(target.records) == 1
+    assert target.thread_id != get_original('_thread', 'get_ident')()
@@ -0,0 +1,89 @@
+import os
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from rotkehlchen.errors.misc import UnableToDecryptRemoteData
+from rotkehlchen.premium.delta import DBDeltaSync, iterate_chunks
+from rotkehlchen.tests.utils.premium import LocalDeltaSyncServer
+
+
+def _create_db(path: Path, rows: int) -> None:
+    conn = sqlite3.connect(path)
+    conn.execute('CREATE TABLE data (identifier INTEGER PRIMARY KEY, value BLOB)')
+    conn.executemany(
+        'INSERT INTO data VALUES (?, ?)',
+        [(idx, os.urandom(500)) for idx in range(rows)],
+    )
+    conn.commit()
+    conn.close()
+
+
+def _update_db(path: Path, identifiers: list[int]) -> None:
+    conn = sqlite3.connect(path)
+    conn.executemany(
+        'UPDATE data SET value=? WHERE identifier=?',
+        [(os.urandom(500), idx) for idx in identifiers],
+    )
+    conn.commit()
+    conn.close()
+
+
+def test_iterate_chunks(tmp_path):
+    path = tmp_path / 'test.db'
+    _create_db(path, rows=5000)
+    data = path.read_bytes()
+    with open(path, 'rb') as f:
+        chunks = list(iterate_chunks(f))
+
+    assert b''.join(chunks) == data
+    assert len(chunks) > 1
+    assert all(len(x) % 4096 == 0 for x in chunks)
+
+
+def test_delta_upload_and_download(tmp_path):
+    """Test that only the changed chunks are transferred in each direction"""
+    server = LocalDeltaSyncServer()
+    local_path = tmp_path / 'local.db'
+    _create_db(local_path, rows=5000)
+    delta_sync = DBDeltaSync(remote=server, password='123')
+
+    result = delta_sync.upload(local_path)
+    assert result.transferred_chunks == len(server.chunks) == server.chunks_put
+    total_chunks = result.total_chunks
+
+    # uploading again without changes sends nothing
+    result = delta_sync.upload(local_path)
+    assert result.transferred_chunks == 0
+    assert result.transferred_bytes == 0
+
+    # change a few rows and only some chunks should be sent
+    _update_db(local_path, [10, 2500])
+    result = delta_sync.upload(local_path)
+    assert 0 < result.transferred_chunks < total_chunks / 4
+
+    # another device with the old DB downloads only what changed
+    other_path = tmp_path / 'other.db'
+    _create_db(other_path, rows=10)
+    target_path = tmp_path / 'target.db'
+    result = delta_sync.download(target_path=target_path, local_path=other_path)
+    assert result.transferred_chunks == result.total_chunks  # nothing in common
+    assert target_path.read_bytes() == local_path.read_bytes()
+
+    _update_db(local_path, [100])
+    delta_sync.upload(local_path)
+    got_before = server.chunks_got
+    result = delta_sync.download(target_path=tmp_path / 'target2.db', local_path=target_path)
+    assert 0 < result.transferred_chunks == server.chunks_got - got_before < 4
+    assert (tmp_path / 'target2.db').read_bytes() == local_path.read_bytes()
+
+
+def test_delta_download_wrong_password(tmp_path):
+    server = LocalDeltaSyncServer()
+    assert DBDeltaSync(remote=server, password='123').download(tmp_path / 'a.db', None) is None
+    local_path = tmp_path / 'local.db'
+    _create_db(local_path, rows=100)
+    DBDeltaSync(remote=server, password='123').upload(local_path)
+    with pytest.raises(UnableToDecryptRemoteData):
+        DBDeltaSync(remote=server, password='456').download(tmp_path / 'a.db', None)
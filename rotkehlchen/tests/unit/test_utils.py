@@ -1,19 +1,29 @@
 import json
 import time
+from collections import defaultdict
+from http import HTTPStatus
 from json.decoder import JSONDecodeError
 from unittest.mock import patch
 
+import gevent
 import pytest
 from eth_typing import HexAddress, HexStr
 from eth_utils import to_checksum_address
 from hexbytes import HexBytes
+from web3.datastructures import AttributeDict
 
+from rotkehlchen.accounting.structures.balance import Balance
 from rotkehlchen.chain.ethereum.utils import generate_address_via_create2
+from rotkehlchen.constants.assets import A_BTC, A_ETH
 from rotkehlchen.errors.serialization import ConversionError
 from rotkehlchen.fval import FVal
+from rotkehlchen.greenlets.manager import GreenletManager
 from rotkehlchen.serialization.deserialize import deserialize_timestamp_from_date
-from rotkehlchen.serialization.serialize import process_result
+from rotkehlchen.serialization.serialize import process_result, process_result_to_json
 from rotkehlchen.tests.utils.mock import MockResponse
+from rotkehlchen.types import Location, TradeType
+from rotkehlchen.user_messages import MessagesAggregator
+from rotkehlchen.utils.data_structures import PartitionedLRUCache
 from rotkehlchen.utils.misc import (
     combine_dicts,
     combine_stat_dicts,
@@ -22,8 +32,16 @@ from rotkehlchen.utils.misc import (
     pairwise,
     pairwise_longest,
     timestamp_to_date,
+    ts_now,
 )
-from rotkehlchen.utils.mixins.cacheable import CacheableMixIn, cache_response_timewise
+from rotkehlchen.utils.mixins.cacheable import (
+    MAX_CACHED_RESULTS,
+    CacheableMixIn,
+    cache_response_timewise,
+    cache_response_timewise_immutable,
+)
+from rotkehlchen.utils.mixins.common import function_sig_key
+from rotkehlchen.utils.mixins.lockable import LockableQueryMixIn, protect_with_lock
 from rotkehlchen.utils.serialization import jsonloads_dict, jsonloads_list
 from rotkehlchen.utils.version_check import get_current_version
 
@@ -63,6 +81,32 @@ def test_hexbytes_in_process_result():
     assert json.dumps(process_result(d)) == expected_str
 
 
+def test_process_result_to_json():
+    """Test that serializing in one pass gives the same json as process_result"""
+    d = {
+        'result': [{
+            'amount': FVal('1.5'),
+            'location': Location.KRAKEN,
+            'balance': Balance(amount=FVal(1), usd_value=FVal(2)),
+            A_ETH: [1, 2.5, float('nan'), float('inf'), None, True, False, 'ü"\n'],
+            1: HTTPStatus.OK,
+            2.5: A_BTC,
+            None: HexBytes(b'\x01\x02'),
+            'type': TradeType.BUY,
+            'attributes': AttributeDict({'foo': FVal(3)}),
+            'empty': [{}, []],
+        }],
+        'message': '',
+        'status_code': HTTPStatus.CONFLICT,
+    }
+    assert process_result_to_json(d) == json.dumps(process_result(d))
+
+    with pytest.raises(ValueError):
+        process_result_to_json({'overview': [{'foo': (FVal('0.1'),)}]})
+    with pytest.raises(TypeError):
+        process_result_to_json({'overview': object()})
+
+
 def test_iso8601ts_to_timestamp():
     assert iso8601ts_to_timestamp('2018-09-09T12:00:00.000Z') == 1536494400
     assert iso8601ts_to_timestamp('2011-01-01T04:13:22.220Z') == 1293855202
@@ -247,6 +291,136 @@ def test_cache_response_timewise_with_arguments_matter_false():
     assert instance.do_something_arguments_dont_matter_count == 2
 
 
+class Bar(CacheableMixIn, LockableQueryMixIn):
+    def __init__(self):
+        super().__init__()
+        self.greenlet_manager = GreenletManager(msg_aggregator=MessagesAggregator())
+        self.calls = 0
+        self.running = 0
+
+    @cache_response_timewise(ttl_secs=100)
+    def slow_query(self, value, **kwargs):  # pylint: disable=unused-argument
+        self.calls += 1
+        gevent.sleep(0.1)
+        return value + self.calls
+
+    @protect_with_lock()
+    @cache_response_timewise(ttl_secs=100, stale_while_revalidate=True)
+    def stale_query(self, **kwargs):  # pylint: disable=unused-argument
+        self.calls += 1
+        self.running += 1
+        assert self.running == 1, 'should run under the lock'
+        gevent.sleep(0.1)
+        self.running -= 1
+        return self.calls
+
+    @cache_response_timewise()
+    def fast_query(self, value, **kwargs):  # pylint: disable=unused-argument
+        return value
+
+    @cache_response_timewise_immutable()
+    def mutable_query(self, **kwargs):  # pylint: disable=unused-argument
+        self.calls += 1
+        return {'a': [1, 2], 'b': defaultdict(list, {'c': [3]})}
+
+
+def test_cache_response_timewise_ttl_and_single_flight():
+    """Test the per method TTL and that concurrent calls share a single query"""
+    instance = Bar()
+    greenlets = [gevent.spawn(instance.slow_query, 10) for _ in range(5)]
+    gevent.joinall(greenlets)
+    assert [x.value for x in greenlets] == [11] * 5
+    assert instance.calls == 1
+
+    with patch('rotkehlchen.utils.mixins.cacheable.ts_now', return_value=ts_now() + 98):
+        assert instance.slow_query(10) == 11
+    with patch('rotkehlchen.utils.mixins.cacheable.ts_now', return_value=ts_now() + 102):
+        assert instance.slow_query(10) == 12
+    assert instance.calls == 2
+
+    instance.cache_ttl_secs = 0  # disables the cache despite the method TTL
+    assert instance.slow_query(10) == 13
+
+
+def test_cache_response_timewise_stale_while_revalidate():
+    instance = Bar()
+    assert instance.stale_query() == 1
+    with patch('rotkehlchen.utils.mixins.cacheable.ts_now', return_value=ts_now() + 102):
+        # the stale value is returned while a single refresh runs in the background
+        assert instance.stale_query() == 1
+        assert instance.stale_query() == 1
+        assert len(instance.greenlet_manager.greenlets) == 1
+        gevent.sleep(0)  # the refresh starts
+        assert instance.stale_query(ignore_cache=True) == 3, 'waits for the refresh lock'
+        assert instance.calls == 3
+        assert instance.stale_query() == 3
+
+    with patch('rotkehlchen.utils.mixins.cacheable.ts_now', return_value=ts_now() + 204):
+        assert instance.stale_query() == 3
+        instance.greenlet_manager.clear()  # as in logout
+        gevent.sleep(0)
+        assert instance.pending_refreshes == {}
+        assert instance.calls == 3
+
+
+def test_cache_response_timewise_bounded_and_immutable():
+    instance = Bar()
+    for value in range(MAX_CACHED_RESULTS + 10):
+        instance.fast_query(value)
+    assert len(instance.results_cache) == MAX_CACHED_RESULTS
+
+    result = instance.mutable_query()
+    result['a'].append(3)
+    result['b']['c'].append(4)
+    result['b']['d'].append(5)
+    assert instance.mutable_query() == {'a': [1, 2], 'b': {'c': [3]}}
+    assert instance.calls == 1
+
+
+def test_function_sig_key():
+    """Test that different arguments give different keys and equal arguments equal keys"""
+    def key(*args, **kwargs):
+        return function_sig_key('foo', True, True, *args, **kwargs)
+
+    assert key('ab', 'c') != key('a', 'bc')
+    assert key(True) != key(1)
+    assert key(['0xa', '0xb']) == key(['0xa', '0xb'])
+    assert key(['0xa', '0xb']) != key(['0xa', '0xb', '0xc'])
+    assert key([{'a': 1}]) == key([{'a': 1}])
+    assert key('a', b='b') == key('a', b='b', ignore_cache=True)
+    assert key(a='x') != key(b='x')
+    assert key('a', b='b') != key('a', c='b')
+    assert function_sig_key('foo', True, False, 'a', ignore_cache=True) != key('a')
+    assert function_sig_key('foo', False, False, 'a', 'b') == function_sig_key('foo', False, False)  # noqa: E501
+    hash(key({'a': [1, {2}]}, FVal('1.5')))
+
+
+def test_partitioned_lru_cache():
+    cache: PartitionedLRUCache[str, int] = PartitionedLRUCache(maxsize=2, partition_maxsizes={'big': 3})  # noqa: E501
+    for idx in range(4):
+        cache.set(f'BIG{idx}', idx, 'big')
+    cache.set('small0', 0, 'small')
+    assert cache.get('big0') is None  # evicted by the entries of its own partition only
+    assert [cache.get(f'big{idx}') for idx in (1, 2, 3)] == [1, 2, 3]
+    cache.set('small1', 1, 'small')
+    assert cache.get('SMALL0') == 0
+    cache.set('small2', 2, 'small')  # small1 is the least recently used
+    assert cache.get('small1') is None
+    cache.set('small2', 2, 'big')  # moves between partitions
+    assert cache.get('big1') is None
+    assert cache.get('small2') == 2
+    cache.remove('Small2')
+    assert cache.get('small2') is None
+
+    stats = cache.stats()
+    assert (stats.size, stats.hits, stats.misses) == (3, 5, 4)
+    assert stats.serialize() == {'size': 3, 'hits': 5, 'misses': 4, 'hit_rate': 0.5556}
+    cache.resize(maxsize=1, partition_maxsizes={})
+    assert cache.stats().size == 2
+    cache.clear()
+    assert cache.stats().size == 0
+
+
 def test_convert_to_int():
     assert convert_to_int('5') == 5
     assert convert_to_int('37451082560000003241000000000003221111111111') == 37451082560000003241000000000003221111111111  # noqa: E501
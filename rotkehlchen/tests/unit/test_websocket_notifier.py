@@ -0,0 +1,112 @@
+import json
+from unittest.mock import patch
+
+import gevent
+from gevent.event import Event
+
+from rotkehlchen.api.websockets.notifier import RotkiNotifier
+from rotkehlchen.api.websockets.typedefs import WSMessageType
+
+
+class MockWebsocket():
+    """A websocket that blocks on sending until it's allowed to"""
+
+    def __init__(self) -> None:
+        self.closed = False
+        self.frames: list[str] = []
+        self.can_send = Event()
+
+    def send(self, frame: str) -> None:
+        self.can_send.wait()
+        self.frames.append(frame)
+
+    def messages(self) -> list[dict]:
+        return [json.loads(x) for x in self.frames]
+
+
+def _csv_progress(entries):
+    return {'source': 'binance', 'processed_entries': entries}
+
+
+def test_broadcast_does_not_block_on_slow_subscriber():
+    """Test that broadcasting returns while a subscriber does not read and that queued
+    progress messages are replaced by newer ones of the same key"""
+    notifier = RotkiNotifier(greenlet_manager=None)
+    slow, fast = MockWebsocket(), MockWebsocket()
+    fast.can_send.set()
+    notifier.subscribe(slow)
+    notifier.subscribe(fast)
+    sent = []
+    with gevent.Timeout(2):
+        notifier.broadcast(WSMessageType.LEGACY, {'verbosity': 'error', 'value': 'a'})
+        gevent.sleep(0.01)  # the slow subscriber now blocks sending the first message
+        for entries in range(1, 4):
+            notifier.broadcast(WSMessageType.CSV_IMPORT_PROGRESS, _csv_progress(entries * 100))
+            gevent.sleep(0.01)
+        notifier.broadcast(
+            WSMessageType.LEGACY,
+            {'verbosity': 'error', 'value': 'b'},
+            success_callback=lambda: sent.append('b'),
+        )
+        gevent.sleep(0.01)
+
+    assert len(fast.frames) == 5
+    assert slow.frames == []
+    slow.can_send.set()
+    gevent.sleep(0.1)
+    assert slow.messages() == [
+        {'type': 'legacy', 'data': {'verbosity': 'error', 'value': 'a'}},
+        {'type': 'csv_import_progress', 'data': _csv_progress(300)},
+        {'type': 'legacy', 'data': {'verbosity': 'error', 'value': 'b'}},
+    ]
+    assert sent == ['b', 'b'], 'success callback should run once per subscriber'
+    metrics = notifier.serialize_metrics()['subscribers']
+    assert metrics[0]['coalesced_messages'] == 2
+    assert metrics[0]['sent_messages'] == 3
+    assert metrics[1]['coalesced_messages'] == 0
+    assert metrics[1]['sent_messages'] == 5
+
+
+def test_slow_subscriber_drops_oldest_messages():
+    notifier = RotkiNotifier(greenlet_manager=None)
+    websocket = MockWebsocket()
+    notifier.subscribe(websocket)
+    failed = []
+    with patch('rotkehlchen.api.websockets.notifier.MAX_QUEUED_MESSAGES', 3):
+        for idx in range(6):
+            notifier.broadcast(
+                WSMessageType.LEGACY,
+                {'verbosity': 'warning', 'value': str(idx)},
+                failure_callback=lambda msg: failed.append(msg),
+                failure_callback_args={'msg': idx},
+            )
+
+    websocket.can_send.set()
+    gevent.sleep(0.1)
+    assert [x['data']['value'] for x in websocket.messages()] == ['3', '4', '5']
+    assert failed == [0, 1, 2]
+    assert notifier.serialize_metrics()['subscribers'][0]['dropped_messages'] == 3
+
+
+def test_batched_frames():
+    notifier = RotkiNotifier(greenlet_manager=None)
+    websocket = MockWebsocket()
+    notifier.subscribe(websocket)
+    notifier.set_batch_frames(websocket, True)
+    for idx in range(3):
+        notifier.broadcast(WSMessageType.LEGACY, {'verbosity': 'warning', 'value': str(idx)})
+    websocket.can_send.set()
+    gevent.sleep(0.1)
+    assert websocket.messages() == [[
+        {'type': 'legacy', 'data': {'verbosity': 'warning', 'value': str(idx)}}
+        for idx in range(3)
+    ]]
+
+    websocket.closed = True
+    failed = []
+    notifier.broadcast(WSMessageType.LEGACY, {}, failure_callback=lambda: failed.append(1))
+    assert failed == [1], 'failure callback should run if there is no subscriber'
+    metrics = notifier.serialize_metrics()
+    assert metrics['subscribers'] == []
+    assert metrics['unsubscribed']['sent_messages'] == 3
+    assert metrics['unsubscribed']['sent_frames'] == 1
@@ -3,6 +3,8 @@ from typing import NamedTuple, Optional
 from rotkehlchen.constants.misc import (
     DEFAULT_MAX_LOG_BACKUP_FILES,
     DEFAULT_MAX_LOG_SIZE_IN_MB,
+    DEFAULT_SQL_READ_CONNECTIONS,
+    DEFAULT_SQL_SLOW_QUERY_MS,
     DEFAULT_SQL_VM_INSTRUCTIONS_CB,
 )
 
@@ -14,9 +16,14 @@ class ConfigurationArgs(NamedTuple):
     logtarget: Optional[str]
     loglevel: str
     logfromothermodules: bool
+    logformat: str = 'text'
+    logasync: bool = False
     max_size_in_mb_all_logs: int = DEFAULT_MAX_LOG_SIZE_IN_MB
     max_logfiles_num: int = DEFAULT_MAX_LOG_BACKUP_FILES
     sqlite_instructions: int = DEFAULT_SQL_VM_INSTRUCTIONS_CB
+    sqlite_read_connections: int = DEFAULT_SQL_READ_CONNECTIONS
+    sqlite_instrumentation: bool = False
+    sqlite_slow_query_ms: int = DEFAULT_SQL_SLOW_QUERY_MS
 
 
 def default_args(
@@ -32,6 +39,11 @@ def default_args(
         max_size_in_mb_all_logs=max_size_in_mb_all_logs,
         max_logfiles_num=DEFAULT_MAX_LOG_BACKUP_FILES,
         sqlite_instructions=DEFAULT_SQL_VM_INSTRUCTIONS_CB,
+        sqlite_read_connections=DEFAULT_SQL_READ_CONNECTIONS,
+        sqlite_instrumentation=False,
+        sqlite_slow_query_ms=DEFAULT_SQL_SLOW_QUERY_MS,
         logfile=None,
         logtarget=None,
+        logformat='text',
+        logasync=False,
     )
@@ -6,6 +6,7 @@ from typing import Literal, Optional
 from unittest.mock import patch
 
 from rotkehlchen.constants import ROTKEHLCHEN_SERVER_TIMEOUT
+from rotkehlchen.premium.delta import DeltaSyncRemoteInterface
 from rotkehlchen.premium.premium import Premium, PremiumCredentials
 from rotkehlchen.rotkehlchen import Rotkehlchen
 from rotkehlchen.tests.utils.constants import A_GBP, DEFAULT_TESTS_MAIN_CURRENCY
@@ -222,3 +223,31 @@ def assert_db_got_replaced(rotkehlchen_instance: Rotkehlchen, username: str):
 
     assert main_db_exists
     assert backup_db_exists
+
+
+class LocalDeltaSyncServer(DeltaSyncRemoteInterface):
+    """Local stand-in for the remote side of the delta sync that keeps everything in memory"""
+
+    def __init__(self) -> None:
+        self.manifest: Optional[str] = None
+        self.chunks: dict[str, str] = {}
+        self.chunks_put = 0
+        self.chunks_got = 0
+
+    def get_manifest(self) -> Optional[str]:
+        return self.manifest
+
+    def put_manifest(self, data: str) -> None:
+        self.manifest = data
+
+    def missing_chunks(self, identifiers: list[str]) -> set[str]:
+        return {x for x in identifiers if x not in self.chunks}
+
+    def put_chunks(self, chunks: dict[str, str]) -> None:
+        self.chunks_put += len(chunks)
+        self.chunks.update(chunks)
+
+    def get_chunks(self, identifiers: list[str]) -> dict[str, str]:
+        result = {x: self.chunks[x] for x in identifiers if x in self.chunks}
+        self.chunks_got += len(result)
+        return result
@@ -1,7 +1,11 @@
+import json
 import platform
 
 import gevent
 import pytest
+import requests
+
+from rotkehlchen.tests.utils.api import api_url_for, assert_proper_response_with_result
 
 
 def _send_stuff(msg_aggregator, websocket_connection, string_len):
@@ -36,3 +40,36 @@ def test_websockets_concurrent_use(rotkehlchen_api_server, websocket_connection)
             isinstance(x.exception, gevent.exceptions.ConcurrentObjectUseError) is False
             for x in [g1, g2] + rotki.greenlet_manager.greenlets
         ), 'At least one ConcurrentObjectUseError exception happened'
+
+
+@pytest.mark.parametrize('legacy_messages_via_websockets', [True])
+def test_websockets_batched_frames(rotkehlchen_api_server, websocket_connection):
+    """Test that a client can ask for batched frames and that the websocket metrics
+    can be queried"""
+    rotki = rotkehlchen_api_server.rest_api.rotkehlchen
+    websocket_connection.ws.send(json.dumps({'batch_frames': True}))
+    response = requests.get(api_url_for(rotkehlchen_api_server, 'websocketmetricsresource'))
+    result = assert_proper_response_with_result(response)
+    assert len(result['subscribers']) == 1
+    assert result['subscribers'][0]['batch_frames'] is True
+
+    for idx in range(3):
+        rotki.msg_aggregator.add_warning(f'Warning {idx}')
+    messages = []
+    with gevent.Timeout(10):
+        while len(messages) != 3:
+            if websocket_connection.messages_num() == 0:
+                gevent.sleep(0.2)
+                continue
+            frame = websocket_connection.pop_message()
+            assert isinstance(frame, list)
+            messages.extend(frame)
+
+    assert messages == [
+        {'type': 'legacy', 'data': {'verbosity': 'warning', 'value': f'Warning {idx}'}}
+        for idx in range(3)
+    ]
+    response = requests.get(api_url_for(rotkehlchen_api_server, 'websocketmetricsresource'))
+    result = assert_proper_response_with_result(response)
+    assert result['subscribers'][0]['sent_messages'] == 3
+    assert result['subscribers'][0]['dropped_messages'] == 0
@@ -1,7 +1,28 @@
 import collections
-from typing import Generic, Optional, OrderedDict, TypeVar
+from typing import Generic, NamedTuple, Optional, OrderedDict, TypeVar, Union
 
 RT = TypeVar('RT')
+PT = TypeVar('PT')
+
+
+class CacheStats(NamedTuple):
+    """Usage statistics of a cache since it was created"""
+    size: int
+    hits: int
+    misses: int
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups != 0 else 0.0
+
+    def serialize(self) -> dict[str, Union[int, float]]:
+        return {
+            'size': self.size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hit_rate, 4),
+        }
 
 
 class LRUCacheWithRemove(Generic[RT]):
@@ -10,12 +31,16 @@ class LRUCacheWithRemove(Generic[RT]):
     def __init__(self, maxsize: int = 512):
         self.cache: OrderedDict[str, RT] = collections.OrderedDict()
         self.maxsize: int = maxsize
+        self.hits = 0
+        self.misses = 0
 
     def get(self, key: str) -> Optional[RT]:
         lowered_key = key.lower()
         if lowered_key in self.cache:
             self.cache.move_to_end(lowered_key)
+            self.hits += 1
             return self.cache[lowered_key]
+        self.misses += 1
         return None
 
     def set(self, key: str, value: RT) -> None:
@@ -32,3 +57,96 @@ class LRUCacheWithRemove(Generic[RT]):
     def clear(self) -> None:
         """Delete all entries in the cache"""
         self.cache.clear()
+
+    def resize(self, maxsize: int) -> None:
+        """Change the max size of the cache evicting the least recently used entries"""
+        self.maxsize = maxsize
+        while len(self.cache) > self.maxsize:
+            self.cache.popitem(last=False)
+
+    def stats(self) -> CacheStats:
+        return CacheStats(size=len(self.cache), hits=self.hits, misses=self.misses)
+
+
+class PartitionedLRUCache(Generic[PT, RT]):
+    """A LRU cache split in partitions with their own max size so that the entries of
+    one partition can't evict the entries of another. Keys are case insensitive and
+    unique across all partitions.
+
+    Partitions that are not in `partition_maxsizes` can hold up to `maxsize` entries.
+    """
+
+    def __init__(self, maxsize: int, partition_maxsizes: Optional[dict[PT, int]] = None):
+        self.maxsize = maxsize
+        self.partition_maxsizes = partition_maxsizes if partition_maxsizes is not None else {}
+        self.partitions: dict[PT, OrderedDict[str, RT]] = {}
+        self.key_partitions: dict[str, PT] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _evict(self, partition: PT) -> None:
+        entries = self.partitions[partition]
+        maxsize = self.partition_maxsizes.get(partition, self.maxsize)
+        while len(entries) > maxsize:
+            evicted_key, _ = entries.popitem(last=False)
+            del self.key_partitions[evicted_key]
+
+    def get(self, key: str) -> Optional[RT]:
+        lowered_key = key.lower()
+        partition = self.key_partitions.get(lowered_key)
+        if partition is None:
+            self.misses += 1
+            return None
+
+        entries = self.partitions[partition]
+        entries.move_to_end(lowered_key)
+        self.hits += 1
+        return entries[lowered_key]
+
+    def set(self, key: str, value: RT, partition: PT) -> None:
+        lowered_key = key.lower()
+        old_partition = self.key_partitions.get(lowered_key)
+        if old_partition is not None and old_partition != partition:
+            del self.partitions[old_partition][lowered_key]
+
+        if (entries := self.partitions.get(partition)) is None:
+            entries = self.partitions[partition] = collections.OrderedDict()
+        entries[lowered_key] = value
+        entries.move_to_end(lowered_key)
+        self.key_partitions[lowered_key] = partition
+        self._evict(partition)
+
+    def remove(self, key: str) -> None:
+        """Remove an item from the cache"""
+        lowered_key = key.lower()
+        if (partition := self.key_partitions.pop(lowered_key, None)) is not None:
+            del self.partitions[partition][lowered_key]
+
+    def clear(self) -> None:
+        """Delete all entries in the cache"""
+        self.partitions.clear()
+        self.key_partitions.clear()
+
+    def values(self) -> list[RT]:
+        """The values of all partitions. Each partition is ordered from the most to the
+        least recently used and the partitions are interleaved"""
+        values = []
+        iterators = [reversed(x.values()) for x in self.partitions.values()]
+        while len(iterators) != 0:
+            for iterator in list(iterators):
+                try:
+                    values.append(next(iterator))
+                except StopIteration:
+                    iterators.remove(iterator)
+        return values
+
+    def resize(self, maxsize: int, partition_maxsizes: Optional[dict[PT, int]] = None) -> None:
+        """Change the max sizes of the partitions evicting the least recently used entries"""
+        self.maxsize = maxsize
+        if partition_maxsizes is not None:
+            self.partition_maxsizes = partition_maxsizes
+        for partition in self.partitions:
+            self._evict(partition)
+
+    def stats(self) -> CacheStats:
+        return CacheStats(size=len(self.key_partitions), hits=self.hits, misses=self.misses)
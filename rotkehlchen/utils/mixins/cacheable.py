@@ -1,14 +1,22 @@
-from copy import deepcopy
-from functools import wraps
-from typing import TYPE_CHECKING, Any, Callable, NamedTuple
+import logging
+from functools import partial, wraps
+from typing import TYPE_CHECKING, Any, Callable, NamedTuple, Optional
 
+import gevent
+from gevent.event import AsyncResult
+
+from rotkehlchen.logging import RotkehlchenLogsAdapter
 from rotkehlchen.utils.misc import ts_now
 
-from .common import function_sig_key
+from .common import FunctionSigKey, function_sig_key
 
 if TYPE_CHECKING:
+    from rotkehlchen.greenlets.manager import GreenletManager
     from rotkehlchen.types import Timestamp
 
+logger = logging.getLogger(__name__)
+log = RotkehlchenLogsAdapter(logger)
+
 
 class ResultCache(NamedTuple):
     """Represents a time-cached result of some API query"""
@@ -16,24 +24,30 @@ class ResultCache(NamedTuple):
     timestamp: 'Timestamp'
 
 
-# Seconds for which cached api queries will be cached
-# By default 10 minutes.
-# TODO: Make configurable!
+# Default seconds for which cached api queries will be cached. Can be changed per object
+# with `cache_ttl_secs` and per method with the `ttl_secs` argument of the decorators.
 CACHE_RESPONSE_FOR_SECS = 600
+# Max number of results that are cached per object. Oldest used results are evicted first.
+MAX_CACHED_RESULTS = 256
 
 
 class CacheableMixIn:
     """Interface for objects that can use timewise caches
 
     Any object that adheres to this MixIn's interface can have its functions
-    use the @cache_response_timewise decorator
+    use the @cache_response_timewise decorator. Objects with methods that use
+    stale_while_revalidate also need a greenlet_manager to run the refreshes.
     """
+    greenlet_manager: 'GreenletManager'
 
     def __init__(self, *args: Any, **kwargs: Any) -> None:
         super().__init__(*args, **kwargs)
-        self.results_cache: dict[int, ResultCache] = {}
+        self.results_cache: dict[FunctionSigKey, ResultCache] = {}
         # Can also be 0 which means cache is disabled.
         self.cache_ttl_secs = CACHE_RESPONSE_FOR_SECS
+        # Results of the refreshes that are currently running so that identical
+        # concurrent calls can wait for them instead of querying again
+        self.pending_refreshes: dict[FunctionSigKey, AsyncResult] = {}
 
     def flush_cache(self, name: str, *args: Any, **kwargs: Any) -> None:
         cache_key = function_sig_key(
@@ -46,14 +60,123 @@ class CacheableMixIn:
         self.results_cache.pop(cache_key, None)
 
 
-def _cache_response_timewise_base(
+def _copy_containers(value: Any) -> Any:
+    """Copies the dicts, lists and sets of a cached result so the caller can mutate them.
+
+    Everything else is shared with the cache. Cached results only contain immutable
+    values (NamedTuples, FVals, assets etc.) in their containers so this is a lot
+    cheaper than a deepcopy while giving the same guarantee.
+    """
+    if value.__class__ is dict:
+        return {k: _copy_containers(v) for k, v in value.items()}
+    if isinstance(value, dict):  # subclasses such as defaultdict keep their type
+        result = value.copy()
+        for k, v in result.items():
+            result[k] = _copy_containers(v)
+        return result
+    if isinstance(value, list):
+        return [_copy_containers(x) for x in value]
+    if isinstance(value, set):
+        return set(value)
+    if value.__class__ is tuple:  # not NamedTuples, they are treated as immutable values
+        return tuple(_copy_containers(x) for x in value)
+    return value
+
+
+def _cache_ttl(wrappingobj: CacheableMixIn, ttl_secs: Optional[int]) -> int:
+    """A zero TTL in the object disables caching for all its methods"""
+    if ttl_secs is None or wrappingobj.cache_ttl_secs == 0:
+        return wrappingobj.cache_ttl_secs
+    return ttl_secs
+
+
+def _store_result(
+        wrappingobj: CacheableMixIn,
+        cache_key: FunctionSigKey,
+        result: ResultCache,
+) -> None:
+    wrappingobj.results_cache.pop(cache_key, None)  # so it moves to the end
+    wrappingobj.results_cache[cache_key] = result
+    if len(wrappingobj.results_cache) > MAX_CACHED_RESULTS:
+        del wrappingobj.results_cache[next(iter(wrappingobj.results_cache))]
+
+
+def _new_pending_refresh(
+        wrappingobj: CacheableMixIn,
+        cache_key: FunctionSigKey,
+) -> AsyncResult:
+    pending = AsyncResult()
+    wrappingobj.pending_refreshes[cache_key] = pending
+    return pending
+
+
+def _refresh(
+        wrappingobj: CacheableMixIn,
+        f: Callable,
+        cache_key: FunctionSigKey,
+        pending: AsyncResult,
+        *args: Any,
+        **kwargs: Any,
+) -> Any:
+    """Calls the function and caches its result. Identical calls made while this runs
+    wait for it through `pending` and get the same result or exception instead of
+    calling the function again.
+    """
+    now = ts_now()
+    try:
+        result = f(wrappingobj, *args, **kwargs)
+    except BaseException as e:  # waiters need to be woken up even if we were killed
+        pending.set_exception(e)
+        raise
+    else:
+        _store_result(wrappingobj, cache_key, ResultCache(result, now))
+        pending.set(result)
+        return result
+    finally:
+        if wrappingobj.pending_refreshes.get(cache_key) is pending:
+            del wrappingobj.pending_refreshes[cache_key]
+
+
+def _background_refresh(
+        wrappingobj: CacheableMixIn,
+        method_name: str,
+        cache_key: FunctionSigKey,
+        pending: AsyncResult,
+        args: tuple[Any, ...],
+        kwargs: dict[str, Any],
+) -> None:
+    """Refreshes a stale result by calling the method of the object, so that the refresh
+    also goes through the other decorators of the method such as its lock"""
+    gevent.getcurrent().stale_refresh = (cache_key, pending)  # picked up by _cached_call
+    try:
+        getattr(wrappingobj, method_name)(*args, **kwargs)
+    except Exception as e:  # pylint: disable=broad-except  # the stale result stays cached
+        log.error(f'Background refresh of {method_name} failed due to {str(e)}')
+
+
+def _end_background_refresh(
+        wrappingobj: CacheableMixIn,
+        cache_key: FunctionSigKey,
+        pending: AsyncResult,
+        greenlet: gevent.Greenlet,
+) -> None:
+    """Wakes up the waiters of a background refresh that was killed before it finished"""
+    if pending.ready() is False:
+        pending.set_exception(greenlet.exception or gevent.GreenletExit())
+    if wrappingobj.pending_refreshes.get(cache_key) is pending:
+        del wrappingobj.pending_refreshes[cache_key]
+
+
+def _cached_call(
         wrappingobj: CacheableMixIn,
         f: Callable,
         arguments_matter: bool,
         forward_ignore_cache: bool,
+        ttl_secs: Optional[int],
+        stale_while_revalidate: bool,
         *args: Any,
         **kwargs: Any,
-) -> tuple[bool, int, 'Timestamp', dict]:
+) -> Any:
     """Base code used in the 2 cache_response_timewise decorators"""
     if forward_ignore_cache:
         ignore_cache = kwargs.get('ignore_cache', False)
@@ -66,22 +189,52 @@ def _cache_response_timewise_base(
         *args,
         **kwargs,
     )
-    now = ts_now()
-    if ignore_cache is False and cache_key in wrappingobj.results_cache:
-        # Check the cache
-        cache_life_secs = now - wrappingobj.results_cache[cache_key].timestamp
-
-    cache_miss = (
-        ignore_cache is True or
-        cache_key not in wrappingobj.results_cache or
-        cache_life_secs >= wrappingobj.cache_ttl_secs
-    )
-    return cache_miss, cache_key, now, kwargs
+    stale_refresh = getattr(gevent.getcurrent(), 'stale_refresh', None)
+    if stale_refresh is not None and stale_refresh[0] == cache_key:
+        return _refresh(wrappingobj, f, cache_key, stale_refresh[1], *args, **kwargs)
+
+    if ignore_cache is True:
+        pending = _new_pending_refresh(wrappingobj, cache_key)
+        return _refresh(wrappingobj, f, cache_key, pending, *args, **kwargs)
+
+    ttl = _cache_ttl(wrappingobj, ttl_secs)
+    cached = wrappingobj.results_cache.get(cache_key) if ttl != 0 else None
+    if cached is not None and ts_now() - cached.timestamp < ttl:
+        _store_result(wrappingobj, cache_key, cached)  # mark as recently used
+        return cached.result
+
+    if (pending := wrappingobj.pending_refreshes.get(cache_key)) is not None:
+        if cached is not None and stale_while_revalidate:
+            return cached.result
+        return pending.get()  # single flight. Wait for the running refresh
+
+    if cached is not None and stale_while_revalidate:
+        # return the stale result and let one greenlet refresh it in the background
+        pending = _new_pending_refresh(wrappingobj, cache_key)
+        greenlet = wrappingobj.greenlet_manager.spawn_and_track(
+            after_seconds=None,
+            task_name=f'Refresh cached {f.__name__}',
+            exception_is_error=True,
+            method=_background_refresh,
+            wrappingobj=wrappingobj,
+            method_name=f.__name__,
+            cache_key=cache_key,
+            pending=pending,
+            args=args,
+            kwargs=kwargs,
+        )
+        greenlet.link(partial(_end_background_refresh, wrappingobj, cache_key, pending))
+        return cached.result
+
+    pending = _new_pending_refresh(wrappingobj, cache_key)
+    return _refresh(wrappingobj, f, cache_key, pending, *args, **kwargs)
 
 
 def cache_response_timewise(
         arguments_matter: bool = True,
         forward_ignore_cache: bool = False,
+        ttl_secs: Optional[int] = None,
+        stale_while_revalidate: bool = False,
 ) -> Callable:
     """ This is a decorator for caching results of functions of objects.
     The objects must adhere to the CachableOject interface.
@@ -105,26 +258,30 @@ def cache_response_timewise(
 
     if forward_ignore_cache is True then if the ignore_cache argument is given it's
     forward to the decorated function instead of being silently consumed.
+
+    If ttl_secs is given it's used as the cache TTL of this method instead of the
+    object's cache_ttl_secs. Setting the object's cache_ttl_secs to 0 still disables caching.
+
+    If stale_while_revalidate is True then an expired result is returned immediately
+    while a greenlet tracked by the object's greenlet_manager refreshes it by calling
+    the method again, so under its lock if it has one.
+
+    Concurrent calls with the same arguments that miss the cache share a single call
+    of the function.
     """
     def _cache_response_timewise(f: Callable) -> Callable:
         @wraps(f)
         def wrapper(wrappingobj: CacheableMixIn, *args: Any, **kwargs: Any) -> Any:
-            cache_miss, cache_key, now, kwargs = _cache_response_timewise_base(
+            return _cached_call(
                 wrappingobj,
                 f,
                 arguments_matter,
                 forward_ignore_cache,
+                ttl_secs,
+                stale_while_revalidate,
                 *args,
                 **kwargs,
             )
-            if cache_miss:
-                # Call the function, write the result in cache and return it
-                result = f(wrappingobj, *args, **kwargs)
-                wrappingobj.results_cache[cache_key] = ResultCache(result, now)
-                return result
-
-            # else hit the cache and return it
-            return wrappingobj.results_cache[cache_key].result
 
         return wrapper
     return _cache_response_timewise
@@ -133,28 +290,26 @@ def cache_response_timewise(
 def cache_response_timewise_immutable(
         arguments_matter: bool = True,
         forward_ignore_cache: bool = False,
+        ttl_secs: Optional[int] = None,
+        stale_while_revalidate: bool = False,
 ) -> Callable:
-    """ Same as cache_response_timewise but resulting dict is a copy so, the cache
-    itself can't be mutated.
+    """ Same as cache_response_timewise but the containers of the resulting value are
+    copies so the caller can mutate them without mutating the cache itself.
     """
     def _cache_response_timewise_immutable(f: Callable) -> Callable:
         @wraps(f)
         def wrapper(wrappingobj: CacheableMixIn, *args: Any, **kwargs: Any) -> Any:
-            cache_miss, cache_key, now, kwargs = _cache_response_timewise_base(
+            result = _cached_call(
                 wrappingobj,
                 f,
                 arguments_matter,
                 forward_ignore_cache,
+                ttl_secs,
+                stale_while_revalidate,
                 *args,
                 **kwargs,
             )
-            if cache_miss:
-                # Call the function, and write the result in cache
-                result = f(wrappingobj, *args, **kwargs)
-                wrappingobj.results_cache[cache_key] = ResultCache(result, now)
-
-            # in any case return a copy of the cache to avoid potential mutation
-            return deepcopy(wrappingobj.results_cache[cache_key].result)
+            return _copy_containers(result)
 
         return wrapper
     return _cache_response_timewise_immutable
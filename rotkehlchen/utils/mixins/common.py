@@ -1,7 +1,42 @@
 """Functionality common in some mixins"""
 
+from collections.abc import Hashable
 from typing import Any
 
+FunctionSigKey = tuple[Hashable, ...]
+
+
+def _argument_key(value: Any) -> Hashable:
+    """Returns a hashable key that is equal for equal arguments
+
+    Strings, which are the vast majority of arguments, are used as they are. Other values
+    are tagged with their type so that for example True and 1 don't give the same key.
+    Lists (such as the lists of accounts) become tuples which is a lot cheaper than
+    stringifying every element and still changes if the list is mutated.
+    """
+    if value.__class__ is str:
+        return value
+
+    try:
+        hash(value)
+    except TypeError:
+        pass
+    else:
+        return value.__class__, value
+
+    if isinstance(value, (list, tuple)):
+        try:
+            key = tuple(value)
+            hash(key)
+        except TypeError:
+            key = tuple(_argument_key(x) for x in value)
+        return tuple, key
+    if isinstance(value, (set, frozenset)):
+        return frozenset, frozenset(_argument_key(x) for x in value)
+    if isinstance(value, dict):
+        return dict, tuple((_argument_key(k), _argument_key(v)) for k, v in value.items())
+    return value.__class__, str(value)  # unhashable object. Fall back to its representation
+
 
 def function_sig_key(
         name: str,
@@ -9,21 +44,28 @@ def function_sig_key(
         skip_ignore_cache: bool,
         *args: Any,
         **kwargs: Any,
-) -> int:
-    """Return a unique int identifying a function's call signature
+) -> FunctionSigKey:
+    """Return a hashable key identifying a function's call signature
 
-    If arguments_matter is True then the function signature depends on the given arguments
+    If arguments_matter is True then the function signature depends on the given arguments.
+    Each argument is a separate element of the key so different arguments can't
+    collide as they did with string concatenation, e.g. ('ab', 'c') and ('a', 'bc').
+    Keyword arguments are keyed together with their name, so f(a=1) and f(b=1) differ.
+    This also means that a call giving an argument by position and one giving it by
+    keyword get different keys, so callers should pass arguments the same way.
     If skip_ignore_cache is True then the ignore_cache kwarg argument is not counted
     in the signature calculation
     """
-    function_sig = name
-    if arguments_matter:
-        for arg in args:
-            function_sig += str(arg)
-        for argname, value in kwargs.items():
-            if skip_ignore_cache and argname == 'ignore_cache':
-                continue
+    if not arguments_matter:
+        return (name,)
+
+    key: list[Hashable] = [name]
+    for arg in args:
+        key.append(_argument_key(arg))
+    for argname, value in kwargs.items():
+        if skip_ignore_cache and argname == 'ignore_cache':
+            continue
 
-            function_sig += str(value)
+        key.append((argname, _argument_key(value)))
 
-    return hash(function_sig)
+    return tuple(key)
@@ -4,7 +4,7 @@ from typing import Any, Callable
 
 from gevent.lock import Semaphore
 
-from .common import function_sig_key
+from .common import FunctionSigKey, function_sig_key
 
 
 class LockableQueryMixIn():
@@ -16,7 +16,7 @@ class LockableQueryMixIn():
 
     def __init__(self, *args: Any, **kwargs: Any) -> None:
         super().__init__(*args, **kwargs)
-        self.query_locks_map: dict[int, Semaphore] = defaultdict(Semaphore)
+        self.query_locks_map: dict[FunctionSigKey, Semaphore] = defaultdict(Semaphore)
         # Accessing and writing to the query_locks map also needs to be protected
         self.query_locks_map_lock = Semaphore()
 
@@ -0,0 +1,119 @@
+"""
+Benchmarks serializing large history payloads for the API.
+
+The result of an endpoint was processed by process_result into a new tree of json
+types which was then encoded by json.dumps. This is compared with process_result_to_json
+which writes the json in a single pass. The output of both is checked to be identical.
+
+Payloads:
+- history events serialized to dicts, as the history events endpoints return them
+- staking event objects, serialized by the serializer itself
+- trades as dicts with FVal values, as the trades endpoint returns them
+
+Run with: python -m tools.profiling.benchmarks.api_serialization --entries 100000
+"""
+import argparse
+import json
+import statistics
+import time
+from collections.abc import Callable
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import Any
+
+from rotkehlchen.accounting.structures.balance import Balance
+from rotkehlchen.accounting.structures.base import HistoryBaseEntry, StakingEvent
+from rotkehlchen.accounting.structures.types import HistoryEventSubType, HistoryEventType
+from rotkehlchen.constants.assets import A_ETH, A_USDC
+from rotkehlchen.fval import FVal
+from rotkehlchen.globaldb.handler import GlobalDBHandler
+from rotkehlchen.logging import TRACE, add_logging_level
+from rotkehlchen.serialization.serialize import process_result, process_result_to_json
+from rotkehlchen.types import Location, TimestampMS, TradeType
+
+
+def make_events(number: int) -> list[HistoryBaseEntry]:
+    return [HistoryBaseEntry(
+        event_identifier=f'{idx // 4:064x}'.encode(),
+        sequence_index=idx % 4,
+        timestamp=TimestampMS(1600000000000 + idx),
+        location=Location.KRAKEN,
+        event_type=HistoryEventType.STAKING,
+        event_subtype=HistoryEventSubType.REWARD,
+        asset=A_ETH,
+        balance=Balance(amount=FVal(idx), usd_value=FVal(idx * 2)),
+        notes=f'Event {idx}',
+        identifier=idx,
+    ) for idx in range(number)]
+
+
+def make_trades(number: int) -> list[dict[str, Any]]:
+    return [{
+        'timestamp': 1600000000 + idx,
+        'location': Location.BINANCE,
+        'base_asset': A_ETH,
+        'quote_asset': A_USDC,
+        'trade_type': TradeType.BUY,
+        'amount': FVal(idx),
+        'rate': FVal('1250.12'),
+        'fee': FVal('0.1'),
+        'fee_currency': A_USDC,
+        'link': f'{idx}',
+        'notes': None,
+        'trade_id': f'{idx:064x}',
+    } for idx in range(number)]
+
+
+def make_payloads(entries: int) -> dict[str, Any]:
+    events = make_events(entries)
+    return {
+        'history events': {'result': {
+            'entries': [{'entry': x.serialize(), 'ignored_in_accounting': False} for x in events],
+            'entries_found': entries,
+            'entries_total': entries,
+            'entries_limit': -1,
+        }, 'message': ''},
+        'staking events': {'result': {
+            'events': [StakingEvent.from_history_base_entry(x) for x in events],
+            'entries_found': entries,
+        }, 'message': ''},
+        'trades': {'result': {
+            'entries': [{'entry': x, 'ignored_in_accounting': False} for x in make_trades(entries)],  # noqa: E501
+            'entries_found': entries,
+        }, 'message': ''},
+    }
+
+
+def measure(function: Callable[[Any], str], payload: Any, runs: int) -> tuple[str, float]:
+    durations = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        data = function(payload)
+        durations.append(time.perf_counter() - start)
+    return data, statistics.median(durations)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark serializing API responses')
+    parser.add_argument('--entries', type=int, default=100000, help='Entries per payload')
+    parser.add_argument('--runs', type=int, default=5, help='Runs per serializer')
+    args = parser.parse_args()
+
+    add_logging_level('TRACE', TRACE)
+    with TemporaryDirectory() as tmp_dir:
+        GlobalDBHandler(data_dir=Path(tmp_dir), sql_vm_instructions_cb=5000)
+        payloads = make_payloads(args.entries)
+
+    for title, payload in payloads.items():
+        old_data, old_duration = measure(lambda x: json.dumps(process_result(x)), payload, args.runs)  # noqa: E501
+        new_data, new_duration = measure(process_result_to_json, payload, args.runs)
+        assert old_data == new_data, f'Serialized {title} differ'
+        print(
+            f'{title:<16} {len(new_data) / 1024 / 1024:.1f}MB. process_result + json.dumps: '
+            f'{old_duration * 1000:.0f}ms, process_result_to_json: '
+            f'{new_duration * 1000:.0f}ms ({old_duration / new_duration:.2f}x)',
+        )
+
+
+if __name__ == '__main__':
+    main()
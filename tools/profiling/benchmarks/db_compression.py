@@ -0,0 +1,100 @@
+"""
+Benchmarks the memory used when compressing and encrypting the user DB for premium sync.
+
+Creates a synthetic DB of the given size and measures the peak memory allocated by
+DataHandler.compress_and_encrypt_db compared to the previous implementation that kept
+the whole source DB and the whole compressed DB in memory.
+
+Run with: python -m tools.profiling.benchmarks.db_compression --size-mb 1024
+"""
+import argparse
+import base64
+import hashlib
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+import tracemalloc
+import zlib
+from pathlib import Path
+from typing import Any, Callable
+
+from rotkehlchen.crypto import encrypt
+from rotkehlchen.data_handler import BUFFERSIZE, DataHandler
+
+from ..constants import MEGA
+
+ROW_SIZE = 4096
+
+
+def create_synthetic_db(path: Path, size_mb: int) -> None:
+    """Creates a DB of roughly size_mb MBs with half random and half compressible data"""
+    conn = sqlite3.connect(path)
+    conn.execute('CREATE TABLE data (identifier INTEGER PRIMARY KEY, value BLOB)')
+    rows_num = size_mb * 2 ** 20 // ROW_SIZE
+    batch = []
+    for idx in range(rows_num):
+        batch.append((idx, os.urandom(ROW_SIZE // 2) + b'rotki' * (ROW_SIZE // 10)))
+        if len(batch) == 1000:
+            conn.executemany('INSERT INTO data VALUES (?, ?)', batch)
+            batch = []
+    conn.executemany('INSERT INTO data VALUES (?, ?)', batch)
+    conn.commit()
+    conn.close()
+
+
+def legacy_compress_and_encrypt_db(source: Path, password: str) -> tuple[bytes, str]:
+    """The implementation before streaming, kept here for comparison"""
+    compressor = zlib.compressobj(level=9)
+    source_data = bytearray()
+    compressed_data = bytearray()
+    with open(source, 'rb') as src_f:
+        block = src_f.read(BUFFERSIZE)
+        while block:
+            source_data += block
+            compressed_data += compressor.compress(block)
+            block = src_f.read(BUFFERSIZE)
+
+        compressed_data += compressor.flush()
+
+    original_data_hash = base64.b64encode(hashlib.sha256(source_data).digest()).decode()
+    encrypted_data = encrypt(password.encode(), bytes(compressed_data))
+    return encrypted_data.encode(), original_data_hash
+
+
+class FakeDB:
+    def __init__(self, source: Path) -> None:
+        self.source = source
+
+    def export_unencrypted(self, temppath: Path) -> None:
+        shutil.copyfile(self.source, temppath)
+
+
+def measure(name: str, function: Callable[[], Any]) -> None:
+    tracemalloc.start()
+    start = time.perf_counter()
+    function()
+    duration = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f'{name}: peak memory {peak / MEGA:.2f} MB, took {duration:.2f} seconds')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark DB compression for premium sync')
+    parser.add_argument('--size-mb', type=int, default=1024, help='Size of the synthetic DB')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        source = Path(tmpdir) / 'synthetic.db'
+        create_synthetic_db(source, args.size_mb)
+        print(f'Synthetic DB size: {source.stat().st_size / MEGA:.2f} MB')
+        data = DataHandler.__new__(DataHandler)
+        data.db = FakeDB(source)  # type: ignore
+        measure('streaming', lambda: data.compress_and_encrypt_db('password'))
+        measure('legacy', lambda: legacy_compress_and_encrypt_db(source, 'password'))
+
+
+if __name__ == '__main__':
+    main()
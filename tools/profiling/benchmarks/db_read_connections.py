@@ -0,0 +1,133 @@
+"""
+Benchmarks reading from the user DB while other greenlets write to it.
+
+A few greenlets insert history events in small write transactions, as the transaction
+decoders do, while others run the kind of reads the API serves. The latency of the reads
+is compared between using only the main connection and using WAL journaling with a pool
+of read only connections.
+
+Run with: python -m tools.profiling.benchmarks.db_read_connections --read-connections 4
+"""
+import argparse
+import statistics
+import time
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+import gevent
+
+from rotkehlchen.accounting.structures.balance import Balance
+from rotkehlchen.accounting.structures.base import HistoryBaseEntry
+from rotkehlchen.accounting.structures.types import HistoryEventSubType, HistoryEventType
+from rotkehlchen.constants.assets import A_ETH
+from rotkehlchen.db.dbhandler import DBHandler
+from rotkehlchen.db.history_events import DBHistoryEvents
+from rotkehlchen.fval import FVal
+from rotkehlchen.globaldb.handler import GlobalDBHandler
+from rotkehlchen.logging import TRACE, add_logging_level
+from rotkehlchen.types import Location, TimestampMS
+from rotkehlchen.user_messages import MessagesAggregator
+
+EVENTS_PER_WRITE = 50
+
+
+def make_events(start: int, number: int) -> list[HistoryBaseEntry]:
+    return [HistoryBaseEntry(
+        event_identifier=f'{idx // 4:064x}'.encode(),
+        sequence_index=idx % 4,
+        timestamp=TimestampMS(1600000000000 + idx),
+        location=Location.BLOCKCHAIN,
+        event_type=HistoryEventType.SPEND,
+        event_subtype=HistoryEventSubType.FEE,
+        asset=A_ETH,
+        balance=Balance(amount=FVal(idx), usd_value=FVal(idx * 2)),
+        notes=f'Event {idx}',
+    ) for idx in range(start, start + number)]
+
+
+def write_events(db: DBHandler, writer: int, writes: int) -> None:
+    history_db = DBHistoryEvents(db)
+    for write in range(writes):
+        start = (writer * writes + write) * EVENTS_PER_WRITE
+        with db.user_write() as write_cursor:
+            history_db.add_history_events(write_cursor, make_events(start, EVENTS_PER_WRITE))
+        gevent.sleep(0)
+
+
+def read_events(db: DBHandler, reads: int, latencies: list[float]) -> None:
+    for _ in range(reads):
+        start = time.perf_counter()
+        with db.conn.read_ctx() as cursor:
+            cursor.execute(
+                'SELECT * FROM history_events ORDER BY timestamp DESC LIMIT 100',
+            ).fetchall()
+            cursor.execute('SELECT COUNT(*) FROM history_events').fetchone()
+        latencies.append(time.perf_counter() - start)
+        gevent.sleep(0.001)
+
+
+def benchmark(
+        title: str,
+        data_dir: Path,
+        read_connections: int,
+        writers: int,
+        readers: int,
+        operations: int,
+) -> None:
+    user_dir = data_dir / title
+    user_dir.mkdir()
+    db = DBHandler(
+        user_data_dir=user_dir,
+        password='123',
+        msg_aggregator=MessagesAggregator(),
+        initial_settings=None,
+        sql_vm_instructions_cb=5000,
+        sql_read_connections=read_connections,
+    )
+    with db.user_write() as write_cursor:
+        db.add_asset_identifiers(write_cursor, [A_ETH.identifier])
+
+    latencies: list[float] = []
+    start = time.perf_counter()
+    greenlets = [gevent.spawn(write_events, db, idx, operations) for idx in range(writers)]
+    greenlets.extend(gevent.spawn(read_events, db, operations, latencies) for _ in range(readers))  # noqa: E501
+    gevent.joinall(greenlets, raise_error=True)
+    duration = time.perf_counter() - start
+    db.logout()
+
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(
+        f'{title:<16} {len(latencies)} reads during {writers * operations} writes in '
+        f'{duration:.2f}s. Read latency p50: {quantiles[49] * 1000:.2f}ms, '
+        f'p99: {quantiles[98] * 1000:.2f}ms, max: {max(latencies) * 1000:.2f}ms',
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark reads during DB writes')
+    parser.add_argument('--read-connections', type=int, default=4, help='Size of the pool')
+    parser.add_argument('--writers', type=int, default=4, help='Number of writing greenlets')
+    parser.add_argument('--readers', type=int, default=8, help='Number of reading greenlets')
+    parser.add_argument('--operations', type=int, default=200, help='Operations per greenlet')
+    args = parser.parse_args()
+
+    add_logging_level('TRACE', TRACE)
+    with TemporaryDirectory() as tmp_dir:
+        data_dir = Path(tmp_dir)
+        GlobalDBHandler(data_dir=data_dir, sql_vm_instructions_cb=5000)
+        for title, read_connections in (
+                ('main connection', 0),
+                ('read connections', args.read_connections),
+        ):
+            benchmark(
+                title=title,
+                data_dir=data_dir,
+                read_connections=read_connections,
+                writers=args.writers,
+                readers=args.readers,
+                operations=args.operations,
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""
+Benchmarks the overhead of building call signature keys and of the @protect_with_lock
+and @cache_response_timewise decorators that use them.
+
+Compares the structured keys of function_sig_key with the previous implementation that
+concatenated the string representation of every argument and hashed the result.
+
+Run with: python -m tools.profiling.benchmarks.function_sig_key --addresses 1000
+"""
+import argparse
+import os
+import timeit
+from typing import Any, Callable
+from unittest.mock import patch
+
+from eth_utils import to_checksum_address
+
+from rotkehlchen.utils.mixins import cacheable, lockable
+from rotkehlchen.utils.mixins.cacheable import CacheableMixIn, cache_response_timewise
+from rotkehlchen.utils.mixins.common import function_sig_key
+from rotkehlchen.utils.mixins.lockable import LockableQueryMixIn, protect_with_lock
+
+
+def legacy_function_sig_key(
+        name: str,
+        arguments_matter: bool,
+        skip_ignore_cache: bool,
+        *args: Any,
+        **kwargs: Any,
+) -> int:
+    """The implementation before structured keys, kept here for comparison"""
+    function_sig = name
+    if arguments_matter:
+        for arg in args:
+            function_sig += str(arg)
+        for argname, value in kwargs.items():
+            if skip_ignore_cache and argname == 'ignore_cache':
+                continue
+
+            function_sig += str(value)
+
+    return hash(function_sig)
+
+
+class Queries(LockableQueryMixIn, CacheableMixIn):
+
+    @protect_with_lock(arguments_matter=True)
+    def locked(self, addresses: list[str], **kwargs: Any) -> int:  # pylint: disable=unused-argument  # noqa: E501
+        return 1
+
+    @cache_response_timewise()
+    def cached(self, addresses: list[str], **kwargs: Any) -> int:  # pylint: disable=unused-argument  # noqa: E501
+        return 1
+
+
+def measure(title: str, method: Callable[[], Any], number: int) -> None:
+    seconds = min(timeit.repeat(method, number=number, repeat=5))
+    print(f'{title:<45} {seconds / number * 1_000_000:10.2f} us/call')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark call signature keys')
+    parser.add_argument('--addresses', type=int, default=1000, help='Size of the accounts list')
+    parser.add_argument('--number', type=int, default=2000, help='Calls per measurement')
+    args = parser.parse_args()
+
+    addresses = [to_checksum_address(os.urandom(20)) for _ in range(args.addresses)]
+    queries = Queries()
+    for name, key_function in (('legacy', legacy_function_sig_key), ('structured', function_sig_key)):  # noqa: E501
+        print(f'--- {name} keys with {args.addresses} addresses ---')
+        measure(
+            'function_sig_key(name, address)',
+            lambda key_function=key_function: key_function('query', True, True, addresses[0], ignore_cache=False),  # type: ignore  # noqa: E501
+            number=args.number * 10,
+        )
+        measure(
+            'function_sig_key(name, addresses)',
+            lambda key_function=key_function: key_function('query', True, True, addresses),  # type: ignore  # noqa: E501
+            number=args.number,
+        )
+        with (
+            patch.object(lockable, 'function_sig_key', key_function),
+            patch.object(cacheable, 'function_sig_key', key_function),
+        ):
+            measure(
+                '@protect_with_lock(addresses)',
+                lambda: queries.locked(addresses),
+                number=args.number,
+            )
+            measure(
+                '@cache_response_timewise(addresses) hit',
+                lambda: queries.cached(addresses),
+                number=args.number,
+            )
+
+
+if __name__ == '__main__':
+    main()
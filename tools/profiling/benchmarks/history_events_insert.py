@@ -0,0 +1,111 @@
+"""
+Benchmarks inserting history events in the user DB.
+
+Compares DBHistoryEvents.add_history_events, which inserts all events with a single
+executemany, with the previous implementation that called add_history_event for each
+event. Half of the events are inserted twice to also measure ignoring duplicates.
+
+Run with: python -m tools.profiling.benchmarks.history_events_insert --events 100000
+"""
+import argparse
+import time
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import Callable
+
+from rotkehlchen.accounting.structures.balance import Balance
+from rotkehlchen.accounting.structures.base import HistoryBaseEntry
+from rotkehlchen.accounting.structures.types import HistoryEventSubType, HistoryEventType
+from rotkehlchen.constants.assets import A_ETH
+from rotkehlchen.db.dbhandler import DBHandler
+from rotkehlchen.db.drivers.gevent import DBCursor
+from rotkehlchen.db.history_events import DBHistoryEvents
+from rotkehlchen.fval import FVal
+from rotkehlchen.globaldb.handler import GlobalDBHandler
+from rotkehlchen.logging import TRACE, add_logging_level
+from rotkehlchen.types import Location, TimestampMS
+from rotkehlchen.user_messages import MessagesAggregator
+
+
+def make_events(number: int) -> list[HistoryBaseEntry]:
+    return [HistoryBaseEntry(
+        event_identifier=f'{idx // 4:064x}'.encode(),
+        sequence_index=idx % 4,
+        timestamp=TimestampMS(1600000000000 + idx),
+        location=Location.KRAKEN,
+        event_type=HistoryEventType.TRADE,
+        event_subtype=HistoryEventSubType.SPEND,
+        asset=A_ETH,
+        balance=Balance(amount=FVal(idx), usd_value=FVal(idx * 2)),
+        notes=f'Event {idx}',
+    ) for idx in range(number)]
+
+
+def legacy_add_history_events(
+        history_db: DBHistoryEvents,
+        write_cursor: DBCursor,
+        history: list[HistoryBaseEntry],
+) -> None:
+    """The implementation before the executemany path, kept here for comparison"""
+    for event in history:
+        history_db.add_history_event(write_cursor=write_cursor, event=event)
+
+
+def benchmark(
+        title: str,
+        data_dir: Path,
+        events: list[HistoryBaseEntry],
+        add_events: Callable[[DBHistoryEvents, DBCursor, list[HistoryBaseEntry]], None],
+) -> None:
+    user_dir = data_dir / title
+    user_dir.mkdir()
+    db = DBHandler(
+        user_data_dir=user_dir,
+        password='123',
+        msg_aggregator=MessagesAggregator(),
+        initial_settings=None,
+        sql_vm_instructions_cb=5000,
+    )
+    history_db = DBHistoryEvents(db)
+    with db.user_write() as write_cursor:
+        db.add_asset_identifiers(write_cursor, [A_ETH.identifier])
+
+    start = time.perf_counter()
+    with db.user_write() as write_cursor:
+        add_events(history_db, write_cursor, events)
+    first_pass = time.perf_counter() - start
+    start = time.perf_counter()
+    with db.user_write() as write_cursor:  # half of them already exist and get ignored
+        add_events(history_db, write_cursor, events[len(events) // 2:])
+    second_pass = time.perf_counter() - start
+
+    with db.conn.read_ctx() as cursor:
+        count = cursor.execute('SELECT COUNT(*) FROM history_events').fetchone()[0]
+    db.logout()
+    print(
+        f'{title:<12} insert {len(events)} events: {first_pass:.2f}s, '
+        f'reinsert {len(events) // 2} existing: {second_pass:.2f}s, rows in DB: {count}',
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark inserting history events')
+    parser.add_argument('--events', type=int, default=100000, help='Number of events')
+    args = parser.parse_args()
+
+    add_logging_level('TRACE', TRACE)
+    events = make_events(args.events)
+    with TemporaryDirectory() as tmp_dir:
+        data_dir = Path(tmp_dir)
+        GlobalDBHandler(data_dir=data_dir, sql_vm_instructions_cb=5000)
+        benchmark('per event', data_dir, events, legacy_add_history_events)
+        benchmark(
+            'executemany',
+            data_dir,
+            events,
+            lambda history_db, write_cursor, history: history_db.add_history_events(write_cursor, history),  # noqa: E501
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+"""
+Benchmarks the overhead of logging in the transaction decoding hot path.
+
+The decoder logs very little per transaction and only at debug level, so at the
+default INFO level of production the cost of a log call is building its message.
+Calls with f-string messages format them, and hex encode the transaction hash, even
+though the record is dropped. Calls with the values given as kwargs skip that.
+
+Then the cost for the caller of emitting INFO records to a log file is measured, with
+the text and json lines formats, writing to the file directly and through the queued
+handler that writes from a separate thread.
+
+Run with: python -m tools.profiling.benchmarks.logging_overhead --calls 200000
+"""
+import argparse
+import logging
+import statistics
+import time
+from collections.abc import Callable
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from rotkehlchen.args import app_args
+from rotkehlchen.errors.serialization import DeserializationError
+from rotkehlchen.logging import TRACE, RotkehlchenLogsAdapter, add_logging_level, configure_logging  # noqa: E501
+
+logger = logging.getLogger('rotkehlchen.chain.evm.decoding.decoder')
+log = RotkehlchenLogsAdapter(logger)
+
+TX_HASH = bytes(range(32))
+ERROR = DeserializationError('Could not deserialize amount')
+
+
+def eager_debug_call(log_index: int) -> None:
+    log.debug(
+        f'Decoding tx log with index {log_index} of transaction '
+        f'{TX_HASH.hex()} through decode_action failed due to {str(ERROR)}')
+
+
+def structured_debug_call(log_index: int) -> None:
+    log.debug(
+        'Decoding tx log failed',
+        log_index=log_index,
+        tx_hash=TX_HASH,
+        method='decode_action',
+        error=ERROR,
+    )
+
+
+def info_call(log_index: int) -> None:
+    log.info('Decoded tx log', log_index=log_index, tx_hash=TX_HASH, events=2)
+
+
+def measure(function: Callable[[int], None], calls: int, runs: int) -> float:
+    """Returns the median time per call in microseconds"""
+    durations = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        for idx in range(calls):
+            function(idx)
+        durations.append(time.perf_counter() - start)
+    return statistics.median(durations) / calls * 1000000
+
+
+def configure(data_dir: Path, logformat: str, logasync: bool) -> None:
+    args = ['--logtarget', 'file', '--logfile', str(data_dir / f'{logformat}.log'), '--loglevel', 'info', '--logformat', logformat]  # noqa: E501
+    if logasync is True:
+        args.append('--logasync')
+    configure_logging(app_args(prog='benchmark', description='').parse_args(args))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark the overhead of logging')
+    parser.add_argument('--calls', type=int, default=200000, help='Log calls per run')
+    parser.add_argument('--runs', type=int, default=5, help='Runs per measurement')
+    args = parser.parse_args()
+
+    add_logging_level('TRACE', TRACE)
+    with TemporaryDirectory() as tmp_dir:
+        configure(data_dir=Path(tmp_dir), logformat='text', logasync=False)
+        eager = measure(eager_debug_call, args.calls, args.runs)
+        structured = measure(structured_debug_call, args.calls, args.runs)
+        print(
+            f'debug call at INFO level. f-string message: {eager:.2f}us, '
+            f'kwargs: {structured:.2f}us ({eager / structured:.2f}x)',
+        )
+
+        for logformat in ('text', 'json'):
+            durations = {}
+            for logasync in (False, True):
+                configure(data_dir=Path(tmp_dir), logformat=logformat, logasync=logasync)
+                durations[logasync] = measure(info_call, args.calls, args.runs)
+                start = time.perf_counter()
+                logging.shutdown()  # waits for the queued records to be written
+                flush_duration = time.perf_counter() - start
+
+            print(
+                f'info call with {logformat} format. file handler: {durations[False]:.2f}us, '
+                f'queued handler: {durations[True]:.2f}us '
+                f'({durations[False] / durations[True]:.2f}x, {flush_duration * 1000:.0f}ms '
+                f'to write the queued records at shutdown)',
+            )
+
+
+if __name__ == '__main__':
+    main()
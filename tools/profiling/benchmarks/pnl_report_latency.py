@@ -0,0 +1,148 @@
+"""
+Benchmarks the latency of API like DB reads while a PnL report reads the history.
+
+One greenlet repeatedly reads all history events and trades as the PnL report does
+while other greenlets run the small reads of the usual API endpoints. Their latency
+includes the time they wait for the hub. It is compared between:
+- the main connection, where the report only yields through the progress handler
+- read connections, where each read has its own connection and progress handler
+- read connections with the report offloaded to a native thread
+
+Run with: python -m tools.profiling.benchmarks.pnl_report_latency --events 100000
+"""
+import argparse
+import statistics
+import time
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+import gevent
+
+from rotkehlchen.accounting.structures.balance import Balance
+from rotkehlchen.accounting.structures.base import HistoryBaseEntry
+from rotkehlchen.accounting.structures.types import HistoryEventSubType, HistoryEventType
+from rotkehlchen.constants.assets import A_ETH
+from rotkehlchen.db.dbhandler import DBHandler
+from rotkehlchen.db.filtering import HistoryEventFilterQuery, TradesFilterQuery
+from rotkehlchen.db.history_events import DBHistoryEvents
+from rotkehlchen.fval import FVal
+from rotkehlchen.globaldb.handler import GlobalDBHandler
+from rotkehlchen.logging import TRACE, add_logging_level
+from rotkehlchen.types import Location, TimestampMS
+from rotkehlchen.user_messages import MessagesAggregator
+
+ENDPOINT_INTERVAL = 0.01  # seconds between two requests of an endpoint greenlet
+
+
+def make_events(number: int) -> list[HistoryBaseEntry]:
+    return [HistoryBaseEntry(
+        event_identifier=f'{idx // 4:064x}'.encode(),
+        sequence_index=idx % 4,
+        timestamp=TimestampMS(1600000000000 + idx),
+        location=Location.KRAKEN,
+        event_type=HistoryEventType.STAKING,
+        event_subtype=HistoryEventSubType.REWARD,
+        asset=A_ETH,
+        balance=Balance(amount=FVal(idx), usd_value=FVal(idx * 2)),
+        notes=f'Event {idx}',
+    ) for idx in range(number)]
+
+
+def run_report(db: DBHandler, offload: bool, reports: int) -> None:
+    history_db = DBHistoryEvents(db)
+    for _ in range(reports):
+        with db.conn.read_ctx(offload=offload) as cursor:
+            db.get_trades(cursor, filter_query=TradesFilterQuery.make(), has_premium=True)
+        with db.conn.read_ctx(offload=offload) as cursor:
+            history_db.get_history_events_and_limit_info(
+                cursor=cursor,
+                filter_query=HistoryEventFilterQuery.make(),
+                has_premium=True,
+            )
+
+
+def run_endpoint(db: DBHandler, latencies: list[float]) -> None:
+    history_db = DBHistoryEvents(db)
+    while True:
+        requested = time.perf_counter()
+        gevent.sleep(ENDPOINT_INTERVAL)
+        with db.conn.read_ctx() as cursor:
+            db.get_settings(cursor)
+            history_db.get_history_events(
+                cursor=cursor,
+                filter_query=HistoryEventFilterQuery.make(limit=10, offset=0),
+                has_premium=True,
+            )
+        # what the request waited on top of its scheduled interval
+        latencies.append(time.perf_counter() - requested - ENDPOINT_INTERVAL)
+
+
+def benchmark(
+        title: str,
+        data_dir: Path,
+        events: list[HistoryBaseEntry],
+        read_connections: int,
+        offload: bool,
+        endpoints: int,
+        reports: int,
+) -> None:
+    user_dir = data_dir / title.replace(' ', '_')
+    user_dir.mkdir()
+    db = DBHandler(
+        user_data_dir=user_dir,
+        password='123',
+        msg_aggregator=MessagesAggregator(),
+        initial_settings=None,
+        sql_vm_instructions_cb=5000,
+        sql_read_connections=read_connections,
+    )
+    with db.user_write() as write_cursor:
+        db.add_asset_identifiers(write_cursor, [A_ETH.identifier])
+        DBHistoryEvents(db).add_history_events(write_cursor, events)
+
+    latencies: list[float] = []
+    endpoint_greenlets = [gevent.spawn(run_endpoint, db, latencies) for _ in range(endpoints)]
+    start = time.perf_counter()
+    gevent.spawn(run_report, db, offload, reports).get()
+    duration = time.perf_counter() - start
+    gevent.killall(endpoint_greenlets)
+    db.logout()
+
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(
+        f'{title:<26} {reports} reports in {duration:.2f}s. {len(latencies)} endpoint '
+        f'requests. Latency p50: {quantiles[49] * 1000:.2f}ms, '
+        f'p99: {quantiles[98] * 1000:.2f}ms, max: {max(latencies) * 1000:.2f}ms',
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark API latency during a PnL report')
+    parser.add_argument('--events', type=int, default=100000, help='Number of history events')
+    parser.add_argument('--endpoints', type=int, default=4, help='Concurrent endpoint greenlets')
+    parser.add_argument('--reports', type=int, default=3, help='Number of report reads')
+    args = parser.parse_args()
+
+    add_logging_level('TRACE', TRACE)
+    events = make_events(args.events)
+    with TemporaryDirectory() as tmp_dir:
+        data_dir = Path(tmp_dir)
+        GlobalDBHandler(data_dir=data_dir, sql_vm_instructions_cb=5000)
+        for title, read_connections, offload in (
+                ('main connection', 0, False),
+                ('read connections', 4, False),
+                ('offloaded to threadpool', 4, True),
+        ):
+            benchmark(
+                title=title,
+                data_dir=data_dir,
+                events=events,
+                read_connections=read_connections,
+                offload=offload,
+                endpoints=args.endpoints,
+                reports=args.reports,
+            )
+
+
+if __name__ == '__main__':
+    main()